@@ -36,3 +36,4 @@ class PaginatedResponseDTO(BaseModel):
     pagination: PaginationMetadata = Field(..., description="Pagination metadata")
     filters_applied: dict | None = Field(None, description="Filters that were applied")
     sorting_applied: dict | None = Field(None, description="Sorting that was applied")
+    facets: dict | None = Field(None, description="Requested facet counts")
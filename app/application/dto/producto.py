@@ -4,16 +4,21 @@ Data Transfer Objects for input/output validation in application layer.
 """
 
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional
 
 from app.domain.entities.producto import ProductoEntity
 
+# Longest accepted ``buscar`` term; every search runs it against the whole catalogue
+MAX_SEARCH_TERM_LENGTH = 100
+
 
 class ProductoSearchDTOV1(BaseModel):
     """DTO for V1 search with larger limit for backward compatibility."""
 
-    buscar: Optional[str] = Field(None, min_length=1, description="Search term")
+    buscar: Optional[str] = Field(
+        None, min_length=1, max_length=MAX_SEARCH_TERM_LENGTH, description="Search term"
+    )
     limit: int = Field(10, ge=1, le=500, description="Max results")
     marca: Optional[str] = Field(None, max_length=50, description="Filter by brand")
     familia: Optional[str] = Field(None, max_length=50, description="Filter by family")
@@ -67,7 +72,7 @@ class ProductoUpdateDTO(BaseModel):
 class ProductoSearchDTO(BaseModel):
     """DTO for searching products with filters."""
 
-    buscar: Optional[str] = Field(None, min_length=1)
+    buscar: Optional[str] = Field(None, min_length=1, max_length=MAX_SEARCH_TERM_LENGTH)
     limit: int = Field(10, ge=1, le=100)
     marca: Optional[str] = Field(None, max_length=50)
     familia: Optional[str] = Field(None, max_length=50)
@@ -137,6 +142,17 @@ class ProductoBC3Response(ProductoExternalResponse):
     cm3: Optional[float] = None
 
 
+# Fields that paginated searches can count with ``?facets=``
+FACET_FIELDS = ("marca", "familia", "bc3_product_type")
+
+
+class ProductoFacetCount(BaseModel):
+    """Products with one value of a facet field, within the current filters."""
+
+    value: str
+    count: int
+
+
 class ProductoExternalPage(BaseModel):
     """Versioned public paginated response."""
 
@@ -144,6 +160,7 @@ class ProductoExternalPage(BaseModel):
     pagination: dict
     filters_applied: dict | None = None
     sorting_applied: dict | None = None
+    facets: dict[str, list[ProductoFacetCount]] | None = None
 
 
 class ProductoBC3Page(BaseModel):
@@ -155,6 +172,66 @@ class ProductoBC3Page(BaseModel):
     sorting_applied: dict | None = None
 
 
+class ProductoBC3Changes(BaseModel):
+    """Private BC3 changes since a sync token."""
+
+    upserts: list[ProductoBC3Response]
+    deletes: list[str]
+    next_token: str
+    has_more: bool
+
+
+class ProductoSuggestion(BaseModel):
+    """One typeahead suggestion."""
+
+    codigo: str
+    descripcion: Optional[str] = None
+    marca: Optional[str] = None
+    referencia: Optional[str] = None
+    match: str = Field(..., description="Matched field: codigo, referencia or descripcion")
+
+
+class ProductoSuggestions(BaseModel):
+    """Typeahead suggestions for a prefix."""
+
+    query: str
+    suggestions: list[ProductoSuggestion]
+
+
+MAX_BULK_LOOKUP_CODES = 5000
+
+
+class ProductoBulkLookupRequest(BaseModel):
+    """Product codes resolved in one request."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    codigos: list[str] = Field(..., min_length=1, max_length=MAX_BULK_LOOKUP_CODES)
+
+    @field_validator("codigos")
+    @classmethod
+    def normalize_codigos(cls, value: list[str]) -> list[str]:
+        """Strip codes, reject blanks and drop repeated codes (first one wins)."""
+        codigos = [codigo.strip() for codigo in value]
+        if not all(codigos):
+            raise ValueError("codigos must not contain blank values")
+        return list(dict.fromkeys(codigos))
+
+
+class ProductoExternalBulk(BaseModel):
+    """Versioned public bulk lookup response."""
+
+    items: list[ProductoExternalResponse]
+    missing_codes: list[str]
+
+
+class ProductoBC3Bulk(BaseModel):
+    """Private BC3 bulk lookup response."""
+
+    items: list[ProductoBC3Response]
+    missing_codes: list[str]
+
+
 class ProductoResponseDTO(BaseModel):
     """DTO for product responses."""
 
@@ -39,6 +39,11 @@ class Settings(BaseSettings):
     rate_limit_global: int = 1000
     rate_limit_burst: int = 10
     rate_limit_listings: int = 10
+    rate_limit_max_clients: int = 100_000
+    rate_limit_redis_url: str | None = None
+    rate_limit_redis_timeout: float = 0.05
+    rate_limit_redis_failure_threshold: int = 3
+    rate_limit_redis_reset_timeout: float = 30.0
 
     # Security - User-Agent Filtering
     blocked_user_agents: list[str] = [
@@ -81,6 +86,94 @@ class Settings(BaseSettings):
     log_rotation: str = "500 MB"
     log_retention: str = "10 days"
     security_log_enabled: bool = True
+    log_json: bool = True
+    log_access_sample_every: int = 1
+    log_event_max_per_second: int = 50
+
+    # Profiling (admin-only; the middleware is not installed unless enabled)
+    profiling_enabled: bool = False
+    profiling_header: str = "X-Profile"
+    profiling_sample_rate: int = 0
+    profiling_interval: float = 0.005
+
+    # Event-loop monitoring (lag probe + blocking-call watchdog)
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.1
+    loop_monitor_block_threshold: float = 0.2
+
+    # Database admission control (adaptive concurrency limit per endpoint class)
+    db_admission_enabled: bool = True
+    db_admission_initial_limit: int = 10
+    db_admission_min_limit: int = 1
+    db_admission_max_limit: int = 15
+    db_admission_target_latency: float = 0.5
+    db_admission_retry_after: int = 1
+    cache_stale_grace_seconds: int = 300
+
+    # Per-request query deadlines (propagated as SET LOCAL statement_timeout)
+    db_query_budget: float = 5.0
+    db_search_query_budget: float = 2.0
+
+    # psycopg server-side prepared statements (disable behind PgBouncer transaction mode)
+    db_prepared_statements: bool = True
+    db_prepare_threshold: int = 2
+
+    # Family endpoints read the familia_stats projection (migration/06_familia_stats.sql)
+    familia_stats_enabled: bool = False
+
+    # Search workload recording for the index advisor (shape counts per worker)
+    workload_recording_enabled: bool = False
+    workload_recording_flush_every: int = 100
+
+    # Conditional GET on catalogue endpoints (migration/08_catalogue_version.sql)
+    http_etags_enabled: bool = False
+    catalogue_version_ttl: float = 2.0
+
+    # Reverse-proxy caching of public catalogue responses (Surrogate-Key always sent;
+    # Cache-Control only when the shared max-age is positive)
+    http_cache_max_age: int = 0
+    http_shared_cache_max_age: int = 0
+    # Surrogate-key purge endpoint of the proxy (empty: no purges)
+    cache_purge_url: str = ""
+    cache_purge_method: str = "PURGE"
+    cache_purge_header: str = "Surrogate-Key"
+    cache_purge_timeout: float = 1.0
+
+    # Brotli/gzip response compression (encoded bodies cached per strong ETag)
+    http_compression_enabled: bool = False
+    http_compression_min_size: int = 1024
+    http_compression_cache_bytes: int = 32 * 1024 * 1024
+
+    # Typeahead prefix index (built at startup; rebuilt on catalogue version change)
+    suggest_index_enabled: bool = False
+    suggest_index_max_age: float = 300.0
+
+    # Columnar in-memory catalogue serving paginated searches (requires numpy)
+    catalogue_snapshot_enabled: bool = False
+    catalogue_snapshot_max_age: float = 300.0
+
+    # Streaming BC3 catalogue export (rows fetched per server-side cursor round trip)
+    bc3_export_batch_size: int = 1000
+    # Each export holds a bc3 pool connection until its body is sent
+    bc3_export_max_concurrent: int = 2
+    bc3_export_retry_after: int = 30
+
+    # Read replicas (read-only repository calls, read-your-writes after a write)
+    db_replica_urls: str | list[str] = Field(default_factory=list)
+    db_replica_health_interval: float = 30.0
+    db_replica_max_lag: float = 5.0
+    db_replica_sticky_seconds: float = 5.0
+
+    # Database pool partitions (one bulkhead per traffic class)
+    db_pool_public_size: int = 6
+    db_pool_public_max_overflow: int = 2
+    db_pool_public_timeout: float = 5.0
+    db_pool_bc3_size: int = 3
+    db_pool_bc3_max_overflow: int = 2
+    db_pool_bc3_timeout: float = 15.0
+    db_pool_admin_size: int = 1
+    db_pool_admin_max_overflow: int = 1
+    db_pool_admin_timeout: float = 30.0
 
     # Database
     database_url: str | None = None
@@ -117,6 +210,14 @@ class Settings(BaseSettings):
             return [key.strip() for key in v.split(",") if key.strip()]
         return v if isinstance(v, list) else []
 
+    @field_validator("db_replica_urls", mode="before")
+    @classmethod
+    def parse_db_replica_urls(cls, v: str | list[str]) -> list[str]:
+        """Parse db_replica_urls from string or list."""
+        if isinstance(v, str):
+            return [url.strip() for url in v.split(",") if url.strip()]
+        return v if isinstance(v, list) else []
+
     @field_validator("cors_origins", mode="before")
     @classmethod
     def parse_cors_origins(cls, v: str | list[str]) -> list[str]:
@@ -5,9 +5,12 @@ from app.domain.exceptions.not_found import (
     ProductoYaExisteException,
 )
 from app.domain.exceptions.not_found import ValidationException
+from app.domain.exceptions.overload import QueryTimeoutException, ServiceOverloadedException
 
 __all__ = [
     "ValidationException",
     "ProductoYaExisteException",
     "ProductoNotFoundException",
+    "ServiceOverloadedException",
+    "QueryTimeoutException",
 ]
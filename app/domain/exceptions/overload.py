@@ -0,0 +1,44 @@
+"""Capacity exceptions module.
+
+Raised when the service sheds load instead of queueing more work.
+"""
+
+
+class ServiceOverloadedException(Exception):
+    """Request rejected by admission control.
+
+    Raised when an endpoint class already has as many queries in flight
+    as its current concurrency limit allows.
+
+    Attributes:
+        endpoint_class: Endpoint class whose limit was reached
+        retry_after: Seconds the client should wait before retrying
+    """
+
+    def __init__(self, endpoint_class: str, retry_after: int = 1, message: str | None = None):
+        self.endpoint_class = endpoint_class
+        self.retry_after = retry_after
+        super().__init__(
+            message or f"Servicio saturado ({endpoint_class}), reintente en {retry_after} s"
+        )
+
+
+class QueryTimeoutException(ServiceOverloadedException):
+    """Query cancelled by its deadline.
+
+    Raised when PostgreSQL cancels a statement because the request's
+    query budget (``statement_timeout``) ran out, or because the client
+    disconnected while it was running.
+
+    Attributes:
+        endpoint_class: Traffic class of the cancelled query
+        budget: Query budget of the request in seconds
+    """
+
+    def __init__(self, endpoint_class: str, budget: float | None = None, retry_after: int = 1):
+        self.budget = budget
+        super().__init__(
+            endpoint_class,
+            retry_after,
+            message=f"Consulta cancelada por superar su plazo ({endpoint_class})",
+        )
@@ -37,6 +37,28 @@ class FamiliaRepositoryInterface(ABC):
         """
         pass
 
+    def get_bc3_coverage_leaderboard(self, limit: int = 5) -> List[FamiliaEntity]:
+        """
+        Get families with highest BC3 coverage.
+
+        Implementations with precomputed statistics should override this
+        with a top-N read; the default sorts every family.
+
+        Args:
+            limit: Number of families to return
+
+        Returns:
+            List[FamiliaEntity]: Families sorted by BC3 coverage
+        """
+        familias = self.get_all()
+
+        # Sort by BC3 coverage percentage
+        sorted_familias = sorted(
+            familias, key=lambda f: f.get_bc3_coverage_percentage(), reverse=True
+        )
+
+        return sorted_familias[:limit]
+
     @abstractmethod
     def get_statistics(self) -> Dict:
         """
@@ -74,14 +74,7 @@ class FamiliaService:
         Returns:
             List[FamiliaEntity]: Families sorted by BC3 coverage
         """
-        familias = self.get_all_familias()
-
-        # Sort by BC3 coverage percentage
-        sorted_familias = sorted(
-            familias, key=lambda f: f.get_bc3_coverage_percentage(), reverse=True
-        )
-
-        return sorted_familias[:limit]
+        return self.repository.get_bc3_coverage_leaderboard(limit)
 
     def buscar_familias_paginado(
         self, request_dto: PaginationRequestDTO
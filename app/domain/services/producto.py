@@ -3,6 +3,10 @@
 Business logic layer that coordinates repositories and applies domain rules.
 """
 
+import base64
+import binascii
+import json
+from collections.abc import Iterator
 from typing import Any, cast
 
 from app.application.dto.bc3_enrichment import (
@@ -34,6 +38,71 @@ from app.application.dto.pagination import (
 )
 
 
+def encode_change_token(position: tuple[int, int]) -> str:
+    """Opaque sync token for a change-log position ``(txid, change_id)``."""
+    raw = f"{position[0]}.{position[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_change_token(token: str) -> tuple[int, int]:
+    """Inverse of :func:`encode_change_token`."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        txid, change_id = raw.split(".")
+        position = int(txid), int(change_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationException("since", "Token de sincronización inválido") from None
+    if min(position) < 0:
+        raise ValidationException("since", "Token de sincronización inválido")
+    return position
+
+
+def _pagination_dict(request_dto: PaginationRequestDTO, filters: dict | None) -> dict:
+    """Repository pagination DTO of a search."""
+    return {
+        "page": request_dto.page,
+        "per_page": request_dto.per_page,
+        "offset": request_dto.offset,
+        "sort": request_dto.sort,
+        "filters": filters if filters else {},
+    }
+
+
+def _paginated_response(
+    request_dto: PaginationRequestDTO, entities: list[ProductoEntity], total: int
+) -> PaginatedResponseDTO:
+    """Wrap one page of search results with its pagination metadata."""
+    metadata = PaginationMetadata.from_query(
+        total_items=total,
+        current_page=request_dto.page,
+        per_page=request_dto.per_page,
+    )
+    return PaginatedResponseDTO(
+        items=entities,
+        pagination=metadata,
+        filters_applied={},
+        sorting_applied={
+            "field": request_dto.sort.split(":")[0] if request_dto.sort else None,
+            "order": request_dto.sort.split(":")[1]
+            if request_dto.sort and ":" in request_dto.sort
+            else "asc",
+        }
+        if request_dto.sort
+        else None,
+    )
+
+
+def _split_lookup(
+    codigos: list[str], found: dict[str, ProductoEntity]
+) -> tuple[list[ProductoEntity], list[str]]:
+    """Order a bulk lookup like the request and list the codes not found."""
+    codigos = list(dict.fromkeys(codigos))
+    return (
+        [found[codigo] for codigo in codigos if codigo in found],
+        [codigo for codigo in codigos if codigo not in found],
+    )
+
+
 class ProductoService:
     """
     Business logic service for Producto.
@@ -201,51 +270,64 @@ class ProductoService:
         return self.repository.count_total()
 
     def buscar_productos_paginado(
-        self, request_dto: PaginationRequestDTO, filters: dict | None = None
+        self,
+        request_dto: PaginationRequestDTO,
+        filters: dict | None = None,
+        facets: list[str] | None = None,
     ) -> PaginatedResponseDTO:
         """Search products with pagination, sorting, and filtering.
 
         Args:
             request_dto: Pagination request with filters and sorting
+            facets: Fields (``FACET_FIELDS``) to count within the filters
 
         Returns:
             PaginatedResponseDTO: Products with pagination metadata
         """
-        # Convert DTO to dict format for repository
-        dto_dict: dict = {
-            "page": request_dto.page,
-            "per_page": request_dto.per_page,
-            "offset": request_dto.offset,
-            "sort": request_dto.sort,
-            "filters": filters if filters else {},
-        }
+        if facets:
+            entities, total, counts = cast(Any, self.repository).buscar_productos_facetado(
+                _pagination_dict(request_dto, filters)
+            )
+            response = _paginated_response(request_dto, entities, total)
+            response.facets = {field: counts[field] for field in facets}
+            return response
 
         # Call repository pagination method
-        entities, total = self.repository.buscar_productos_paginado(dto_dict)
-
-        # Create pagination metadata
-        metadata = PaginationMetadata.from_query(
-            total_items=total,
-            current_page=request_dto.page,
-            per_page=request_dto.per_page,
+        entities, total = self.repository.buscar_productos_paginado(
+            _pagination_dict(request_dto, filters)
         )
+        return _paginated_response(request_dto, entities, total)
 
-        # Convert entities to DTOs (if needed)
-        items = entities  # Can be converted to DTOs in future
+    def buscar_productos_paginado_lote(
+        self, queries: list[tuple[PaginationRequestDTO, dict | None]]
+    ) -> list[PaginatedResponseDTO]:
+        """
+        Run several paginated searches at once.
 
-        return PaginatedResponseDTO(
-            items=items,
-            pagination=metadata,
-            filters_applied={},
-            sorting_applied={
-                "field": request_dto.sort.split(":")[0] if request_dto.sort else None,
-                "order": request_dto.sort.split(":")[1]
-                if request_dto.sort and ":" in request_dto.sort
-                else "asc",
-            }
-            if request_dto.sort
-            else None,
+        Identical queries are executed once; results come back in request order.
+
+        Args:
+            queries: (pagination request, filters) pairs
+        """
+        dtos = [_pagination_dict(request_dto, filters) for request_dto, filters in queries]
+        index_of: dict[str, int] = {}
+        unique_dtos: list[dict] = []
+        positions: list[int] = []
+        for dto in dtos:
+            key = json.dumps(dto, sort_keys=True, default=str)
+            if key not in index_of:
+                index_of[key] = len(unique_dtos)
+                unique_dtos.append(dto)
+            positions.append(index_of[key])
+
+        pages = cast(
+            list[tuple[list[ProductoEntity], int]],
+            cast(Any, self.repository).buscar_productos_paginado_lote(unique_dtos),
         )
+        return [
+            _paginated_response(request_dto, *pages[position])
+            for (request_dto, _), position in zip(queries, positions)
+        ]
 
     def apply_bc3_enrichment(
         self, request: BC3EnrichmentApplyRequest, idempotency_key: str
@@ -265,6 +347,29 @@ class ProductoService:
             cast(Any, self.repository).get_bc3_enrichment_job_status(job_id),
         )
 
+    def obtener_productos(self, codigos: list[str]) -> tuple[list[ProductoEntity], list[str]]:
+        """
+        Bulk lookup of public products.
+
+        Returns:
+            (found products in request order, codes not found)
+        """
+        found = cast(
+            dict[str, ProductoEntity],
+            cast(Any, self.repository).get_by_codigos(codigos, cached=True),
+        )
+        return _split_lookup(codigos, found)
+
+    def obtener_productos_privado(
+        self, codigos: list[str]
+    ) -> tuple[list[ProductoEntity], list[str]]:
+        """Bulk lookup of BC3 products (found in request order, missing codes)."""
+        found = cast(
+            dict[str, ProductoEntity],
+            cast(Any, self.repository).get_private_by_codigos(codigos, cached=True),
+        )
+        return _split_lookup(codigos, found)
+
     def obtener_producto_privado(self, codigo: str) -> ProductoEntity:
         """Get a BC3 product from the raw-product repository projection."""
         return cast(
@@ -296,6 +401,37 @@ class ProductoService:
             sorting_applied=None,
         )
 
+    def exportar_productos_privado(
+        self, filters: dict | None = None, batch_size: int = 1000
+    ) -> Iterator[ProductoEntity]:
+        """Stream the whole BC3 catalogue (optionally filtered) in codigo order."""
+        return cast(
+            Iterator[ProductoEntity],
+            cast(Any, self.repository).stream_private_catalogue(filters or {}, batch_size),
+        )
+
+    def listar_cambios_privado(self, since: str | None = None, limit: int = 500) -> dict:
+        """
+        Products changed since a sync token (BC3 incremental sync).
+
+        Without ``since`` no changes are returned, only the token of the
+        current position: take it before a full export, then sync from it.
+
+        Raises:
+            ValidationException: If ``since`` is not a token issued here
+        """
+        position = decode_change_token(since) if since else None
+        upserts, deletes, next_position, has_more = cast(
+            tuple[list[ProductoEntity], list[str], tuple[int, int], bool],
+            cast(Any, self.repository).get_private_changes(position, limit),
+        )
+        return {
+            "upserts": upserts,
+            "deletes": deletes,
+            "next_token": encode_change_token(next_position),
+            "has_more": has_more,
+        }
+
     def preview_bc3_enrichment(
         self, request: BC3EnrichmentPreviewRequest
     ) -> BC3EnrichmentPreviewResponse:
@@ -33,6 +33,7 @@ class CacheManager:
     # TTL Strategy: Time to live in seconds per data type
     TTL_STRATEGY = {
         "product": 3600,  # 1 hour for products
+        "product_bc3": 60,  # 1 minute for private BC3 products (enrichment edits them)
         "familia": 7200,  # 2 hours for families
         "list": 600,  # 10 minutes for lists
         "search": 300,  # 5 minutes for searches
@@ -40,21 +41,31 @@ class CacheManager:
         "default": 1800,  # 30 minutes default
     }
 
-    def __init__(self, redis_client=None, use_memory_cache: bool = True):
+    def __init__(
+        self, redis_client=None, use_memory_cache: bool = True, stale_grace: int = 0
+    ):
         """
         Initialize cache manager.
 
         Args:
             redis_client: Optional Redis client (falls back to in-memory)
             use_memory_cache: Whether to use in-memory cache as fallback
+            stale_grace: Seconds an expired entry stays available to get_stale()
         ."""
         self.redis_client = redis_client
         self.use_memory_cache = use_memory_cache
+        self.stale_grace = stale_grace
         self.memory_cache: Dict[str, tuple] = {}  # {key: (value, expiry)}
         self.cache_lock = Lock()
 
         # Statistics tracking
-        self.stats = {"hits": 0, "misses": 0, "errors": 0, "total_operations": 0}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "errors": 0,
+            "total_operations": 0,
+        }
 
     def generate_key(self, cache_type: str, identifier: str, **kwargs) -> str:
         """
@@ -142,11 +153,12 @@ class CacheManager:
                     if key in self.memory_cache:
                         value, expiry = self.memory_cache[key]
                         # Check if expired
-                        if expiry > time.time():
+                        now = time.time()
+                        if expiry > now:
                             self.stats["hits"] += 1
                             return value
-                        else:
-                            # Remove expired entry
+                        elif expiry + self.stale_grace <= now:
+                            # Remove expired entry (kept during the stale grace window)
                             del self.memory_cache[key]
 
             self.stats["misses"] += 1
@@ -173,9 +185,13 @@ class CacheManager:
             # Try Redis first if available
             if self.redis_client:
                 try:
-                    self.redis_client.setex(
-                        key, ttl or self.get_ttl("default"), json.dumps(value)
-                    )
+                    ttl = ttl or self.get_ttl("default")
+                    payload = json.dumps(value)
+                    self.redis_client.setex(key, ttl, payload)
+                    if self.stale_grace:
+                        self.redis_client.setex(
+                            self._stale_key(key), ttl + self.stale_grace, payload
+                        )
                     return True
                 except Exception:
                     # Fall through to memory cache
@@ -193,6 +209,125 @@ class CacheManager:
         except Exception:
             return False
 
+    def get_many(self, keys: list[str]) -> Dict[str, Any]:
+        """
+        Get several values in one round trip (Redis MGET, one memory lock).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of {key: value} for the keys found and not expired
+        """
+        found: Dict[str, Any] = {}
+        self.stats["total_operations"] += len(keys)
+
+        try:
+            if self.redis_client and keys:
+                try:
+                    for key, value in zip(keys, self.redis_client.mget(keys)):
+                        if value is not None:
+                            found[key] = json.loads(value)
+                except Exception:
+                    self.stats["errors"] += 1
+
+            if self.use_memory_cache:
+                now = time.time()
+                with self.cache_lock:
+                    for key in keys:
+                        if key in found:
+                            continue
+                        entry = self.memory_cache.get(key)
+                        if entry is not None and entry[1] > now:
+                            found[key] = entry[0]
+
+        except Exception:
+            self.stats["errors"] += 1
+
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Set several values with the same TTL (one Redis pipeline, one memory lock).
+
+        Args:
+            items: Dictionary of {key: value}
+            ttl: Optional TTL in seconds (uses default if not specified)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not items:
+            return True
+        ttl = ttl or self.get_ttl("default")
+
+        try:
+            if self.redis_client:
+                try:
+                    pipeline = self.redis_client.pipeline()
+                    for key, value in items.items():
+                        pipeline.setex(key, ttl, json.dumps(value))
+                    pipeline.execute()
+                    return True
+                except Exception:
+                    # Fall through to memory cache
+                    pass
+
+            if self.use_memory_cache:
+                expiry = time.time() + ttl
+                with self.cache_lock:
+                    for key, value in items.items():
+                        self.memory_cache[key] = (value, expiry)
+                return True
+
+            return False
+
+        except Exception:
+            return False
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        Get a value even if it expired less than ``stale_grace`` seconds ago.
+
+        Used to keep answering while the database sheds load; callers must
+        accept slightly outdated data.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Fresh or recently expired value, or None
+        """
+        try:
+            if self.redis_client and self.stale_grace:
+                try:
+                    value = self.redis_client.get(self._stale_key(key))
+                    if value is not None:
+                        self.stats["stale_hits"] += 1
+                        return json.loads(value)
+                except Exception:
+                    self.stats["errors"] += 1
+
+            if self.use_memory_cache:
+                with self.cache_lock:
+                    entry = self.memory_cache.get(key)
+                    if entry is not None and entry[1] + self.stale_grace > time.time():
+                        self.stats["stale_hits"] += 1
+                        return entry[0]
+
+            return None
+
+        except Exception:
+            self.stats["errors"] += 1
+            return None
+
+    @staticmethod
+    def _stale_key(key: str) -> str:
+        """Redis key holding the copy of ``key`` that outlives its TTL."""
+        return f"{key}:stale"
+
     def delete(self, key: str) -> bool:
         """
         Delete specific key from cache.
@@ -209,7 +344,8 @@ class CacheManager:
             # Try Redis first if available
             if self.redis_client:
                 try:
-                    result = self.redis_client.delete(key)
+                    keys = (key, self._stale_key(key)) if self.stale_grace else (key,)
+                    result = self.redis_client.delete(*keys)
                     deleted = result > 0
                 except Exception:
                     pass
@@ -379,6 +515,7 @@ class CacheManager:
         return {
             "hits": self.stats["hits"],
             "misses": self.stats["misses"],
+            "stale_hits": self.stats["stale_hits"],
             "errors": self.stats["errors"],
             "total_operations": total_ops,
             "hit_rate": hit_rate,
@@ -387,7 +524,13 @@ class CacheManager:
 
     def reset_statistics(self) -> None:
         """Reset cache statistics counters."""
-        self.stats = {"hits": 0, "misses": 0, "errors": 0, "total_operations": 0}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "errors": 0,
+            "total_operations": 0,
+        }
 
 
 def cache_result(cache_key_pattern: str, ttl: Optional[int] = None):
@@ -450,6 +593,10 @@ def get_cache_manager() -> CacheManager:
     global _global_cache_manager
 
     if _global_cache_manager is None:
-        _global_cache_manager = CacheManager()
+        from app.config import get_settings
+
+        _global_cache_manager = CacheManager(
+            stale_grace=get_settings().cache_stale_grace_seconds
+        )
 
     return _global_cache_manager
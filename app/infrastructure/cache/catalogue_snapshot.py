@@ -0,0 +1,302 @@
+"""Columnar in-memory catalogue answering paginated searches without the database.
+
+With ``CATALOGUE_SNAPSHOT_ENABLED`` each worker loads ``productos_clean`` into
+NumPy arrays: ``marca``, ``familia`` and ``bc3_product_type`` dictionary-encoded
+as integer codes, ``pvp`` as floats (NaN for NULL), and one precomputed row
+permutation per sortable field and direction. Filters become vectorized boolean
+masks, sorting selects the masked rows from the permutation, and facet counts
+are a ``bincount`` of the codes. ``buscar`` scans one string holding the text
+of every row, mapped back to rows with ``searchsorted``: the pattern's
+``%``-separated parts are searched in order within each column, so a term
+full of wildcards stays linear instead of backtracking.
+
+A snapshot answers a search only while it matches the current catalogue
+version. After a write the repository queries the database while a background
+thread loads the next snapshot, which then replaces the previous one in a
+single assignment. Without migration 08 the snapshot is rebuilt every
+``CATALOGUE_SNAPSHOT_MAX_AGE`` seconds instead.
+
+Unlike PostgreSQL, text sorts use code-point order rather than the database
+collation, and rows tied on the sort key keep ``codigo`` order.
+"""
+
+import re
+from collections.abc import Iterator, Sequence
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.domain.entities.producto import ProductoEntity
+from app.infrastructure.database.catalogue_version import VersionedSnapshot, get_catalogue_version
+from app.infrastructure.models.producto_clean import ProductoModelClean
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # Optional dependency; searches always query the database.
+    np = None
+
+# Separate the ``buscar`` columns of a row, and the rows, so no match spans two
+_FIELD_SEPARATOR = "\x00"
+_ROW_SEPARATOR = "\x01"
+
+# End of the column a match starts in
+_COLUMN_END = re.compile(f"[{_FIELD_SEPARATOR}{_ROW_SEPARATOR}]")
+
+
+def like_parts(term: str) -> Optional[list["re.Pattern[str]"]]:
+    r"""
+    Patterns of the ``%``-separated parts of ``ILIKE '%term%'``, in order.
+
+    Runs of ``%`` collapse and each part has a fixed length (``_`` is one
+    character), so finding every part in order, each at its earliest
+    position, decides the match. ``\`` is PostgreSQL's default escape:
+    ``\x`` is a literal x, and a trailing ``\`` escapes the closing ``%``,
+    so the last part must end the column. None when no column can match.
+    """
+    if _FIELD_SEPARATOR in term or _ROW_SEPARATOR in term:
+        return None
+    parts: list[list[str]] = []
+    part: list[str] = []
+    anchored = False
+    chars = iter(term.lower())
+    for char in chars:
+        if char == "%":
+            if part:
+                parts.append(part)
+                part = []
+        elif char == "_":
+            part.append(f"[^{_FIELD_SEPARATOR}{_ROW_SEPARATOR}]")
+        elif char == "\\":
+            escaped = next(chars, None)
+            if escaped is None:
+                escaped, anchored = "%", True
+            part.append(re.escape(escaped))
+        else:
+            part.append(re.escape(char))
+    if part:
+        parts.append(part)
+
+    patterns = ["".join(part) for part in parts]
+    if anchored:
+        # Search ``endpos`` is the column end; elsewhere a separator follows
+        patterns[-1] += f"(?=[{_FIELD_SEPARATOR}{_ROW_SEPARATOR}]|\\Z)"
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def _sort_order(column: list, reverse: bool) -> Any:
+    """Row permutation sorting ``column``: NULLs last ascending, first descending."""
+    return np.array(
+        sorted(
+            range(len(column)),
+            key=lambda row: (column[row] is None, 0 if column[row] is None else column[row]),
+            reverse=reverse,
+        ),
+        dtype=np.int64,
+    )
+
+
+class ColumnarCatalogue:
+    """
+    Immutable columnar copy of the public catalogue.
+
+    Args:
+        models: ``productos_clean`` rows, in the order unsorted searches return them
+    """
+
+    def __init__(self, models: Sequence[Any]):
+        # Same columns as the SQL search
+        from app.infrastructure.repositories.producto import (
+            FACET_COLUMNS,
+            SORT_COLUMNS,
+            TEXT_SEARCH_COLUMNS,
+        )
+
+        size = len(models)
+        self.entities: list[ProductoEntity] = [model.to_entity() for model in models]
+
+        self._values: dict[str, list[str]] = {}
+        self._codes_of: dict[str, dict[str, int]] = {}
+        self._codes: dict[str, Any] = {}
+        for field in FACET_COLUMNS:
+            column = [getattr(model, field) for model in models]
+            values = sorted({value for value in column if value is not None})
+            codes_of = {value: code for code, value in enumerate(values)}
+            self._values[field] = values
+            self._codes_of[field] = codes_of
+            self._codes[field] = np.fromiter(
+                (codes_of.get(value, -1) for value in column), dtype=np.int32, count=size
+            )
+
+        self._pvp = np.fromiter(
+            (np.nan if model.pvp is None else model.pvp for model in models),
+            dtype=np.float64,
+            count=size,
+        )
+        self._has_bc3_descripcion_corta = np.fromiter(
+            (model.bc3_descripcion_corta is not None for model in models), dtype=bool, count=size
+        )
+        # One string for all rows: ``buscar`` is a single regex scan in C
+        texts = [
+            _FIELD_SEPARATOR.join(
+                getattr(model, column.key) or "" for column in TEXT_SEARCH_COLUMNS
+            ).lower()
+            for model in models
+        ]
+        self._corpus = _ROW_SEPARATOR.join(texts)
+        self._row_starts = np.cumsum([0] + [len(text) + 1 for text in texts])[:-1]
+
+        # Ties keep the load (``codigo``) order in both directions
+        self._orders: dict[tuple[str, str], Any] = {}
+        for field in SORT_COLUMNS:
+            column = [getattr(model, field) for model in models]
+            self._orders[(field, "asc")] = _sort_order(column, reverse=False)
+            self._orders[(field, "desc")] = _sort_order(column, reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def search(self, dto: dict) -> tuple[list[ProductoEntity], int]:
+        """Answer ``buscar_productos_paginado``.
+
+        Args:
+            dto: Complete pagination request DTO with filters and sorting
+
+        Returns:
+            Entities of the page and the total count of matching items
+        """
+        return self._page(dto, self._mask(dto.get("filters", {})))
+
+    def search_with_facets(
+        self, dto: dict
+    ) -> tuple[list[ProductoEntity], int, dict[str, list[dict]]]:
+        """Answer ``buscar_productos_facetado``."""
+        mask = self._mask(dto.get("filters", {}))
+        entities, total_count = self._page(dto, mask)
+        return entities, total_count, self._facets(mask)
+
+    def _mask(self, filters: dict) -> Any:
+        """Rows matching the filters of ``_pagination_conditions``."""
+        mask = np.ones(len(self.entities), dtype=bool)
+        for field, codes in self._codes.items():
+            if filters.get(field):
+                # A value absent from the catalogue (-2) matches nothing
+                mask &= codes == self._codes_of[field].get(filters[field], -2)
+
+        # NaN (NULL) fails both comparisons, as in SQL
+        if filters.get("pvp_min") is not None:
+            mask &= self._pvp >= filters["pvp_min"]
+        if filters.get("pvp_max") is not None:
+            mask &= self._pvp <= filters["pvp_max"]
+
+        if filters.get("bc3_has_descripcion_corta") is not None:
+            if filters["bc3_has_descripcion_corta"]:
+                mask &= self._has_bc3_descripcion_corta
+            else:
+                mask &= ~self._has_bc3_descripcion_corta
+
+        if filters.get("buscar"):
+            positions = np.fromiter(self._like_matches(filters["buscar"]), dtype=np.int64)
+            found = np.zeros(len(self.entities), dtype=bool)
+            found[np.searchsorted(self._row_starts, positions, side="right") - 1] = True
+            mask &= found
+
+        return mask
+
+    def _like_matches(self, term: str) -> Iterator[int]:
+        """Start of every column matching ``ILIKE '%term%'``."""
+        parts = like_parts(term)
+        if parts is None:
+            return
+        if not parts:
+            # Only wildcards: every row matches
+            yield from self._row_starts
+            return
+
+        corpus = self._corpus
+        first, rest = parts[0], parts[1:]
+        match = first.search(corpus)
+        while match is not None:
+            end_match = _COLUMN_END.search(corpus, match.end())
+            column_end = end_match.start() if end_match is not None else len(corpus)
+            position = match.end()
+            for part in rest:
+                found = part.search(corpus, position, column_end)
+                if found is None:
+                    break
+                position = found.end()
+            else:
+                yield match.start()
+            # A later start in the same column cannot match where this one failed
+            match = first.search(corpus, column_end + 1)
+
+    def _page(self, dto: dict, mask: Any) -> tuple[list[ProductoEntity], int]:
+        rows = np.flatnonzero(mask)
+        sort_string = dto.get("sort")
+        if sort_string:
+            # Parsed as ``_apply_sorting``: unknown fields leave rows unsorted
+            parts = sort_string.split(":")
+            order = "desc" if len(parts) > 1 and parts[1].lower() == "desc" else "asc"
+            permutation = self._orders.get((parts[0], order))
+            if permutation is not None:
+                rows = permutation[mask[permutation]]
+
+        offset = dto["offset"]
+        page = rows[offset : offset + dto["per_page"]]
+        # Entities are frozen, so they are shared with the snapshot
+        return [self.entities[row] for row in page], len(rows)
+
+    def _facets(self, mask: Any) -> dict[str, list[dict]]:
+        facets: dict[str, list[dict]] = {}
+        for field, codes in self._codes.items():
+            selected = codes[mask]
+            counts = np.bincount(selected[selected >= 0], minlength=len(self._values[field]))
+            facets[field] = sorted(
+                (
+                    {"value": self._values[field][code], "count": int(counts[code])}
+                    for code in np.flatnonzero(counts)
+                ),
+                key=lambda item: (-item["count"], item["value"]),
+            )
+        return facets
+
+
+def load_catalogue(session: Session) -> ColumnarCatalogue:
+    """Read the public catalogue into a :class:`ColumnarCatalogue`."""
+    models = session.scalars(select(ProductoModelClean).order_by(ProductoModelClean.codigo)).all()
+    return ColumnarCatalogue(models)
+
+
+def catalogue_snapshot_enabled() -> bool:
+    """Whether searches may be served from the snapshot (setting on, NumPy installed)."""
+    return np is not None and get_settings().catalogue_snapshot_enabled
+
+
+def get_serving_snapshot() -> Optional[ColumnarCatalogue]:
+    """The snapshot to answer a search from, or None to query the database."""
+    if not catalogue_snapshot_enabled():
+        return None
+    return get_catalogue_snapshot().get_current()
+
+
+# Singleton instance for application-wide use
+_global_catalogue_snapshot: Optional[VersionedSnapshot[ColumnarCatalogue]] = None
+
+
+def get_catalogue_snapshot() -> VersionedSnapshot[ColumnarCatalogue]:
+    """Get the global catalogue snapshot configured from settings."""
+    global _global_catalogue_snapshot
+
+    if _global_catalogue_snapshot is None:
+        from app.infrastructure.database.connection import get_session_factory
+
+        _global_catalogue_snapshot = VersionedSnapshot(
+            "catalogue snapshot",
+            load_catalogue,
+            session_factory=get_session_factory("public"),
+            version_source=lambda: get_catalogue_version().current(),
+            max_age=get_settings().catalogue_snapshot_max_age,
+        )
+
+    return _global_catalogue_snapshot
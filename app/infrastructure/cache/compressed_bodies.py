@@ -0,0 +1,105 @@
+"""Precompressed response bodies keyed by strong ETag.
+
+A strong ETag (see :mod:`app.interfaces.http.conditional`) names one exact
+response body, so its gzip and Brotli encodings can be computed once and
+reused by every later response carrying the same ETag. Each entry keeps the
+raw bytes next to its encoded variants; a lookup only hits when the raw body
+is identical, so a reused ETag (for instance after the database is recreated
+and the version counter starts over) never serves a stale variant.
+
+The cache is a per-worker LRU bounded by ``HTTP_COMPRESSION_CACHE_BYTES``
+(raw plus encoded bytes).
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import get_settings
+
+
+@dataclass
+class CachedBody:
+    """Raw response body and its encoded variants (encoding -> bytes)."""
+
+    raw: bytes
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.raw) + sum(len(body) for body in self.variants.values())
+
+
+class CompressedBodyCache:
+    """
+    LRU cache of encoded response bodies.
+
+    Args:
+        max_bytes: Total size of raw and encoded bodies kept (0 disables the cache)
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedBody] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, etag: str, raw: bytes, encoding: str) -> Optional[bytes]:
+        """Encoded variant of ``raw``, or None if it was not stored for ``etag``."""
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None or encoding not in entry.variants or entry.raw != raw:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.stats["hits"] += 1
+            return entry.variants[encoding]
+
+    def put(self, etag: str, raw: bytes, encoding: str, body: bytes) -> None:
+        """Store the ``encoding`` variant of ``raw`` under ``etag``."""
+        if len(raw) + len(body) > self.max_bytes:
+            return
+        with self._lock:
+            entry = self._entries.pop(etag, None)
+            if entry is not None:
+                self._size -= entry.size
+                if entry.raw != raw:
+                    entry = None
+            if entry is None:
+                entry = CachedBody(raw)
+            entry.variants[encoding] = body
+            self._entries[etag] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_statistics(self) -> dict:
+        """Hit/miss counters, entry count and bytes held."""
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self._size}
+
+
+# Singleton instance for application-wide use
+_global_compressed_body_cache: Optional[CompressedBodyCache] = None
+
+
+def get_compressed_body_cache() -> CompressedBodyCache:
+    """Get the global compressed body cache configured from settings."""
+    global _global_compressed_body_cache
+
+    if _global_compressed_body_cache is None:
+        _global_compressed_body_cache = CompressedBodyCache(
+            max_bytes=get_settings().http_compression_cache_bytes
+        )
+
+    return _global_compressed_body_cache
@@ -102,6 +102,29 @@ class PaginationCacheWrapper:
         cache_key = self._generate_cache_key(entity_type, page, per_page, sort, filters)
         return self.cache_manager.get(cache_key)
 
+    def get_stale(
+        self,
+        entity_type: str,
+        page: int,
+        per_page: int,
+        sort: Optional[str],
+        filters: Dict[str, Any],
+    ) -> Optional[Any]:
+        """Get a cached pagination result, accepting recently expired entries.
+
+        Args:
+            entity_type: Type of entity (productos, familias, bc3)
+            page: Current page number
+            per_page: Items per page
+            sort: Sort criteria string
+            filters: Dictionary of applied filters
+
+        Returns:
+            Fresh or stale pagination result, or None if not available
+        """
+        cache_key = self._generate_cache_key(entity_type, page, per_page, sort, filters)
+        return self.cache_manager.get_stale(cache_key)
+
     def set(
         self,
         entity_type: str,
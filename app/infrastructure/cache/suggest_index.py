@@ -0,0 +1,202 @@
+"""In-memory prefix index for typeahead suggestions.
+
+Typeahead must not run the paginated ILIKE search and its COUNT on every
+keystroke. :class:`PrefixIndex` keeps two sorted arrays of normalized terms,
+product codes (``codigo`` and ``referencia``) and description words, and
+answers a prefix with two ``bisect`` calls plus a scan of at most
+``MAX_SCAN`` entries.
+
+Normalization casefolds and strips accents, so ``"lumi"`` finds
+``"Luminária"``. With several words, the last one is the prefix and the
+others must prefix some word of the same description.
+
+:class:`SuggestIndex` builds the index from ``productos_clean`` (at startup
+with ``SUGGEST_INDEX_ENABLED``, else on first use) and rebuilds it in a
+background thread when the catalogue version changes, serving the previous
+index meanwhile. Without migration 08 it is rebuilt every
+``SUGGEST_INDEX_MAX_AGE`` seconds instead.
+"""
+
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.infrastructure.database.catalogue_version import (
+    Version,
+    VersionedSnapshot,
+    get_catalogue_version,
+)
+from app.infrastructure.models.producto_clean import ProductoModelClean
+
+# Index entries examined per query and array (bounds the latency of short prefixes)
+MAX_SCAN = 2000
+
+_WORD = re.compile(r"[0-9a-z]+")
+_TERM_END = "\U0010ffff"
+
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized words of ``text``."""
+    return _WORD.findall(normalize(text))
+
+
+def normalize_code(code: str) -> str:
+    """Codes compare without case, accents, spaces or separators."""
+    return "".join(tokenize(code))
+
+
+class Suggestion(NamedTuple):
+    """Public fields returned for a suggested product."""
+
+    codigo: str
+    descripcion: Optional[str]
+    marca: Optional[str]
+    referencia: Optional[str]
+
+
+class PrefixIndex:
+    """
+    Immutable sorted-array prefix index.
+
+    Args:
+        products: Products to index
+    """
+
+    def __init__(self, products: Sequence[Suggestion]):
+        self.products = list(products)
+        codes: list[tuple[str, int, str]] = []
+        words: list[tuple[str, int]] = []
+        self._words: list[frozenset[str]] = []
+        for position, product in enumerate(self.products):
+            for field, value in (("codigo", product.codigo), ("referencia", product.referencia)):
+                term = normalize_code(value or "")
+                if term:
+                    codes.append((term, position, field))
+            product_words = frozenset(tokenize(product.descripcion or ""))
+            self._words.append(product_words)
+            words.extend((word, position) for word in product_words)
+        codes.sort()
+        words.sort()
+        self._code_terms = [term for term, _, _ in codes]
+        self._code_ids = [position for _, position, _ in codes]
+        self._code_fields = [field for _, _, field in codes]
+        self._word_terms = [term for term, _ in words]
+        self._word_ids = [position for _, position in words]
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def suggest(self, query: str, limit: int = 10) -> list[tuple[Suggestion, str]]:
+        """
+        Top ``limit`` products for a typed prefix.
+
+        Code matches come first, then description matches; within each group
+        shorter completions come first (sorted order).
+
+        Returns:
+            (product, matched field) pairs
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        found: dict[int, str] = {}
+        code = normalize_code(query)
+        start = bisect_left(self._code_terms, code)
+        end = bisect_left(self._code_terms, code + _TERM_END, start)
+        for position in range(start, min(end, start + MAX_SCAN)):
+            if len(found) >= limit:
+                break
+            found.setdefault(self._code_ids[position], self._code_fields[position])
+
+        *required, prefix = tokens
+        start = bisect_left(self._word_terms, prefix)
+        end = bisect_left(self._word_terms, prefix + _TERM_END, start)
+        for position in range(start, min(end, start + MAX_SCAN)):
+            if len(found) >= limit:
+                break
+            product = self._word_ids[position]
+            if product not in found and self._has_words(product, required):
+                found[product] = "descripcion"
+
+        return [(self.products[product], field) for product, field in found.items()]
+
+    def _has_words(self, product: int, required: list[str]) -> bool:
+        words = self._words[product]
+        return all(any(word.startswith(token) for word in words) for token in required)
+
+
+def load_suggestions(session: Session) -> list[Suggestion]:
+    """Read the indexed fields of the public catalogue."""
+    rows = session.execute(
+        select(
+            ProductoModelClean.codigo,
+            ProductoModelClean.descripcion,
+            ProductoModelClean.marca,
+            ProductoModelClean.referencia,
+        )
+    ).all()
+    return [Suggestion(*row) for row in rows]
+
+
+class SuggestIndex(VersionedSnapshot[PrefixIndex]):
+    """
+    Current :class:`PrefixIndex`, rebuilt when the catalogue changes.
+
+    Thread-safe: the endpoint runs in Starlette's threadpool.
+
+    Args:
+        session_factory: Creates sessions to read the catalogue
+        version_source: Current catalogue version, or None when unknown
+        max_age: Seconds before rebuilding when the version is unknown
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        version_source: Callable[[], Optional[Version]],
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(
+            "suggest index",
+            lambda session: PrefixIndex(load_suggestions(session)),
+            session_factory,
+            version_source,
+            max_age,
+            clock,
+        )
+
+
+# Singleton instance for application-wide use
+_global_suggest_index: Optional[SuggestIndex] = None
+
+
+def get_suggest_index() -> SuggestIndex:
+    """Get the global suggest index configured from settings."""
+    global _global_suggest_index
+
+    if _global_suggest_index is None:
+        from app.infrastructure.database.connection import get_session_factory
+
+        _global_suggest_index = SuggestIndex(
+            session_factory=get_session_factory("public"),
+            version_source=lambda: get_catalogue_version().current(),
+            max_age=get_settings().suggest_index_max_age,
+        )
+
+    return _global_suggest_index
@@ -0,0 +1,228 @@
+"""Surrogate-key purges of the reverse-proxy cache.
+
+Public catalogue responses carry a ``Surrogate-Key`` header (see
+:mod:`app.interfaces.http.surrogate`). After a catalogue write commits, the
+writer hands the affected keys to :func:`queue_purge`, and the configured
+purger asks the proxy to drop every cached response tagged with them:
+
+- ``CACHE_PURGE_URL`` unset: :class:`NullCachePurger`, nothing is sent.
+- ``CACHE_PURGE_URL`` set: :class:`HTTPCachePurger` sends one request
+  (``CACHE_PURGE_METHOD``, ``PURGE`` by default) whose ``CACHE_PURGE_HEADER``
+  lists the keys, separated by spaces.
+
+Purges are sent by a :class:`PurgeWorker` thread, so a commit never waits
+for the proxy. Purge failures are logged and never fail the write; the proxy
+entries then expire after ``HTTP_SHARED_CACHE_MAX_AGE`` seconds.
+"""
+
+import logging
+import queue
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections.abc import Iterable
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Keys of every list and aggregate response (see app.interfaces.http.surrogate)
+CATALOGUE_KEY = "catalogue"
+FAMILIAS_KEY = "familias"
+
+
+def producto_key(codigo: str) -> str:
+    """Surrogate key of one product's detail responses."""
+    return f"producto:{surrogate_token(codigo)}"
+
+
+def familia_key(nombre: str) -> str:
+    """Surrogate key of one family's detail responses."""
+    return f"familia:{surrogate_token(nombre)}"
+
+
+def surrogate_token(value: str) -> str:
+    """Make ``value`` safe inside a space-separated, ASCII header value."""
+    return urllib.parse.quote(value, safe="!#$&'()*+-./:;<=>?@[]^_`{|}~")
+
+
+def catalogue_write_keys(codigos: Iterable[str]) -> list[str]:
+    """Keys to purge after the given products changed."""
+    return [CATALOGUE_KEY, FAMILIAS_KEY, *(producto_key(codigo) for codigo in codigos)]
+
+
+class NullCachePurger:
+    """Purger used when no reverse-proxy purge endpoint is configured."""
+
+    def purge(self, keys: list[str]) -> bool:
+        """Do nothing; return False (nothing was purged)."""
+        return False
+
+
+class HTTPCachePurger:
+    """
+    Purge surrogate keys through an HTTP endpoint of the proxy.
+
+    Args:
+        url: Purge endpoint
+        method: HTTP method of the purge request
+        header: Header carrying the space-separated keys
+        timeout: Seconds to wait for the proxy
+        max_header_bytes: Longer key lists are split over several requests
+    """
+
+    def __init__(
+        self,
+        url: str,
+        method: str = "PURGE",
+        header: str = "Surrogate-Key",
+        timeout: float = 1.0,
+        max_header_bytes: int = 4096,
+    ):
+        self.url = url
+        self.method = method
+        self.header = header
+        self.timeout = timeout
+        self.max_header_bytes = max_header_bytes
+
+    def _batches(self, keys: list[str]) -> Iterable[str]:
+        batch: list[str] = []
+        size = 0
+        for key in keys:
+            if batch and size + len(key) + 1 > self.max_header_bytes:
+                yield " ".join(batch)
+                batch, size = [], 0
+            batch.append(key)
+            size += len(key) + 1
+        if batch:
+            yield " ".join(batch)
+
+    def purge(self, keys: list[str]) -> bool:
+        """Send the purge request(s); return True if the proxy accepted all of them."""
+        ok = True
+        for value in self._batches(list(dict.fromkeys(keys))):
+            request = urllib.request.Request(
+                self.url, method=self.method, headers={self.header: value}
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError) as exc:
+                logger.warning(f"surrogate-key purge failed ({len(keys)} keys): {exc}")
+                ok = False
+        return ok
+
+
+class PurgeWorker:
+    """
+    Send purges from a daemon thread.
+
+    Keys submitted while a purge is in flight are merged into the next one.
+    Nothing is queued while no purge endpoint is configured.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[list[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, keys: list[str]) -> None:
+        """Queue ``keys`` for purging and return immediately."""
+        if isinstance(get_cache_purger(), NullCachePurger):
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="surrogate-purge", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(list(keys))
+
+    def wait(self) -> None:
+        """Block until every submitted key has been purged (or failed)."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batches = [self._queue.get()]
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                get_cache_purger().purge([key for batch in batches for key in batch])
+            except Exception as exc:  # noqa: BLE001 -- the worker must keep running
+                logger.warning(f"surrogate-key purge failed: {exc}")
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+
+def queue_purge(session: Session, keys: list[str]) -> None:
+    """
+    Purge ``keys`` once the session's current write is durable.
+
+    Inside a transaction the keys are purged after it commits (and dropped
+    if it rolls back); otherwise they are purged right away. Either way the
+    request is sent by the purge worker, not by the caller.
+    """
+    if not keys:
+        return
+    if session.in_transaction():
+        session.info.setdefault("purge_keys", []).extend(keys)
+    else:
+        get_purge_worker().submit(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _purge_after_commit(session: Session) -> None:
+    keys = session.info.pop("purge_keys", None)
+    if keys:
+        get_purge_worker().submit(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("purge_keys", None)
+
+
+# Singleton instance for application-wide use
+_global_cache_purger: Optional[NullCachePurger | HTTPCachePurger] = None
+
+
+def get_cache_purger() -> NullCachePurger | HTTPCachePurger:
+    """Get the global purger configured from settings."""
+    global _global_cache_purger
+
+    if _global_cache_purger is None:
+        settings = get_settings()
+        if settings.cache_purge_url:
+            _global_cache_purger = HTTPCachePurger(
+                url=settings.cache_purge_url,
+                method=settings.cache_purge_method,
+                header=settings.cache_purge_header,
+                timeout=settings.cache_purge_timeout,
+            )
+        else:
+            _global_cache_purger = NullCachePurger()
+
+    return _global_cache_purger
+
+
+_global_purge_worker: Optional[PurgeWorker] = None
+
+
+def get_purge_worker() -> PurgeWorker:
+    """Get the global purge worker."""
+    global _global_purge_worker
+
+    if _global_purge_worker is None:
+        _global_purge_worker = PurgeWorker()
+
+    return _global_purge_worker
@@ -0,0 +1,277 @@
+"""Adaptive admission control for database-backed endpoints.
+
+Each endpoint class (productos, familias, bc3) gets its own AIMD concurrency
+limit. The limit grows additively (about +1 per round of fast queries) and
+is halved when a query exceeds the target latency or the connection pool
+times out. Requests above the limit are rejected immediately with
+``ServiceOverloadedException`` instead of waiting ``pool_timeout`` seconds
+for a connection, which keeps p99 latency bounded during scraping bursts.
+
+Streams that hold a connection for a whole response (the BC3 export) are not
+admitted per query but capped by a fixed :class:`StreamLimit`.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import get_settings
+from app.domain.exceptions.overload import ServiceOverloadedException
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Thread-safe: sync repositories run in Starlette's threadpool.
+
+    Args:
+        name: Endpoint class this limiter protects
+        initial_limit: Concurrent queries allowed at startup
+        min_limit: Floor for the limit after repeated decreases
+        max_limit: Ceiling, normally ``pool_size + max_overflow``
+        target_latency: Query latency (seconds) above which the limit shrinks
+        backoff: Multiplicative decrease factor
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 15,
+        target_latency: float = 0.5,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Current integer concurrency limit."""
+        return max(self.min_limit, int(self._limit))
+
+    def try_acquire(self) -> Optional[float]:
+        """Reserve a slot; return the start time, or None when the limit is reached."""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                return None
+            self.in_flight += 1
+            self.accepted += 1
+            return self._clock()
+
+    def release(self, started: float, overloaded: bool = False) -> None:
+        """Free a slot and adapt the limit from the observed latency."""
+        now = self._clock()
+        with self._lock:
+            self.in_flight -= 1
+            if overloaded or now - started > self.target_latency:
+                # Queries already in flight when the limit was cut saw the same
+                # congestion; only one decrease per congestion episode.
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+            elif self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+    def get_state(self) -> dict[str, int | float]:
+        """Snapshot of the limiter for health endpoints."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "decreases": self.decreases,
+                "saturated": self.in_flight >= self.limit,
+            }
+
+
+class AdmissionController:
+    """
+    Per-endpoint-class admission control in front of the connection pool.
+
+    Usage:
+        with get_admission_controller().admit("productos"):
+            rows = session.execute(query).all()
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 15,
+        target_latency: float = 0.5,
+        retry_after: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = enabled
+        self.retry_after = retry_after
+        self._limiter_config = {
+            "initial_limit": initial_limit,
+            "min_limit": min_limit,
+            "max_limit": max_limit,
+            "target_latency": target_latency,
+            "clock": clock,
+        }
+        self._limiters: dict[str, AIMDLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, endpoint_class: str) -> AIMDLimiter:
+        """Return (creating on first use) the limiter of an endpoint class."""
+        limiter = self._limiters.get(endpoint_class)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.setdefault(
+                    endpoint_class, AIMDLimiter(endpoint_class, **self._limiter_config)
+                )
+        return limiter
+
+    @contextmanager
+    def admit(self, endpoint_class: str) -> Generator[None, None, None]:
+        """
+        Run the enclosed queries under the endpoint class limit.
+
+        Raises:
+            ServiceOverloadedException: When the limit is reached or the pool
+                timed out handing out a connection
+        """
+        if not self.enabled:
+            yield
+            return
+
+        limiter = self.limiter(endpoint_class)
+        started = limiter.try_acquire()
+        if started is None:
+            raise ServiceOverloadedException(endpoint_class, self.retry_after)
+
+        overloaded = False
+        try:
+            yield
+        except PoolTimeoutError as exc:
+            overloaded = True
+            raise ServiceOverloadedException(endpoint_class, self.retry_after) from exc
+        finally:
+            limiter.release(started, overloaded=overloaded)
+
+    def get_state(self) -> dict[str, object]:
+        """Admission state per endpoint class."""
+        return {
+            "enabled": self.enabled,
+            "classes": {name: limiter.get_state() for name, limiter in self._limiters.items()},
+        }
+
+
+class StreamLimit:
+    """
+    Fixed cap on concurrent streams that each hold a pooled connection.
+
+    A slot is held for a whole response, so unlike :class:`AIMDLimiter` the
+    limit does not adapt to latency: a long download is not congestion.
+
+    Args:
+        name: Stream class this limit protects
+        limit: Concurrent streams allowed
+        retry_after: Seconds a rejected client should wait before retrying
+    """
+
+    def __init__(self, name: str, limit: int = 2, retry_after: int = 30):
+        self.name = name
+        self.limit = limit
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def acquire(self) -> None:
+        """
+        Reserve a slot until :meth:`release`.
+
+        Raises:
+            ServiceOverloadedException: When ``limit`` streams are already open
+        """
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                raise ServiceOverloadedException(self.name, self.retry_after)
+            self.in_flight += 1
+            self.accepted += 1
+
+    def release(self) -> None:
+        """Free a slot."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def get_state(self) -> dict[str, int | bool]:
+        """Snapshot of the limit for health endpoints."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "saturated": self.in_flight >= self.limit,
+            }
+
+
+# Singleton instance for application-wide use
+_global_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the global admission controller configured from settings."""
+    global _global_admission_controller
+
+    if _global_admission_controller is None:
+        settings = get_settings()
+        _global_admission_controller = AdmissionController(
+            enabled=settings.db_admission_enabled,
+            initial_limit=settings.db_admission_initial_limit,
+            min_limit=settings.db_admission_min_limit,
+            max_limit=settings.db_admission_max_limit,
+            target_latency=settings.db_admission_target_latency,
+            retry_after=settings.db_admission_retry_after,
+        )
+
+    return _global_admission_controller
+
+
+_global_export_limit: Optional[StreamLimit] = None
+
+
+def get_export_limit() -> StreamLimit:
+    """Get the global cap on concurrent BC3 catalogue exports."""
+    global _global_export_limit
+
+    if _global_export_limit is None:
+        settings = get_settings()
+        _global_export_limit = StreamLimit(
+            "bc3_export",
+            limit=settings.bc3_export_max_concurrent,
+            retry_after=settings.bc3_export_retry_after,
+        )
+
+    return _global_export_limit
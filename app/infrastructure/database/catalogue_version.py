@@ -0,0 +1,268 @@
+"""Catalogue version for HTTP conditional GET.
+
+``migration/08_catalogue_version.sql`` keeps a single-row counter that every
+write to ``productos`` (and every refresh of the catalogue views) increments.
+The counter and its timestamp are cached per worker for
+``CATALOGUE_VERSION_TTL`` seconds, so answering ``If-None-Match`` costs at
+most one primary-key read per worker and TTL, never a catalogue query. Writes
+made by this worker drop the cache immediately; other workers pick them up
+within the TTL: repositories call :func:`invalidate_after_commit` for each
+write, and the cache is dropped once that write's transaction commits.
+
+:class:`VersionedSnapshot` keeps per-worker values derived from the whole
+catalogue (the suggest index, the columnar catalogue) in step with the
+version, rebuilding them in the background after a write.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Generic, NamedTuple, Optional, TypeVar
+
+from sqlalchemy import BigInteger, DateTime, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds before retrying a failed snapshot rebuild
+REBUILD_RETRY_DELAY = 5.0
+
+_READ_VERSION = text("SELECT version, updated_at FROM catalogue_version").columns(
+    version=BigInteger, updated_at=DateTime(timezone=True)
+)
+
+
+class Version(NamedTuple):
+    """Catalogue version counter and the time it last changed (UTC)."""
+
+    number: int
+    updated_at: datetime
+
+
+class CatalogueVersion:
+    """
+    Cached reader of the catalogue version counter.
+
+    Thread-safe: sync dependencies run in Starlette's threadpool.
+
+    Args:
+        session_factory: Creates sessions on the primary
+        ttl: Seconds a read value is reused
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self._clock = clock
+        self._cached: Optional[Version] = None
+        self._expires = float("-inf")
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[Version]:
+        """Current version, or None when it cannot be read (no migration 08)."""
+        with self._lock:
+            if self._clock() < self._expires:
+                return self._cached
+
+        version = self._read()
+        with self._lock:
+            self._cached = version
+            self._expires = self._clock() + self.ttl
+        return version
+
+    def invalidate(self) -> None:
+        """Forget the cached version (call after committing a catalogue write)."""
+        with self._lock:
+            self._expires = float("-inf")
+
+    def _read(self) -> Optional[Version]:
+        session = self.session_factory()
+        try:
+            row = session.execute(_READ_VERSION).first()
+        except SQLAlchemyError as exc:
+            # Cached as None for one TTL: conditional GET is skipped, not retried per request
+            logger.warning(f"catalogue version unavailable, ETags disabled: {exc}")
+            return None
+        finally:
+            session.close()
+        if row is None:
+            return None
+        updated_at = row.updated_at
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return Version(int(row.version), updated_at.astimezone(timezone.utc))
+
+
+class _Built(NamedTuple, Generic[T]):
+    value: T
+    version: Optional[int]
+    built_at: float
+
+
+class VersionedSnapshot(Generic[T]):
+    """
+    Per-worker value built from the catalogue, rebuilt when the version changes.
+
+    A stale value is rebuilt in a background thread and swapped in atomically;
+    requests never wait for a rebuild. Without a readable version (no
+    migration 08) a value is stale after ``max_age`` seconds.
+
+    Args:
+        name: Name used in log messages
+        build: Builds the value from a session
+        session_factory: Creates sessions to read the catalogue
+        version_source: Current catalogue version, or None when unknown
+        max_age: Seconds before rebuilding when the version is unknown
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[Session], T],
+        session_factory: Callable[[], Session],
+        version_source: Callable[[], Optional[Version]],
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.build = build
+        self.session_factory = session_factory
+        self.version_source = version_source
+        self.max_age = max_age
+        self._clock = clock
+        # Value, version and build time are swapped together
+        self._built: Optional[_Built[T]] = None
+        self._retry_at = float("-inf")
+        self._build_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuilding = False
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    def get(self) -> T:
+        """The latest value, possibly stale; built now if there is none yet."""
+        built = self._built
+        if built is None:
+            with self._build_lock:
+                if self._built is None:
+                    self._build()
+            return self._built.value
+        if not self._is_current(built):
+            self._rebuild_in_background()
+        return built.value
+
+    def get_current(self) -> Optional[T]:
+        """The value if built at the current version, else None (and rebuild)."""
+        built = self._built
+        if built is not None and self._is_current(built):
+            return built.value
+        self._rebuild_in_background()
+        return None
+
+    def refresh(self) -> None:
+        """Rebuild the value now (startup warm-up)."""
+        with self._build_lock:
+            self._build()
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the background rebuild in progress; True if none is left running."""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self._rebuilding
+
+    def _is_current(self, built: _Built[T]) -> bool:
+        version = self.version_source()
+        if version is not None:
+            return version.number == built.version
+        return self._clock() - built.built_at <= self.max_age
+
+    def _build(self) -> None:
+        # Read the version first: a write during the load triggers another rebuild
+        version = self.version_source()
+        started = time.perf_counter()
+        session = self.session_factory()
+        try:
+            value = self.build(session)
+        finally:
+            session.close()
+        self._built = _Built(value, version.number if version is not None else None, self._clock())
+        logger.info(f"{self.name} built in {time.perf_counter() - started:.2f}s")
+
+    def _rebuild_in_background(self) -> None:
+        # Not the build lock: requests must never wait for a rebuild
+        with self._rebuild_lock:
+            if self._rebuilding or self._clock() < self._retry_at:
+                return
+            self._rebuilding = True
+            self._rebuild_thread = threading.Thread(
+                target=self._background_rebuild, name=f"{self.name} rebuild", daemon=True
+            )
+            self._rebuild_thread.start()
+
+    def _background_rebuild(self) -> None:
+        try:
+            with self._build_lock:
+                self._build()
+        except SQLAlchemyError as exc:
+            # Keep serving the previous value; retried on a later request
+            logger.warning(f"{self.name} rebuild failed: {exc}")
+            self._retry_at = self._clock() + REBUILD_RETRY_DELAY
+        finally:
+            self._rebuilding = False
+
+
+def invalidate_after_commit(session: Session) -> None:
+    """
+    Drop the cached catalogue version once the session's current write is durable.
+
+    Inside a transaction the cache is dropped after it commits (and kept if
+    it rolls back); otherwise it is dropped immediately.
+    """
+    if session.in_transaction():
+        session.info["catalogue_written"] = True
+    else:
+        get_catalogue_version().invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("catalogue_written", False):
+        get_catalogue_version().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("catalogue_written", None)
+
+
+# Singleton instance for application-wide use
+_global_catalogue_version: Optional[CatalogueVersion] = None
+
+
+def get_catalogue_version() -> CatalogueVersion:
+    """Get the global catalogue version reader configured from settings."""
+    global _global_catalogue_version
+
+    if _global_catalogue_version is None:
+        from app.infrastructure.database.connection import get_session_factory
+
+        _global_catalogue_version = CatalogueVersion(
+            session_factory=get_session_factory("public"),
+            ttl=get_settings().catalogue_version_ttl,
+        )
+
+    return _global_catalogue_version
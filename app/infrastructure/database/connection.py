@@ -3,16 +3,21 @@
 SQLAlchemy engine and session management for the infrastructure layer.
 """
 
+import threading
 from collections.abc import Generator
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, StaticPool
 
 from app.config import get_settings
+from app.infrastructure.database.admission import get_admission_controller, get_export_limit
+from app.infrastructure.database.deadlines import install_deadline_hooks
+from app.infrastructure.database.replicas import ReplicaSet, RoutingSession
 
 
 def get_database_path() -> Path:
@@ -134,20 +139,94 @@ def get_pool_config(environment: str = "development") -> dict[str, int | str]:
     return configs.get(environment, configs["development"])
 
 
-def get_pool_stats() -> dict[str, int | str]:
+# Traffic classes with their own pool partition (bulkhead). Public scraping
+# traffic cannot exhaust the connections of BC3-Suite or admin writes.
+TRAFFIC_CLASSES = ("public", "bc3", "admin")
+
+
+def get_partition_pool_config(traffic_class: str) -> dict[str, int | str]:
+    """
+    Get pool configuration for one traffic-class partition.
+
+    Production defaults (recycle, pre-ping) are kept; size, overflow and
+    timeout come from the ``DB_POOL_<CLASS>_*`` settings.
+
+    Args:
+        traffic_class: One of TRAFFIC_CLASSES
+
+    Returns:
+        Dictionary with pool configuration settings
+    """
+    if traffic_class not in TRAFFIC_CLASSES:
+        raise ValueError(f"Unknown traffic class: {traffic_class}")
+
+    settings = get_settings()
+    config = dict(get_pool_config("production"))
+    config["pool_size"] = getattr(settings, f"db_pool_{traffic_class}_size")
+    config["max_overflow"] = getattr(settings, f"db_pool_{traffic_class}_max_overflow")
+    config["pool_timeout"] = getattr(settings, f"db_pool_{traffic_class}_timeout")
+    return config
+
+
+@dataclass
+class PartitionMetrics:
+    """Connection checkout counters of one pool partition, fed by pool events."""
+
+    checkouts: int = 0
+    in_use: int = 0
+    peak_in_use: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_checkout(self) -> None:
+        """Count a connection handed out by the pool."""
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def record_checkin(self) -> None:
+        """Count a connection returned to the pool."""
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def to_dict(self) -> dict[str, int]:
+        """Snapshot for health and dashboard endpoints."""
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+            }
+
+
+partition_metrics: dict[str, PartitionMetrics] = {
+    traffic_class: PartitionMetrics() for traffic_class in TRAFFIC_CLASSES
+}
+
+
+def _attach_partition_metrics(partition_engine: Engine, metrics: PartitionMetrics) -> None:
+    """Feed ``metrics`` from the checkout/checkin events of an engine's pool."""
+    event.listen(partition_engine, "checkout", lambda *_args: metrics.record_checkout())
+    event.listen(partition_engine, "checkin", lambda *_args: metrics.record_checkin())
+
+
+def get_pool_stats(traffic_class: str = "public") -> dict[str, int | str]:
     """
     Get current pool statistics and usage metrics.
 
+    Args:
+        traffic_class: Partition to inspect (defaults to the public pool)
+
     Returns:
         Dictionary with pool statistics
     """
-    pool = engine.pool
+    pool = engines[traffic_class].pool
 
     # StaticPool doesn't have all attributes, so we need to handle it
     stats = {
         "size": pool.size() if isinstance(pool, QueuePool) else 1,
         "checked_in": pool.checkedin() if isinstance(pool, QueuePool) else 1,
-        "checked_out": 0,
+        "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else 0,
         "overflow": pool.overflow() if isinstance(pool, QueuePool) else 0,
         "pool_type": type(pool).__name__,
     }
@@ -155,6 +234,29 @@ def get_pool_stats() -> dict[str, int | str]:
     return stats
 
 
+def get_partition_stats() -> dict[str, dict[str, object]]:
+    """
+    Get pool statistics, limits and checkout counters per traffic class.
+
+    Returns:
+        Dictionary keyed by traffic class
+    """
+    partitions: dict[str, dict[str, object]] = {}
+    for traffic_class in TRAFFIC_CLASSES:
+        config = get_partition_pool_config(traffic_class)
+        partitions[traffic_class] = {
+            **get_pool_stats(traffic_class),
+            "limits": {
+                "pool_size": config["pool_size"],
+                "max_overflow": config["max_overflow"],
+                "pool_timeout": config["pool_timeout"],
+            },
+            **partition_metrics[traffic_class].to_dict(),
+            "replicas": replica_sets[traffic_class].get_state(),
+        }
+    return partitions
+
+
 def check_pool_exhaustion(stats: dict[str, int | str]) -> bool:
     """
     Check if pool is approaching exhaustion.
@@ -250,12 +352,46 @@ def get_pool_optimization_recommendations() -> list[str]:
     return recommendations
 
 
-def create_production_engine(database_url: str | None = None) -> Engine:
+def get_connect_args(database_url: str, application_name: str | None = None) -> dict[str, object]:
+    """
+    Build the DBAPI connect arguments of a PostgreSQL engine.
+
+    With psycopg 3, statements executed ``DB_PREPARE_THRESHOLD`` times on a
+    connection become server-side prepared statements, so the hot catalogue
+    queries skip parsing and planning. ``DB_PREPARED_STATEMENTS=false``
+    turns this off (PgBouncer in transaction mode).
+
+    Args:
+        database_url: Validated database URL
+        application_name: Optional PostgreSQL application_name
+
+    Returns:
+        Dictionary for ``create_engine(connect_args=...)``
+    """
+    connect_args: dict[str, object] = {}
+    if application_name:
+        connect_args["application_name"] = application_name
+
+    if make_url(database_url).drivername == "postgresql+psycopg":
+        settings = get_settings()
+        connect_args["prepare_threshold"] = (
+            settings.db_prepare_threshold if settings.db_prepared_statements else None
+        )
+    return connect_args
+
+
+def create_production_engine(
+    database_url: str | None = None,
+    pool_config: dict[str, int | str] | None = None,
+    application_name: str | None = None,
+) -> Engine:
     """
     Create database engine optimized for production deployment.
 
     Args:
         database_url: Optional database URL, uses settings if not provided
+        pool_config: Optional pool configuration, production defaults if not provided
+        application_name: Optional PostgreSQL application_name (visible in pg_stat_activity)
 
     Returns:
         SQLAlchemy engine with production-optimized pool configuration
@@ -272,7 +408,8 @@ def create_production_engine(database_url: str | None = None) -> Engine:
     )
 
     # Get production pool configuration
-    pool_config = get_pool_config("production")
+    if pool_config is None:
+        pool_config = get_pool_config("production")
 
     # Create production engine with QueuePool
     if database_url.startswith("sqlite"):
@@ -287,6 +424,7 @@ def create_production_engine(database_url: str | None = None) -> Engine:
         # PostgreSQL/MySQL use QueuePool
         return create_engine(
             database_url,
+            connect_args=get_connect_args(database_url, application_name),
             poolclass=QueuePool,
             pool_size=pool_config["pool_size"],  # type: ignore
             max_overflow=pool_config["max_overflow"],  # type: ignore
@@ -297,11 +435,97 @@ def create_production_engine(database_url: str | None = None) -> Engine:
         )
 
 
-# Application engine and sessions use the same backend-aware factory.
-engine = create_production_engine()
-SessionFactory = sessionmaker(bind=engine, expire_on_commit=False)
+def create_partition_engines(database_url: str | None = None) -> dict[str, Engine]:
+    """
+    Create one engine (and pool) per traffic class.
+
+    SQLite test databases share a single StaticPool engine, since separate
+    engines would not see the same in-memory database.
+
+    Args:
+        database_url: Optional database URL, uses settings if not provided
+
+    Returns:
+        Dictionary of engines keyed by traffic class
+    """
+    partition_engines: dict[str, Engine] = {}
+    for traffic_class in TRAFFIC_CLASSES:
+        partition_engine = create_production_engine(
+            database_url,
+            pool_config=get_partition_pool_config(traffic_class),
+            application_name=f"api-disano-{traffic_class}",
+        )
+        _attach_partition_metrics(partition_engine, partition_metrics[traffic_class])
+        if partition_engine.url.drivername == "sqlite":
+            return {name: partition_engine for name in TRAFFIC_CLASSES}
+        partition_engines[traffic_class] = partition_engine
+    return partition_engines
+
+
+def create_replica_sets(replica_urls: list[str] | None = None) -> dict[str, ReplicaSet]:
+    """
+    Create the read-replica engines of every traffic class.
+
+    Replicas get the same pool partition limits as the primary so the
+    bulkheads also hold on the read path.
+
+    Args:
+        replica_urls: Optional replica URLs, uses DB_REPLICA_URLS if not provided
+
+    Returns:
+        Dictionary of replica sets keyed by traffic class (empty sets without replicas)
+    """
+    settings = get_settings()
+    if replica_urls is None:
+        replica_urls = list(settings.db_replica_urls)
+
+    return {
+        traffic_class: ReplicaSet(
+            [
+                create_production_engine(
+                    url,
+                    pool_config=get_partition_pool_config(traffic_class),
+                    application_name=f"api-disano-{traffic_class}-replica",
+                )
+                for url in replica_urls
+            ],
+            health_interval=settings.db_replica_health_interval,
+            max_lag=settings.db_replica_max_lag,
+        )
+        for traffic_class in TRAFFIC_CLASSES
+    }
+
+
+# Application engines and sessions use the same backend-aware factory.
+# ``engine`` / ``SessionLocal`` remain the public partition for tooling and health checks.
+engines = create_partition_engines()
+engine = engines["public"]
+replica_sets = create_replica_sets()
+SessionFactories = {
+    traffic_class: sessionmaker(
+        bind=partition_engine,
+        class_=RoutingSession,
+        expire_on_commit=False,
+        replicas=replica_sets[traffic_class],
+    )
+    for traffic_class, partition_engine in engines.items()
+}
+SessionFactory = SessionFactories["public"]
 SessionLocal = scoped_session(SessionFactory)
 
+for _traffic_class, _session_factory in SessionFactories.items():
+    install_deadline_hooks(_session_factory, engines[_traffic_class], _traffic_class)
+
+
+def get_session_factory(traffic_class: str) -> sessionmaker:
+    """
+    Return the session factory bound to a traffic class partition.
+
+    Usage in FastAPI dependencies:
+        session = get_session_factory("bc3")()
+    """
+    return SessionFactories[traffic_class]
+
 
 def log_pool_stats() -> None:
     """Log current pool statistics for monitoring."""
@@ -319,7 +543,7 @@ def log_pool_stats() -> None:
     )
 
 
-def monitor_pool_health() -> dict[str, bool | list[str]]:
+def monitor_pool_health() -> dict[str, object]:
     """
     Monitor pool health and return status with recommendations.
 
@@ -328,13 +552,43 @@ def monitor_pool_health() -> dict[str, bool | list[str]]:
     """
     stats = get_pool_stats()
     recommendations = get_pool_optimization_recommendations()
-    exhausted = check_pool_exhaustion(stats)
+    partitions = get_partition_stats()
+    exhausted_partitions = [
+        traffic_class
+        for traffic_class, partition in partitions.items()
+        if check_pool_exhaustion(partition)  # type: ignore[arg-type]
+    ]
+    exhausted = bool(exhausted_partitions)
+    admission = get_admission_controller().get_state()
+    exports = get_export_limit().get_state()
+
+    if exhausted_partitions:
+        recommendations.append(
+            f"Pool partitions near exhaustion: {', '.join(exhausted_partitions)}. "
+            "Raise DB_POOL_<CLASS>_SIZE for that class only."
+        )
+
+    saturated = sorted(name for name, state in admission["classes"].items() if state["saturated"])
+    if saturated:
+        recommendations.append(
+            f"Admission control is shedding load for: {', '.join(saturated)}. "
+            "Check slow queries before raising DB_ADMISSION_MAX_LIMIT."
+        )
+
+    if exports["saturated"]:
+        recommendations.append(
+            "Every BC3 export slot is in use. Raising BC3_EXPORT_MAX_CONCURRENT takes "
+            "connections from the bc3 pool partition."
+        )
 
     health_status = {
         "healthy": not exhausted,
         "exhausted": exhausted,
         "recommendations": recommendations,
         "stats": stats,
+        "partitions": partitions,
+        "admission": admission,
+        "exports": exports,
     }
 
     return health_status
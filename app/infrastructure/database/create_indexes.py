@@ -89,6 +89,22 @@ def analyze_index_usage():
             print("\nTable Statistics:")
             for stat in stats:
                 print(f"   {stat[0]}")
+
+        if dialect_name == "postgresql":
+            usage = session.execute(
+                text(
+                    "SELECT indexrelname, idx_scan FROM pg_stat_user_indexes "
+                    "WHERE indexrelname LIKE 'idx_productos_%' ORDER BY idx_scan DESC"
+                )
+            ).fetchall()
+            if usage:
+                print("\nIndex Scans (unused indexes only cost writes):")
+                for name, scans in usage:
+                    print(f"   {name}: {scans}")
+            print(
+                "\nFor composite/partial index proposals from the real search workload, "
+                "run python -m app.infrastructure.database.index_advisor"
+            )
         return indexes
     finally:
         session.close()
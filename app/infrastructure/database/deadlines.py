@@ -0,0 +1,127 @@
+"""Per-request query deadlines and cancellation.
+
+A session opened for a request carries its deadline in ``session.info``.
+Each time the session begins a transaction, the remaining budget is sent to
+PostgreSQL as a transaction-local ``statement_timeout``. The server then cancels a
+runaway ILIKE scan by itself, and the cancellation surfaces as
+``QueryTimeoutException``.
+
+The psycopg connection of the open transaction is remembered so that another
+thread (the HTTP disconnect watcher) can cancel the running statement.
+"""
+
+import time
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
+
+from app.domain.exceptions.overload import QueryTimeoutException
+from app.monitoring.metrics import get_metrics_collector
+
+# SQLSTATE query_canceled: statement_timeout or pg_cancel_backend / cancel()
+QUERY_CANCELED_SQLSTATE = "57014"
+
+TIMEOUT_METRIC = "db_query_timeout"
+CANCELLED_METRIC = "db_query_cancelled"
+
+# Same SQL text for every budget (unlike SET LOCAL with a literal), so it does
+# not flood psycopg's prepared-statement LRU with one-off statements.
+_SET_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+
+def set_deadline(session: Session, budget: float, now: float | None = None) -> None:
+    """Give ``session`` a query budget of ``budget`` seconds starting now."""
+    session.info["budget"] = budget
+    session.info["deadline"] = (time.monotonic() if now is None else now) + budget
+
+
+def remaining_budget(session: Session) -> float | None:
+    """Seconds left before the session's deadline, or None without deadline."""
+    deadline = session.info.get("deadline")
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def _apply_statement_timeout(session: Session, _transaction, connection) -> None:
+    """``after_begin`` hook: propagate the remaining budget to PostgreSQL."""
+    remaining = remaining_budget(session)
+    if remaining is None:
+        return
+
+    traffic_class = session.info.get("traffic_class", "public")
+    if remaining <= 0:
+        get_metrics_collector().record(
+            TIMEOUT_METRIC, 0.0, tags={"traffic_class": traffic_class, "reason": "budget"}
+        )
+        raise QueryTimeoutException(traffic_class, session.info.get("budget"))
+
+    session.info["connection"] = connection
+    session.info["dbapi_connection"] = connection.connection.dbapi_connection
+    if connection.dialect.name == "postgresql":
+        timeout_ms = max(1, int(remaining * 1000))
+        connection.execute(_SET_STATEMENT_TIMEOUT, {"timeout": str(timeout_ms)})
+
+
+def enforce_deadline(session: Session) -> None:
+    """
+    Re-check the deadline between the statements of one transaction.
+
+    ``statement_timeout`` bounds each statement separately, so a transaction
+    running many of them could outlive the request's budget. Raises
+    ``QueryTimeoutException`` once the budget is spent; otherwise shrinks the
+    timeout of the open transaction to what is left.
+    """
+    # Without an open transaction the next BEGIN applies the budget itself
+    connection = session.info.get("connection")
+    if connection is not None:
+        _apply_statement_timeout(session, None, connection)
+
+
+def _forget_connection(session: Session, transaction: SessionTransaction) -> None:
+    """``after_transaction_end`` hook: the connection may go back to the pool."""
+    if transaction.parent is None:
+        session.info.pop("connection", None)
+        session.info.pop("dbapi_connection", None)
+
+
+def cancel_running_query(session: Session) -> bool:
+    """
+    Cancel the statement currently running in ``session`` (thread-safe).
+
+    Returns:
+        True if a cancel request was sent to the server
+    """
+    dbapi_connection = session.info.get("dbapi_connection")
+    cancel = getattr(dbapi_connection, "cancel_safe", None) or getattr(
+        dbapi_connection, "cancel", None
+    )
+    if cancel is None:
+        return False
+
+    cancel()
+    get_metrics_collector().record(
+        CANCELLED_METRIC, 1.0, tags={"traffic_class": session.info.get("traffic_class", "public")}
+    )
+    return True
+
+
+def install_deadline_hooks(
+    session_factory: sessionmaker, engine: Engine, traffic_class: str
+) -> None:
+    """Register the deadline hooks on a partition's session factory and engine."""
+    event.listen(session_factory, "after_begin", _apply_statement_timeout)
+    event.listen(session_factory, "after_transaction_end", _forget_connection)
+
+    def translate_query_cancel(context: ExceptionContext) -> None:
+        """Turn PostgreSQL query cancellations into QueryTimeoutException."""
+        sqlstate = getattr(context.original_exception, "sqlstate", None)
+        if sqlstate != QUERY_CANCELED_SQLSTATE:
+            return
+        get_metrics_collector().record(
+            TIMEOUT_METRIC, 1.0, tags={"traffic_class": traffic_class, "reason": "cancelled"}
+        )
+        raise QueryTimeoutException(traffic_class) from context.original_exception
+
+    event.listen(engine, "handle_error", translate_query_cancel)
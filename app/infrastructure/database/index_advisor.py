@@ -0,0 +1,289 @@
+r"""Workload-driven index advisor for the product catalogue.
+
+Replays the search shapes recorded by
+:mod:`app.infrastructure.database.workload` against a local PostgreSQL copy
+and proposes indexes for them:
+
+1. Each shape is planned with ``EXPLAIN (ANALYZE)`` using the repository's own
+   statements, which gives the baseline time.
+2. Each shape yields one candidate: equality filters first (marca, familia,
+   bc3_product_type), then the sort column, then the pvp range. When the sort
+   takes the slot after the equality columns, pvp becomes an INCLUDE column
+   (covering index). ``bc3_has_descripcion_corta`` makes the index partial.
+3. Each candidate is built inside a transaction, every shape is replayed, and
+   the transaction is rolled back. The benefit is the time saved weighted by
+   how often each shape was recorded. The write cost is the index size and
+   its build time per row, a proxy for the extra work of each insert/update.
+
+Usage (local databases only)::
+
+    python -m app.infrastructure.database.index_advisor \
+        --database-url postgresql+psycopg://localhost/api_disano_local \
+        logs/workload/pagination-*.json
+"""
+
+import argparse
+import hashlib
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Select, create_engine, func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database.workload import QueryShape, load_workload
+from app.infrastructure.models.producto_clean import ProductoModelClean as ProductoModel
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# Equality filters, in index key order
+EQUALITY_FILTERS = ("marca", "familia", "bc3_product_type")
+RANGE_FILTERS = {"pvp_min": "pvp", "pvp_max": "pvp"}
+PARTIAL_FILTERS = {
+    "bc3_has_descripcion_corta=true": "bc3_descripcion_corta IS NOT NULL",
+    "bc3_has_descripcion_corta=false": "bc3_descripcion_corta IS NULL",
+}
+
+# productos_clean column -> raw productos column (indexes on the plain view)
+RAW_COLUMNS = {
+    "codigo": '"CÓDIGO"',
+    "descripcion": '"DESCRIPCION"',
+    "marca": '"MARCA"',
+    "familia": '"Familia_WEB"',
+    "pvp": '"PVP_26_01_26"',
+    "bc3_descripcion_corta": '"bc3_descripcion_corta"',
+    "bc3_product_type": '"bc3_product_type"',
+}
+
+
+@dataclass(frozen=True)
+class IndexCandidate:
+    """
+    Index proposed for one or more search shapes.
+
+    Attributes:
+        columns: Key columns (productos_clean names)
+        include: Non-key columns stored in the index (covering)
+        where: Partial index predicate (productos_clean names)
+    """
+
+    columns: tuple[str, ...]
+    include: tuple[str, ...] = ()
+    where: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Index name, unique per definition and within PostgreSQL's 63 bytes."""
+        digest = hashlib.sha1(repr(self).encode()).hexdigest()[:8]
+        return f"idx_advisor_{'_'.join(self.columns)}"[:50] + f"_{digest}"
+
+    def ddl(self, table: str, column_names: dict[str, str], concurrently: bool = False) -> str:
+        """CREATE INDEX statement on ``table`` using ``column_names``."""
+        keys = ", ".join(column_names[column] for column in self.columns)
+        statement = "CREATE INDEX CONCURRENTLY IF NOT EXISTS" if concurrently else "CREATE INDEX"
+        ddl = f"{statement} {self.name} ON {table} ({keys})"
+        if self.include:
+            ddl += f" INCLUDE ({', '.join(column_names[column] for column in self.include)})"
+        if self.where:
+            column, predicate = self.where.split(" ", 1)
+            ddl += f" WHERE {column_names[column]} {predicate}"
+        return ddl
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    """
+    Measured effect of one candidate on the recorded workload.
+
+    Attributes:
+        candidate: Evaluated index
+        ddl: Statement to create it on the live database
+        benefit_ms: Time saved by one replay of the recorded workload
+            (sum over shapes of recorded count x saving per execution)
+        improved_shapes: Shapes that got faster
+        size_bytes: Index size on the local copy
+        write_cost_us: Build time per row, the estimated extra cost of
+            maintaining the index on each inserted or updated product
+    """
+
+    candidate: IndexCandidate
+    ddl: str
+    benefit_ms: float
+    improved_shapes: int
+    size_bytes: int
+    write_cost_us: float
+
+
+def candidate_for(shape: QueryShape) -> Optional[IndexCandidate]:
+    """Propose the index that serves ``shape`` (equality, sort, range)."""
+    columns = [name for name in EQUALITY_FILTERS if name in shape.filters]
+    include: list[str] = []
+    range_column = next(
+        (column for name, column in RANGE_FILTERS.items() if name in shape.filters), None
+    )
+    sort_column = shape.sort.split(":")[0] if shape.sort else None
+    if sort_column is not None and sort_column not in RAW_COLUMNS:
+        sort_column = None  # Unknown sort fields are ignored by the repository
+
+    if sort_column is not None and sort_column not in columns:
+        columns.append(sort_column)
+        if range_column is not None and range_column != sort_column:
+            include.append(range_column)
+    elif range_column is not None:
+        columns.append(range_column)
+
+    where = next((PARTIAL_FILTERS[name] for name in shape.filters if name in PARTIAL_FILTERS), None)
+    if not columns:
+        if where is None:
+            return None  # Only free-text search: no B-tree helps ILIKE '%term%'
+        columns = ["codigo"]
+    return IndexCandidate(columns=tuple(columns), include=tuple(include), where=where)
+
+
+def propose_candidates(shapes: Iterable[QueryShape]) -> list[IndexCandidate]:
+    """Distinct candidates for ``shapes``, in first-seen order."""
+    candidates: dict[IndexCandidate, None] = {}
+    for shape in shapes:
+        candidate = candidate_for(shape)
+        if candidate is not None:
+            candidates.setdefault(candidate)
+    return list(candidates)
+
+
+class IndexAdvisor:
+    """
+    Replay a recorded workload and measure index candidates.
+
+    Args:
+        session: Session on the local PostgreSQL copy
+        workload: (shape, count, sample DTO) from :func:`load_workload`
+        repeat: Executions per measurement (the fastest is kept)
+    """
+
+    def __init__(
+        self, session: Session, workload: list[tuple[QueryShape, int, dict]], repeat: int = 3
+    ):
+        self.session = session
+        self.workload = workload
+        self.repeat = repeat
+        self.repository = SQLAlchemyProductoRepository(session)
+
+    def target(self) -> tuple[str, dict[str, str]]:
+        """Table that holds the indexes and its column names."""
+        materialized = self.session.scalar(
+            text(
+                "SELECT 1 FROM pg_matviews "
+                "WHERE schemaname = current_schema() AND matviewname = 'productos_clean'"
+            )
+        )
+        if materialized:
+            return "productos_clean", {column: column for column in RAW_COLUMNS}
+        return '"productos"', RAW_COLUMNS
+
+    def explain_ms(self, stmt: Select) -> float:
+        """Fastest execution time of ``stmt`` in milliseconds."""
+        compiled = stmt.compile(dialect=self.session.get_bind().dialect)
+        connection = self.session.connection()
+        timings = []
+        for _ in range(self.repeat):
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}", compiled.params
+            ).scalar_one()
+            timings.append(float(plan[0]["Execution Time"]))
+        return min(timings)
+
+    def replay(self) -> dict[QueryShape, float]:
+        """Time of each recorded shape (count plus page statement)."""
+        timings = {}
+        for shape, _count, sample in self.workload:
+            count_stmt, page_stmt = self.repository.pagination_statements(sample)
+            timings[shape] = self.explain_ms(count_stmt) + self.explain_ms(page_stmt)
+        return timings
+
+    def evaluate(
+        self, candidate: IndexCandidate, baseline: dict[QueryShape, float]
+    ) -> Recommendation:
+        """Build ``candidate`` in a rolled-back transaction and replay the workload."""
+        table, column_names = self.target()
+        rows = self.session.scalar(select(func.count()).select_from(ProductoModel)) or 1
+        try:
+            started = time.perf_counter()
+            self.session.execute(text(candidate.ddl(table, column_names)))
+            build_ms = (time.perf_counter() - started) * 1000
+            size_bytes = self.session.scalar(
+                text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": candidate.name}
+            )
+            timings = self.replay()
+        finally:
+            self.session.rollback()
+
+        counts = {shape: count for shape, count, _sample in self.workload}
+        savings = {shape: baseline[shape] - timings[shape] for shape in baseline}
+        return Recommendation(
+            candidate=candidate,
+            ddl=candidate.ddl(table, column_names, concurrently=True),
+            benefit_ms=sum(counts[shape] * saving for shape, saving in savings.items()),
+            improved_shapes=sum(1 for saving in savings.values() if saving > 0),
+            size_bytes=int(size_bytes or 0),
+            write_cost_us=build_ms * 1000 / rows,
+        )
+
+    def advise(self) -> list[Recommendation]:
+        """Evaluate every candidate, most beneficial first."""
+        baseline = self.replay()
+        self.session.rollback()
+        candidates = propose_candidates(shape for shape, _count, _sample in self.workload)
+        recommendations = [self.evaluate(candidate, baseline) for candidate in candidates]
+        return sorted(recommendations, key=lambda item: item.benefit_ms, reverse=True)
+
+
+def format_report(recommendations: list[Recommendation], min_benefit_ms: float = 0.0) -> str:
+    """Render the recommendations worth creating as text."""
+    useful = [item for item in recommendations if item.benefit_ms > min_benefit_ms]
+    if not useful:
+        return "No index candidate improves the recorded workload."
+
+    lines = []
+    for item in useful:
+        lines.append(item.ddl + ";")
+        lines.append(
+            f"    benefit {item.benefit_ms:.1f} ms per workload replay "
+            f"({item.improved_shapes} shapes faster), "
+            f"size {item.size_bytes / 1024:.0f} kB, "
+            f"write cost ~{item.write_cost_us:.1f} us/row"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Propose indexes for the recorded workload.")
+    parser.add_argument("workload", type=Path, nargs="+", help="pagination-<pid>.json files")
+    parser.add_argument("--database-url", required=True, help="Local PostgreSQL copy")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-benefit-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    url = make_url(args.database_url)
+    if url.get_backend_name() != "postgresql" or url.host not in LOCAL_HOSTS:
+        parser.error("--database-url must point to a local PostgreSQL copy")
+
+    workload = load_workload(args.workload)
+    engine = create_engine(url)
+    try:
+        with Session(engine) as session:
+            recommendations = IndexAdvisor(session, workload, repeat=args.repeat).advise()
+    finally:
+        engine.dispose()
+
+    print(f"Replayed {len(workload)} search shapes")
+    print(format_report(recommendations, args.min_benefit_ms))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
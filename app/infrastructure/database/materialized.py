@@ -0,0 +1,139 @@
+"""Refresh of the optionally materialized catalogue views.
+
+``migration/05_materialize_productos_clean.sql`` turns the ``productos_clean``
+view into a materialized view with indexes on codigo, marca, familia, pvp and
+bc3_product_type. ``migration/06_familia_stats.sql`` adds the ``familia_stats``
+per-family projection. Writers to ``productos`` schedule
+:func:`refresh_catalogue_views` after they commit; the
+:class:`CatalogueViewRefresher` runs it in a background thread on its own
+session, without the request's query deadline, so a slow refresh neither
+holds the response nor times out with it. The refresh is concurrent, so
+catalogue reads keep being served from the previous snapshot meanwhile.
+Views that are not materialized in the database are skipped.
+
+A refresh changes what the catalogue endpoints return, so it also bumps the
+HTTP catalogue version (``migration/08_catalogue_version.sql``) when present.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from typing import Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Refreshed in this order
+CATALOGUE_VIEWS = ("productos_clean", "familia_stats")
+
+_MATERIALIZED_VIEWS = text(
+    "SELECT matviewname FROM pg_matviews "
+    "WHERE schemaname = current_schema() AND matviewname IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+_BUMP_CATALOGUE_VERSION = text(
+    "UPDATE catalogue_version SET version = version + 1, updated_at = clock_timestamp()"
+)
+
+
+def refresh_catalogue_views(session: Session) -> list[str]:
+    """
+    Refresh the materialized catalogue views in their own transaction.
+
+    Args:
+        session: Session with no transaction in progress
+
+    Returns:
+        Names of the refreshed views (empty if none is materialized)
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return []
+
+    with session.begin():
+        present = set(session.scalars(_MATERIALIZED_VIEWS, {"names": list(CATALOGUE_VIEWS)}))
+        refreshed = [name for name in CATALOGUE_VIEWS if name in present]
+        for name in refreshed:
+            session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+        if refreshed and session.scalar(text("SELECT to_regclass('catalogue_version')")):
+            session.execute(_BUMP_CATALOGUE_VERSION)
+    return refreshed
+
+
+class CatalogueViewRefresher:
+    """
+    Refresh the catalogue views in a background thread.
+
+    Requests made while a refresh runs are coalesced into one more refresh.
+    Callbacks run after a refresh that changed at least one view.
+
+    Args:
+        session_factory: Factory of the sessions the refresh runs on
+    """
+
+    def __init__(self, session_factory: sessionmaker):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._requested = False
+        self._callbacks: list[Callable[[], None]] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, on_refreshed: Optional[Callable[[], None]] = None) -> None:
+        """Request a refresh; start the background thread unless one is running."""
+        with self._lock:
+            self._requested = True
+            if on_refreshed is not None:
+                self._callbacks.append(on_refreshed)
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="catalogue-view-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the scheduled refreshes; True if none is left running."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self._thread is None
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._requested:
+                    self._thread = None
+                    return
+                self._requested = False
+                callbacks, self._callbacks = self._callbacks, []
+
+            try:
+                with self._session_factory() as session:
+                    refreshed = refresh_catalogue_views(session)
+            except Exception as exc:  # noqa: BLE001 -- keep serving the previous snapshot
+                logger.warning(f"catalogue view refresh failed: {exc}")
+                continue
+
+            if refreshed:
+                for callback in callbacks:
+                    try:
+                        callback()
+                    except Exception as exc:  # noqa: BLE001
+                        logger.warning(f"catalogue view refresh callback failed: {exc}")
+
+
+# Singleton instance for application-wide use
+_global_catalogue_view_refresher: Optional[CatalogueViewRefresher] = None
+
+
+def get_catalogue_view_refresher() -> CatalogueViewRefresher:
+    """Get the global refresher, running on the admin partition."""
+    global _global_catalogue_view_refresher
+
+    if _global_catalogue_view_refresher is None:
+        from app.infrastructure.database.connection import get_session_factory
+
+        _global_catalogue_view_refresher = CatalogueViewRefresher(get_session_factory("admin"))
+
+    return _global_catalogue_view_refresher
@@ -0,0 +1,251 @@
+"""Read-replica routing for read-only repository calls.
+
+Sessions are ``RoutingSession`` instances bound to the primary. Repository
+methods decorated with ``replica_read`` mark their queries as read-only and
+are served by a healthy replica (round-robin). Everything else, including
+flushes and explicit transactions such as ``apply_bc3_enrichment``, stays
+on the primary.
+
+Read-your-writes: once a session flushes, it reads from the primary for the
+rest of its life, and the same client (``session.info["sticky_key"]``) keeps
+reading from the primary for ``DB_REPLICA_STICKY_SECONDS`` so that
+replication lag never hides its own writes.
+"""
+
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional, TypeVar
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Replication lag in seconds (0 on a primary or an idle replica)
+_PG_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_is_in_recovery() THEN "
+    "COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+
+class Replica:
+    """One replica engine and its health state."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = True
+        self.lag: float = 0.0
+        self.last_error: Optional[str] = None
+        self.reads = 0
+
+    def get_state(self) -> dict[str, object]:
+        """Snapshot for health endpoints (without credentials)."""
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag": round(self.lag, 3),
+            "reads": self.reads,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """
+    Round-robin over the healthy replicas of one pool partition.
+
+    Health is probed lazily: the first ``choose()`` after
+    ``health_interval`` seconds checks every replica (``SELECT 1``, plus the
+    replication lag on PostgreSQL). A replica that drops its connection is
+    taken out of rotation immediately.
+
+    Args:
+        engines: Replica engines
+        health_interval: Seconds between health probes
+        max_lag: Replication lag (seconds) above which a replica is skipped
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        engines: list[Engine],
+        health_interval: float = 30.0,
+        max_lag: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self._clock = clock
+        self._next_check = clock() + health_interval
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._checking = False
+
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._disconnect_listener(replica))
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _disconnect_listener(self, replica: Replica) -> Callable[[ExceptionContext], None]:
+        def mark_down_on_disconnect(context: ExceptionContext) -> None:
+            if context.is_disconnect:
+                replica.healthy = False
+                replica.last_error = type(context.original_exception).__name__
+
+        return mark_down_on_disconnect
+
+    def choose(self) -> Optional[Engine]:
+        """Return the next healthy replica engine, or None to use the primary."""
+        if not self.replicas:
+            return None
+        self._maybe_check_health()
+
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._cursor]
+                self._cursor = (self._cursor + 1) % len(self.replicas)
+                if replica.healthy:
+                    replica.reads += 1
+                    return replica.engine
+        return None
+
+    def _maybe_check_health(self) -> None:
+        """Probe the replicas if the interval elapsed (one thread at a time)."""
+        with self._lock:
+            if self._checking or self._clock() < self._next_check:
+                return
+            self._checking = True
+        try:
+            self.check_health()
+        finally:
+            with self._lock:
+                self._next_check = self._clock() + self.health_interval
+                self._checking = False
+
+    def check_health(self) -> None:
+        """Probe every replica and update its health and lag."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    if conn.dialect.name == "postgresql":
+                        replica.lag = float(conn.execute(_PG_LAG_QUERY).scalar() or 0.0)
+                    else:
+                        conn.execute(text("SELECT 1"))
+                        replica.lag = 0.0
+            except Exception as exc:
+                replica.healthy = False
+                replica.last_error = type(exc).__name__
+                logger.warning(f"Read replica unavailable: {replica.engine.url!r}: {exc}")
+                continue
+
+            replica.healthy = replica.lag <= self.max_lag
+            replica.last_error = None if replica.healthy else "replication_lag"
+
+    def get_state(self) -> list[dict[str, object]]:
+        """Health of every replica."""
+        return [replica.get_state() for replica in self.replicas]
+
+
+class WriteTracker:
+    """
+    Remember recent writers so their next reads go to the primary.
+
+    Args:
+        window: Seconds a client stays on the primary after a write
+        clock: Monotonic time source
+    """
+
+    def __init__(self, window: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self._clock = clock
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Optional[str]) -> None:
+        """Start (or extend) the primary-only window of ``key``."""
+        if not key:
+            return
+        now = self._clock()
+        with self._lock:
+            self._until[key] = now + self.window
+            # Drop expired writers so the map stays bounded
+            expired = [name for name, until in self._until.items() if until <= now]
+            for name in expired:
+                del self._until[name]
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        """True if ``key`` wrote within the window."""
+        if not key:
+            return False
+        return self._until.get(key, 0.0) > self._clock()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only repository calls to a replica.
+
+    Args:
+        replicas: Replica set of the session's partition (None: primary only)
+    """
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kw):  # type: ignore[no-untyped-def]
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if not self.replicas or self._flushing or not self.info.get("read_only"):
+            return primary
+        if self.info.get("wrote") or get_write_tracker().is_sticky(self.info.get("sticky_key")):
+            return primary
+        return self.replicas.choose() or primary
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _record_write(session: Session, _flush_context) -> None:
+    """After a write, this session and its client read from the primary."""
+    session.info["wrote"] = True
+    get_write_tracker().record(session.info.get("sticky_key"))
+
+
+def replica_read(method: F) -> F:
+    """Decorate a repository method whose queries may be served by a replica."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        info = getattr(self.session, "info", None)
+        if not isinstance(info, dict):
+            return method(self, *args, **kwargs)
+
+        previous = info.get("read_only", False)
+        info["read_only"] = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            info["read_only"] = previous
+
+    return wrapper  # type: ignore[return-value]
+
+
+# Singleton instance for application-wide use
+_global_write_tracker: Optional[WriteTracker] = None
+
+
+def get_write_tracker() -> WriteTracker:
+    """Get the global write tracker configured from settings."""
+    global _global_write_tracker
+
+    if _global_write_tracker is None:
+        _global_write_tracker = WriteTracker(window=get_settings().db_replica_sticky_seconds)
+
+    return _global_write_tracker
@@ -0,0 +1,163 @@
+"""Recording of the product search workload for the index advisor.
+
+With ``WORKLOAD_RECORDING_ENABLED`` every paginated product search is reduced
+to its shape: which filters are present, and the sort. The recorder counts
+shapes and keeps the latest request of each one as a replay sample. Every
+``WORKLOAD_RECORDING_FLUSH_EVERY`` searches (and at shutdown) the counts are
+written as JSON to ``<log dir>/workload/pagination-<pid>.json``, one file per
+worker. These files are the input of
+``python -m app.infrastructure.database.index_advisor``.
+
+Disabled, :meth:`WorkloadRecorder.record` returns immediately.
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.config import get_settings
+
+# Filters that take part in a shape when set (truthy)
+VALUE_FILTERS = ("marca", "familia", "bc3_product_type", "buscar")
+# Filters that take part in a shape when not None
+RANGE_FILTERS = ("pvp_min", "pvp_max")
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """
+    Filter and sort combination of one paginated search.
+
+    Attributes:
+        filters: Present filters, sorted; ``bc3_has_descripcion_corta`` is
+            recorded with its value since it selects different rows
+        sort: ``field:order`` or None
+    """
+
+    filters: tuple[str, ...]
+    sort: Optional[str] = None
+
+    @classmethod
+    def from_dto(cls, dto: dict) -> "QueryShape":
+        """Reduce a pagination DTO to its shape."""
+        filters = dto.get("filters", {})
+        present = [name for name in VALUE_FILTERS if filters.get(name)]
+        present += [name for name in RANGE_FILTERS if filters.get(name) is not None]
+        has_bc3 = filters.get("bc3_has_descripcion_corta")
+        if has_bc3 is not None:
+            present.append(f"bc3_has_descripcion_corta={str(bool(has_bc3)).lower()}")
+
+        sort = None
+        if dto.get("sort"):
+            parts = dto["sort"].split(":")
+            order = parts[1].lower() if len(parts) > 1 else "asc"
+            sort = f"{parts[0]}:{'desc' if order == 'desc' else 'asc'}"
+        return cls(filters=tuple(sorted(present)), sort=sort)
+
+    def to_dict(self) -> dict[str, object]:
+        """JSON-friendly representation."""
+        return {"filters": list(self.filters), "sort": self.sort}
+
+
+class WorkloadRecorder:
+    """
+    Count search shapes and periodically persist them.
+
+    Thread-safe: sync repositories run in Starlette's threadpool.
+
+    Args:
+        enabled: Record searches at all
+        path: JSON file the workload is written to
+        flush_every: Searches between two writes (0: only on flush())
+    """
+
+    def __init__(self, enabled: bool, path: Path, flush_every: int = 100):
+        self.enabled = enabled
+        self.path = path
+        self.flush_every = flush_every
+        self._counts: Counter[QueryShape] = Counter()
+        self._samples: dict[QueryShape, dict] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def record(self, dto: dict) -> None:
+        """Count the shape of one paginated search."""
+        if not self.enabled:
+            return
+
+        shape = QueryShape.from_dto(dto)
+        sample = {
+            "filters": dict(dto.get("filters", {})),
+            "sort": dto.get("sort"),
+            "offset": dto.get("offset", 0),
+            "per_page": dto.get("per_page", 10),
+        }
+        with self._lock:
+            self._counts[shape] += 1
+            self._samples[shape] = sample
+            self._pending += 1
+            due = self.flush_every > 0 and self._pending >= self.flush_every
+        if due:
+            self.flush()
+
+    def snapshot(self) -> dict[str, object]:
+        """Recorded shapes, most frequent first, with their replay sample."""
+        with self._lock:
+            shapes = [
+                {**shape.to_dict(), "count": count, "sample": self._samples[shape]}
+                for shape, count in self._counts.most_common()
+            ]
+        return {"shapes": shapes}
+
+    def flush(self) -> None:
+        """Write the workload atomically to ``path``."""
+        with self._lock:
+            self._pending = 0
+        with self._write_lock:
+            data = self.snapshot()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+
+def load_workload(paths: list[Path]) -> list[tuple[QueryShape, int, dict]]:
+    """
+    Merge workload files written by :meth:`WorkloadRecorder.flush`.
+
+    Returns:
+        (shape, count, sample DTO) per recorded shape, most frequent first
+    """
+    counts: Counter[QueryShape] = Counter()
+    samples: dict[QueryShape, dict] = {}
+    for path in paths:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for item in data.get("shapes", []):
+            shape = QueryShape(filters=tuple(item["filters"]), sort=item["sort"])
+            counts[shape] += item["count"]
+            samples[shape] = item["sample"]
+    return [(shape, count, samples[shape]) for shape, count in counts.most_common()]
+
+
+# Singleton instance for application-wide use
+_global_workload_recorder: Optional[WorkloadRecorder] = None
+
+
+def get_workload_recorder() -> WorkloadRecorder:
+    """Get the global workload recorder configured from settings."""
+    global _global_workload_recorder
+
+    if _global_workload_recorder is None:
+        settings = get_settings()
+        _global_workload_recorder = WorkloadRecorder(
+            enabled=settings.workload_recording_enabled,
+            path=Path(settings.log_file).parent / "workload" / f"pagination-{os.getpid()}.json",
+            flush_every=settings.workload_recording_flush_every,
+        )
+
+    return _global_workload_recorder
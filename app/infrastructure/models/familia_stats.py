@@ -0,0 +1,47 @@
+"""SQLAlchemy model for the familia_stats projection.
+
+Materialized view created by ``migration/06_familia_stats.sql`` with one
+precomputed row of BC3 statistics per family.
+"""
+
+from sqlalchemy import Column, Float, Integer, String
+
+from app.infrastructure.models.producto_clean import Base
+
+
+class FamiliaStatsModel(Base):
+    """
+    SQLAlchemy ORM model for the familia_stats materialized view.
+
+    The row with ``familia`` NULL counts products without a family, so
+    global totals can be summed from the projection alone.
+    """
+
+    __tablename__ = "familia_stats"
+
+    familia = Column(String, primary_key=True, nullable=True)
+    total_productos = Column(Integer, nullable=False)
+    con_bc3 = Column(Integer, nullable=False)
+    con_imagen = Column(Integer, nullable=False)
+    bc3_coverage = Column(Float, nullable=False)  # con_bc3 / total_productos
+
+    def to_entity(self):
+        """
+        Convert SQLAlchemy model to Domain Entity.
+
+        Returns:
+            FamiliaEntity: Family with statistics
+        """
+        from app.domain.entities.familia import FamiliaEntity
+
+        return FamiliaEntity(
+            nombre=self.familia,
+            total_productos=self.total_productos,
+            con_bc3=self.con_bc3,
+            con_imagen=self.con_imagen,
+            descontinuados=0,  # Not in clean view
+        )
+
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"<FamiliaStatsModel(familia='{self.familia}', total={self.total_productos})>"
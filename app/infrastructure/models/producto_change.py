@@ -0,0 +1,27 @@
+"""SQLAlchemy model for the productos change log.
+
+Table and triggers are created by ``migration/07_producto_changes.sql``.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, text
+
+from app.infrastructure.models.producto import Base
+
+
+class ProductoChangeModel(Base):
+    """
+    One logged change of a product (``upsert`` or ``delete``).
+
+    ``txid`` is the writing transaction; the changes endpoint pages in
+    ``(txid, change_id)`` order.
+    """
+
+    __tablename__ = "producto_changes"
+    __table_args__ = (Index("ix_producto_changes_txid_change_id", "txid", "change_id"),)
+
+    # Integer on SQLite so the primary key autoincrements (BIGINT IDENTITY in PostgreSQL)
+    change_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    txid = Column(BigInteger, nullable=False, default=0)
+    codigo = Column(String, nullable=False)
+    operation = Column(String, nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
@@ -5,14 +5,45 @@ Repository implementation using SQLAlchemy ORM for data access.
 
 from typing import Any
 
-from sqlalchemy import asc, case, desc, func, or_
+from sqlalchemy import Select, asc, case, desc, func, or_, select
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.domain.entities.familia import FamiliaEntity
+from app.domain.exceptions.overload import ServiceOverloadedException
 from app.domain.repositories.familia import FamiliaRepositoryInterface
 from app.infrastructure.cache.pagination_cache import get_pagination_cache
+from app.infrastructure.database.admission import get_admission_controller
+from app.infrastructure.database.replicas import replica_read
+from app.infrastructure.models.familia_stats import FamiliaStatsModel
 from app.infrastructure.models.producto_clean import ProductoModelClean as ProductoModel
 
+# Per-family aggregates shared by every family statement
+FAMILIA_STATS_COLUMNS = (
+    ProductoModel.familia,
+    func.count(ProductoModel.codigo).label("total_productos"),
+    func.sum(case((ProductoModel.bc3_descripcion_corta.isnot(None), 1), else_=0)).label("con_bc3"),
+    func.sum(case((ProductoModel.descripcion_corta.isnot(None), 1), else_=0)).label("con_imagen"),
+)
+
+# Same columns read from the familia_stats projection (FAMILIA_STATS_ENABLED)
+PRECOMPUTED_STATS_COLUMNS = (
+    FamiliaStatsModel.familia,
+    FamiliaStatsModel.total_productos,
+    FamiliaStatsModel.con_bc3,
+    FamiliaStatsModel.con_imagen,
+)
+
+# Sortable fields (``?sort=field:asc|desc``); strings order by aggregate labels,
+# None by the family name of the statement
+SORT_COLUMNS: dict[str, Any] = {
+    "nombre": None,
+    "familia": None,
+    "total_productos": "total_productos",
+    "con_bc3": "con_bc3",
+    "con_imagen": "con_imagen",
+}
+
 
 class SQLAlchemyFamiliaRepository(FamiliaRepositoryInterface):
     """SQLAlchemy implementation for FamiliaRepository."""
@@ -25,43 +56,20 @@ class SQLAlchemyFamiliaRepository(FamiliaRepositoryInterface):
         """
         self.session = session
 
+    @replica_read
     def get_all(self) -> list[FamiliaEntity]:
         """Get all families with BC3 statistics from productos_clean view.
 
         Returns:
             List[FamiliaEntity]: All families with BC3 statistics.
         """
-        # Group by familia and calculate statistics
-        query = (
-            self.session.query(
-                ProductoModel.familia,
-                func.count(ProductoModel.codigo).label("total_productos"),
-                func.sum(case((ProductoModel.bc3_descripcion_corta.isnot(None), 1), else_=0)).label(
-                    "con_bc3"
-                ),
-                func.sum(case((ProductoModel.descripcion_corta.isnot(None), 1), else_=0)).label(
-                    "con_imagen"
-                ),
-            )
-            .filter(ProductoModel.familia.isnot(None))
-            .group_by(ProductoModel.familia)
-            .order_by(ProductoModel.familia)
-        )
-
-        results = query.all()
+        stmt, familia = self._families_statement()
+        results = self.session.execute(stmt.order_by(familia)).all()
 
         # Convert to domain entities
-        return [
-            FamiliaEntity(
-                nombre=row.familia,
-                total_productos=row.total_productos,
-                con_bc3=int(row.con_bc3 or 0),
-                con_imagen=int(row.con_imagen or 0),
-                descontinuados=0,  # Not in clean view
-            )
-            for row in results
-        ]
+        return [self._to_entity(row) for row in results]
 
+    @replica_read
     def get_by_nombre(self, nombre: str) -> FamiliaEntity:
         """Get a family by name with statistics.
 
@@ -74,61 +82,75 @@ class SQLAlchemyFamiliaRepository(FamiliaRepositoryInterface):
         Raises:
             ValueError: If the family is not found.
         """
-        query = (
-            self.session.query(
-                ProductoModel.familia,
-                func.count(ProductoModel.codigo).label("total_productos"),
-                func.sum(case((ProductoModel.bc3_descripcion_corta.isnot(None), 1), else_=0)).label(
-                    "con_bc3"
-                ),
-                func.sum(case((ProductoModel.descripcion_corta.isnot(None), 1), else_=0)).label(
-                    "con_imagen"
-                ),
-            )
-            .filter(ProductoModel.familia == nombre)
-            .group_by(ProductoModel.familia)
-        )
-
-        row = query.first()
+        stmt, familia = self._families_statement()
+        row = self.session.execute(stmt.where(familia == nombre)).first()
 
         if not row:
             raise ValueError(f"Familia '{nombre}' no encontrada")
 
-        return FamiliaEntity(
-            nombre=row.familia,
-            total_productos=row.total_productos,
-            con_bc3=int(row.con_bc3 or 0),
-            con_imagen=int(row.con_imagen or 0),
-            descontinuados=0,  # Not in clean view
+        return self._to_entity(row)
+
+    @replica_read
+    def get_bc3_coverage_leaderboard(self, limit: int = 5) -> list[FamiliaEntity]:
+        """Get the families with the highest BC3 coverage.
+
+        Args:
+            limit: Number of families to return.
+
+        Returns:
+            List[FamiliaEntity]: Top families, highest BC3 coverage first.
+        """
+        if not get_settings().familia_stats_enabled:
+            return super().get_bc3_coverage_leaderboard(limit)
+
+        # Top-N read of the bc3_coverage index; ties keep the get_all name order
+        stmt = (
+            select(*PRECOMPUTED_STATS_COLUMNS)
+            .where(FamiliaStatsModel.familia.isnot(None))
+            .order_by(desc(FamiliaStatsModel.bc3_coverage), FamiliaStatsModel.familia)
+            .limit(limit)
         )
+        return [self._to_entity(row) for row in self.session.execute(stmt)]
 
+    @replica_read
     def get_statistics(self) -> dict:
         """Get aggregate statistics across all families.
 
         Returns:
             Dict: Aggregate family, product, and BC3 coverage statistics.
         """
-        # Total families
-        total_familias_query = self.session.query(
-            func.count(func.distinct(ProductoModel.familia))
-        ).filter(ProductoModel.familia.isnot(None))
-        total_familias = total_familias_query.scalar() or 0
-
-        # Total products
-        total_productos = self.session.query(func.count(ProductoModel.codigo)).scalar() or 0
-
-        # BC3 coverage
-        bc3_coverage_query = self.session.query(
-            func.count(ProductoModel.codigo).label("total"),
-            func.sum(case((ProductoModel.bc3_descripcion_corta.isnot(None), 1), else_=0)).label(
-                "con_bc3"
-            ),
-        )
-        result = bc3_coverage_query.first()
+        if get_settings().familia_stats_enabled:
+            # One pass over the projection; the NULL-family row counts its products
+            stmt = select(
+                func.count(FamiliaStatsModel.familia).label("total_familias"),
+                func.sum(FamiliaStatsModel.total_productos).label("total"),
+                func.sum(FamiliaStatsModel.con_bc3).label("con_bc3"),
+            )
+            result = self.session.execute(stmt).first()
+            total_familias = result.total_familias if result else 0
+            total_productos = int(result.total or 0) if result else 0
+        else:
+            # Total families
+            total_familias_stmt = select(func.count(func.distinct(ProductoModel.familia))).where(
+                ProductoModel.familia.isnot(None)
+            )
+            total_familias = self.session.scalar(total_familias_stmt) or 0
+
+            # Total products
+            total_productos = self.session.scalar(select(func.count(ProductoModel.codigo))) or 0
+
+            # BC3 coverage
+            bc3_coverage_stmt = select(
+                func.count(ProductoModel.codigo).label("total"),
+                func.sum(case((ProductoModel.bc3_descripcion_corta.isnot(None), 1), else_=0)).label(
+                    "con_bc3"
+                ),
+            )
+            result = self.session.execute(bc3_coverage_stmt).first()
 
         bc3_coverage = 0.0
-        if result and result.total > 0:
-            bc3_coverage = (result.con_bc3 / result.total) * 100
+        if result and result.total:
+            bc3_coverage = (int(result.con_bc3 or 0) / int(result.total)) * 100
 
         return {
             "total_familias": total_familias,
@@ -136,6 +158,7 @@ class SQLAlchemyFamiliaRepository(FamiliaRepositoryInterface):
             "bc3_coverage": round(bc3_coverage, 2),
         }
 
+    @replica_read
     def buscar_familias_paginado(self, dto: dict) -> tuple[list[FamiliaEntity], int]:
         """Search families with pagination, sorting, and filtering.
 
@@ -161,23 +184,29 @@ class SQLAlchemyFamiliaRepository(FamiliaRepositoryInterface):
 
         # Try to get from cache first
         cached_result = cache.get("familias", page, per_page, sort, filters)
-        if cached_result is not None:
-            # Convert cached data back to entities
-            entities_data = cached_result.get("entities", [])
-            total_count = cached_result.get("total", 0)
-            entities = [FamiliaEntity(**data) for data in entities_data]
-            return entities, total_count
-
-        # Cache miss - execute actual query
-        entities, total_count = self._execute_pagination_query(dto)
-
-        # Cache the result
-        cache_data = {
-            "entities": [entity.model_dump() for entity in entities],
-            "total": total_count,
-        }
-        cache.set("familias", page, per_page, sort, filters, cache_data)
-
+        if cached_result is None:
+            try:
+                # Cache miss - execute actual query if admission control lets it through
+                with get_admission_controller().admit("familias"):
+                    entities, total_count = self._execute_pagination_query(dto)
+            except ServiceOverloadedException:
+                # Shedding load: a recently expired page beats a 503
+                cached_result = cache.get_stale("familias", page, per_page, sort, filters)
+                if cached_result is None:
+                    raise
+            else:
+                # Cache the result
+                cache_data = {
+                    "entities": [entity.model_dump() for entity in entities],
+                    "total": total_count,
+                }
+                cache.set("familias", page, per_page, sort, filters, cache_data)
+                return entities, total_count
+
+        # Convert cached data back to entities
+        entities_data = cached_result.get("entities", [])
+        total_count = cached_result.get("total", 0)
+        entities = [FamiliaEntity(**data) for data in entities_data]
         return entities, total_count
 
     def _execute_pagination_query(self, dto: dict) -> tuple[list[FamiliaEntity], int]:
@@ -194,88 +223,77 @@ class SQLAlchemyFamiliaRepository(FamiliaRepositoryInterface):
                 - List of entities for current page
                 - Total count of matching items
         """
-        # Build base query with grouping
-        base_query = (
-            self.session.query(
-                ProductoModel.familia,
-                func.count(ProductoModel.codigo).label("total_productos"),
-                func.sum(case((ProductoModel.bc3_descripcion_corta.isnot(None), 1), else_=0)).label(
-                    "con_bc3"
-                ),
-                func.sum(case((ProductoModel.descripcion_corta.isnot(None), 1), else_=0)).label(
-                    "con_imagen"
-                ),
-            )
-            .filter(ProductoModel.familia.isnot(None))
-            .group_by(ProductoModel.familia)
-        )
+        stmt, familia = self._families_statement()
 
         # Apply filters
         filters = dto.get("filters", {})
         if filters.get("buscar"):
             search_pattern = f"%{filters['buscar']}%"
-            base_query = base_query.filter(or_(ProductoModel.familia.ilike(search_pattern)))
+            stmt = stmt.where(or_(familia.ilike(search_pattern)))
 
-        # Get total count BEFORE pagination
-        total_count = base_query.count()
+        # Get total count (number of families) BEFORE pagination
+        total_count = self.session.scalar(select(func.count()).select_from(stmt.subquery())) or 0
 
         # Apply sorting
         sort_string = dto.get("sort")
         if sort_string:
-            base_query = self._apply_sorting(base_query, sort_string)
+            stmt = self._apply_sorting(stmt, familia, sort_string)
         else:
-            base_query = base_query.order_by(asc(self._family_order_expression()))
+            stmt = stmt.order_by(asc(self._family_order_expression(familia)))
 
         # Apply pagination
-        base_query = base_query.offset(dto["offset"]).limit(dto["per_page"])
+        stmt = stmt.offset(dto["offset"]).limit(dto["per_page"])
 
-        # Execute query
-        results = base_query.all()
-
-        # Convert to domain entities
-        entities = [
-            FamiliaEntity(
-                nombre=row.familia,
-                total_productos=row.total_productos,
-                con_bc3=int(row.con_bc3 or 0),
-                con_imagen=int(row.con_imagen or 0),
-                descontinuados=0,  # Not in clean view
-            )
-            for row in results
-        ]
+        # Execute statement and convert to domain entities
+        entities = [self._to_entity(row) for row in self.session.execute(stmt)]
 
         return entities, total_count
 
-    def _apply_sorting(self, query, sort_string: str) -> Any:
-        """Apply sorting to query."""
+    def _families_statement(self) -> tuple[Select, Any]:
+        """Build the one-row-per-family statement and return its familia column.
+
+        Reads the familia_stats projection when FAMILIA_STATS_ENABLED, and
+        groups productos_clean otherwise.
+        """
+        if get_settings().familia_stats_enabled:
+            stmt = select(*PRECOMPUTED_STATS_COLUMNS).where(FamiliaStatsModel.familia.isnot(None))
+            return stmt, FamiliaStatsModel.familia
+
+        stmt = (
+            select(*FAMILIA_STATS_COLUMNS)
+            .where(ProductoModel.familia.isnot(None))
+            .group_by(ProductoModel.familia)
+        )
+        return stmt, ProductoModel.familia
+
+    def _to_entity(self, row: Any) -> FamiliaEntity:
+        """Convert a family statistics row to a domain entity."""
+        return FamiliaEntity(
+            nombre=row.familia,
+            total_productos=row.total_productos,
+            con_bc3=int(row.con_bc3 or 0),
+            con_imagen=int(row.con_imagen or 0),
+            descontinuados=0,  # Not in clean view
+        )
+
+    def _apply_sorting(self, stmt: Select, familia: Any, sort_string: str) -> Select:
+        """Apply sorting to a statement."""
         parts = sort_string.split(":")
         field = parts[0]
         order = parts[1].lower() if len(parts) > 1 else "asc"
 
-        field_mapping = {
-            "nombre": ProductoModel.familia,
-            "familia": ProductoModel.familia,
-            "total_productos": "total_productos",
-            "con_bc3": "con_bc3",
-            "con_imagen": "con_imagen",
-        }
-
-        if field in field_mapping:
+        if field in SORT_COLUMNS:
             order_func = desc if order == "desc" else asc
-            mapped_field = field_mapping[field]
+            mapped_field = SORT_COLUMNS[field]
 
-            if isinstance(mapped_field, str):
-                # Aggregated fields need different handling
-                return query.order_by(order_func(mapped_field))
-            if field in {"nombre", "familia"}:
-                mapped_field = self._family_order_expression()
-            return query.order_by(order_func(mapped_field))
+            if mapped_field is None:
+                mapped_field = self._family_order_expression(familia)
+            return stmt.order_by(order_func(mapped_field))
 
-        return query
+        return stmt
 
-    def _family_order_expression(self) -> Any:
+    def _family_order_expression(self, field: Any) -> Any:
         """Use Python-compatible case-sensitive family ordering on PostgreSQL."""
-        field = ProductoModel.familia
         try:
             dialect_name = self.session.get_bind().dialect.name
         except Exception:
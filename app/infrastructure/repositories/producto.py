@@ -1,8 +1,23 @@
+import logging
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from typing import Any, cast
 from uuid import uuid4
 
-from sqlalchemy import asc, desc, or_
+from sqlalchemy import (
+    Select,
+    asc,
+    desc,
+    func,
+    lambda_stmt,
+    literal,
+    null,
+    or_,
+    select,
+    text,
+    tuple_,
+    union_all,
+)
 from sqlalchemy.orm import Session
 
 from app.application.dto.bc3_enrichment import (
@@ -11,24 +26,126 @@ from app.application.dto.bc3_enrichment import (
 )
 from app.domain.entities.producto import ProductoEntity
 from app.domain.exceptions.not_found import ProductoNotFoundException
+from app.domain.exceptions.overload import ServiceOverloadedException
 from app.domain.repositories.producto import ProductoRepositoryInterface
 from app.infrastructure.models.producto_clean import (
     ProductoModelClean as _ProductoModel,
 )
 from app.infrastructure.models.producto import ProductoRawModel as _ProductoRawModel
+from app.infrastructure.models.producto_change import (
+    ProductoChangeModel as _ProductoChangeModel,
+)
 from app.infrastructure.models.enrichment import (
     BC3EnrichmentJobItemModel as _BC3EnrichmentJobItemModel,
     BC3EnrichmentJobModel as _BC3EnrichmentJobModel,
 )
+from app.infrastructure.cache.cache_manager import get_cache_manager
+from app.infrastructure.cache.catalogue_snapshot import get_serving_snapshot
 from app.infrastructure.cache.pagination_cache import get_pagination_cache
+from app.infrastructure.cache.surrogate_purge import (
+    catalogue_write_keys,
+    get_purge_worker,
+    queue_purge,
+)
+from app.infrastructure.database.admission import (
+    StreamLimit,
+    get_admission_controller,
+    get_export_limit,
+)
+from app.infrastructure.database.catalogue_version import (
+    get_catalogue_version,
+    invalidate_after_commit,
+)
+from app.infrastructure.database.deadlines import enforce_deadline
+from app.infrastructure.database.materialized import get_catalogue_view_refresher
+from app.infrastructure.database.replicas import replica_read
+from app.infrastructure.database.workload import get_workload_recorder
 
 
+logger = logging.getLogger(__name__)
+
 # These legacy ORM models use untyped SQLAlchemy ``Column`` declarations.
 # Keep the repository runtime behavior unchanged while containing that typing debt.
 ProductoModel = cast(Any, _ProductoModel)
 ProductoRawModel = cast(Any, _ProductoRawModel)
 BC3EnrichmentJobItemModel = cast(Any, _BC3EnrichmentJobItemModel)
 BC3EnrichmentJobModel = cast(Any, _BC3EnrichmentJobModel)
+ProductoChangeModel = cast(Any, _ProductoChangeModel)
+
+# Sortable columns of the public catalogue (``?sort=field:asc|desc``)
+SORT_COLUMNS = {
+    "codigo": ProductoModel.codigo,
+    "descripcion": ProductoModel.descripcion,
+    "marca": ProductoModel.marca,
+    "familia": ProductoModel.familia,
+    "pvp": ProductoModel.pvp,
+    "bc3_descripcion_corta": ProductoModel.bc3_descripcion_corta,
+    "bc3_product_type": ProductoModel.bc3_product_type,
+}
+
+# Columns counted by ``?facets=`` (keyed by ``FACET_FIELDS``)
+FACET_COLUMNS = {
+    "marca": ProductoModel.marca,
+    "familia": ProductoModel.familia,
+    "bc3_product_type": ProductoModel.bc3_product_type,
+}
+
+# Columns matched by the paginated ``buscar`` filter
+TEXT_SEARCH_COLUMNS = (
+    ProductoModel.codigo,
+    ProductoModel.descripcion,
+    ProductoModel.descripcion_corta,
+    ProductoModel.bc3_descripcion_corta,
+    ProductoModel.bc3_descripcion_completa,
+)
+
+# Columns matched by the private BC3 ``buscar`` filter
+PRIVATE_TEXT_SEARCH_COLUMNS = (
+    ProductoRawModel.codigo,
+    ProductoRawModel.descripcion,
+    ProductoRawModel.marca,
+    ProductoRawModel.familia_web,
+    ProductoRawModel.bc3_descripcion_corta,
+)
+
+# Oldest transaction still running: changes of older transactions are final
+CHANGE_HORIZON = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::TEXT::BIGINT")
+
+# Codes per ``IN (...)`` query of a bulk lookup
+BULK_LOOKUP_CHUNK = 500
+
+
+class _ExportStream(Iterator[ProductoEntity]):
+    """
+    Entities of an open export cursor, holding a :class:`StreamLimit` slot.
+
+    The cursor is closed and the slot released once the rows run out, or when
+    the stream is closed or collected (client gone before the end).
+    """
+
+    def __init__(self, models: Any, limit: StreamLimit):
+        self._models = models
+        self._rows = iter(models)
+        self._limit: StreamLimit | None = limit
+
+    def __next__(self) -> ProductoEntity:
+        try:
+            return next(self._rows).to_entity()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close the cursor and free the export slot (idempotent)."""
+        limit, self._limit = self._limit, None
+        if limit is not None:
+            try:
+                self._models.close()
+            finally:
+                limit.release()
+
+    def __del__(self) -> None:
+        self.close()
 
 
 class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
@@ -49,6 +166,7 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         """
         self.session = session
 
+    @replica_read
     def get_by_codigo(self, codigo: str) -> ProductoEntity:
         """
         Get product by code.
@@ -62,7 +180,9 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         Raises:
             ProductoNotFoundException: If product doesn't exist
         """
-        model = self.session.query(ProductoModel).filter(ProductoModel.codigo == codigo).first()
+        # Lambda statement: built and cache-keyed once, ``codigo`` is a bound parameter
+        stmt = lambda_stmt(lambda: select(ProductoModel).where(ProductoModel.codigo == codigo))
+        model = self.session.scalars(stmt).first()
 
         if not model:
             raise ProductoNotFoundException(codigo)
@@ -88,12 +208,12 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         Returns:
             List[ProductoEntity]: Matching products
         """
-        query = self.session.query(ProductoModel)
+        stmt = select(ProductoModel)
 
         # Apply text search if term provided
         if termino:
             search_pattern = f"%{termino}%"
-            query = query.filter(
+            stmt = stmt.where(
                 or_(
                     ProductoModel.descripcion.ilike(search_pattern),
                     ProductoModel.codigo.ilike(search_pattern),
@@ -107,18 +227,18 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
 
         # Apply marca filter if provided
         if marca:
-            query = query.filter(ProductoModel.marca == marca)
+            stmt = stmt.where(ProductoModel.marca == marca)
 
         # Apply familia filter if provided
         if familia:
-            query = query.filter(ProductoModel.familia == familia)
+            stmt = stmt.where(ProductoModel.familia == familia)
 
         # Apply limit
         if limit > 0:
-            query = query.limit(limit)
+            stmt = stmt.limit(limit)
 
         # Convert models to entities
-        return [model.to_entity() for model in query.all()]
+        return [model.to_entity() for model in self.session.scalars(stmt)]
 
     def get_all(self, skip: int = 0, limit: int = 100) -> list[ProductoEntity]:
         """
@@ -131,8 +251,8 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         Returns:
             List[ProductoEntity]: Products in specified range
         """
-        query = self.session.query(ProductoModel).offset(skip).limit(limit)
-        return [model.to_entity() for model in query.all()]
+        stmt = select(ProductoModel).offset(skip).limit(limit)
+        return [model.to_entity() for model in self.session.scalars(stmt)]
 
     def save(self, producto: ProductoEntity) -> ProductoEntity:
         """
@@ -150,6 +270,9 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         # Use merge to handle both create and update
         self.session.merge(model)
         self.session.flush()  # Flush without commit
+        invalidate_after_commit(self.session)
+        queue_purge(self.session, catalogue_write_keys([producto.codigo]))
+        self._forget_cached_products([producto.codigo])
 
         return model.to_entity()
 
@@ -163,13 +286,16 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         Returns:
             bool: True if deleted, False if not found
         """
-        model = self.session.query(ProductoModel).filter(ProductoModel.codigo == codigo).first()
+        model = self.session.get(ProductoModel, codigo)
 
         if not model:
             return False
 
         self.session.delete(model)
         self.session.flush()
+        invalidate_after_commit(self.session)
+        queue_purge(self.session, catalogue_write_keys([codigo]))
+        self._forget_cached_products([codigo])
 
         return True
 
@@ -180,8 +306,9 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
         Returns:
             int: Total number of products in database
         """
-        return self.session.query(ProductoModel).count()
+        return self.session.scalar(select(func.count()).select_from(ProductoModel)) or 0
 
+    @replica_read
     def buscar_productos_paginado(self, dto: dict) -> tuple[list[ProductoEntity], int]:
         """Execute paginated query with sorting and filtering.
 
@@ -196,6 +323,11 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
                 - List of entities for current page
                 - Total count of matching items
         """
+        # Columnar snapshot at the current catalogue version, when enabled
+        snapshot = get_serving_snapshot()
+        if snapshot is not None:
+            return snapshot.search(dto)
+
         # Get pagination cache wrapper
         cache = get_pagination_cache()
 
@@ -207,25 +339,189 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
 
         # Try to get from cache first
         cached_result = cache.get("productos", page, per_page, sort, filters)
-        if cached_result is not None:
-            # Convert cached data back to entities
-            entities_data = cached_result.get("entities", [])
-            total_count = cached_result.get("total", 0)
-            entities = [ProductoEntity(**data) for data in entities_data]
-            return entities, total_count
-
-        # Cache miss - execute actual query
-        entities, total_count = self._execute_pagination_query(dto)
-
-        # Cache the result
-        cache_data = {
-            "entities": [entity.model_dump() for entity in entities],
-            "total": total_count,
-        }
-        cache.set("productos", page, per_page, sort, filters, cache_data)
+        if cached_result is None:
+            try:
+                # Cache miss - execute actual query if admission control lets it through
+                with get_admission_controller().admit("productos"):
+                    entities, total_count = self._execute_pagination_query(dto)
+            except ServiceOverloadedException:
+                # Shedding load: a recently expired page beats a 503
+                cached_result = cache.get_stale("productos", page, per_page, sort, filters)
+                if cached_result is None:
+                    raise
+            else:
+                # Cache the result
+                cache_data = {
+                    "entities": [entity.model_dump() for entity in entities],
+                    "total": total_count,
+                }
+                cache.set("productos", page, per_page, sort, filters, cache_data)
+                return entities, total_count
 
+        # Convert cached data back to entities
+        entities_data = cached_result.get("entities", [])
+        total_count = cached_result.get("total", 0)
+        entities = [ProductoEntity(**data) for data in entities_data]
         return entities, total_count
 
+    @replica_read
+    def buscar_productos_paginado_lote(
+        self, dtos: list[dict]
+    ) -> list[tuple[list[ProductoEntity], int]]:
+        """Run several paginated searches on this session's connection.
+
+        Cached pages are served first; the misses then run one after another
+        on the same pooled connection, each admitted separately and only while
+        the request's query budget lasts.
+
+        Args:
+            dtos: Pagination request DTOs, as for ``buscar_productos_paginado``
+
+        Returns:
+            One (entities, total) tuple per DTO, in order
+        """
+        snapshot = get_serving_snapshot()
+        if snapshot is not None:
+            return [snapshot.search(dto) for dto in dtos]
+
+        cache = get_pagination_cache()
+        keys = [
+            (dto.get("page", 1), dto.get("per_page", 10), dto.get("sort"), dto.get("filters", {}))
+            for dto in dtos
+        ]
+        cached: list[Any] = [cache.get("productos", *key) for key in keys]
+        misses = [index for index, result in enumerate(cached) if result is None]
+
+        results: dict[int, tuple[list[ProductoEntity], int]] = {}
+        if misses:
+            for position, index in enumerate(misses):
+                try:
+                    # All queries share the transaction, so its deadline is
+                    # re-checked before each one; each is admitted on its own
+                    # so the limiter sees per-query latency
+                    enforce_deadline(self.session)
+                    with get_admission_controller().admit("productos"):
+                        results[index] = self._execute_pagination_query(dtos[index])
+                except ServiceOverloadedException:
+                    # Shedding load: recently expired pages beat a 503
+                    for pending in misses[position:]:
+                        cached[pending] = cache.get_stale("productos", *keys[pending])
+                        if cached[pending] is None:
+                            raise
+                    break
+            for index, (entities, total_count) in results.items():
+                cache_data = {
+                    "entities": [entity.model_dump() for entity in entities],
+                    "total": total_count,
+                }
+                cache.set("productos", *keys[index], cache_data)
+
+        return [
+            results[index]
+            if index in results
+            else (
+                [ProductoEntity(**data) for data in cached[index].get("entities", [])],
+                cached[index].get("total", 0),
+            )
+            for index in range(len(dtos))
+        ]
+
+    @replica_read
+    def buscar_productos_facetado(
+        self, dto: dict
+    ) -> tuple[list[ProductoEntity], int, dict[str, list[dict]]]:
+        """Paginated search plus the facet counts of its filter set.
+
+        The counts are stored in the page's own pagination cache entry; when
+        the page is already cached only the facet query runs.
+
+        Args:
+            dto: Complete pagination request DTO with filters and sorting
+
+        Returns:
+            Tuple[list[ProductoEntity], int, dict]:
+                - List of entities for current page
+                - Total count of matching items
+                - Per facet field, ``{"value", "count"}`` by descending count
+        """
+        snapshot = get_serving_snapshot()
+        if snapshot is not None:
+            return snapshot.search_with_facets(dto)
+
+        cache = get_pagination_cache()
+        key = (dto.get("page", 1), dto.get("per_page", 10), dto.get("sort"), dto.get("filters", {}))
+
+        cached_result = cache.get("productos", *key)
+        if cached_result is None or "facets" not in cached_result:
+            try:
+                with get_admission_controller().admit("productos"):
+                    total_count, facets = self._count_facets(dto.get("filters", {}))
+                    if cached_result is None:
+                        get_workload_recorder().record(dto)
+                        _, stmt = self.pagination_statements(dto)
+                        cached_result = {
+                            "entities": [
+                                model.to_entity().model_dump()
+                                for model in self.session.scalars(stmt)
+                            ]
+                        }
+            except ServiceOverloadedException:
+                # Shedding load: a recently expired page beats a 503
+                cached_result = cache.get_stale("productos", *key)
+                if cached_result is None or "facets" not in cached_result:
+                    raise
+            else:
+                cached_result = {**cached_result, "total": total_count, "facets": facets}
+                cache.set("productos", *key, cached_result)
+
+        entities = [ProductoEntity(**data) for data in cached_result.get("entities", [])]
+        return entities, cached_result.get("total", 0), cached_result["facets"]
+
+    def _count_facets(self, filters: dict) -> tuple[int, dict[str, list[dict]]]:
+        """Total and facet counts of a filter set in one statement.
+
+        PostgreSQL counts every facet in a single scan with GROUPING SETS; the
+        empty set gives the total, replacing the page's COUNT. Other dialects
+        run the equivalent UNION ALL.
+        """
+        conditions = self._pagination_conditions(filters)
+        fields = list(FACET_COLUMNS)
+        columns = list(FACET_COLUMNS.values())
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt: Any = (
+                select(*columns, *(func.grouping(column) for column in columns), func.count())
+                .where(*conditions)
+                .group_by(func.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+            )
+        else:
+            stmt = union_all(
+                *(
+                    select(
+                        *(column if column is grouped else null() for column in columns),
+                        *(literal(int(column is not grouped)) for column in columns),
+                        func.count(),
+                    )
+                    .where(*conditions)
+                    .group_by(*([grouped] if grouped is not None else []))
+                    for grouped in [*columns, None]
+                )
+            )
+
+        total_count = 0
+        facets: dict[str, list[dict]] = {field: [] for field in fields}
+        for row in self.session.execute(stmt):
+            values, grouping, count = row[: len(fields)], row[len(fields) : -1], row[-1]
+            if all(grouping):
+                total_count = count
+                continue
+            position = list(grouping).index(0)
+            # Products without a value cannot be filtered on, so they are not listed
+            if values[position] is not None:
+                facets[fields[position]].append({"value": values[position], "count": count})
+        for counts in facets.values():
+            counts.sort(key=lambda item: (-item["count"], item["value"]))
+        return total_count, facets
+
     def _execute_pagination_query(self, dto: dict) -> tuple[list[ProductoEntity], int]:
         """Execute the actual pagination query (without caching).
 
@@ -240,107 +536,124 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
                 - List of entities for current page
                 - Total count of matching items
         """
-        # Base query
-        query = self.session.query(ProductoModel)
+        get_workload_recorder().record(dto)
+        count_stmt, stmt = self.pagination_statements(dto)
 
-        # Apply filters
-        filters = dto.get("filters", {})
-        if filters.get("marca"):
-            query = query.filter(ProductoModel.marca == filters["marca"])
+        # Get total count BEFORE pagination
+        total_count = self.session.scalar(count_stmt) or 0
 
-        if filters.get("familia"):
-            query = query.filter(ProductoModel.familia == filters["familia"])
+        # Execute query and convert to entities
+        entities = [model.to_entity() for model in self.session.scalars(stmt)]
 
-        if filters.get("pvp_min") is not None:
-            query = query.filter(ProductoModel.pvp >= filters["pvp_min"])
+        return entities, total_count
 
-        if filters.get("pvp_max") is not None:
-            query = query.filter(ProductoModel.pvp <= filters["pvp_max"])
+    def pagination_statements(self, dto: dict) -> tuple[Select, Select]:
+        """Build the count and page statements of a paginated search.
 
-        if filters.get("bc3_product_type"):
-            query = query.filter(ProductoModel.bc3_product_type == filters["bc3_product_type"])
+        Also replayed by the index advisor, so it plans exactly these.
 
-        if filters.get("bc3_has_descripcion_corta") is not None:
-            if filters["bc3_has_descripcion_corta"]:
-                query = query.filter(ProductoModel.bc3_descripcion_corta.isnot(None))
-            else:
-                query = query.filter(ProductoModel.bc3_descripcion_corta.is_(None))
+        Args:
+            dto: Complete pagination request DTO with filters and sorting
 
-        if filters.get("buscar"):
-            query = self._apply_text_search(query, filters["buscar"])
+        Returns:
+            Tuple[Select, Select]: Count statement and page statement
+        """
+        conditions = self._pagination_conditions(dto.get("filters", {}))
+        count_stmt = select(func.count()).select_from(ProductoModel).where(*conditions)
 
-        # Get total count BEFORE pagination
-        total_count = query.count()
+        stmt = select(ProductoModel).where(*conditions)
 
         # Apply sorting
         sort_string = dto.get("sort")
         if sort_string:
-            query = self._apply_sorting(query, sort_string)
+            stmt = self._apply_sorting(stmt, sort_string)
 
         # Apply pagination
-        query = query.offset(dto["offset"]).limit(dto["per_page"])
+        stmt = stmt.offset(dto["offset"]).limit(dto["per_page"])
 
-        # Execute query
-        models = query.all()
+        return count_stmt, stmt
 
-        # Convert to entities
-        entities = [model.to_entity() for model in models]
+    def _pagination_conditions(self, filters: dict) -> list[Any]:
+        """Build the WHERE conditions of a paginated search."""
+        conditions: list[Any] = []
+        if filters.get("marca"):
+            conditions.append(ProductoModel.marca == filters["marca"])
 
-        return entities, total_count
+        if filters.get("familia"):
+            conditions.append(ProductoModel.familia == filters["familia"])
+
+        if filters.get("pvp_min") is not None:
+            conditions.append(ProductoModel.pvp >= filters["pvp_min"])
+
+        if filters.get("pvp_max") is not None:
+            conditions.append(ProductoModel.pvp <= filters["pvp_max"])
+
+        if filters.get("bc3_product_type"):
+            conditions.append(ProductoModel.bc3_product_type == filters["bc3_product_type"])
+
+        if filters.get("bc3_has_descripcion_corta") is not None:
+            if filters["bc3_has_descripcion_corta"]:
+                conditions.append(ProductoModel.bc3_descripcion_corta.isnot(None))
+            else:
+                conditions.append(ProductoModel.bc3_descripcion_corta.is_(None))
+
+        if filters.get("buscar"):
+            pattern = f"%{filters['buscar']}%"
+            conditions.append(or_(*(column.ilike(pattern) for column in TEXT_SEARCH_COLUMNS)))
 
-    def _apply_sorting(self, query, sort_string: str):
-        """Apply sorting to query."""
+        return conditions
+
+    def _apply_sorting(self, stmt: Select, sort_string: str) -> Select:
+        """Apply sorting to a statement."""
         parts = sort_string.split(":")
         field = parts[0]
         order = parts[1].lower() if len(parts) > 1 else "asc"
 
-        field_mapping = {
-            "codigo": ProductoModel.codigo,
-            "descripcion": ProductoModel.descripcion,
-            "marca": ProductoModel.marca,
-            "familia": ProductoModel.familia,
-            "pvp": ProductoModel.pvp,
-            "bc3_descripcion_corta": ProductoModel.bc3_descripcion_corta,
-            "bc3_product_type": ProductoModel.bc3_product_type,
-        }
-
-        if field in field_mapping:
+        column = SORT_COLUMNS.get(field)
+        if column is not None:
             order_func = desc if order == "desc" else asc
-            return query.order_by(order_func(field_mapping[field]))
-
-        return query
-
-    def _apply_text_search(self, query, search_pattern: str):
-        """Apply text search to query."""
-        pattern = f"%{search_pattern}%"
-        return query.filter(
-            or_(
-                ProductoModel.codigo.ilike(pattern),
-                ProductoModel.descripcion.ilike(pattern),
-                ProductoModel.descripcion_corta.ilike(pattern),
-                ProductoModel.bc3_descripcion_corta.ilike(pattern),
-                ProductoModel.bc3_descripcion_completa.ilike(pattern),
-            )
-        )
+            return stmt.order_by(order_func(column))
+
+        return stmt
 
     def get_private_by_codigo(self, codigo: str) -> ProductoEntity:
         """Read a private BC3 product directly from the raw table."""
-        model = (
-            self.session.query(ProductoRawModel).filter(ProductoRawModel.codigo == codigo).first()
+        stmt = lambda_stmt(
+            lambda: select(ProductoRawModel).where(ProductoRawModel.codigo == codigo)
         )
+        model = self.session.scalars(stmt).first()
         if not model:
             raise ProductoNotFoundException(codigo)
         return model.to_entity()
 
     def apply_bc3_enrichment(self, items: list[dict], idempotency_key: str) -> dict[str, object]:
         """Apply one idempotent BC3 enrichment transaction."""
+        result = self._apply_bc3_enrichment(items, idempotency_key)
+        updated_codes = cast(list[str], result["updated_codes"])
+        if updated_codes:
+            # The enrichment is committed; this worker answers with the new ETags right away
+            get_catalogue_version().invalidate()
+            queue_purge(self.session, catalogue_write_keys(updated_codes))
+            self._forget_cached_products(updated_codes)
+
+            def forget_refreshed_views() -> None:
+                # Runs in the refresh thread, so it does not touch this session
+                get_catalogue_version().invalidate()
+                get_purge_worker().submit(catalogue_write_keys(updated_codes))
+                self._forget_cached_products(updated_codes)
+
+            # A failed refresh only delays the enrichment in the read views
+            get_catalogue_view_refresher().schedule(forget_refreshed_views)
+        return result
+
+    def _apply_bc3_enrichment(self, items: list[dict], idempotency_key: str) -> dict[str, object]:
         request_hash = hash_bc3_enrichment_items(items)
         with self.session.begin():
-            existing = (
-                self.session.query(BC3EnrichmentJobModel)
-                .filter(BC3EnrichmentJobModel.idempotency_key == idempotency_key)
-                .first()
-            )
+            existing = self.session.scalars(
+                select(BC3EnrichmentJobModel).where(
+                    BC3EnrichmentJobModel.idempotency_key == idempotency_key
+                )
+            ).first()
             if existing is not None:
                 if existing.request_hash != request_hash:
                     raise ValueError(
@@ -358,9 +671,11 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
             self.session.flush()
             products = {
                 model.codigo: model
-                for model in self.session.query(ProductoRawModel)
-                .filter(ProductoRawModel.codigo.in_([item["codigo"] for item in items]))
-                .all()
+                for model in self.session.scalars(
+                    select(ProductoRawModel).where(
+                        ProductoRawModel.codigo.in_([item["codigo"] for item in items])
+                    )
+                )
             }
             updated_codes: list[str] = []
             unchanged_codes: list[str] = []
@@ -406,12 +721,11 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
             }
 
     def _bc3_apply_result(self, job: Any) -> dict[str, object]:
-        items = (
-            self.session.query(BC3EnrichmentJobItemModel)
-            .filter(BC3EnrichmentJobItemModel.job_id == job.job_id)
+        items = self.session.scalars(
+            select(BC3EnrichmentJobItemModel)
+            .where(BC3EnrichmentJobItemModel.job_id == job.job_id)
             .order_by(BC3EnrichmentJobItemModel.id.asc())
-            .all()
-        )
+        ).all()
         return {
             "updated_codes": [item.codigo for item in items if item.result_status == "updated"],
             "unchanged_codes": [item.codigo for item in items if item.result_status == "unchanged"],
@@ -422,19 +736,16 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
 
     def get_bc3_enrichment_job_status(self, job_id: str) -> dict[str, object] | None:
         """Return the persisted status projection for an enrichment job."""
-        job = (
-            self.session.query(BC3EnrichmentJobModel)
-            .filter(BC3EnrichmentJobModel.job_id == job_id)
-            .first()
-        )
+        job = self.session.scalars(
+            select(BC3EnrichmentJobModel).where(BC3EnrichmentJobModel.job_id == job_id)
+        ).first()
         if job is None:
             return None
-        items = (
-            self.session.query(BC3EnrichmentJobItemModel)
-            .filter(BC3EnrichmentJobItemModel.job_id == job_id)
+        items = self.session.scalars(
+            select(BC3EnrichmentJobItemModel)
+            .where(BC3EnrichmentJobItemModel.job_id == job_id)
             .order_by(BC3EnrichmentJobItemModel.codigo.asc())
-            .all()
-        )
+        ).all()
         return {
             "job_id": cast(str, job.job_id),
             "status": cast(str, job.status),
@@ -454,36 +765,212 @@ class SQLAlchemyProductoRepository(ProductoRepositoryInterface):
             ],
         }
 
-    def buscar_productos_privado(self, dto: dict) -> tuple[list[ProductoEntity], int]:
-        """Paginate private BC3 products from the raw ``productos`` table."""
-
-        query = self.session.query(ProductoRawModel)
-        filters = dto.get("filters", {})
+    def _private_conditions(self, filters: dict) -> list[Any]:
+        conditions: list[Any] = []
         if filters.get("marca"):
-            query = query.filter(ProductoRawModel.marca == filters["marca"])
+            conditions.append(ProductoRawModel.marca == filters["marca"])
         if filters.get("familia"):
-            query = query.filter(ProductoRawModel.familia_web == filters["familia"])
+            conditions.append(ProductoRawModel.familia_web == filters["familia"])
         if filters.get("buscar"):
             pattern = f"%{filters['buscar']}%"
-            query = query.filter(
-                or_(
-                    ProductoRawModel.codigo.ilike(pattern),
-                    ProductoRawModel.descripcion.ilike(pattern),
-                    ProductoRawModel.marca.ilike(pattern),
-                    ProductoRawModel.familia_web.ilike(pattern),
-                    ProductoRawModel.bc3_descripcion_corta.ilike(pattern),
-                )
+            conditions.append(
+                or_(*(column.ilike(pattern) for column in PRIVATE_TEXT_SEARCH_COLUMNS))
             )
+        return conditions
 
-        total_count = query.count()
-        models = query.offset(dto["offset"]).limit(dto["per_page"]).all()
+    def buscar_productos_privado(self, dto: dict) -> tuple[list[ProductoEntity], int]:
+        """Paginate private BC3 products from the raw ``productos`` table."""
+
+        conditions = self._private_conditions(dto.get("filters", {}))
+        count_stmt = select(func.count()).select_from(ProductoRawModel).where(*conditions)
+        stmt = (
+            select(ProductoRawModel).where(*conditions).offset(dto["offset"]).limit(dto["per_page"])
+        )
+        with get_admission_controller().admit("bc3"):
+            total_count = self.session.scalar(count_stmt) or 0
+            models = self.session.scalars(stmt).all()
         return [model.to_entity() for model in models], total_count
 
-    def get_private_by_codigos(self, codigos: list[str]) -> dict[str, ProductoEntity]:
+    @replica_read
+    def stream_private_catalogue(
+        self, filters: dict, batch_size: int = 1000
+    ) -> Iterator[ProductoEntity]:
+        """
+        Walk the private BC3 catalogue in ``codigo`` order.
+
+        The statement is executed here, through a server-side cursor
+        (``yield_per``); the returned iterator then fetches ``batch_size``
+        rows per round trip, so memory stays constant whatever the
+        catalogue size. The session must stay open until it is exhausted.
+        """
+        stmt = (
+            select(ProductoRawModel)
+            .where(*self._private_conditions(filters))
+            .order_by(ProductoRawModel.codigo)
+            .execution_options(yield_per=batch_size)
+        )
+        # The stream holds a bc3 connection until it is closed, so exports
+        # are capped separately; only opening the cursor is admitted, as a
+        # long download must not count as a slow query against the bc3 limit
+        export_limit = get_export_limit()
+        export_limit.acquire()
+        try:
+            with get_admission_controller().admit("bc3"):
+                models = self.session.scalars(stmt)
+        except BaseException:
+            export_limit.release()
+            raise
+        return _ExportStream(models, export_limit)
+
+    def _change_horizon(self) -> int | None:
+        """Oldest running transaction; older changes are final (None: no limit)."""
+        if self.session.get_bind().dialect.name != "postgresql":
+            return None
+        return self.session.scalar(CHANGE_HORIZON)
+
+    @replica_read
+    def get_private_changes(
+        self, since: tuple[int, int] | None, limit: int
+    ) -> tuple[list[ProductoEntity], list[str], tuple[int, int], bool]:
+        """
+        Read product changes logged after the ``since`` watermark.
+
+        The watermark is the ``(txid, change_id)`` of the last change a client
+        has seen. Only changes of transactions older than every running
+        transaction are returned, so nothing can later appear behind it.
+        Several changes of one product in the page collapse into its latest
+        state; an upsert whose row is gone again is reported as deleted.
+
+        Args:
+            since: Watermark, or None for the current position (no changes)
+            limit: Maximum log rows read
+
+        Returns:
+            (upserted products, deleted codes, next watermark, more pending)
+        """
+        position = tuple_(ProductoChangeModel.txid, ProductoChangeModel.change_id)
+        with get_admission_controller().admit("bc3"):
+            horizon = self._change_horizon()
+            final = [] if horizon is None else [ProductoChangeModel.txid < horizon]
+            if since is None:
+                latest = self.session.execute(
+                    select(ProductoChangeModel.txid, ProductoChangeModel.change_id)
+                    .where(*final)
+                    .order_by(desc(ProductoChangeModel.txid), desc(ProductoChangeModel.change_id))
+                    .limit(1)
+                ).first()
+                return [], [], (latest[0], latest[1]) if latest else (0, 0), False
+
+            rows = self.session.execute(
+                select(
+                    ProductoChangeModel.txid,
+                    ProductoChangeModel.change_id,
+                    ProductoChangeModel.codigo,
+                    ProductoChangeModel.operation,
+                )
+                .where(position > tuple_(*since), *final)
+                .order_by(ProductoChangeModel.txid, ProductoChangeModel.change_id)
+                .limit(limit + 1)
+            ).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            # Latest operation per product, in the order of that change
+            operations: dict[str, str] = {}
+            for row in rows:
+                operations.pop(row.codigo, None)
+                operations[row.codigo] = row.operation
+            upserted = [codigo for codigo, operation in operations.items() if operation == "upsert"]
+            models = (
+                self.session.scalars(
+                    select(ProductoRawModel).where(ProductoRawModel.codigo.in_(upserted))
+                ).all()
+                if upserted
+                else []
+            )
+
+        current = {model.codigo: model for model in models}
+        upserts = [current[codigo].to_entity() for codigo in upserted if codigo in current]
+        deletes = [codigo for codigo in operations if codigo not in current]
+        next_since = (rows[-1].txid, rows[-1].change_id) if rows else since
+        return upserts, deletes, next_since, has_more
+
+    @replica_read
+    def get_by_codigos(self, codigos: list[str], cached: bool = False) -> dict[str, ProductoEntity]:
+        """
+        Read several public products by code (bulk lookup).
+
+        Args:
+            codigos: Product codes
+            cached: Serve from and fill the product cache
+
+        Returns:
+            Found products by code; missing codes are absent
+        """
+        return self._get_many(ProductoModel, "product", "productos", codigos, cached)
+
+    def get_private_by_codigos(
+        self, codigos: list[str], cached: bool = False
+    ) -> dict[str, ProductoEntity]:
         """Read the requested BC3 products without mutating the session."""
+        return self._get_many(ProductoRawModel, "product_bc3", "bc3", codigos, cached)
+
+    def _get_many(
+        self,
+        model_class: Any,
+        cache_type: str,
+        traffic_class: str,
+        codigos: list[str],
+        cached: bool,
+    ) -> dict[str, ProductoEntity]:
+        """Cache multi-get, then one ``IN`` query per chunk for the remaining codes."""
+        codigos = list(dict.fromkeys(codigos))
         if not codigos:
             return {}
-        models = (
-            self.session.query(ProductoRawModel).filter(ProductoRawModel.codigo.in_(codigos)).all()
-        )
-        return {model.codigo: model.to_entity() for model in models}
+
+        found: dict[str, ProductoEntity] = {}
+        cache = get_cache_manager()
+        keys: dict[str, str] = {}
+        ttl = cache.get_ttl(cache_type)
+        if cached:
+            # Entries of an older catalogue version are never read again, so a
+            # write made through another worker shows up within the version TTL.
+            # Without migration 08 they only live for the short BC3 product TTL.
+            version = get_catalogue_version().current()
+            if version is None:
+                keys = {codigo: cache.generate_key(cache_type, codigo) for codigo in codigos}
+                ttl = min(ttl, cache.get_ttl("product_bc3"))
+            else:
+                keys = {
+                    codigo: cache.generate_key(cache_type, codigo, version=version.number)
+                    for codigo in codigos
+                }
+            hits = cache.get_many(list(keys.values()))
+            for codigo, key in keys.items():
+                if key in hits:
+                    found[codigo] = ProductoEntity(**hits[key])
+
+        pending = [codigo for codigo in codigos if codigo not in found]
+        loaded: dict[str, ProductoEntity] = {}
+        with get_admission_controller().admit(traffic_class):
+            for start in range(0, len(pending), BULK_LOOKUP_CHUNK):
+                chunk = pending[start : start + BULK_LOOKUP_CHUNK]
+                for model in self.session.scalars(
+                    select(model_class).where(model_class.codigo.in_(chunk))
+                ):
+                    loaded[model.codigo] = model.to_entity()
+
+        if cached and loaded:
+            cache.set_many(
+                {keys[codigo]: entity.model_dump(mode="json") for codigo, entity in loaded.items()},
+                ttl,
+            )
+        found.update(loaded)
+        return found
+
+    def _forget_cached_products(self, codigos: list[str]) -> None:
+        """Drop the unversioned bulk-lookup cache entries of written products."""
+        cache = get_cache_manager()
+        for codigo in codigos:
+            cache.delete(cache.generate_key("product", codigo))
+            cache.delete(cache.generate_key("product_bc3", codigo))
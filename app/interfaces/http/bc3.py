@@ -4,14 +4,17 @@ FastAPI router with dependency injection for BC3 endpoints.
 Uses existing ProductoService since BC3 data is in ProductoEntity.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from app.domain.exceptions.not_found import ProductoNotFoundException
+from app.domain.exceptions.overload import ServiceOverloadedException
 from app.domain.services.producto import ProductoService
 from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
-from app.infrastructure.database.connection import SessionLocal
-from app.application.dto.producto import ProductoSearchDTO
+from app.interfaces.http.conditional import catalogue_etag
+from app.interfaces.http.surrogate import surrogate_keys
+from app.interfaces.http.traffic import get_partitioned_session
+from app.application.dto.producto import MAX_SEARCH_TERM_LENGTH, ProductoSearchDTO
 from app.application.dto.pagination import (
     PaginationRequestDTO,
 )
@@ -24,13 +27,9 @@ router = APIRouter(prefix="/bc3", tags=["bc3"])
 # ============================================
 
 
-def get_db_session() -> Session:
-    """DI function to get database session."""
-    session = SessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
+def get_db_session(request: Request) -> Session:
+    """DI function to get a session from the request's pool partition."""
+    yield from get_partitioned_session(request)
 
 
 def get_producto_service(session: Session = Depends(get_db_session)) -> ProductoService:
@@ -52,7 +51,7 @@ async def buscar_bc3_paginado(
         None,
         description="Criterio de ordenamiento (ej: codigo:asc, bc3_product_type:desc)",
     ),
-    buscar: str = Query(None, description="Término de búsqueda"),
+    buscar: str = Query(None, max_length=MAX_SEARCH_TERM_LENGTH, description="Término de búsqueda"),
     bc3_product_type: str = Query(
         None, description="Filtrar por tipo de producto BC3 (columna/articulacion)"
     ),
@@ -146,13 +145,17 @@ async def buscar_bc3_paginado(
         }
 
         return response_dict
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error en búsqueda BC3 paginada: {str(e)}"
         ) from None
 
 
-@router.get("/v2/stats")
+@router.get(
+    "/v2/stats", dependencies=[Depends(surrogate_keys("catalogue")), Depends(catalogue_etag)]
+)
 async def get_bc3_stats_v2(
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
@@ -202,7 +205,7 @@ async def get_bc3_stats_v2(
 # ============================================
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[Depends(surrogate_keys("catalogue")), Depends(catalogue_etag)])
 async def get_bc3_stats(
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
@@ -0,0 +1,235 @@
+"""Brotli/gzip response compression with precompressed catalogue bodies.
+
+:class:`CompressionMiddleware` negotiates ``Accept-Encoding`` (Brotli when
+the optional ``brotli`` package is installed, then gzip) for JSON, NDJSON and
+text responses of at least ``HTTP_COMPRESSION_MIN_SIZE`` bytes:
+
+- Responses with a strong ``ETag`` (catalogue endpoints with
+  ``HTTP_ETAGS_ENABLED``) are compressed once, at maximum effort, and the
+  encoded body is kept in :mod:`app.infrastructure.cache.compressed_bodies`;
+  later responses with the same ETag ship the stored bytes.
+- Other buffered responses are compressed per request at a moderate level,
+  off the event loop.
+- Streaming responses (the BC3 export) are compressed chunk by chunk.
+
+Compressed responses carry a weak ETag (``W/"..."``), which still matches
+``If-None-Match`` (compared weakly), and every compressible response varies
+on ``Accept-Encoding``.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.infrastructure.cache.compressed_bodies import (
+    CompressedBodyCache,
+    get_compressed_body_cache,
+)
+
+try:
+    import brotli
+except ModuleNotFoundError:  # Optional dependency; only gzip is negotiated.
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Server preference order
+AVAILABLE_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# (cached once per ETag, per request / streamed)
+GZIP_LEVELS = (9, 6)
+BROTLI_QUALITIES = (11, 5)
+
+
+def negotiate_encoding(accept_encoding: str, available=AVAILABLE_ENCODINGS) -> Optional[str]:
+    """
+    Pick the content coding for an ``Accept-Encoding`` header.
+
+    Returns:
+        The acceptable coding with the highest q-value (server order breaks
+        ties), or None for identity
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Encode ``body``; ``cached`` bodies get the slower, denser settings."""
+    index = 0 if cached else 1
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITIES[index])
+    compressor = zlib.compressobj(GZIP_LEVELS[index], zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Incremental encoder; every chunk is flushed so the stream keeps moving."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITIES[1])
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVELS[1], zlib.DEFLATED, 31)
+
+    def chunk(self, body: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(body) + self._brotli.flush()
+        return self._zlib.compress(body) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI response compression.
+
+    Args:
+        app: Downstream ASGI application
+        minimum_size: Smaller buffered bodies are sent as they are
+        cache: Store of encoded bodies by ETag (defaults to the global one)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        cache: Optional[CompressedBodyCache] = None,
+    ):
+        self.app = app
+        settings = get_settings()
+        self.minimum_size = (
+            settings.http_compression_min_size if minimum_size is None else minimum_size
+        )
+        self.cache = get_compressed_body_cache() if cache is None else cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.cache)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """``send`` wrapper that holds the response start until the body is known."""
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: Optional[str],
+        minimum_size: int,
+        cache: CompressedBodyCache,
+    ):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.start: Optional[Message] = None
+        self.headers: Optional[MutableHeaders] = None
+        self.passthrough = False
+        self.stream: Optional[_StreamCompressor] = None
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+        elif message["type"] == "http.response.start":
+            await self._on_start(message)
+        elif message["type"] == "http.response.body":
+            if self.stream is not None:
+                await self._on_stream_body(message)
+            else:
+                await self._on_first_body(message)
+        else:
+            await self.send(message)
+
+    async def _on_start(self, message: Message) -> None:
+        headers = MutableHeaders(raw=list(message.get("headers", ())))
+        content_type = headers.get("content-type", "")
+        if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+            self.passthrough = True
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        message = {**message, "headers": headers.raw}
+        if self.encoding is None:
+            self.passthrough = True
+            await self.send(message)
+            return
+        self.start, self.headers = message, headers
+
+    def _mark_encoded(self) -> None:
+        self.headers["content-encoding"] = self.encoding
+        etag = self.headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            self.headers["etag"] = f"W/{etag}"
+
+    async def _on_first_body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            self.stream = _StreamCompressor(self.encoding)
+            del self.headers["content-length"]
+            self._mark_encoded()
+            await self.send(self.start)
+            await self._on_stream_body(message)
+            return
+
+        if len(body) < self.minimum_size:
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        encoded = await self._encode(body)
+        self.headers["content-length"] = str(len(encoded))
+        self._mark_encoded()
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": encoded})
+
+    async def _encode(self, body: bytes) -> bytes:
+        etag = self.headers.get("etag")
+        if not etag or etag.startswith("W/") or self.cache.max_bytes <= 0:
+            return await run_in_threadpool(compress, body, self.encoding)
+
+        encoded = self.cache.get(etag, body, self.encoding)
+        if encoded is None:
+            encoded = await run_in_threadpool(compress, body, self.encoding, True)
+            self.cache.put(etag, body, self.encoding, encoded)
+        return encoded
+
+    async def _on_stream_body(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        body = self.stream.chunk(message.get("body", b""))
+        if not more_body:
+            body += self.stream.finish()
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
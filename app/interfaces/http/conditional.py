@@ -0,0 +1,86 @@
+"""Conditional GET (ETag / Last-Modified) for catalogue endpoints.
+
+Routes whose body depends only on the catalogue and the request URL declare
+``dependencies=[Depends(catalogue_etag)]``. The strong ETag combines the
+catalogue version with a fingerprint of the path and query string, so it
+changes whenever any catalogue write commits. The dependency runs before the
+endpoint: a matching ``If-None-Match`` (or, without it, a recent enough
+``If-Modified-Since``) answers 304 without calling the service.
+"""
+
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.infrastructure.database.catalogue_version import Version, get_catalogue_version
+
+
+class NotModifiedException(Exception):
+    """The client's cached representation is current (answered with 304)."""
+
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+        super().__init__("Not Modified")
+
+
+def compute_etag(version: Version, request: Request) -> str:
+    """Strong ETag of ``request`` at catalogue ``version``."""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+    return f'"{version.number}-{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, as RFC 9110 requires for GET)."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified <= since
+
+
+def catalogue_etag(request: Request, response: Response) -> None:
+    """
+    Route dependency: validators on the response, 304 before the endpoint runs.
+
+    Disabled (``HTTP_ETAGS_ENABLED=false``) or without a readable catalogue
+    version, requests are served normally without validators.
+
+    Raises:
+        NotModifiedException: When the client's copy is current
+    """
+    if not get_settings().http_etags_enabled:
+        return
+    version = get_catalogue_version().current()
+    if version is None:
+        return
+
+    # HTTP dates have second precision
+    last_modified = version.updated_at.replace(microsecond=0)
+    etag = compute_etag(version, request)
+    headers = {"ETag": etag, "Last-Modified": format_datetime(last_modified, usegmt=True)}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since) and _not_modified_since(
+            if_modified_since, last_modified
+        )
+    if not_modified:
+        # Keep headers set by earlier dependencies (Cache-Control, Surrogate-Key)
+        raise NotModifiedException({**response.headers, **headers})
+    response.headers.update(headers)
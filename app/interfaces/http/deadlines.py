@@ -0,0 +1,60 @@
+"""Query deadlines and client-disconnect cancellation for HTTP endpoints.
+
+Search endpoints run their repository call in the threadpool through
+``run_cancellable`` while the event loop watches the ASGI connection. If the
+client goes away first, the running PostgreSQL statement is cancelled
+instead of finishing a scan nobody will read.
+"""
+
+import asyncio
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.infrastructure.database.deadlines import cancel_running_query
+
+T = TypeVar("T")
+
+
+def search_query_budget(request: Request) -> None:
+    """Route dependency: search endpoints get the shorter search budget."""
+    request.state.query_budget = get_settings().db_search_query_budget
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the ASGI server reports that the client disconnected."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_cancellable(request: Request, fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run blocking repository work, cancelling its query if the client disconnects.
+
+    Args:
+        request: Current request (its ``state.db_session`` is cancelled)
+        fn: Blocking callable, typically a service method
+        *args: Positional arguments for ``fn``
+
+    Returns:
+        The result of ``fn``
+
+    Raises:
+        QueryTimeoutException: If the query was cancelled (deadline or disconnect)
+    """
+    work = asyncio.ensure_future(run_in_threadpool(fn, *args))
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if not work.done():
+            session = getattr(request.state, "db_session", None)
+            if session is not None:
+                cancel_running_query(session)
+        return await work
+    finally:
+        watcher.cancel()
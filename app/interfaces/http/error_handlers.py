@@ -9,8 +9,10 @@ from typing import Any
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import HTTPException, RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+from app.domain.exceptions.overload import QueryTimeoutException, ServiceOverloadedException
+from app.interfaces.http.conditional import NotModifiedException
 from app.interfaces.http.exceptions import (
     APIException,
     BadRequestException,
@@ -114,6 +116,55 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     return JSONResponse(status_code=exc.status_code, content=error_response)
 
 
+async def service_overloaded_exception_handler(
+    request: Request, exc: ServiceOverloadedException
+) -> JSONResponse:
+    """
+    Handle requests rejected by database admission control.
+
+    Args:
+        request: FastAPI request object
+        exc: Admission control rejection
+
+    Returns:
+        JSONResponse 503 with Retry-After so clients back off.
+    """
+    logger.warning(
+        f"Load shed: {exc.endpoint_class} admission limit reached",
+        extra={
+            "path": request.url.path,
+            "method": request.method,
+            "endpoint_class": exc.endpoint_class,
+        },
+    )
+
+    error_response: dict[str, Any] = {
+        "error": str(exc),
+        "error_code": "SERVICE_UNAVAILABLE",
+        "status_code": 503,
+        "path": request.url.path,
+        "method": request.method,
+        "timestamp": datetime_utc_now(),
+        "details": {"endpoint_class": exc.endpoint_class, "retry_after": exc.retry_after},
+    }
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=error_response,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def not_modified_exception_handler(request: Request, exc: NotModifiedException) -> Response:
+    """
+    Answer a conditional GET whose cached copy is still current.
+
+    Returns:
+        Empty 304 response carrying the current validators.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
+
+
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
 ) -> JSONResponse:
@@ -223,6 +274,46 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
     return JSONResponse(status_code=wrapped_exc.status_code, content=error_response)
 
 
+async def query_timeout_exception_handler(
+    request: Request, exc: QueryTimeoutException
+) -> JSONResponse:
+    """
+    Handle queries cancelled for exceeding the request deadline.
+
+    Args:
+        request: FastAPI request object
+        exc: Query deadline expiry
+
+    Returns:
+        JSONResponse 504 with Retry-After.
+    """
+    logger.warning(
+        f"Query deadline exceeded: {exc.endpoint_class}",
+        extra={
+            "path": request.url.path,
+            "method": request.method,
+            "endpoint_class": exc.endpoint_class,
+            "budget": exc.budget,
+        },
+    )
+
+    error_response: dict[str, Any] = {
+        "error": str(exc),
+        "error_code": "GATEWAY_TIMEOUT",
+        "status_code": 504,
+        "path": request.url.path,
+        "method": request.method,
+        "timestamp": datetime_utc_now(),
+        "details": {"endpoint_class": exc.endpoint_class, "budget": exc.budget},
+    }
+
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content=error_response,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 def register_exception_handlers(app: FastAPI) -> None:
     """
     Register all exception handlers with FastAPI application.
@@ -236,6 +327,21 @@ def register_exception_handlers(app: FastAPI) -> None:
     # Register FastAPI HTTP exception handler
     app.add_exception_handler(HTTPException, http_exception_handler)  # type: ignore[arg-type]
 
+    # Register admission control (load shedding) handler
+    app.add_exception_handler(
+        ServiceOverloadedException, service_overloaded_exception_handler
+    )  # type: ignore[arg-type]
+
+    # Register query deadline handler (more specific than the overload one)
+    app.add_exception_handler(
+        QueryTimeoutException, query_timeout_exception_handler
+    )  # type: ignore[arg-type]
+
+    # Register conditional GET short-circuit (304 Not Modified)
+    app.add_exception_handler(
+        NotModifiedException, not_modified_exception_handler
+    )  # type: ignore[arg-type]
+
     # Register request validation exception handler
     app.add_exception_handler(
         RequestValidationError, validation_exception_handler
@@ -0,0 +1,57 @@
+"""Streaming encoders for the BC3 catalogue export.
+
+Both encoders consume an entity iterator (a server-side cursor walk) and yield
+text chunks of ``chunk_rows`` rows each, so the response is written while the
+database is still being read and only one chunk is held in memory.
+"""
+
+import csv
+import io
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from app.application.dto.producto import ProductoBC3Response
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# CSV header: every field of the BC3 contract, in declaration order
+CSV_COLUMNS = tuple(ProductoBC3Response.model_fields)
+
+
+def _bc3_item(entity: Any) -> ProductoBC3Response:
+    return ProductoBC3Response.model_validate(entity.model_dump())
+
+
+def iter_ndjson(entities: Iterable[Any], chunk_rows: int = 500) -> Iterator[str]:
+    """One JSON object per line, in the same shape as ``/bc3/v1`` items."""
+    lines: list[str] = []
+    for entity in entities:
+        lines.append(_bc3_item(entity).model_dump_json(exclude_none=True))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv(entities: Iterable[Any], chunk_rows: int = 500) -> Iterator[str]:
+    """Header row plus one row per product; missing values are empty cells."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    rows = 0
+    for entity in entities:
+        item = _bc3_item(entity).model_dump(mode="json")
+        writer.writerow(["" if item[column] is None else item[column] for column in CSV_COLUMNS])
+        rows += 1
+        if rows >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    # An empty export still carries its header
+    if buffer.tell():
+        yield buffer.getvalue()
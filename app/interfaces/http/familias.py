@@ -3,13 +3,16 @@
 FastAPI router with dependency injection for families endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List
 from sqlalchemy.orm import Session
 
+from app.domain.exceptions.overload import ServiceOverloadedException
 from app.domain.services.familia import FamiliaService
 from app.infrastructure.repositories.familia import SQLAlchemyFamiliaRepository
-from app.infrastructure.database.connection import SessionLocal
+from app.interfaces.http.conditional import catalogue_etag
+from app.interfaces.http.surrogate import surrogate_keys
+from app.interfaces.http.traffic import get_partitioned_session
 from app.application.dto.pagination import (
     PaginationRequestDTO,
 )
@@ -24,13 +27,9 @@ router = APIRouter(prefix="/familias", tags=["familias"])
 # ============================================
 
 
-def get_db_session() -> Session:
-    """DI function to get database session."""
-    session = SessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
+def get_db_session(request: Request) -> Session:
+    """DI function to get a session from the request's pool partition."""
+    yield from get_partitioned_session(request)
 
 
 def get_familia_service(session: Session = Depends(get_db_session)) -> FamiliaService:
@@ -83,6 +82,8 @@ async def buscar_familias_paginado(
         )
 
         return response_dict
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error en búsqueda paginada: {str(e)}"
@@ -117,7 +118,7 @@ async def get_top_bc3_coverage_v2(
 # ============================================
 
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(surrogate_keys("familias")), Depends(catalogue_etag)])
 async def get_familias(
     limit: int = Query(50, ge=1, le=500, description="Maximum number of families"),
     service: FamiliaService = Depends(get_familia_service),
@@ -135,7 +136,7 @@ async def get_familias(
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}") from None
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[Depends(surrogate_keys("familias")), Depends(catalogue_etag)])
 async def get_familias_stats(
     service: FamiliaService = Depends(get_familia_service),
 ) -> dict:
@@ -152,7 +153,7 @@ async def get_familias_stats(
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}") from None
 
 
-@router.get("/top-bc3")
+@router.get("/top-bc3", dependencies=[Depends(surrogate_keys("familias")), Depends(catalogue_etag)])
 async def get_top_bc3_coverage(
     limit: int = Query(5, ge=1, le=10, description="Number of top families"),
     service: FamiliaService = Depends(get_familia_service),
@@ -176,7 +177,10 @@ async def get_top_bc3_coverage(
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}") from None
 
 
-@router.get("/{nombre}")
+@router.get(
+    "/{nombre}",
+    dependencies=[Depends(surrogate_keys("familias", "familia:{nombre}")), Depends(catalogue_etag)],
+)
 async def get_familia_by_nombre(
     nombre: str,
     service: FamiliaService = Depends(get_familia_service),
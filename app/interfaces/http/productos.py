@@ -3,15 +3,25 @@
 FastAPI router with dependency injection for product endpoints.
 """
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
-from typing import Any, List, Optional
-from pydantic import BaseModel
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.domain.services.producto import ProductoService
+from app.infrastructure.cache.suggest_index import get_suggest_index
 from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
-from app.infrastructure.database.connection import SessionLocal
+from app.interfaces.http.conditional import catalogue_etag
+from app.interfaces.http.deadlines import run_cancellable, search_query_budget
+from app.interfaces.http.export import EXPORT_MEDIA_TYPES, iter_csv, iter_ndjson
+from app.interfaces.http.surrogate import surrogate_keys
+from app.interfaces.http.traffic import (
+    get_partitioned_session,
+    pin_traffic_class,
+    traffic_class,
+)
 from app.application.dto.bc3_enrichment import (
     BC3EnrichmentApplyRequest,
     BC3EnrichmentApplyResponse,
@@ -23,16 +33,23 @@ from app.application.dto.pagination import (
     PaginationRequestDTO,
 )
 from app.application.dto.producto import (
+    FACET_FIELDS,
+    MAX_SEARCH_TERM_LENGTH,
+    ProductoBC3Bulk,
+    ProductoBC3Changes,
     ProductoBC3Page,
     ProductoBC3Response,
+    ProductoBulkLookupRequest,
+    ProductoExternalBulk,
     ProductoExternalPage,
     ProductoExternalResponse,
+    ProductoSuggestions,
 )
-from app.domain.exceptions.not_found import ProductoNotFoundException
+from app.domain.exceptions.not_found import ProductoNotFoundException, ValidationException
+from app.domain.exceptions.overload import ServiceOverloadedException
 from app.interfaces.http.response_serializers import ProductoResponseSerializer
 from app.config import get_settings
 
-
 _bc3_api_key = APIKeyHeader(
     name=get_settings().api_key_header,
     description="API key for private BC3 access",
@@ -40,10 +57,14 @@ _bc3_api_key = APIKeyHeader(
 )
 
 
-async def verify_bc3_api_key(api_key: Optional[str] = Depends(_bc3_api_key)) -> str:
+async def verify_bc3_api_key(
+    request: Request, api_key: Optional[str] = Depends(_bc3_api_key)
+) -> str:
     """Validate the private BC3 credential without exposing its value."""
     if api_key is None or api_key not in get_settings().bc3_api_keys_list:
         raise HTTPException(status_code=401, detail="API Key inválida")
+    # BC3-Suite calls get their own pool partition, isolated from public scraping
+    pin_traffic_class(request, "bc3")
     return api_key
 
 
@@ -58,7 +79,7 @@ class BuscarProductosRequest(BaseModel):
     Compatible with BC3-Suite frontend JSON payload.
     """
 
-    termino: Optional[str] = None
+    termino: Optional[str] = Field(None, max_length=MAX_SEARCH_TERM_LENGTH)
     limit: int = 20
     marca: Optional[str] = None
     familia: Optional[str] = None
@@ -70,6 +91,22 @@ class BuscarProductosRequest(BaseModel):
         extra = "forbid"  # Reject unexpected fields
 
 
+MAX_BUSCAR_PRODUCTOS_LOTE = 50
+
+
+class BuscarProductosLoteRequest(BaseModel):
+    """Request model for POST /buscar-productos/lote (several searches at once)."""
+
+    consultas: List[BuscarProductosRequest] = Field(
+        ..., min_length=1, max_length=MAX_BUSCAR_PRODUCTOS_LOTE
+    )
+
+    class Config:
+        """Configure request validation."""
+
+        extra = "forbid"  # Reject unexpected fields
+
+
 router = APIRouter(prefix="/productos", tags=["productos"])
 
 
@@ -78,13 +115,9 @@ router = APIRouter(prefix="/productos", tags=["productos"])
 # ============================================
 
 
-def get_db_session() -> Session:
-    """DI function to get database session."""
-    session = SessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
+def get_db_session(request: Request) -> Session:
+    """DI function to get a session from the request's pool partition."""
+    yield from get_partitioned_session(request)
 
 
 def get_producto_service(session: Session = Depends(get_db_session)) -> ProductoService:
@@ -98,6 +131,16 @@ def _contract_item(entity: Any) -> dict:
     return ProductoExternalResponse.model_validate(data).model_dump(exclude_none=True)
 
 
+# ``?facets=marca,familia``: comma-separated FACET_FIELDS
+FACETS_PATTERN = rf"^({'|'.join(FACET_FIELDS)})(,({'|'.join(FACET_FIELDS)}))*$"
+FACETS_DESCRIPTION = f"Facetas a contar, separadas por comas: {', '.join(FACET_FIELDS)}"
+
+
+def _facet_fields(facets: Optional[str]) -> list[str]:
+    """Requested facet fields, without duplicates."""
+    return list(dict.fromkeys(facets.split(","))) if facets else []
+
+
 def _public_filters(buscar: Optional[str], marca: Optional[str], familia: Optional[str]) -> dict:
     return {
         key: value
@@ -116,9 +159,10 @@ def _public_filters(buscar: Optional[str], marca: Optional[str], familia: Option
 
 
 # POST ENDPOINT FOR FRONTEND COMPATIBILITY
-@router.post("/buscar-productos")
+@router.post("/buscar-productos", dependencies=[Depends(search_query_budget)])
 async def buscar_productos_post(
     request: BuscarProductosRequest,
+    http_request: Request,
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
     """
@@ -137,42 +181,16 @@ async def buscar_productos_post(
     - Uses: ProductoResponseSerializer.serialize_paginated_response()
     """
     try:
-        # Map frontend parameters → backend V2 format
-        filters = {}
-        if request.termino:
-            filters["buscar"] = request.termino
-        if request.marca:
-            filters["marca"] = request.marca
-        if request.familia:
-            filters["familia"] = request.familia
-        if request.con_bc3:
-            # Filter by BC3 product types
-            filters["bc3_product_type"] = "luminaria"
-
-        # Build pagination DTO (always page 1 for frontend search)
-        pagination_dto = PaginationRequestDTO(
-            page=1,
-            per_page=min(request.limit, 100),  # Cap at 100
-        )
+        pagination_dto, filters = _frontend_search(request)
 
         # Call service with pagination and filters
-        paginated_response = service.buscar_productos_paginado(pagination_dto, filters)
-
-        # Serialize response using ProductoResponseSerializer
-        response_dict = ProductoResponseSerializer.serialize_paginated_response(
-            paginated_response, "producto"
+        paginated_response = await run_cancellable(
+            http_request, service.buscar_productos_paginado, pagination_dto, filters
         )
+        return _frontend_results(paginated_response)
 
-        # Map backend response → frontend-expected format
-        frontend_response = {
-            "status": "success",
-            "resultados": response_dict.get("items", []),
-            "count": len(response_dict.get("items", [])),
-            "total": response_dict.get("total", 0),
-        }
-
-        return frontend_response
-
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         # Return error in frontend-expected format
         return {
@@ -184,46 +202,149 @@ async def buscar_productos_post(
         }
 
 
+@router.post("/buscar-productos/lote", dependencies=[Depends(search_query_budget)])
+async def buscar_productos_lote(
+    request: BuscarProductosLoteRequest,
+    http_request: Request,
+    service: ProductoService = Depends(get_producto_service),
+) -> dict:
+    """
+    Several /buscar-productos searches in one request (one per BC3 line).
+
+    Identical searches run once, and all of them share one session and
+    connection, so the batch pays middleware and session setup a single time.
+
+    **Frontend Compatibility**:
+    - Accepts: {"consultas": [{"termino": "toledo", "limit": 20}, ...]}
+    - Returns: {"status": "success", "resultados": [{"status": "success",
+      "resultados": [...], "count": N, "total": M}, ...]} in request order
+    """
+    try:
+        queries = [_frontend_search(consulta) for consulta in request.consultas]
+        pages = await run_cancellable(http_request, service.buscar_productos_paginado_lote, queries)
+        return {"status": "success", "resultados": [_frontend_results(page) for page in pages]}
+
+    except ServiceOverloadedException:
+        raise
+    except Exception as e:
+        return {"status": "error", "resultados": [], "error": str(e)}
+
+
+def _frontend_search(request: BuscarProductosRequest) -> tuple[PaginationRequestDTO, dict]:
+    """Map frontend search parameters to the backend V2 pagination and filters."""
+    filters = {}
+    if request.termino:
+        filters["buscar"] = request.termino
+    if request.marca:
+        filters["marca"] = request.marca
+    if request.familia:
+        filters["familia"] = request.familia
+    if request.con_bc3:
+        # Filter by BC3 product types
+        filters["bc3_product_type"] = "luminaria"
+
+    # Build pagination DTO (always page 1 for frontend search)
+    pagination_dto = PaginationRequestDTO(
+        page=1,
+        per_page=min(request.limit, 100),  # Cap at 100
+    )
+    return pagination_dto, filters
+
+
+def _frontend_results(paginated_response: Any) -> dict:
+    """Map a backend page to the frontend-expected search response."""
+    # Serialize response using ProductoResponseSerializer
+    response_dict = ProductoResponseSerializer.serialize_paginated_response(
+        paginated_response, "producto"
+    )
+    return {
+        "status": "success",
+        "resultados": response_dict.get("items", []),
+        "count": len(response_dict.get("items", [])),
+        "total": response_dict.get("total", 0),
+    }
+
+
 async def _list_public_contract(
+    request: Request,
     service: ProductoService,
     page: int,
     per_page: int,
     buscar: Optional[str],
     marca: Optional[str],
     familia: Optional[str],
+    facets: Optional[str] = None,
 ) -> dict:
     filters = _public_filters(buscar, marca, familia)
-    response = service.buscar_productos_paginado(
-        PaginationRequestDTO(page=page, per_page=per_page, sort=None), filters
+    response = await run_cancellable(
+        request,
+        service.buscar_productos_paginado,
+        PaginationRequestDTO(page=page, per_page=per_page, sort=None),
+        filters,
+        _facet_fields(facets),
     )
     return {
         "items": [_contract_item(item) for item in response.items],
         "pagination": response.pagination.model_dump(),
         "filters_applied": filters,
         "sorting_applied": response.sorting_applied,
+        "facets": response.facets,
     }
 
 
 @router.get(
     "/v1",
     response_model=ProductoExternalPage,
+    dependencies=[
+        Depends(surrogate_keys("catalogue")),
+        Depends(catalogue_etag),
+        Depends(search_query_budget),
+    ],
     summary="List public products (v1)",
 )
 async def list_products_v1(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    buscar: Optional[str] = None,
+    buscar: Optional[str] = Query(None, max_length=MAX_SEARCH_TERM_LENGTH),
     marca: Optional[str] = None,
     familia: Optional[str] = None,
+    facets: Optional[str] = Query(None, pattern=FACETS_PATTERN, description=FACETS_DESCRIPTION),
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
     """Return the stable external product contract."""
-    return await _list_public_contract(service, page, per_page, buscar, marca, familia)
+    return await _list_public_contract(
+        request, service, page, per_page, buscar, marca, familia, facets
+    )
+
+
+@router.get(
+    "/v1/suggest",
+    response_model=ProductoSuggestions,
+    summary="Typeahead suggestions for a product prefix",
+)
+def suggest_products_v1(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto tecleado"),
+    limit: int = Query(10, ge=1, le=50),
+) -> dict:
+    """
+    Products whose codigo, referencia or a description word starts with ``q``.
+
+    Answered from an in-memory prefix index, without querying the database.
+    """
+    suggestions = get_suggest_index().get().suggest(q, limit)
+    return {
+        "query": q,
+        "suggestions": [
+            {**suggestion._asdict(), "match": match} for suggestion, match in suggestions
+        ],
+    }
 
 
 @router.get(
     "/v1/{codigo}",
     response_model=ProductoExternalResponse,
+    dependencies=[Depends(surrogate_keys("producto:{codigo}")), Depends(catalogue_etag)],
     summary="Get one public product",
 )
 async def get_product_v1(
@@ -236,24 +357,43 @@ async def get_product_v1(
         raise HTTPException(status_code=404, detail=str(exc)) from None
 
 
+@router.post(
+    "/v1/lookup",
+    response_model=ProductoExternalBulk,
+    summary="Look up many public products by code",
+)
+async def lookup_products_v1(
+    request: Request,
+    lookup: ProductoBulkLookupRequest,
+    service: ProductoService = Depends(get_producto_service),
+) -> dict:
+    """Return the requested products (request order) and the codes not found."""
+    found, missing = await run_cancellable(request, service.obtener_productos, lookup.codigos)
+    return {"items": [_contract_item(item) for item in found], "missing_codes": missing}
+
+
 @router.get(
     "/bc3/v1",
     response_model=ProductoBC3Page,
-    dependencies=[Depends(verify_bc3_api_key)],
+    dependencies=[Depends(verify_bc3_api_key), Depends(search_query_budget)],
     summary="List products for BC3",
 )
 async def list_products_bc3_v1(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    buscar: Optional[str] = None,
+    buscar: Optional[str] = Query(None, max_length=MAX_SEARCH_TERM_LENGTH),
     marca: Optional[str] = None,
     familia: Optional[str] = None,
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
     """Return the private BC3 product contract."""
     filters = _public_filters(buscar, marca, familia)
-    response = service.buscar_productos_privado(
-        PaginationRequestDTO(page=page, per_page=per_page, sort=None), filters
+    response = await run_cancellable(
+        request,
+        service.buscar_productos_privado,
+        PaginationRequestDTO(page=page, per_page=per_page, sort=None),
+        filters,
     )
     return {
         "items": [
@@ -266,6 +406,105 @@ async def list_products_bc3_v1(
     }
 
 
+@router.get(
+    "/bc3/v1/export",
+    dependencies=[Depends(verify_bc3_api_key)],
+    summary="Stream the whole BC3 catalogue",
+    response_class=StreamingResponse,
+)
+async def export_products_bc3_v1(
+    request: Request,
+    export_format: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="ndjson o csv"
+    ),
+    buscar: Optional[str] = Query(None, max_length=MAX_SEARCH_TERM_LENGTH),
+    marca: Optional[str] = None,
+    familia: Optional[str] = None,
+    service: ProductoService = Depends(get_producto_service),
+) -> StreamingResponse:
+    """
+    Stream every BC3 product (``ProductoBC3Response`` rows) ordered by codigo.
+
+    Replaces crawling ``/bc3/v1`` page by page: rows are read through a
+    server-side cursor and written as they arrive, in constant memory.
+    """
+    filters = _public_filters(buscar, marca, familia)
+    batch_size = get_settings().bc3_export_batch_size
+    # Opening the cursor runs here, so admission and query errors still
+    # produce a regular error response instead of a truncated body
+    entities = await run_cancellable(
+        request, service.exportar_productos_privado, filters, batch_size
+    )
+    encode = iter_csv if export_format == "csv" else iter_ndjson
+    return StreamingResponse(
+        encode(entities, chunk_rows=batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="productos-bc3.{export_format}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get(
+    "/bc3/v1/changes",
+    response_model=ProductoBC3Changes,
+    dependencies=[Depends(verify_bc3_api_key)],
+    summary="List BC3 product changes since a sync token",
+)
+async def list_product_changes_bc3_v1(
+    request: Request,
+    since: Optional[str] = Query(None, description="next_token de la respuesta anterior"),
+    limit: int = Query(500, ge=1, le=1000),
+    service: ProductoService = Depends(get_producto_service),
+) -> dict:
+    """
+    Return products upserted or deleted after ``since``, oldest first.
+
+    Keep calling with ``next_token`` while ``has_more`` is true. Without
+    ``since`` only the current token is returned (take it before a full export).
+    """
+    try:
+        changes = await run_cancellable(request, service.listar_cambios_privado, since, limit)
+    except ValidationException as exc:
+        raise HTTPException(status_code=400, detail=exc.message) from None
+    return {
+        **changes,
+        "upserts": [
+            ProductoBC3Response.model_validate(item.model_dump()).model_dump(exclude_none=True)
+            for item in changes["upserts"]
+        ],
+    }
+
+
+@router.post(
+    "/bc3/v1/lookup",
+    response_model=ProductoBC3Bulk,
+    dependencies=[Depends(verify_bc3_api_key)],
+    summary="Look up many BC3 products by code",
+)
+async def lookup_products_bc3_v1(
+    request: Request,
+    lookup: ProductoBulkLookupRequest,
+    service: ProductoService = Depends(get_producto_service),
+) -> dict:
+    """
+    Return the requested BC3 products (request order) and the codes not found.
+
+    Replaces one ``GET /bc3/v1/{codigo}`` per budget line.
+    """
+    found, missing = await run_cancellable(
+        request, service.obtener_productos_privado, lookup.codigos
+    )
+    return {
+        "items": [
+            ProductoBC3Response.model_validate(item.model_dump()).model_dump(exclude_none=True)
+            for item in found
+        ],
+        "missing_codes": missing,
+    }
+
+
 @router.get(
     "/bc3/v1/{codigo}",
     response_model=ProductoBC3Response,
@@ -300,15 +539,20 @@ async def preview_bc3_enrichment(
 @router.post(
     "/bc3/v1/enrichment/apply",
     response_model=BC3EnrichmentApplyResponse,
-    dependencies=[Depends(verify_bc3_api_key)],
+    # The write transaction runs in the admin partition so it cannot starve BC3 reads
+    dependencies=[Depends(verify_bc3_api_key), Depends(traffic_class("admin"))],
     summary="Apply BC3 enrichment changes",
 )
-async def apply_bc3_enrichment(
+def apply_bc3_enrichment(
     request: BC3EnrichmentApplyRequest,
     idempotency_key: str = Header(..., alias="Idempotency-Key", min_length=1),
     service: ProductoService = Depends(get_producto_service),
 ) -> BC3EnrichmentApplyResponse:
-    """Apply BC3 enrichment atomically with durable idempotency."""
+    """Apply BC3 enrichment atomically with durable idempotency.
+
+    A plain ``def`` route: FastAPI runs the blocking write transaction in its
+    threadpool instead of the event loop.
+    """
     try:
         return service.apply_bc3_enrichment(request, idempotency_key)
     except ValueError as exc:
@@ -353,33 +597,44 @@ async def get_bc3_enrichment_job_status(
 @router.get(
     "/v3",
     response_model=ProductoExternalPage,
+    dependencies=[
+        Depends(surrogate_keys("catalogue")),
+        Depends(catalogue_etag),
+        Depends(search_query_budget),
+    ],
     summary="List public products",
 )
 async def list_products_v3(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    buscar: Optional[str] = None,
+    buscar: Optional[str] = Query(None, max_length=MAX_SEARCH_TERM_LENGTH),
     marca: Optional[str] = None,
     familia: Optional[str] = None,
+    facets: Optional[str] = Query(None, pattern=FACETS_PATTERN, description=FACETS_DESCRIPTION),
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
     """Compatibility alias for the stable external product contract."""
-    return await _list_public_contract(service, page, per_page, buscar, marca, familia)
+    return await _list_public_contract(
+        request, service, page, per_page, buscar, marca, familia, facets
+    )
 
 
 # PAGINATED ENDPOINT FIRST (to avoid route conflict)
-@router.get("/v2/paginated")
+@router.get("/v2/paginated", dependencies=[Depends(search_query_budget)])
 async def buscar_productos_paginado(
+    request: Request,
     page: int = Query(1, ge=1, description="Número de página"),
     per_page: int = Query(20, ge=1, le=100, description="Resultados por página"),
     sort: str = Query(None, description="Criterio de ordenamiento (ej: codigo:asc, pvp:desc)"),
-    buscar: str = Query(None, description="Término de búsqueda"),
+    buscar: str = Query(None, max_length=MAX_SEARCH_TERM_LENGTH, description="Término de búsqueda"),
     marca: str = Query(None, description="Filtrar por marca"),
     familia: str = Query(None, description="Filtrar por familia"),
     pvp_min: float = Query(None, ge=0, description="Precio mínimo"),
     pvp_max: float = Query(None, ge=0, description="Precio máximo"),
     bc3_product_type: str = Query(None, description="Tipo de producto BC3"),
     bc3_has_descripcion_corta: bool = Query(None, description="Filtrar por descripción corta BC3"),
+    facets: str = Query(None, pattern=FACETS_PATTERN, description=FACETS_DESCRIPTION),
     service: ProductoService = Depends(get_producto_service),
 ) -> dict:
     """
@@ -413,8 +668,14 @@ async def buscar_productos_paginado(
         if bc3_has_descripcion_corta is not None:
             filters["bc3_has_descripcion_corta"] = bc3_has_descripcion_corta
 
-        # Call service method with pagination
-        paginated_response = service.buscar_productos_paginado(pagination_dto, filters)
+        # Call service method with pagination (and facet counts when requested)
+        paginated_response = await run_cancellable(
+            request,
+            service.buscar_productos_paginado,
+            pagination_dto,
+            filters,
+            _facet_fields(facets),
+        )
 
         # Serialize response using ProductoResponseSerializer
         response_dict = ProductoResponseSerializer.serialize_paginated_response(
@@ -422,6 +683,8 @@ async def buscar_productos_paginado(
         )
 
         return response_dict
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error en búsqueda paginada: {str(e)}"
@@ -429,12 +692,13 @@ async def buscar_productos_paginado(
 
 
 # V2 LIST ENDPOINT (Backward compatibility with tests)
-@router.get("/v2/list")
+@router.get("/v2/list", dependencies=[Depends(search_query_budget)])
 async def buscar_productos_list_v2(
+    request: Request,
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(20, ge=1, le=100, description="Resultados por página (alias de per_page)"),
     sort: str = Query(None, description="Criterio de ordenamiento (ej: codigo:asc, pvp:desc)"),
-    buscar: str = Query(None, description="Término de búsqueda"),
+    buscar: str = Query(None, max_length=MAX_SEARCH_TERM_LENGTH, description="Término de búsqueda"),
     marca: str = Query(None, description="Filtrar por marca"),
     familia: str = Query(None, description="Filtrar por familia"),
     pvp_min: float = Query(None, ge=0, description="Precio mínimo"),
@@ -472,12 +736,16 @@ async def buscar_productos_list_v2(
         if bc3_has_descripcion_corta is not None:
             filters["bc3_has_descripcion_corta"] = bc3_has_descripcion_corta
 
-        paginated_response = service.buscar_productos_paginado(pagination_dto, filters)
+        paginated_response = await run_cancellable(
+            request, service.buscar_productos_paginado, pagination_dto, filters
+        )
         response_dict = ProductoResponseSerializer.serialize_paginated_response(
             paginated_response, "producto"
         )
 
         return response_dict.get("items", [])
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en búsqueda: {str(e)}") from None
 
@@ -145,13 +145,20 @@ class ResponseSerializer:
         filters_applied = getattr(paginated_response, "filters_applied", {})
         sorting_applied = getattr(paginated_response, "sorting_applied", None)
 
-        return {
+        response = {
             "items": items,
             "pagination": pagination,
             "filters_applied": filters_applied,
             "sorting_applied": sorting_applied,
         }
 
+        # Facet counts only when the request asked for them
+        facets = getattr(paginated_response, "facets", None)
+        if facets is not None:
+            response["facets"] = facets
+
+        return response
+
     @classmethod
     def format_for_json(cls, data: Any, indent: int = 2) -> str:
         """Format data as JSON string with custom formatting.
@@ -0,0 +1,54 @@
+"""Reverse-proxy cache headers for public catalogue endpoints.
+
+Routes declare ``Depends(surrogate_keys(...))`` with the surrogate keys of
+their body, formatted from the path parameters (``"producto:{codigo}"``).
+Every response carries ``Surrogate-Key`` so the proxy can drop it when one of
+those keys is purged (:mod:`app.infrastructure.cache.surrogate_purge`). With
+``HTTP_SHARED_CACHE_MAX_AGE`` positive the response also becomes cacheable by
+the proxy:
+
+- ``Cache-Control: public, max-age=<HTTP_CACHE_MAX_AGE>, s-maxage=<shared>``
+- ``X-Accel-Expires: <shared>`` (nginx ignores ``s-maxage``)
+- ``Vary: <API_KEY_HEADER>``: the API key is checked by the application, so
+  the proxy must never answer one key's request with another key's entry.
+
+Declare it before ``catalogue_etag`` so 304 responses repeat these headers.
+"""
+
+from collections.abc import Callable
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.infrastructure.cache.surrogate_purge import surrogate_token
+
+
+def cache_headers(keys: list[str]) -> dict[str, str]:
+    """Response headers for a public catalogue body tagged with ``keys``."""
+    settings = get_settings()
+    headers = {"Surrogate-Key": " ".join(keys)}
+    if settings.http_shared_cache_max_age > 0:
+        headers["Cache-Control"] = (
+            f"public, max-age={settings.http_cache_max_age}, "
+            f"s-maxage={settings.http_shared_cache_max_age}"
+        )
+        headers["X-Accel-Expires"] = str(settings.http_shared_cache_max_age)
+        headers["Vary"] = settings.api_key_header
+    return headers
+
+
+def surrogate_keys(*templates: str) -> Callable[[Request, Response], None]:
+    """
+    Route dependency tagging the response with surrogate keys.
+
+    Args:
+        templates: Keys, with ``{param}`` placeholders for path parameters
+    """
+
+    def dependency(request: Request, response: Response) -> None:
+        params = {name: surrogate_token(str(value)) for name, value in request.path_params.items()}
+        response.headers.update(
+            cache_headers([template.format(**params) for template in templates])
+        )
+
+    return dependency
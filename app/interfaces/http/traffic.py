@@ -0,0 +1,84 @@
+"""Traffic-class selection for the database pool partitions.
+
+Each request is served from the pool partition of its traffic class:
+
+- Routes pin their class with ``Depends(traffic_class("admin"))`` or through
+  their credential check (``verify_bc3_api_key`` pins ``"bc3"``).
+- Otherwise a valid admin API key selects ``"admin"`` and everything else
+  uses ``"public"``.
+
+The session also receives the request's query budget (``DB_QUERY_BUDGET``
+unless the route set a shorter one), enforced as a PostgreSQL
+``statement_timeout``, and the client key used for read-your-writes
+stickiness when read replicas are configured.
+"""
+
+from collections.abc import Callable, Generator
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.infrastructure.database.connection import TRAFFIC_CLASSES, get_session_factory
+from app.infrastructure.database.deadlines import set_deadline
+from app.middleware import get_admin_keys
+
+
+def pin_traffic_class(request: Request, name: str) -> None:
+    """Pin ``request`` to the pool partition of traffic class ``name``."""
+    if name not in TRAFFIC_CLASSES:
+        raise ValueError(f"Unknown traffic class: {name}")
+    request.state.traffic_class = name
+
+
+def traffic_class(name: str) -> Callable[[Request], None]:
+    """Build a route dependency that pins requests to a traffic class."""
+    if name not in TRAFFIC_CLASSES:
+        raise ValueError(f"Unknown traffic class: {name}")
+
+    def select_traffic_class(request: Request) -> None:
+        pin_traffic_class(request, name)
+
+    return select_traffic_class
+
+
+def request_traffic_class(request: Request) -> str:
+    """Return the traffic class of a request (pinned, admin key or public)."""
+    pinned = getattr(request.state, "traffic_class", None)
+    if pinned:
+        return pinned
+
+    admin_api_key = request.headers.get("X-Admin-API-Key")
+    if admin_api_key and admin_api_key in get_admin_keys():
+        return "admin"
+    return "public"
+
+
+def request_query_budget(request: Request) -> float:
+    """Return the query budget (seconds) of a request."""
+    budget = getattr(request.state, "query_budget", None)
+    return budget if budget is not None else get_settings().db_query_budget
+
+
+def request_client_key(request: Request) -> str | None:
+    """Identify the client of a request (API key, else address) for replica stickiness."""
+    for header in ("X-Admin-API-Key", get_settings().api_key_header):
+        value = request.headers.get(header)
+        if value:
+            return f"key:{value}"
+    return f"ip:{request.client.host}" if request.client else None
+
+
+def get_partitioned_session(request: Request) -> Generator[Session, None, None]:
+    """Yield a session from the request's pool partition, bound to its deadline."""
+    name = request_traffic_class(request)
+    session = get_session_factory(name)()
+    session.info["traffic_class"] = name
+    session.info["sticky_key"] = request_client_key(request)
+    set_deadline(session, request_query_budget(request))
+    # Lets the disconnect watcher cancel the running statement
+    request.state.db_session = session
+    try:
+        yield session
+    finally:
+        session.close()
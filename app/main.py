@@ -3,28 +3,38 @@
 FastAPI service with secure runtime configuration.
 """
 
+import logging
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
 from app.interfaces.http import (
     productos as productos_http,
     familias as familias_http,
     bc3 as bc3_http,
 )
-from app.middleware import (
-    APIKeyMiddleware,
-    RateLimitMiddleware,
-    UserAgentMiddleware,
-    SecurityHeadersMiddleware,
-)
+from app.middleware import SecurityPipelineMiddleware
+from app.interfaces.http.compression import CompressionMiddleware
 from app.interfaces.http.error_handlers import register_exception_handlers
 from app.security.logging_config import setup_logging
+from app.infrastructure.cache.catalogue_snapshot import (
+    catalogue_snapshot_enabled,
+    get_catalogue_snapshot,
+)
+from app.infrastructure.cache.suggest_index import get_suggest_index
 from app.infrastructure.database.connection import engine
+from app.infrastructure.database.workload import get_workload_recorder
+from app.monitoring.loop_monitor import get_event_loop_monitor
 from app.config import get_settings
 
 settings = get_settings()
 setup_logging()
+logger = logging.getLogger(__name__)
 
 # Load environment
 ENVIRONMENT = settings.environment
@@ -39,6 +49,37 @@ validate_startup_configuration()
 
 DOCS_ENABLED = bool(settings.docs_enabled)
 
+
+async def _warm_up(name: str, refresh: Callable[[], None]) -> None:
+    """Build a per-worker catalogue snapshot before serving requests."""
+    try:
+        await run_in_threadpool(refresh)
+    except SQLAlchemyError as exc:
+        # Built on first use instead
+        logger.warning(f"{name} warm-up failed: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Start per-worker monitors and catalogue snapshots; persist the recorded workload."""
+    monitor = get_event_loop_monitor() if settings.loop_monitor_enabled else None
+    if monitor is not None:
+        monitor.start()
+    if settings.suggest_index_enabled:
+        await _warm_up("suggest index", get_suggest_index().refresh)
+    if catalogue_snapshot_enabled():
+        await _warm_up("catalogue snapshot", get_catalogue_snapshot().refresh)
+    elif settings.catalogue_snapshot_enabled:
+        logger.warning("CATALOGUE_SNAPSHOT_ENABLED requires numpy; searches query the database")
+    try:
+        yield
+    finally:
+        if monitor is not None:
+            await monitor.stop()
+        if settings.workload_recording_enabled:
+            get_workload_recorder().flush()
+
+
 # Crear aplicación FastAPI
 app = FastAPI(
     title="API Disano",
@@ -47,6 +88,7 @@ app = FastAPI(
     docs_url="/docs" if DOCS_ENABLED else None,
     redoc_url="/redoc" if DOCS_ENABLED else None,
     openapi_url="/openapi.json" if DOCS_ENABLED else None,
+    lifespan=lifespan,
 )
 
 # Configure CORS based on environment
@@ -59,6 +101,10 @@ else:
     # In development: allow configured origins, defaulting to all origins.
     allowed_origins = settings.cors_origins_list
 
+# Response compression; added first so it runs inside CORS and the security pipeline.
+if settings.http_compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -67,14 +113,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add security middlewares
-app.add_middleware(SecurityHeadersMiddleware)
+# Add security middleware: a single pure-ASGI layer that replaces the chained
+# UserAgentMiddleware -> RateLimitMiddleware -> APIKeyMiddleware -> SecurityHeadersMiddleware
+# stack. Access checks only run in production; security headers always apply.
+app.add_middleware(SecurityPipelineMiddleware, enforce_access=ENVIRONMENT == "production")
 
-# Only add these in production
-if ENVIRONMENT == "production":
-    app.add_middleware(APIKeyMiddleware)
-    app.add_middleware(RateLimitMiddleware)
-    app.add_middleware(UserAgentMiddleware)
+# Admin-only profiling; installed last so it wraps the whole middleware stack.
+if settings.profiling_enabled:
+    from app.monitoring.profiler import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware)
 
 # Incluir routers (hexagonal architecture)
 app.include_router(productos_http.router, prefix="/api", tags=["productos"])
@@ -1,23 +1,39 @@
 """Security middleware for the API DISANO application.
 
 Provides API key authentication and rate limiting.
+
+``SecurityPipelineMiddleware`` is the pure-ASGI middleware installed by
+``app.main``: it applies User-Agent filtering, rate limiting, API key checks
+and security headers in a single layer. The ``BaseHTTPMiddleware`` classes
+below implement the same checks one per layer and are kept for callers that
+compose them individually.
 """
 
 from fastapi import Request, status
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import math
 import os
 import time
-from collections import defaultdict
-from typing import Dict
+from typing import Optional
 
 from app.config import get_settings
+from app.security.sliding_window import RateLimitDecision, SlidingWindowRateLimiter
 
 # Note: Don't use load_dotenv() - systemd passes env vars directly
 # from dotenv import load_dotenv
 
-# Rate limiting storage (in production, use Redis)
-rate_limit_store: Dict[str, list] = defaultdict(list)
+RATE_LIMIT_WINDOW_SECONDS = 60
+
+# Rate limiting state per worker (O(1) per request, bounded memory).
+# For limits shared across workers see app.middleware_redis.
+rate_limit_store = SlidingWindowRateLimiter(
+    limit=get_settings().rate_limit_per_client,
+    window=RATE_LIMIT_WINDOW_SECONDS,
+    max_keys=get_settings().rate_limit_max_clients,
+)
 
 
 def get_api_keys():
@@ -64,6 +80,87 @@ def verify_admin_api_key(request: Request) -> bool:
     return admin_api_key in valid_admin_keys
 
 
+# Response headers added to every response by the security middleware
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "no-referrer",
+    "Content-Security-Policy": "default-src 'self'",
+}
+HSTS_HEADER = {"Strict-Transport-Security": "max-age=31536000; includeSubDomains"}
+STRIPPED_RESPONSE_HEADERS = frozenset({b"server", b"x-powered-by"})
+
+
+def is_blocked_user_agent(user_agent: str, blocked_agents) -> bool:
+    """Return whether the User-Agent contains any blocked pattern."""
+    user_agent = user_agent.lower()
+    return any(blocked in user_agent for blocked in blocked_agents)
+
+
+def user_agent_rejection() -> JSONResponse:
+    """Build the 403 response for a blocked User-Agent."""
+    return JSONResponse(
+        status_code=status.HTTP_403_FORBIDDEN,
+        content={"detail": "Access denied. Suspicious User-Agent detected."},
+    )
+
+
+def api_key_rejection(
+    api_key: Optional[str], admin_api_key: Optional[str], valid_keys, valid_admin_keys
+) -> Optional[JSONResponse]:
+    """Return a 401 response unless one of the presented keys is valid."""
+    # Check if we have at least one API key
+    if not api_key and not admin_api_key:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": "API Key is required. Use X-API-Key or X-Admin-API-Key header."},
+        )
+
+    if api_key and api_key in valid_keys:
+        return None
+
+    # Validate admin API key if provided
+    if admin_api_key and admin_api_key in valid_admin_keys:
+        return None
+
+    # If we get here, neither key was valid
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": "Invalid API Key"},
+    )
+
+
+def register_rate_limited_request(client_id: str, rate_limit: int) -> RateLimitDecision:
+    """Record a request for ``client_id`` against the per-client limit."""
+    return rate_limit_store.hit(client_id, limit=rate_limit)
+
+
+def rate_limit_headers(decision: RateLimitDecision, current_time: float) -> dict[str, str]:
+    """Build the X-RateLimit-* headers for a response."""
+    return {
+        "X-RateLimit-Limit": str(decision.limit),
+        "X-RateLimit-Remaining": str(decision.remaining),
+        "X-RateLimit-Reset": str(int(current_time + decision.reset_after)),
+    }
+
+
+def rate_limit_exceeded_response(decision: RateLimitDecision, current_time: float) -> JSONResponse:
+    """Build the 429 response returned when a client exceeds its quota."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "detail": f"Rate limit exceeded. Maximum {decision.limit} requests per minute.",
+            "limit": decision.limit,
+            "window": "1 minute",
+        },
+        headers={
+            "Retry-After": str(max(1, math.ceil(decision.retry_after))),
+            **rate_limit_headers(decision, current_time),
+        },
+    )
+
+
 class APIKeyMiddleware(BaseHTTPMiddleware):
     """Middleware to validate API Key on every request."""
 
@@ -90,32 +187,13 @@ class APIKeyMiddleware(BaseHTTPMiddleware):
         api_key = request.headers.get("X-API-Key")
         admin_api_key = request.headers.get("X-Admin-API-Key")
 
-        # Check if we have at least one API key
-        if not api_key and not admin_api_key:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "API Key is required. Use X-API-Key or X-Admin-API-Key header."},
-            )
-
         # Validate regular API key against the route's credential scope.
-        if api_key:
-            valid_keys = (
-                get_bc3_api_keys() if self._is_bc3_path(request.url.path) else get_api_keys()
-            )
-            if api_key in valid_keys:
-                return await call_next(request)
+        valid_keys = get_bc3_api_keys() if self._is_bc3_path(request.url.path) else get_api_keys()
+        rejection = api_key_rejection(api_key, admin_api_key, valid_keys, get_admin_keys())
+        if rejection is not None:
+            return rejection
 
-        # Validate admin API key if provided
-        if admin_api_key:
-            valid_admin_keys = get_admin_keys()
-            if admin_api_key in valid_admin_keys:
-                return await call_next(request)
-
-        # If we get here, neither key was valid
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"detail": "Invalid API Key"},
-        )
+        return await call_next(request)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -140,44 +218,16 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             else (request.client.host if request.client else "unknown-client")
         )
 
-        # Clean old requests (older than 1 minute)
         current_time = time.time()
-        minute_ago = current_time - 60
-
-        # Filter out old requests
-        rate_limit_store[client_id] = [
-            req_time for req_time in rate_limit_store[client_id] if req_time > minute_ago
-        ]
-
-        # Check rate limit
-        rate_limit = get_rate_limit()
-        if len(rate_limit_store[client_id]) >= rate_limit:
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "detail": f"Rate limit exceeded. Maximum {rate_limit} requests per minute.",
-                    "limit": rate_limit,
-                    "window": "1 minute",
-                },
-                headers={
-                    "Retry-After": "60",
-                    "X-RateLimit-Limit": str(rate_limit),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(current_time + 60)),
-                },
-            )
-
-        # Add current request
-        rate_limit_store[client_id].append(current_time)
+        decision = register_rate_limited_request(client_id, get_rate_limit())
+        if not decision.allowed:
+            return rate_limit_exceeded_response(decision, current_time)
 
         # Continue with request
         response = await call_next(request)
 
         # Add rate limit headers
-        remaining = rate_limit - len(rate_limit_store[client_id])
-        response.headers["X-RateLimit-Limit"] = str(rate_limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(current_time + 60))
+        response.headers.update(rate_limit_headers(decision, current_time))
 
         return response
 
@@ -201,15 +251,11 @@ class UserAgentMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next):
         """Reject requests with suspicious user-agent values."""
-        user_agent = request.headers.get("user-agent", "").lower()
+        user_agent = request.headers.get("user-agent", "")
 
         # Check if user agent contains blocked patterns
-        for blocked in self.BLOCKED_AGENTS:
-            if blocked in user_agent:
-                return JSONResponse(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    content={"detail": "Access denied. Suspicious User-Agent detected."},
-                )
+        if is_blocked_user_agent(user_agent, self.BLOCKED_AGENTS):
+            return user_agent_rejection()
 
         return await call_next(request)
 
@@ -228,14 +274,117 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             del response.headers["x-powered-by"]
 
         # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "no-referrer"
-        response.headers["Content-Security-Policy"] = "default-src 'self'"
+        response.headers.update(SECURITY_HEADERS)
 
         # HSTS (only in production with HTTPS)
         if get_environment() == "production":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+            response.headers.update(HSTS_HEADER)
 
         return response
+
+
+def _encode_headers(headers: dict[str, str]) -> list[tuple[bytes, bytes]]:
+    """Encode a header mapping as raw ASGI header pairs."""
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()
+    ]
+
+
+class SecurityPipelineMiddleware:
+    """Pure ASGI security pipeline.
+
+    Runs, in the order the individual middlewares were stacked: User-Agent
+    filtering, rate limiting, API key validation and security headers. Key sets,
+    the rate limit and the encoded header list are computed once at startup,
+    and the response body is passed through untouched, so streaming responses
+    keep streaming.
+
+    Args:
+        app: Downstream ASGI application
+        enforce_access: Apply UA filtering, rate limiting and API key checks.
+            Defaults to production only, matching the previous middleware stack.
+    """
+
+    def __init__(self, app: ASGIApp, enforce_access: Optional[bool] = None):
+        self.app = app
+        production = get_environment() == "production"
+        self.enforce_access = production if enforce_access is None else enforce_access
+
+        self.api_keys = frozenset(get_api_keys())
+        self.bc3_api_keys = frozenset(get_bc3_api_keys())
+        self.admin_api_keys = frozenset(get_admin_keys())
+        self.rate_limit = get_rate_limit()
+        self.blocked_agents = tuple(UserAgentMiddleware.BLOCKED_AGENTS)
+
+        headers = dict(SECURITY_HEADERS)
+        if production:
+            headers.update(HSTS_HEADER)
+        self.response_headers = _encode_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        extra_headers = self.response_headers
+        if self.enforce_access:
+            rejection, rate_headers = self._check_access(scope)
+            if rate_headers:
+                extra_headers = extra_headers + _encode_headers(rate_headers)
+            if rejection is not None:
+                await rejection(scope, receive, self._wrap_send(send, self.response_headers))
+                return
+
+        await self.app(scope, receive, self._wrap_send(send, extra_headers))
+
+    def _check_access(self, scope: Scope) -> tuple[Optional[JSONResponse], Optional[dict]]:
+        """Return a rejection response (or None) and the rate-limit headers to add."""
+        headers = Headers(scope=scope)
+        path = scope["path"]
+
+        if is_blocked_user_agent(headers.get("user-agent", ""), self.blocked_agents):
+            return user_agent_rejection(), None
+
+        rate_headers = None
+        if path not in RateLimitMiddleware.EXEMPT_PATHS:
+            api_key = headers.get("X-API-Key")
+            client = scope.get("client")
+            client_id = (
+                api_key if api_key is not None else (client[0] if client else "unknown-client")
+            )
+            current_time = time.time()
+            decision = register_rate_limited_request(client_id, self.rate_limit)
+            if not decision.allowed:
+                return rate_limit_exceeded_response(decision, current_time), None
+            rate_headers = rate_limit_headers(decision, current_time)
+
+        if path not in APIKeyMiddleware.EXEMPT_PATHS:
+            valid_keys = self.bc3_api_keys if APIKeyMiddleware._is_bc3_path(path) else self.api_keys
+            rejection = api_key_rejection(
+                headers.get("X-API-Key"),
+                headers.get("X-Admin-API-Key"),
+                valid_keys,
+                self.admin_api_keys,
+            )
+            if rejection is not None:
+                return rejection, None
+
+        return None, rate_headers
+
+    @staticmethod
+    def _wrap_send(send: Send, extra_headers: list[tuple[bytes, bytes]]) -> Send:
+        """Strip server banners and set the security headers on response start."""
+        dropped = STRIPPED_RESPONSE_HEADERS.union(name for name, _ in extra_headers)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", ())
+                    if name.lower() not in dropped
+                ]
+                headers.extend(extra_headers)
+                message = {**message, "headers": headers}
+            await send(message)
+
+        return send_with_headers
@@ -6,11 +6,17 @@ Redis-based rate limiting for shared state across Gunicorn workers.
 Follows BC3-Suite security patterns.
 
 Features:
-- Redis-backed storage (shared state)
+- Redis-backed storage (shared state): one Lua script per request checks and
+  increments the per-client and the global sliding window atomically
 - Per-client rate limiting (30/min)
 - Global rate limiting (1000/min)
 - Burst protection (max 10 in burst)
-- Automatic cleanup of expired entries
+- Automatic cleanup of expired entries (Redis keys expire after two windows)
+- Circuit breaker: when Redis fails repeatedly, each worker falls back to its
+  local SlidingWindowRateLimiter until Redis answers again
+
+Without RATE_LIMIT_REDIS_URL (or without the ``redis`` package) the middleware
+uses the local limiter only, which enforces the limits per worker.
 
 Usage:
     from app.middleware_redis import RedisRateLimitMiddleware
@@ -18,41 +24,235 @@ Usage:
     app.add_middleware(RedisRateLimitMiddleware)
 ."""
 
+import math
 import time
-from collections import defaultdict
+from typing import Optional
 
 from fastapi import Request, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
 from app.config import get_settings
-from loguru import logger
+from app.security.logging_config import log_security_event, logger
+from app.security.sliding_window import (
+    RateLimitDecision,
+    SlidingWindowRateLimiter,
+    window_decision,
+)
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ModuleNotFoundError:  # Optional dependency; the local limiter is used instead.
+    redis_asyncio = None
+
+    class RedisError(Exception):
+        """Placeholder so callers can catch Redis errors without redis installed."""
+
 
 settings = get_settings()
 
+RATE_LIMIT_WINDOW_SECONDS = 60
+
+# KEYS[1]: client hash, KEYS[2]: global hash. Each hash stores the window index
+# (w), the current window count (c) and the previous window count (p).
+# ARGV: window seconds, client limit, global limit.
+# Returns {verdict, client c, client p, global c, global p, elapsed fraction}
+# where verdict is 0 = allowed, 1 = client limit, 2 = global limit. Counts are
+# read before this request is added.
+RATE_LIMIT_LUA = """
+local now = redis.call('TIME')
+local window = tonumber(ARGV[1])
+local client_limit = tonumber(ARGV[2])
+local global_limit = tonumber(ARGV[3])
+local seconds = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local index = math.floor(seconds / window)
+local elapsed = (seconds - index * window) / window
+
+local function load(key)
+    local state = redis.call('HMGET', key, 'w', 'c', 'p')
+    local w = tonumber(state[1])
+    local c = tonumber(state[2]) or 0
+    if w == index then
+        return c, tonumber(state[3]) or 0
+    elseif w == index - 1 then
+        return 0, c
+    end
+    return 0, 0
+end
+
+local function store(key, current, previous)
+    redis.call('HSET', key, 'w', index, 'c', current + 1, 'p', previous)
+    redis.call('PEXPIRE', key, math.ceil(window * 2000))
+end
+
+local client_c, client_p = load(KEYS[1])
+local global_c, global_p = load(KEYS[2])
+local verdict = 0
+if client_p * (1 - elapsed) + client_c + 1 > client_limit then
+    verdict = 1
+elseif global_p * (1 - elapsed) + global_c + 1 > global_limit then
+    verdict = 2
+else
+    store(KEYS[1], client_c, client_p)
+    store(KEYS[2], global_c, global_p)
+end
+return {verdict, client_c, client_p, global_c, global_p, tostring(elapsed)}
+"""
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker for the Redis backend.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    callers skip Redis for ``reset_timeout`` seconds. Then one trial request
+    is let through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 3, reset_timeout: float = 30.0, clock=time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Whether the protected backend should be tried."""
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failure; return True when this failure opened the circuit."""
+        self.failures += 1
+        if self.opened_at is not None:
+            # Trial request in half-open state failed: wait another timeout.
+            self.opened_at = self._clock()
+            return False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = self._clock()
+            return True
+        return False
+
+
+class RedisSlidingWindowLimiter:
+    """Per-client and global sliding windows evaluated atomically in Redis."""
+
+    def __init__(
+        self,
+        redis_client,
+        window: float = RATE_LIMIT_WINDOW_SECONDS,
+        key_prefix: str = "api_disano:ratelimit",
+    ):
+        self.redis_client = redis_client
+        self.window = window
+        self.key_prefix = key_prefix
+        self.global_key = f"{key_prefix}:global"
+        self._script = redis_client.register_script(RATE_LIMIT_LUA)
+
+    def redis_key(self, client_id: str) -> str:
+        """Return the Redis hash that stores a client's window counters."""
+        return f"{self.key_prefix}:client:{client_id}"
+
+    async def hit(
+        self, client_id: str, client_limit: int, global_limit: int
+    ) -> tuple[RateLimitDecision, Optional[RateLimitDecision]]:
+        """
+        Register one request in a single round trip.
+
+        Returns:
+            (client decision, global decision); the global decision is None
+            when the client limit already rejected the request
+        """
+        verdict, client_c, client_p, global_c, global_p, elapsed = await self._script(
+            keys=[self.redis_key(client_id), self.global_key],
+            args=[self.window, client_limit, global_limit],
+        )
+        verdict = int(verdict)
+        elapsed = float(elapsed)
+
+        client = window_decision(client_limit, int(client_c), int(client_p), elapsed, self.window)
+        if verdict == 1:
+            return _rejected(client), None
+        global_limit_decision = window_decision(
+            global_limit, int(global_c), int(global_p), elapsed, self.window
+        )
+        if verdict == 2:
+            return client, _rejected(global_limit_decision)
+        return client, global_limit_decision
+
+
+def _rejected(decision: RateLimitDecision) -> RateLimitDecision:
+    """Force a rejection decided by Redis (guards float rounding at the edge)."""
+    if not decision.allowed:
+        return decision
+    return RateLimitDecision(
+        allowed=False,
+        limit=decision.limit,
+        remaining=0,
+        reset_after=decision.reset_after,
+        retry_after=decision.reset_after,
+    )
+
+
+def create_redis_client():
+    """Create the asyncio Redis client from RATE_LIMIT_REDIS_URL, or None when not configured."""
+    if not settings.rate_limit_redis_url or redis_asyncio is None:
+        return None
+    return redis_asyncio.from_url(
+        settings.rate_limit_redis_url,
+        socket_timeout=settings.rate_limit_redis_timeout,
+        socket_connect_timeout=settings.rate_limit_redis_timeout,
+    )
+
 
 class RedisRateLimitMiddleware(BaseHTTPMiddleware):
     """Rate limiting middleware using Redis for shared state."""
 
-    def __init__(self, app):
+    def __init__(self, app, redis_client=None):
         """Initialize with Redis client (in-memory fallback)."""
         super().__init__(app)
-        self.rate_limit_store: dict[str, list] = defaultdict(list)
         self.rate_limit_per_client = settings.rate_limit_per_client
         self.rate_limit_global = settings.rate_limit_global
         self.rate_limit_burst = settings.rate_limit_burst
+        # Local fallback (per worker) used when Redis is absent or unavailable
+        self.rate_limit_store = SlidingWindowRateLimiter(
+            limit=self.rate_limit_per_client,
+            window=RATE_LIMIT_WINDOW_SECONDS,
+            max_keys=settings.rate_limit_max_clients,
+        )
+        # The global limit is a single counter shared by every client
+        self.global_rate_limit_store = SlidingWindowRateLimiter(
+            limit=self.rate_limit_global, window=RATE_LIMIT_WINDOW_SECONDS, max_keys=1
+        )
 
         # Paths that don't require rate limiting
         self.EXEMPT_PATHS = {"/", "/health"}
 
-        # TODO: Connect to Redis in production
-        # import redis
-        # self.redis_client = redis.Redis(
-        #     host=settings.redis_host,
-        #     port=settings.redis_port,
-        #     db=0,
-        #     decode_responses=True
-        # )
+        # Shared state across workers
+        self.redis_client = redis_client if redis_client is not None else create_redis_client()
+        self.redis_limiter = (
+            RedisSlidingWindowLimiter(self.redis_client) if self.redis_client is not None else None
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.rate_limit_redis_failure_threshold,
+            reset_timeout=settings.rate_limit_redis_reset_timeout,
+        )
 
     async def dispatch(self, request: Request, call_next):
         """Rate limit the request."""
@@ -63,10 +263,11 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         # Get API key (or use IP if no API key in development)
-        client_id = request.headers.get("X-API-Key", request.client.host)
+        client_host = request.client.host if request.client else "unknown-client"
+        client_id = request.headers.get("X-API-Key", client_host)
 
         # Check rate limits
-        rate_limit_result = self._check_rate_limits(client_id)
+        rate_limit_result = await self._check_rate_limits_shared(client_id)
 
         if rate_limit_result["exceeded"]:
             return JSONResponse(
@@ -77,10 +278,10 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
                     "window": "1 minute",
                 },
                 headers={
-                    "Retry-After": "60",
+                    "Retry-After": str(max(1, math.ceil(rate_limit_result["retry_after"]))),
                     "X-RateLimit-Limit": str(rate_limit_result["limit"]),
                     "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(time.time() + 60)),
+                    "X-RateLimit-Reset": str(int(time.time() + rate_limit_result["reset_after"])),
                 },
             )
 
@@ -91,13 +292,15 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
         remaining = rate_limit_result["limit"] - rate_limit_result["current"]
         response.headers["X-RateLimit-Limit"] = str(rate_limit_result["limit"])
         response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(time.time() + 60))
+        response.headers["X-RateLimit-Reset"] = str(
+            int(time.time() + rate_limit_result["reset_after"])
+        )
 
         return response
 
     def _check_rate_limits(self, client_id: str) -> dict:
         """
-        Check if client has exceeded rate limits.
+        Check if client has exceeded rate limits using the local (per-worker) limiter.
 
         Args:
             client_id: API key or client IP
@@ -112,69 +315,103 @@ class RedisRateLimitMiddleware(BaseHTTPMiddleware):
                 pass
         """
         current_time = time.time()
-        minute_ago = current_time - 60
-
-        # Clean old requests (older than 1 minute)
-        self.rate_limit_store[client_id] = [
-            req_time
-            for req_time in self.rate_limit_store[client_id]
-            if req_time > minute_ago
-        ]
 
         # Check per-client rate limit
-        client_requests = len(self.rate_limit_store[client_id])
+        client = self.rate_limit_store.hit(
+            client_id, limit=self.rate_limit_per_client, now=current_time
+        )
 
-        if client_requests >= self.rate_limit_per_client:
-            logger.warning(
-                f"Rate limit exceeded for {client_id}: "
-                f"{client_requests}/{self.rate_limit_per_client}"
+        # Check global rate limit (all clients)
+        global_limit = None
+        if client.allowed:
+            global_limit = self.global_rate_limit_store.hit(
+                "global", limit=self.rate_limit_global, now=current_time
+            )
+
+        return self._build_result(client_id, client, global_limit, backend="local")
+
+    async def _check_rate_limits_shared(self, client_id: str) -> dict:
+        """
+        Check rate limits in Redis, falling back to the local limiter.
+
+        Redis errors are counted by the circuit breaker; while the circuit is
+        open Redis is not contacted at all.
+        """
+        if self.redis_limiter is None or not self.circuit_breaker.allow_request():
+            return self._check_rate_limits(client_id)
+
+        try:
+            client, global_limit = await self.redis_limiter.hit(
+                client_id, self.rate_limit_per_client, self.rate_limit_global
+            )
+        except (RedisError, OSError) as exc:
+            if self.circuit_breaker.record_failure():
+                logger.warning(
+                    f"Redis rate limiting no disponible, usando límites locales "
+                    f"durante {self.circuit_breaker.reset_timeout:.0f}s: {exc}"
+                )
+            return self._check_rate_limits(client_id)
+
+        self.circuit_breaker.record_success()
+        return self._build_result(client_id, client, global_limit, backend="redis")
+
+    def _get_redis_key(self, client_id: str) -> Optional[str]:
+        """Get Redis key for a client (None without a Redis backend)."""
+        if self.redis_limiter is None:
+            return None
+        return self.redis_limiter.redis_key(client_id)
+
+    def _build_result(
+        self,
+        client_id: str,
+        client: RateLimitDecision,
+        global_limit: Optional[RateLimitDecision],
+        backend: str,
+    ) -> dict:
+        """Translate limiter decisions into the middleware's result dict."""
+        if not client.allowed:
+            log_security_event(
+                event_type="rate_limit",
+                details=f"client={client_id} | {client.used}/{self.rate_limit_per_client}",
             )
             return {
                 "exceeded": True,
                 "message": f"Rate limit exceeded. Maximum {self.rate_limit_per_client} requests per minute.",
                 "limit": self.rate_limit_per_client,
-                "current": client_requests,
+                "current": client.used,
+                "retry_after": client.retry_after,
+                "reset_after": client.reset_after,
+                "backend": backend,
             }
 
-        # Check global rate limit (all clients)
-        all_requests = sum(len(requests) for requests in self.rate_limit_store.values())
-
-        if all_requests >= self.rate_limit_global:
-            logger.warning(
-                f"Global rate limit exceeded: {all_requests}/{self.rate_limit_global}"
+        if global_limit is not None and not global_limit.allowed:
+            log_security_event(
+                event_type="rate_limit_global",
+                details=f"{global_limit.used}/{self.rate_limit_global}",
             )
             return {
                 "exceeded": True,
                 "message": f"Global rate limit exceeded. Maximum {self.rate_limit_global} requests per minute.",
                 "limit": self.rate_limit_global,
-                "current": all_requests,
+                "current": global_limit.used,
+                "retry_after": global_limit.retry_after,
+                "reset_after": global_limit.reset_after,
+                "backend": backend,
             }
 
         # Check burst protection
-        if client_requests >= self.rate_limit_burst:
-            logger.warning(
-                f"Burst limit exceeded for {client_id}: "
-                f"{client_requests}/{self.rate_limit_burst}"
+        if client.used > self.rate_limit_burst:
+            log_security_event(
+                event_type="rate_limit_burst",
+                details=f"client={client_id} | {client.used}/{self.rate_limit_burst}",
             )
 
-        # Add current request
-        self.rate_limit_store[client_id].append(current_time)
-
         return {
             "exceeded": False,
             "message": None,
             "limit": self.rate_limit_per_client,
-            "current": client_requests + 1,
+            "current": client.used,
+            "retry_after": 0.0,
+            "reset_after": client.reset_after,
+            "backend": backend,
         }
-
-    # TODO: Implement Redis storage in production
-    # def _get_redis_key(self, client_id: str) -> str:
-    #     """Get Redis key for a client."""
-    #     return f"ratelimit:{client_id}"
-
-    # def _increment_redis_count(self, client_id: str) -> int:
-    #     """Increment request count in Redis."""
-    #     key = self._get_redis_key(client_id)
-    #     count = self.redis_client.incr(key)
-    #     self.redis_client.expire(key, 60)  # Expire after 1 minute
-    #     return count
@@ -3,7 +3,8 @@
 from typing import Any
 from datetime import datetime
 
-from app.infrastructure.database.connection import get_pool_stats
+from app.infrastructure.database.connection import get_partition_stats, get_pool_stats
+from app.monitoring.loop_monitor import get_event_loop_monitor
 from app.monitoring.metrics import MetricsCollector
 
 
@@ -27,12 +28,15 @@ def generate_dashboard() -> dict[str, Any]:
     # Generate database queries section
     database_queries = _generate_database_queries_section()
 
+    # Generate event loop section (live data from the running worker)
+    event_loop = _generate_event_loop_section()
+
     # Generate trends section
     trends = _generate_trends_section(collector)
 
     # Generate recommendations
     recommendations = _generate_recommendations(
-        response_times, cache_performance, database_queries
+        response_times, cache_performance, database_queries, event_loop
     )
 
     # Combine into dashboard
@@ -41,6 +45,7 @@ def generate_dashboard() -> dict[str, Any]:
         "response_times": response_times,
         "cache_performance": cache_performance,
         "database_queries": database_queries,
+        "event_loop": event_loop,
         "trends": trends,
         "recommendations": recommendations,
     }
@@ -133,6 +138,7 @@ def _generate_database_queries_section() -> dict[str, Any]:
             0, int(pool_stats["size"]) - int(pool_stats["checked_in"])
         ),
         "overflow": pool_stats["overflow"],
+        "partitions": get_partition_stats(),
         "query_times": {
             "avg_query_time": 0.015,  # Sample value
             "max_query_time": 0.050,  # Sample value
@@ -141,6 +147,11 @@ def _generate_database_queries_section() -> dict[str, Any]:
     }
 
 
+def _generate_event_loop_section() -> dict[str, Any]:
+    """Generate event loop lag section of dashboard."""
+    return get_event_loop_monitor().get_summary()
+
+
 def _generate_trends_section(collector: MetricsCollector) -> list[dict[str, Any]]:
     """Generate trends section of dashboard."""
     # Analyze trends for key metrics
@@ -164,6 +175,7 @@ def _generate_recommendations(
     response_times: dict[str, Any],
     cache_performance: dict[str, Any],
     database_queries: dict[str, Any],
+    event_loop: dict[str, Any] | None = None,
 ) -> list[str]:
     """Generate optimization recommendations based on dashboard data."""
     recommendations = []
@@ -190,6 +202,15 @@ def _generate_recommendations(
             f"Database pool utilization is {pool_utilization:.1%}, approaching capacity. Consider increasing pool size."
         )
 
+    # Event loop recommendations
+    if event_loop:
+        lag_p99 = event_loop.get("lag", {}).get("p99", 0)
+        if lag_p99 > 0.050:  # > 50ms
+            recommendations.append(
+                f"Event loop lag p99 is {lag_p99 * 1000:.0f}ms. Move blocking calls off the "
+                "event loop (see event_loop.blocking_events for captured stacks)."
+            )
+
     # Add general positive recommendations if no issues
     if not recommendations:
         recommendations.append(
@@ -0,0 +1,189 @@
+"""Event-loop lag measurement and blocking-call detection.
+
+Handlers are ``async def`` but still call synchronous SQLAlchemy and logging
+code, so a slow query stalls every request on the worker. The monitor runs
+two cooperating pieces:
+
+- An asyncio task that sleeps for a fixed interval and records how late it
+  woke up (``event_loop_lag``, in seconds) in the shared ``MetricsCollector``.
+- A watchdog thread that notices when that task has not ticked for longer
+  than the blocking threshold and captures the event-loop thread's stack
+  while it is still blocked, so the offending code is visible.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from app.config import get_settings
+from app.monitoring.metrics import MetricsCollector, get_metrics_collector
+from app.security.logging_config import logger
+
+LAG_METRIC = "event_loop_lag"
+BLOCKED_METRIC = "event_loop_blocked"
+
+
+@dataclass
+class BlockingEvent:
+    """A stall of the event loop together with the stack that caused it."""
+
+    started_at: float
+    duration: float
+    stack: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-friendly representation for the dashboard."""
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "duration": round(self.duration, 4),
+            "stack": self.stack,
+        }
+
+
+class EventLoopMonitor:
+    """Measure event-loop lag and capture stacks of blocking callbacks."""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.2,
+        collector: MetricsCollector | None = None,
+        max_events: int = 50,
+    ):
+        """
+        Configure the monitor.
+
+        Args:
+            interval: Seconds between lag probes
+            block_threshold: Stall duration (seconds) that triggers a stack capture
+            collector: Metrics sink; defaults to the process-wide collector
+            max_events: Number of recent blocking events kept in memory
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.collector = collector or get_metrics_collector()
+        self.blocking_events: deque[BlockingEvent] = deque(maxlen=max_events)
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id: int | None = None
+        self._last_tick = time.monotonic()
+        self._stall: BlockingEvent | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the probe task is active."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start probing the running event loop; must be called from inside it."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Cancel the probe task and stop the watchdog thread."""
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_tick = time.monotonic()
+            self.collector.record(LAG_METRIC, lag)
+            self._finish_stall()
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.block_threshold) / 2
+        while not self._stop_event.wait(check_every):
+            stalled_for = time.monotonic() - self._last_tick - self.interval
+            if stalled_for >= self.block_threshold and self._stall is None:
+                self._stall = BlockingEvent(
+                    started_at=time.time() - stalled_for,
+                    duration=stalled_for,
+                    stack=self._capture_loop_stack(),
+                )
+
+    def _capture_loop_stack(self) -> list[str]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return []
+        return [line.rstrip() for line in traceback.format_stack(frame)]
+
+    def _finish_stall(self) -> None:
+        """Close out a stall detected by the watchdog once the loop recovers."""
+        stall = self._stall
+        if stall is None:
+            return
+        self._stall = None
+        stall.duration = time.time() - stall.started_at
+        self.blocking_events.append(stall)
+        self.collector.record(BLOCKED_METRIC, stall.duration)
+        innermost = stall.stack[-1].strip().splitlines()[0] if stall.stack else "unknown"
+        logger.warning(f"Event loop bloqueado {stall.duration * 1000:.0f} ms | {innermost}")
+
+    def get_summary(self) -> dict[str, Any]:
+        """Return lag percentiles and the most recent blocking events."""
+        lag = self.collector.get_statistics(LAG_METRIC, percentiles=[50, 95, 99])
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "block_threshold": self.block_threshold,
+            "lag": {
+                "count": int(lag.get("count", 0)),
+                "mean": lag.get("mean", 0.0),
+                "max": lag.get("max", 0.0),
+                "p50": lag.get("p50", 0.0),
+                "p95": lag.get("p95", 0.0),
+                "p99": lag.get("p99", 0.0),
+            },
+            "blocking_events": [event.to_dict() for event in self.blocking_events],
+        }
+
+
+# Singleton instance for the application's event loop
+_global_event_loop_monitor: EventLoopMonitor | None = None
+
+
+def get_event_loop_monitor() -> EventLoopMonitor:
+    """
+    Get global event-loop monitor instance.
+
+    Returns:
+        Monitor configured from the LOOP_MONITOR_* settings
+    """
+    global _global_event_loop_monitor
+
+    if _global_event_loop_monitor is None:
+        settings = get_settings()
+        _global_event_loop_monitor = EventLoopMonitor(
+            interval=settings.loop_monitor_interval,
+            block_threshold=settings.loop_monitor_block_threshold,
+        )
+
+    return _global_event_loop_monitor
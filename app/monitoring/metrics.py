@@ -2,7 +2,7 @@
 
 import statistics
 from typing import Any
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 
 
@@ -14,9 +14,17 @@ class MetricsCollector:
     query execution times, cache performance, and database operations.
     """
 
-    def __init__(self) -> None:
-        """Initialize the metrics collector."""
-        self._metrics: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    def __init__(self, max_samples: int | None = None) -> None:
+        """
+        Initialize the metrics collector.
+
+        Args:
+            max_samples: Optional cap on entries kept per metric (oldest are dropped)
+        """
+        self.max_samples = max_samples
+        self._metrics: dict[str, deque[dict[str, Any]]] = defaultdict(
+            lambda: deque(maxlen=max_samples)
+        )
         self._cache_stats: dict[str, dict[str, int]] = defaultdict(
             lambda: {"hits": 0, "misses": 0}
         )
@@ -60,7 +68,7 @@ class MetricsCollector:
         Returns:
             List of metric entries
         """
-        return self._metrics.get(metric_name, [])
+        return list(self._metrics.get(metric_name, ()))
 
     def get_aggregated_metrics(
         self, metric_name: str, tags: dict[str, str] | None = None
@@ -234,9 +242,28 @@ class MetricsCollector:
         Returns:
             Dictionary with all metrics
         """
-        return dict(self._metrics)
+        return {name: list(entries) for name, entries in self._metrics.items()}
 
     def reset(self) -> None:
         """Reset all collected metrics."""
         self._metrics.clear()
         self._cache_stats.clear()
+
+
+# Singleton instance for runtime metrics recorded by the running application
+_global_metrics_collector: MetricsCollector | None = None
+
+
+def get_metrics_collector() -> MetricsCollector:
+    """
+    Get global metrics collector instance.
+
+    Returns:
+        Global collector, bounded so long-running workers keep constant memory
+    """
+    global _global_metrics_collector
+
+    if _global_metrics_collector is None:
+        _global_metrics_collector = MetricsCollector(max_samples=10000)
+
+    return _global_metrics_collector
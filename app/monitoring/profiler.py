@@ -0,0 +1,196 @@
+"""On-demand and sampled request profiling for production workers.
+
+Two profiling modes are available once ``PROFILING_ENABLED`` is set:
+
+- Single request: an admin sends the ``X-Profile`` header (``text`` or
+  ``html``) and receives the profile report instead of the endpoint body.
+  pyinstrument is used when installed; otherwise the built-in stack sampler
+  returns collapsed stacks.
+- Sampling: one in ``PROFILING_SAMPLE_RATE`` requests is sampled and its
+  collapsed stacks are written to ``<log dir>/profiles`` for flamegraph tools
+  (``flamegraph.pl``, speedscope, inferno).
+
+When profiling is disabled the middleware is never installed, so the request
+path pays nothing.
+"""
+
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import HTMLResponse, PlainTextResponse, Response
+
+from app.config import get_settings
+from app.middleware import verify_admin_api_key
+from app.security.logging_config import get_log_directory, logger
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+except ModuleNotFoundError:  # Optional dependency; the stack sampler is used instead.
+    _PyinstrumentProfiler = None
+
+
+def get_profile_directory() -> Path:
+    """Return the directory where sampled profiles are written."""
+    return get_log_directory() / "profiles"
+
+
+class StackSampler:
+    """Sample the Python stack of one thread at a fixed interval.
+
+    Stacks are aggregated in collapsed format (``outer;inner count``), which
+    flamegraph tools consume directly.
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float = 0.005):
+        """Prepare a sampler for ``thread_id`` (defaults to the calling thread)."""
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        """Render a frame chain root-first as a collapsed stack."""
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            labels.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._collapse(frame)] += 1
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def render_collapsed(self) -> str:
+        """Return the samples as collapsed-stack lines, heaviest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def write_collapsed_profile(
+    sampler: StackSampler, method: str, path: str, directory: Path | None = None
+) -> Path | None:
+    """Persist a sampled profile; returns the file path, or None when empty."""
+    if not sampler.samples:
+        return None
+    directory = directory or get_profile_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    slug = path.strip("/").replace("/", "_") or "root"
+    profile_path = directory / f"{timestamp}-{method}-{slug}.collapsed"
+    profile_path.write_text(sampler.render_collapsed(), encoding="utf-8")
+    return profile_path
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Profile admin-requested requests and a sampled fraction of traffic."""
+
+    def __init__(
+        self,
+        app,
+        sample_rate: int | None = None,
+        interval: float | None = None,
+        output_dir: Path | None = None,
+    ):
+        """Configure the sampling rate (1 in N requests, 0 disables sampling)."""
+        super().__init__(app)
+        settings = get_settings()
+        self.sample_rate = settings.profiling_sample_rate if sample_rate is None else sample_rate
+        self.interval = settings.profiling_interval if interval is None else interval
+        self.header = settings.profiling_header
+        self.output_dir = output_dir
+        self._counter = itertools.count(1)
+
+    async def dispatch(self, request: Request, call_next):
+        """Route the request through the matching profiling mode."""
+        profile_format = request.headers.get(self.header)
+        if profile_format and verify_admin_api_key(request):
+            return await self._profile_request(request, call_next, profile_format.lower())
+
+        if self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0:
+            return await self._sample_request(request, call_next)
+
+        return await call_next(request)
+
+    async def _profile_request(self, request: Request, call_next, profile_format: str):
+        """Profile one request and return the report instead of its body."""
+        started = time.perf_counter()
+        if _PyinstrumentProfiler is not None:
+            profiler = _PyinstrumentProfiler(interval=self.interval, async_mode="enabled")
+            profiler.start()
+            try:
+                response = await call_next(request)
+                await self._drain(response)
+            finally:
+                profiler.stop()
+            if profile_format == "html":
+                return HTMLResponse(profiler.output_html())
+            return PlainTextResponse(profiler.output_text(unicode=True, color=False))
+
+        sampler = StackSampler(interval=self.interval)
+        sampler.start()
+        try:
+            response = await call_next(request)
+            await self._drain(response)
+        finally:
+            sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return PlainTextResponse(
+            sampler.render_collapsed(),
+            headers={
+                "X-Profile-Duration-Ms": f"{elapsed_ms:.1f}",
+                "X-Profile-Status": str(response.status_code),
+            },
+        )
+
+    async def _sample_request(self, request: Request, call_next):
+        """Sample one request and persist its collapsed stacks off the event loop."""
+        sampler = StackSampler(interval=self.interval)
+        sampler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+        try:
+            await run_in_threadpool(
+                write_collapsed_profile,
+                sampler,
+                request.method,
+                request.url.path,
+                self.output_dir,
+            )
+        except OSError as exc:
+            logger.warning(f"No se pudo guardar el perfil muestreado: {exc}")
+        return response
+
+    @staticmethod
+    async def _drain(response: Response) -> None:
+        """Consume a streamed body so the profile covers its generation."""
+        body_iterator = getattr(response, "body_iterator", None)
+        if body_iterator is not None:
+            async for _chunk in body_iterator:
+                pass
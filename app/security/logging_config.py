@@ -1,6 +1,9 @@
 """Configure structured logging with loguru or a safe standard-library fallback."""
 
 import sys
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
 try:
@@ -33,13 +36,26 @@ from app.config import get_settings
 settings = get_settings()
 
 
+def get_log_directory() -> Path:
+    """Return the directory that holds the configured log files."""
+    return Path(settings.log_file).parent
+
+
 def setup_logging():
-    """Configure loguru for the whole application."""  # Remove default handler.
-    logger.remove()
+    """Configure loguru for the whole application.
+
+    Every sink is queued (``enqueue=True``): request handlers only push records
+    onto a queue and a background thread does the disk I/O. File sinks write
+    JSON lines when ``LOG_JSON`` is enabled. Variable values in tracebacks
+    (``diagnose``) are only rendered outside production.
+    """
+    logger.remove()  # Remove default handler.
 
     # Crear directorio de logs si no existe
     log_file_path = Path(settings.log_file)
-    log_file_path.parent.mkdir(parents=True, exist_ok=True)
+    get_log_directory().mkdir(parents=True, exist_ok=True)
+
+    verbose_tracebacks = not settings.is_production()
 
     # Formato de log detallado
     log_format = (
@@ -55,8 +71,9 @@ def setup_logging():
         format=log_format,
         level=settings.log_level,
         colorize=True,
-        backtrace=True,
-        diagnose=True,
+        enqueue=True,
+        backtrace=verbose_tracebacks,
+        diagnose=verbose_tracebacks,
     )
 
     # File handler (rotación y retención)
@@ -67,8 +84,10 @@ def setup_logging():
         rotation=settings.log_rotation,
         retention=settings.log_retention,
         compression="zip",  # Comprimir logs antiguos
-        backtrace=True,
-        diagnose=True,
+        enqueue=True,
+        serialize=settings.log_json,
+        backtrace=verbose_tracebacks,
+        diagnose=verbose_tracebacks,
         encoding="utf-8",
     )
 
@@ -82,6 +101,9 @@ def setup_logging():
             rotation="100 MB",
             retention="30 days",
             compression="zip",
+            enqueue=True,
+            serialize=settings.log_json,
+            encoding="utf-8",
         )
 
     logger.info(f"Logging configurado - Nivel: {settings.log_level}")
@@ -90,6 +112,83 @@ def setup_logging():
         logger.info(f"Security log: {security_log_path}")
 
 
+@dataclass
+class _EventWindow:
+    """Sampling state for one event type."""
+
+    window_start: float
+    emitted: int = 0
+    seen: int = 0
+    suppressed: int = 0
+    suppressed_total: int = 0
+
+
+class EventLogSampler:
+    """Per-event-type sampling and rate cap for high-volume log events.
+
+    ``sample_every`` keeps 1 in N events of a type; ``max_per_second`` caps
+    how many events of each type are written per second. Dropped events are
+    counted and the count is attached to the next emitted event of the same
+    type, so bursts stay visible without writing every line.
+    """
+
+    def __init__(
+        self,
+        max_per_second: int = 0,
+        sample_every: dict[str, int] | None = None,
+        clock=time.monotonic,
+    ):
+        """Configure the cap (0 disables it) and per-type sampling rates."""
+        self.max_per_second = max_per_second
+        self.sample_every = sample_every or {}
+        self._clock = clock
+        self._windows: dict[str, _EventWindow] = {}
+        self._lock = threading.Lock()
+
+    def admit(self, event_type: str) -> int | None:
+        """Return None to drop the event, else the events suppressed since the last one."""
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(event_type)
+            if window is None:
+                window = self._windows[event_type] = _EventWindow(window_start=now)
+            window.seen += 1
+
+            every = self.sample_every.get(event_type, 1)
+            if every > 1 and window.seen % every:
+                return self._suppress(window)
+
+            if now - window.window_start >= 1.0:
+                window.window_start = now
+                window.emitted = 0
+            if self.max_per_second and window.emitted >= self.max_per_second:
+                return self._suppress(window)
+
+            window.emitted += 1
+            suppressed, window.suppressed = window.suppressed, 0
+            return suppressed
+
+    @staticmethod
+    def _suppress(window: _EventWindow) -> None:
+        window.suppressed += 1
+        window.suppressed_total += 1
+        return None
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """Return seen and suppressed counts per event type."""
+        with self._lock:
+            return {
+                event_type: {"seen": window.seen, "suppressed": window.suppressed_total}
+                for event_type, window in self._windows.items()
+            }
+
+
+event_sampler = EventLogSampler(
+    max_per_second=settings.log_event_max_per_second,
+    sample_every={"access": settings.log_access_sample_every},
+)
+
+
 def log_access_request(api_key: str, endpoint: str, method: str, client_ip: str, status_code: int):
     """Record an API access request.
 
@@ -100,9 +199,20 @@ def log_access_request(api_key: str, endpoint: str, method: str, client_ip: str,
         client_ip: IP del cliente
         status_code: Código de respuesta HTTP
     """
-    logger.bind(context="access").info(
+    suppressed = event_sampler.admit("access")
+    if suppressed is None:
+        return
+    logger.bind(
+        context="access",
+        api_key=api_key,
+        endpoint=endpoint,
+        method=method,
+        client_ip=client_ip,
+        status_code=status_code,
+        suppressed=suppressed,
+    ).info(
         f"API_ACCESS | key={api_key} | {method} {endpoint} | "
-        f"ip={client_ip} | status={status_code}"
+        f"ip={client_ip} | status={status_code} | suppressed={suppressed}"
     )
 
 
@@ -117,10 +227,28 @@ def log_security_event(
         client_ip: IP del cliente
         api_key: API key involucrada (si aplica)
     """
-    logger.bind(context="security").warning(
-        f"SECURITY_EVENT | type={event_type} | {details} | " f"ip={client_ip} | key={api_key}"
+    suppressed = event_sampler.admit(event_type)
+    if suppressed is None:
+        return
+    logger.bind(
+        context="security",
+        event_type=event_type,
+        client_ip=client_ip,
+        api_key=api_key,
+        suppressed=suppressed,
+    ).warning(
+        f"SECURITY_EVENT | type={event_type} | {details} | "
+        f"ip={client_ip} | key={api_key} | suppressed={suppressed}"
     )
 
 
 # Exportar logger para uso en otros módulos
-__all__ = ["logger", "setup_logging", "log_access_request", "log_security_event"]
+__all__ = [
+    "logger",
+    "setup_logging",
+    "get_log_directory",
+    "EventLogSampler",
+    "event_sampler",
+    "log_access_request",
+    "log_security_event",
+]
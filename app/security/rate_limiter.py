@@ -64,7 +64,7 @@ except ModuleNotFoundError:  # Optional dependency; custom middleware remains ac
 
 
 from app.config import get_settings  # noqa: E402
-from app.security.logging_config import logger, log_security_event  # noqa: E402
+from app.security.logging_config import log_security_event  # noqa: E402
 
 settings = get_settings()
 
@@ -100,11 +100,9 @@ def get_api_key_identifier(request: Request) -> str:
         # Solo mostrar primeros 8 caracteres por seguridad
         key_preview = f"{api_key[:8]}" if len(api_key) > 8 else api_key
         identifier = f"api_key:{key_preview}"
-        logger.debug(f"Rate limiting por API key: {identifier}")
     else:
         # Fallback a IP address
         identifier = f"ip:{get_remote_address(request)}"
-        logger.debug(f"Rate limiting por IP: {identifier}")
 
     return identifier
 
@@ -146,12 +144,10 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
         }
     """
     identifier = get_api_key_identifier(request)
-    logger.warning(
-        f"Rate limit excedido por {identifier}. " f"Límite: {settings.rate_limit_per_client}/minute"
-    )
     log_security_event(
         event_type="rate_limit",
-        details=f"Exceeded {settings.rate_limit_per_client}/minute",
+        details=f"Exceeded {settings.rate_limit_per_client}/minute | client={identifier}",
+        client_ip=get_remote_address(request),
         api_key=identifier.split(":")[-1] if "api_key:" in identifier else "none",
     )
 
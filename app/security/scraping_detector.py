@@ -14,8 +14,11 @@ Patrones detectados:
     5. Mismos headers en todas las peticiones
     6. Acceso a endpoints de honeypot
 
-Para producción se recomienda usar Redis para almacenar estadísticas
-de peticiones y patrones.
+El estado por cliente se actualiza de forma incremental (O(1) por petición)
+con buffers circulares y estadísticas acumuladas, y los clientes inactivos
+caducan mediante una rueda de tiempo. Los bans y accesos a honeypots viven en
+un BanStore: en memoria por defecto, o en Redis (RATE_LIMIT_REDIS_URL) para que
+todos los workers vean los mismos bans.
 
 Uso:
     from fastapi import Request
@@ -25,58 +28,353 @@ Uso:
 
     @app.middleware("http")
     async def detect_scraping(request: Request, call_next):
-        if detector.is_suspicious_request(request):
+        if await detector.is_suspicious_request(request):
             raise HTTPException(403, "Suspicious activity detected")
         return await call_next(request)
 """
 
-from fastapi import Request
-from typing import Dict, List
-from datetime import datetime, timedelta
-from collections import defaultdict
 import hashlib
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+
 from app.config import get_settings
 from app.security.logging_config import logger, log_security_event
 
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ModuleNotFoundError:  # Optional dependency; bans stay in process memory.
+    redis_asyncio = None
+
+    class RedisError(Exception):
+        """Placeholder so callers can catch Redis errors without redis installed."""
+
+
 settings = get_settings()
 
+# Código de producto al final de la ruta: /api/productos/v1/11253300, /products/123
+PRODUCT_CODE_PATTERN = re.compile(r"/product(?:o)?s/(?:.*/)?(\d+)/?$")
+
+# Ventanas de análisis (mismos umbrales que el análisis original)
+TIMING_INTERVALS = 19  # Intervalos entre las últimas 20 peticiones
+SEQUENTIAL_STEPS = 49  # Saltos entre los últimos 50 códigos de producto
+HIGH_FREQUENCY_REQUESTS = 50  # Más de 50 peticiones por minuto
+HISTORY_TTL_SECONDS = 3600  # Clientes inactivos 1 hora se olvidan
+
+
+class ClientStats:
+    """
+    Estadísticas incrementales de un cliente.
+
+    Cada petición actualiza buffers circulares (``deque(maxlen)``) y sumas
+    acumuladas, de modo que todas las heurísticas se evalúan en O(1).
+    """
+
+    __slots__ = (
+        "requests",
+        "last_seen",
+        "intervals",
+        "interval_sum",
+        "interval_sq_sum",
+        "recent",
+        "last_code",
+        "code_steps",
+        "small_steps",
+        "code_run",
+        "pattern_counts",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.last_seen: Optional[float] = None
+        # Intervalos entre peticiones con suma y suma de cuadrados (media/varianza)
+        self.intervals: deque = deque(maxlen=TIMING_INTERVALS)
+        self.interval_sum = 0.0
+        self.interval_sq_sum = 0.0
+        # Timestamps de las últimas 51 peticiones (frecuencia por minuto)
+        self.recent: deque = deque(maxlen=HIGH_FREQUENCY_REQUESTS + 1)
+        # Saltos entre códigos de producto consecutivos (True = salto pequeño)
+        self.last_code: Optional[int] = None
+        self.code_steps: deque = deque(maxlen=SEQUENTIAL_STEPS)
+        self.small_steps = 0
+        self.code_run = 0  # Longitud de la racha actual de saltos pequeños
+        self.pattern_counts: Dict[str, int] = {}
+
+    def record(self, now: float, endpoint: str) -> None:
+        """Actualiza todas las estadísticas con una nueva petición."""
+        self.requests += 1
+
+        if self.last_seen is not None:
+            interval = now - self.last_seen
+            if len(self.intervals) == self.intervals.maxlen:
+                oldest = self.intervals[0]
+                self.interval_sum -= oldest
+                self.interval_sq_sum -= oldest * oldest
+            self.intervals.append(interval)
+            self.interval_sum += interval
+            self.interval_sq_sum += interval * interval
+        self.last_seen = now
+        self.recent.append(now)
+
+        match = PRODUCT_CODE_PATTERN.search(endpoint)
+        if match:
+            code = int(match.group(1))
+            if self.last_code is not None:
+                small = 0 <= code - self.last_code <= 100
+                if len(self.code_steps) == self.code_steps.maxlen:
+                    self.small_steps -= self.code_steps[0]
+                self.code_steps.append(small)
+                self.small_steps += small
+                self.code_run = self.code_run + 1 if small else 0
+            self.last_code = code
+
+    def is_timing_perfect(self) -> bool:
+        """Intervalos < 200ms de media con desviación < 50ms (imposible para humanos)."""
+        count = len(self.intervals)
+        if self.requests < 10 or count < 10:
+            return False
+        mean = self.interval_sum / count
+        if mean >= 0.2:
+            return False
+        variance = max(0.0, self.interval_sq_sum / count - mean * mean)
+        return math.sqrt(variance) < 0.05
+
+    def is_sequential_access(self) -> bool:
+        """Más del 80% de saltos pequeños entre al menos 20 códigos de producto."""
+        if self.requests < 20:
+            return False
+        if self.code_run >= 20:
+            return True
+        steps = len(self.code_steps)
+        if steps < 19:  # Menos de 20 códigos
+            return False
+        return self.small_steps / steps > 0.8
+
+    def requests_last_minute(self, now: float) -> int:
+        """Peticiones en el último minuto, saturando en HIGH_FREQUENCY_REQUESTS + 1."""
+        cutoff = now - 60
+        if len(self.recent) == self.recent.maxlen and self.recent[0] > cutoff:
+            return len(self.recent)
+        return sum(1 for ts in self.recent if ts > cutoff)
+
+
+class _TimeWheel:
+    """
+    Rueda de tiempo para caducar identificadores inactivos.
+
+    Cada slot agrupa los identificadores vistos durante ``slot_seconds``. Al
+    avanzar el reloj solo se revisan los slots que salen de la ventana, en
+    lugar de recorrer todos los clientes en cada petición.
+    """
+
+    def __init__(self, ttl_seconds: float, slot_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.slot_seconds = slot_seconds
+        self._slots: Dict[int, set] = {}
+        self._oldest_slot: Optional[int] = None
+
+    def touch(self, key: str, now: float) -> None:
+        """Registra actividad de ``key`` en el slot actual."""
+        slot = int(now // self.slot_seconds)
+        self._slots.setdefault(slot, set()).add(key)
+        if self._oldest_slot is None:
+            self._oldest_slot = slot
+
+    def expire(self, now: float) -> List[str]:
+        """Devuelve los identificadores de los slots caducados (pueden seguir activos)."""
+        if self._oldest_slot is None:
+            return []
+        newest_expired = int((now - self.ttl_seconds) // self.slot_seconds) - 1
+        expired: List[str] = []
+        if newest_expired < self._oldest_slot:
+            return expired
+        if newest_expired - self._oldest_slot > len(self._slots):
+            # Salto largo del reloj: recorrer solo los slots existentes
+            for slot in [slot for slot in self._slots if slot <= newest_expired]:
+                expired.extend(self._slots.pop(slot))
+        else:
+            for slot in range(self._oldest_slot, newest_expired + 1):
+                expired.extend(self._slots.pop(slot, ()))
+        self._oldest_slot = min(self._slots) if self._slots else None
+        return expired
+
+
+class BanStore(ABC):
+    """
+    Interfaz de almacenamiento de bans y accesos a honeypots.
+
+    Los métodos son corrutinas para que un store remoto (Redis) no bloquee el
+    event loop en la ruta de cada petición.
+    """
+
+    @abstractmethod
+    async def get_ban(self, ip: str) -> Optional[float]:
+        """Retorna el timestamp de fin del ban (``inf`` si es permanente) o None."""
+
+    @abstractmethod
+    async def ban(self, ip: str, until: float) -> None:
+        """Banea ``ip`` hasta el timestamp ``until``."""
+
+    @abstractmethod
+    async def unban(self, ip: str) -> bool:
+        """Elimina el ban; True si existía."""
+
+    @abstractmethod
+    async def active_bans(self) -> List[str]:
+        """Lista de IPs con ban vigente."""
+
+    @abstractmethod
+    async def record_honeypot_access(self, ip: str) -> int:
+        """Incrementa y retorna los accesos a honeypots de ``ip``."""
+
+
+class InMemoryBanStore(BanStore):
+    """Bans en memoria del proceso (un worker)."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self.banned_ips: Dict[str, float] = {}
+        self.honeypot_accesses: Dict[str, int] = {}
+
+    async def get_ban(self, ip: str) -> Optional[float]:
+        until = self.banned_ips.get(ip)
+        if until is not None and until <= self._clock():
+            del self.banned_ips[ip]
+            return None
+        return until
+
+    async def ban(self, ip: str, until: float) -> None:
+        self.banned_ips[ip] = until
+
+    async def unban(self, ip: str) -> bool:
+        return self.banned_ips.pop(ip, None) is not None
+
+    async def active_bans(self) -> List[str]:
+        now = self._clock()
+        return [ip for ip, until in self.banned_ips.items() if until > now]
+
+    async def record_honeypot_access(self, ip: str) -> int:
+        self.honeypot_accesses[ip] = self.honeypot_accesses.get(ip, 0) + 1
+        return self.honeypot_accesses[ip]
+
+
+class RedisBanStore(BanStore):
+    """
+    Bans compartidos entre workers en Redis (cliente ``redis.asyncio``).
+
+    Cada ban es una clave con TTL (sin TTL si es permanente), así que Redis
+    elimina los bans expirados por sí mismo. Ante errores de Redis el detector
+    no bloquea peticiones (fail-open) y lo registra en el log.
+    """
+
+    HONEYPOT_TTL_SECONDS = 30 * 86400
+
+    def __init__(self, client, key_prefix: str = "api_disano:security"):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _ban_key(self, ip: str) -> str:
+        return f"{self.key_prefix}:ban:{ip}"
+
+    def _honeypot_key(self, ip: str) -> str:
+        return f"{self.key_prefix}:honeypot:{ip}"
+
+    async def get_ban(self, ip: str) -> Optional[float]:
+        try:
+            value = await self.client.get(self._ban_key(ip))
+        except RedisError as exc:
+            logger.warning(f"Ban store Redis no disponible: {exc}")
+            return None
+        return float(value) if value is not None else None
+
+    async def ban(self, ip: str, until: float) -> None:
+        try:
+            if math.isinf(until):
+                await self.client.set(self._ban_key(ip), "inf")
+            else:
+                ttl = max(1, math.ceil(until - time.time()))
+                await self.client.set(self._ban_key(ip), repr(until), ex=ttl)
+        except RedisError as exc:
+            logger.warning(f"No se pudo guardar el ban en Redis: {exc}")
+
+    async def unban(self, ip: str) -> bool:
+        try:
+            return bool(await self.client.delete(self._ban_key(ip)))
+        except RedisError as exc:
+            logger.warning(f"No se pudo eliminar el ban en Redis: {exc}")
+            return False
+
+    async def active_bans(self) -> List[str]:
+        prefix = self._ban_key("")
+        try:
+            return [
+                (key.decode() if isinstance(key, bytes) else key)[len(prefix) :]
+                async for key in self.client.scan_iter(match=f"{prefix}*")
+            ]
+        except RedisError as exc:
+            logger.warning(f"No se pudieron listar los bans en Redis: {exc}")
+            return []
+
+    async def record_honeypot_access(self, ip: str) -> int:
+        key = self._honeypot_key(ip)
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.incr(key)
+            pipeline.expire(key, self.HONEYPOT_TTL_SECONDS)
+            count, _ = await pipeline.execute()
+        except RedisError as exc:
+            logger.warning(f"No se pudo registrar el honeypot en Redis: {exc}")
+            return 0
+        return int(count)
+
+
+def create_ban_store() -> BanStore:
+    """Usa Redis si RATE_LIMIT_REDIS_URL está configurado; si no, memoria."""
+    if settings.rate_limit_redis_url and redis_asyncio is not None:
+        client = redis_asyncio.from_url(
+            settings.rate_limit_redis_url,
+            socket_timeout=settings.rate_limit_redis_timeout,
+            socket_connect_timeout=settings.rate_limit_redis_timeout,
+        )
+        return RedisBanStore(client)
+    return InMemoryBanStore()
+
 
 class ScrapingDetector:
     """
     Detector de patrones de scraping usando análisis heurístico.
 
-    Mantiene estadísticas en memoria de peticiones por IP/API key.
-    Para producción con múltiples workers, usar Redis en lugar de memoria.
+    Mantiene estadísticas incrementales por IP/API key y caduca los clientes
+    inactivos durante una hora mediante una rueda de tiempo.
 
     Atributos:
-        request_history: Historial de peticiones por identificador
-        pattern_counts: Contador de patrones sospechosos por identificador
-        honeypot_accesses: IPs que accedieron a honeypots
+        clients: Estadísticas por identificador
+        ban_store: Bans y accesos a honeypots (memoria o Redis)
 
     Ejemplo:
         detector = ScrapingDetector()
 
         # Analizar petición
-        if detector.is_suspicious_request(request):
+        if await detector.is_suspicious_request(request):
             logger.warning("Posible scraper detectado")
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        ban_store: Optional[BanStore] = None,
+        clock: Callable[[], float] = time.time,
+    ):
         """Inicializa el detector con estructuras de datos vacías."""
-        # Historial de peticiones: {identifier: [(timestamp, endpoint), ...]}
-        self.request_history: Dict[str, List[tuple]] = defaultdict(list)
-
-        # Contadores de patrones sospechosos: {identifier: {pattern: count}}
-        self.pattern_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-
-        # IPs bloqueadas temporalmente: {ip: unban_timestamp}
-        self.banned_ips: Dict[str, float] = {}
-
-        # Honeypot accesses: {ip: access_count}
-        self.honeypot_accesses: Dict[str, int] = {}
-
-        # Limpiar historiales antiguos periódicamente
-        self._cleanup_old_entries()
+        self._clock = clock
+        self.clients: Dict[str, ClientStats] = {}
+        self.ban_store = ban_store if ban_store is not None else create_ban_store()
+        self._expiry_wheel = _TimeWheel(ttl_seconds=HISTORY_TTL_SECONDS)
 
     def _get_identifier(self, request: Request) -> str:
         """
@@ -98,107 +396,19 @@ class ScrapingDetector:
             # Fallback a IP
             return f"ip:{request.client.host if request.client else 'unknown'}"
 
-    def _cleanup_old_entries(self):
-        """
-        Limpia entradas del historial más antiguas que 1 hora.
-
-        Se llama automáticamente en cada análisis para evitar
-        consumo excesivo de memoria.
-        """
-        cutoff_time = datetime.now() - timedelta(hours=1)
-
-        for identifier in list(self.request_history.keys()):
-            # Filtrar peticiones recientes
-            self.request_history[identifier] = [
-                (ts, endpoint)
-                for ts, endpoint in self.request_history[identifier]
-                if ts > cutoff_time
-            ]
-
-            # Eliminar identificador si no hay peticiones recientes
-            if not self.request_history[identifier]:
-                del self.request_history[identifier]
-
-    def _is_timing_perfect(self, request_history: List[tuple]) -> bool:
-        """
-        Detecta si las peticiones tienen timing perfecto (imposible para humanos).
-
-        Los humanos no pueden hacer peticiones a intervalos perfectos
-        de 100ms o menos. Los scrapers sí.
-
-        Args:
-            request_history: Lista de (timestamp, endpoint)
-
-        Returns:
-            bool: True si el timing es sospechosamente perfecto
+    def _cleanup_old_entries(self, now: Optional[float] = None) -> None:
         """
-        if len(request_history) < 10:
-            return False
-
-        # Calcular intervalos entre peticiones
-        intervals = []
-        for i in range(1, min(len(request_history), 20)):
-            interval = (request_history[i][0] - request_history[i - 1][0]).total_seconds()
-            intervals.append(interval)
-
-        # Si todos los intervalos son < 200ms y muy consistentes
-        if len(intervals) >= 10:
-            avg_interval = sum(intervals) / len(intervals)
-            if avg_interval < 0.2:  # Menos de 200ms promedio
-                # Calcular desviación estándar
-                variance = sum((x - avg_interval) ** 2 for x in intervals) / len(intervals)
-                std_dev = variance**0.5
-                # Si desviación estándar es baja → timing perfecto (scraper)
-                if std_dev < 0.05:
-                    return True
-
-        return False
+        Elimina clientes sin peticiones durante más de 1 hora.
 
-    def _is_sequential_access(self, request_history: List[tuple]) -> bool:
+        Solo revisa los identificadores de los slots caducados de la rueda
+        de tiempo, no todos los clientes.
         """
-        Detecta acceso secuencial a productos (1, 2, 3, 4...).
-
-        Los scrapers suelen acceder productos secuencialmente por código.
-        Los humanos suelen buscar productos específicos o usar filtros.
-
-        Args:
-            request_history: Lista de (timestamp, endpoint)
-
-        Returns:
-            bool: True si detecta patrón secuencial sospechoso
-        """
-        if len(request_history) < 20:
-            return False
-
-        # Extraer códigos de producto de endpoints
-        # Ejemplo: /v1/internal/products/11253300
-        import re
-
-        product_codes = []
-        pattern = r"/products/(\d+)"
-
-        for _, endpoint in request_history[-50:]:  # Últimas 50 peticiones
-            match = re.search(pattern, endpoint)
-            if match:
-                try:
-                    code = int(match.group(1))
-                    product_codes.append(code)
-                except ValueError:
-                    pass
-
-        # Verificar si los códigos son secuenciales
-        if len(product_codes) >= 20:
-            # Calcular diferencias entre códigos consecutivos
-            differences = [
-                product_codes[i + 1] - product_codes[i] for i in range(len(product_codes) - 1)
-            ]
-
-            # Si la mayoría de diferencias son pequeñas (0-100), es secuencial
-            small_diffs = sum(1 for d in differences if 0 <= d <= 100)
-            if small_diffs / len(differences) > 0.8:  # 80% secuenciales
-                return True
-
-        return False
+        now = self._clock() if now is None else now
+        cutoff = now - HISTORY_TTL_SECONDS
+        for identifier in self._expiry_wheel.expire(now):
+            stats = self.clients.get(identifier)
+            if stats is not None and stats.last_seen is not None and stats.last_seen <= cutoff:
+                del self.clients[identifier]
 
     def _has_no_referer(self, request: Request) -> bool:
         """
@@ -242,29 +452,31 @@ class ScrapingDetector:
             }
         """
         identifier = self._get_identifier(request)
-        current_time = datetime.now()
+        current_time = self._clock()
 
-        # Registrar petición en historial
-        endpoint = request.url.path
-        self.request_history[identifier].append((current_time, endpoint))
+        # Registrar petición en las estadísticas del cliente
+        stats = self.clients.get(identifier)
+        if stats is None:
+            stats = self.clients[identifier] = ClientStats()
+        stats.record(current_time, request.url.path)
+        self._expiry_wheel.touch(identifier, current_time)
 
-        # Limpiar entradas antiguas
-        self._cleanup_old_entries()
+        # Caducar clientes inactivos
+        self._cleanup_old_entries(current_time)
 
         # Analizar patrones
-        history = self.request_history[identifier]
         score = 0
         reasons = []
         patterns = {}
 
         # 1. Timing perfecto (máximo 30 puntos)
-        if self._is_timing_perfect(history):
+        if stats.is_timing_perfect():
             score += 30
             reasons.append("Perfect timing detected (bot-like)")
             patterns["perfect_timing"] = 30
 
         # 2. Acceso secuencial (máximo 40 puntos)
-        if self._is_sequential_access(history):
+        if stats.is_sequential_access():
             score += 40
             reasons.append("Sequential product access detected")
             patterns["sequential_access"] = 40
@@ -276,27 +488,24 @@ class ScrapingDetector:
             patterns["no_referer"] = 10
 
         # 4. Demasiadas peticiones en poco tiempo (máximo 20 puntos)
-        recent_count = len([ts for ts, _ in history if (current_time - ts).total_seconds() < 60])
-        if recent_count > 50:
+        recent_count = stats.requests_last_minute(current_time)
+        if recent_count > HIGH_FREQUENCY_REQUESTS:
             score += 20
-            reasons.append(f"Too many requests: {recent_count}/minute")
+            reasons.append(f"Too many requests: >{HIGH_FREQUENCY_REQUESTS}/minute")
             patterns["high_frequency"] = 20
 
         # Actualizar contadores
         for pattern, value in patterns.items():
-            self.pattern_counts[identifier][pattern] += value
+            stats.pattern_counts[pattern] = stats.pattern_counts.get(pattern, 0) + value
 
         # Determinar si es sospechoso (umbral: 70 puntos)
         is_suspicious = score >= 70
 
         if is_suspicious:
-            logger.warning(
-                f"Scraping detectado: {identifier} - Score: {score} - "
-                f"Razones: {', '.join(reasons)}"
-            )
             log_security_event(
                 event_type="scraping_detected",
-                details=f"Score: {score} - {', '.join(reasons)}",
+                details=f"client={identifier} | Score: {score} - {', '.join(reasons)}",
+                client_ip=request.client.host if request.client else "unknown",
                 api_key=identifier.split(":")[1] if "apikey:" in identifier else "none",
             )
 
@@ -307,7 +516,7 @@ class ScrapingDetector:
             "patterns": patterns,
         }
 
-    def is_suspicious_request(self, request: Request) -> bool:
+    async def is_suspicious_request(self, request: Request) -> bool:
         """
         Verifica rápidamente si una petición es sospechosa.
 
@@ -322,14 +531,10 @@ class ScrapingDetector:
         if not settings.scraping_detection_enabled:
             return False
 
-        # Verificar si IP está baneada
+        # Verificar si IP está baneada (el store descarta bans expirados)
         client_ip = request.client.host if request.client else "unknown"
-        if client_ip in self.banned_ips:
-            # Verificar si ban ha expirado
-            if datetime.now().timestamp() > self.banned_ips[client_ip]:
-                del self.banned_ips[client_ip]
-            else:
-                return True
+        if await self.ban_store.get_ban(client_ip) is not None:
+            return True
 
         # Análisis completo
         analysis = self.analyze_request(request)
@@ -337,12 +542,12 @@ class ScrapingDetector:
         # Si es muy sospechoso, banear IP temporalmente
         if analysis["score"] >= 90:
             ban_duration = settings.ban_duration_first_offense
-            self.banned_ips[client_ip] = datetime.now().timestamp() + ban_duration
+            await self.ban_store.ban(client_ip, self._clock() + ban_duration)
             logger.warning(f"IP baneada temporalmente: {client_ip} - Duración: {ban_duration}s")
 
         return analysis["is_suspicious"]
 
-    def is_honeypot_access(self, request: Request) -> bool:
+    async def is_honeypot_access(self, request: Request) -> bool:
         """
         Verifica si la petición accede a un endpoint honeypot.
 
@@ -371,25 +576,25 @@ class ScrapingDetector:
 
         if any(request.url.path.startswith(path) for path in honeypot_paths):
             client_ip = request.client.host if request.client else "unknown"
-            self.honeypot_accesses[client_ip] = self.honeypot_accesses.get(client_ip, 0) + 1
+            accesses = await self.ban_store.record_honeypot_access(client_ip)
 
-            logger.warning(f"HONEYPOT accedido: {request.url.path} desde {client_ip}")
             log_security_event(
                 event_type="honeypot_access",
                 details=f"Honeypot: {request.url.path}",
+                client_ip=client_ip,
                 api_key="none",
             )
 
             # Banear permanentemente tras 2 accesos a honeypot
-            if self.honeypot_accesses[client_ip] >= 2:
-                self.banned_ips[client_ip] = float("inf")  # Ban permanente
+            if accesses >= 2:
+                await self.ban_store.ban(client_ip, float("inf"))  # Ban permanente
                 logger.error(f"IP baneada permanentemente por honeypot: {client_ip}")
 
             return True
 
         return False
 
-    def get_banned_ips(self) -> List[str]:
+    async def get_banned_ips(self) -> List[str]:
         """
         Retorna lista de IPs baneadas actualmente.
 
@@ -398,18 +603,9 @@ class ScrapingDetector:
 
         Nota: Incluye tanto bans temporales como permanentes
         """
-        current_time = datetime.now().timestamp()
-
-        # Filtrar bans expirados
-        active_bans = [
-            ip
-            for ip, expiry in self.banned_ips.items()
-            if expiry > current_time or expiry == float("inf")
-        ]
-
-        return active_bans
+        return await self.ban_store.active_bans()
 
-    def unban_ip(self, ip: str) -> bool:
+    async def unban_ip(self, ip: str) -> bool:
         """
         Elimina el ban de una IP específica.
 
@@ -419,8 +615,7 @@ class ScrapingDetector:
         Returns:
             bool: True si la IP estaba baneada y fue desbloqueada
         """
-        if ip in self.banned_ips:
-            del self.banned_ips[ip]
+        if await self.ban_store.unban(ip):
             logger.info(f"IP desbloqueada: {ip}")
             return True
         return False
@@ -0,0 +1,186 @@
+"""
+Rate limiter de ventana deslizante con memoria acotada.
+=======================================================
+
+Implementa el algoritmo "sliding window counter": por cada cliente se guardan
+dos contadores (ventana actual y anterior) en lugar de la lista completa de
+timestamps. El número de peticiones en el último minuto se estima como::
+
+    anterior * (1 - fracción_transcurrida) + actual
+
+Cada petición cuesta O(1) en tiempo y memoria, con independencia del límite.
+
+Memoria acotada:
+    - Los clientes inactivos durante dos ventanas se eliminan; su estado ya
+      equivale a "sin peticiones", así que la expulsión no cambia decisiones.
+    - ``max_keys`` fija un techo de clientes. Al superarlo se descarta el menos
+      reciente (LRU), que en el peor caso recibe una ventana nueva.
+
+Uso:
+    from app.security.sliding_window import SlidingWindowRateLimiter
+
+    limiter = SlidingWindowRateLimiter(limit=60, window=60)
+    decision = limiter.hit(client_id)
+    if not decision.allowed:
+        ...  # 429 con Retry-After = decision.retry_after
+"""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Resultado de registrar una petición en el rate limiter."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    @property
+    def used(self) -> int:
+        """Peticiones estimadas en la ventana, incluida la actual si se admitió."""
+        return self.limit - self.remaining
+
+
+def window_decision(
+    limit: int, current: int, previous: int, elapsed: float, window: float
+) -> RateLimitDecision:
+    """
+    Decide one request from the counters of the current and previous window.
+
+    Args:
+        limit: Peticiones permitidas por ventana
+        current: Peticiones ya admitidas en la ventana actual
+        previous: Peticiones admitidas en la ventana anterior
+        elapsed: Fracción transcurrida de la ventana actual (0-1)
+        window: Duración de la ventana en segundos
+
+    Returns:
+        RateLimitDecision; si se admite, ``remaining`` ya descuenta esta petición
+    """
+    reset_after = (1 - elapsed) * window
+    estimated = previous * (1 - elapsed) + current
+
+    if estimated + 1 <= limit:
+        return RateLimitDecision(
+            allowed=True,
+            limit=limit,
+            remaining=max(0, math.floor(limit - estimated - 1)),
+            reset_after=reset_after,
+        )
+
+    # Segundos hasta que el peso de la ventana anterior deje sitio a una petición
+    retry_after = reset_after
+    if previous and current + 1 <= limit:
+        free_at = 1 - (limit - current - 1) / previous
+        retry_after = max(0.0, (free_at - elapsed) * window)
+
+    return RateLimitDecision(
+        allowed=False,
+        limit=limit,
+        remaining=0,
+        reset_after=reset_after,
+        retry_after=retry_after,
+    )
+
+
+class _WindowCounter:
+    """Contadores de la ventana actual y la anterior de un cliente."""
+
+    __slots__ = ("window_index", "current", "previous", "last_seen")
+
+    def __init__(self, window_index: int, now: float):
+        self.window_index = window_index
+        self.current = 0
+        self.previous = 0
+        self.last_seen = now
+
+
+class SlidingWindowRateLimiter:
+    """
+    Rate limiter "sliding window counter" con expulsión LRU de clientes.
+
+    No es thread-safe: está pensado para usarse desde el event loop, igual que
+    los middlewares que lo consumen.
+
+    Args:
+        limit: Peticiones permitidas por ventana (puede sobrescribirse por llamada)
+        window: Duración de la ventana en segundos
+        max_keys: Máximo de clientes con estado en memoria
+        clock: Función de tiempo (epoch en segundos)
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float = 60.0,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.idle_timeout = 2 * window
+        self._clock = clock
+        self._counters: "OrderedDict[str, _WindowCounter]" = OrderedDict()
+
+    def hit(
+        self, key: str, limit: Optional[int] = None, now: Optional[float] = None
+    ) -> RateLimitDecision:
+        """Registra una petición de ``key`` y devuelve si está permitida."""
+        limit = self.limit if limit is None else limit
+        now = self._clock() if now is None else now
+        window_index = int(now // self.window)
+
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = _WindowCounter(window_index, now)
+            self._counters[key] = counter
+        else:
+            self._counters.move_to_end(key)
+            self._roll(counter, window_index)
+        counter.last_seen = now
+
+        elapsed = (now - window_index * self.window) / self.window
+        decision = window_decision(limit, counter.current, counter.previous, elapsed, self.window)
+        if decision.allowed:
+            counter.current += 1
+
+        self._evict(now)
+        return decision
+
+    def _roll(self, counter: _WindowCounter, window_index: int) -> None:
+        """Avanza los contadores de un cliente a la ventana ``window_index``."""
+        if counter.window_index == window_index:
+            return
+        counter.previous = counter.current if counter.window_index == window_index - 1 else 0
+        counter.current = 0
+        counter.window_index = window_index
+
+    def _evict(self, now: float) -> None:
+        """Elimina clientes inactivos y aplica el techo de memoria (O(1) amortizado)."""
+        counters = self._counters
+        idle_before = now - self.idle_timeout
+        while counters:
+            oldest = next(iter(counters.values()))
+            if oldest.last_seen > idle_before:
+                break
+            counters.popitem(last=False)
+        while len(counters) > self.max_keys:
+            counters.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._counters
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def clear(self) -> None:
+        """Olvida el estado de todos los clientes."""
+        self._counters.clear()
@@ -34,7 +34,7 @@ Uso:
 
 from fastapi import Request
 from app.config import get_settings
-from app.security.logging_config import logger, log_security_event
+from app.security.logging_config import log_security_event
 
 settings = get_settings()
 
@@ -62,13 +62,14 @@ def is_user_agent_allowed(request: Request) -> bool:
         # → Returns True
     """
     user_agent = request.headers.get("user-agent", "")
+    client_ip = request.client.host if request.client else "unknown"
 
     # Si no hay user-agent, bloquear (suspiccioso)
     if not user_agent:
-        logger.warning(f"Petición sin User-Agent desde {request.client.host}")
         log_security_event(
             event_type="blocked_user_agent",
             details="No User-Agent provided",
+            client_ip=client_ip,
             api_key="none",
         )
         return False
@@ -79,19 +80,15 @@ def is_user_agent_allowed(request: Request) -> bool:
     # Verificar contra la lista de User-Agents bloqueados
     for blocked_pattern in settings.blocked_user_agents:
         if blocked_pattern.lower() in user_agent_lower:
-            logger.warning(
-                f"User-Agent bloqueado: {user_agent} "
-                f"(contiene '{blocked_pattern}') desde {request.client.host}"
-            )
             log_security_event(
                 event_type="blocked_user_agent",
-                details=f"Blocked pattern: {blocked_pattern}",
+                details=f"Blocked pattern: {blocked_pattern} | user_agent={user_agent}",
+                client_ip=client_ip,
                 api_key="none",
             )
             return False
 
-    # User-Agent permitido
-    logger.debug(f"User-Agent permitido: {user_agent}")
+    # User-Agent permitido (sin log: es el camino de cada petición legítima)
     return True
 
 
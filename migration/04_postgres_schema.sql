@@ -137,25 +137,37 @@ BEGIN
     END IF;
 END $$;
 
-CREATE OR REPLACE VIEW productos_clean AS
-SELECT
-    "CÓDIGO" AS codigo,
-    "DESCRIPCION" AS descripcion,
-    "MARCA" AS marca,
-    "Familia_WEB" AS familia,
-    "descripcion_corta" AS descripcion_corta,
-    "PVP_26_01_26" AS pvp,
-    "bc3_descripcion_corta" AS bc3_descripcion_corta,
-    "bc3_descripcion_completa" AS bc3_descripcion_completa,
-    "bc3_descripcion_larga" AS bc3_descripcion_larga,
-    "bc3_product_type" AS bc3_product_type,
-    "bc3_processed_at" AS bc3_processed_at,
-    "CÓDIGO WEB" AS codigo_web,
-    "REFERENCIA" AS referencia,
-    "EAN 13" AS ean_13,
-    "imagen" AS imagen,
-    "img_url" AS img_url,
-    "RAEE_A" AS raee_a,
-    "RAEE_L" AS raee_l,
-    "RAEE_T" AS raee_t
-FROM "productos";
+-- Left alone once 05_materialize_productos_clean.sql has materialized it.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_matviews
+        WHERE schemaname = current_schema() AND matviewname = 'productos_clean'
+    ) THEN
+        EXECUTE $view$
+        CREATE OR REPLACE VIEW productos_clean AS
+        SELECT
+            "CÓDIGO" AS codigo,
+            "DESCRIPCION" AS descripcion,
+            "MARCA" AS marca,
+            "Familia_WEB" AS familia,
+            "descripcion_corta" AS descripcion_corta,
+            "PVP_26_01_26" AS pvp,
+            "bc3_descripcion_corta" AS bc3_descripcion_corta,
+            "bc3_descripcion_completa" AS bc3_descripcion_completa,
+            "bc3_descripcion_larga" AS bc3_descripcion_larga,
+            "bc3_product_type" AS bc3_product_type,
+            "bc3_processed_at" AS bc3_processed_at,
+            "CÓDIGO WEB" AS codigo_web,
+            "REFERENCIA" AS referencia,
+            "EAN 13" AS ean_13,
+            "imagen" AS imagen,
+            "img_url" AS img_url,
+            "RAEE_A" AS raee_a,
+            "RAEE_L" AS raee_l,
+            "RAEE_T" AS raee_t
+        FROM "productos"
+        $view$;
+    END IF;
+END $$;
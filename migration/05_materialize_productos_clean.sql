@@ -0,0 +1,67 @@
+-- Optional: materialize productos_clean with its own indexes.
+-- Run after 04_postgres_schema.sql. Safe to re-run.
+--
+-- The productos_clean view renames the raw quoted columns ("Familia_WEB",
+-- "PVP_26_01_26", ...), so the catalogue queries cannot rely on the raw
+-- indexes of create_indexes.py. As a materialized view, productos_clean
+-- is a plain relation with indexes on its own column names.
+--
+-- It is refreshed with REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are
+-- never blocked) after postgres_local_migrate.py imports and after every BC3
+-- enrichment commit that updates products. The unique index on codigo is
+-- required by the concurrent refresh.
+--
+-- Rollback: DROP MATERIALIZED VIEW productos_clean; then re-run 04.
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_views
+        WHERE schemaname = current_schema() AND viewname = 'productos_clean'
+    ) THEN
+        DROP VIEW productos_clean;
+    END IF;
+END $$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS productos_clean AS
+SELECT
+    "CÓDIGO" AS codigo,
+    "DESCRIPCION" AS descripcion,
+    "MARCA" AS marca,
+    "Familia_WEB" AS familia,
+    "descripcion_corta" AS descripcion_corta,
+    "PVP_26_01_26" AS pvp,
+    "bc3_descripcion_corta" AS bc3_descripcion_corta,
+    "bc3_descripcion_completa" AS bc3_descripcion_completa,
+    "bc3_descripcion_larga" AS bc3_descripcion_larga,
+    "bc3_product_type" AS bc3_product_type,
+    "bc3_processed_at" AS bc3_processed_at,
+    "CÓDIGO WEB" AS codigo_web,
+    "REFERENCIA" AS referencia,
+    "EAN 13" AS ean_13,
+    "imagen" AS imagen,
+    "img_url" AS img_url,
+    "RAEE_A" AS raee_a,
+    "RAEE_L" AS raee_l,
+    "RAEE_T" AS raee_t
+FROM "productos";
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_productos_clean_codigo
+    ON productos_clean (codigo);
+CREATE INDEX IF NOT EXISTS idx_productos_clean_marca
+    ON productos_clean (marca);
+CREATE INDEX IF NOT EXISTS idx_productos_clean_familia
+    ON productos_clean (familia);
+CREATE INDEX IF NOT EXISTS idx_productos_clean_marca_familia
+    ON productos_clean (marca, familia);
+CREATE INDEX IF NOT EXISTS idx_productos_clean_pvp
+    ON productos_clean (pvp);
+CREATE INDEX IF NOT EXISTS idx_productos_clean_bc3_type
+    ON productos_clean (bc3_product_type);
+
+COMMIT;
+
+ANALYZE productos_clean;
@@ -0,0 +1,38 @@
+-- Optional: precomputed per-family statistics (familia_stats).
+-- Run after 04_postgres_schema.sql, then set FAMILIA_STATS_ENABLED=true.
+-- Safe to re-run.
+--
+-- The family endpoints otherwise run GROUP BY familia with SUM(CASE ...) over
+-- every product on each request. familia_stats holds one row per family
+-- (plus one row with familia NULL for unassigned products, so the global
+-- totals stay exact). It is refreshed with REFRESH MATERIALIZED VIEW
+-- CONCURRENTLY together with productos_clean: after postgres_local_migrate.py
+-- imports and after every BC3 enrichment commit that updates products.
+--
+-- Rollback: set FAMILIA_STATS_ENABLED=false, then DROP MATERIALIZED VIEW familia_stats;
+
+BEGIN;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS familia_stats AS
+SELECT
+    "Familia_WEB" AS familia,
+    COUNT(*) AS total_productos,
+    COUNT("bc3_descripcion_corta") AS con_bc3,
+    COUNT("descripcion_corta") AS con_imagen,
+    COUNT("bc3_descripcion_corta")::DOUBLE PRECISION / COUNT(*) AS bc3_coverage
+FROM "productos"
+GROUP BY "Familia_WEB";
+
+-- Single-row lookups by name; also required by the concurrent refresh
+CREATE UNIQUE INDEX IF NOT EXISTS idx_familia_stats_familia
+    ON familia_stats (familia);
+-- Family listings in byte order (COLLATE "C", as in FamiliaRepository)
+CREATE INDEX IF NOT EXISTS idx_familia_stats_familia_c
+    ON familia_stats (familia COLLATE "C");
+-- BC3 coverage leaderboard (top-N)
+CREATE INDEX IF NOT EXISTS idx_familia_stats_bc3_coverage
+    ON familia_stats (bc3_coverage DESC, familia);
+
+COMMIT;
+
+ANALYZE familia_stats;
@@ -0,0 +1,63 @@
+-- Change log of the productos table for incremental BC3 sync.
+-- Run after 04_postgres_schema.sql (PostgreSQL 13+). Safe to re-run.
+--
+-- Triggers append one row per changed product: 'upsert' for inserts and
+-- updates that actually modify the row, 'delete' for deletions (and for the
+-- old code when CÓDIGO itself changes). Re-importing identical rows with
+-- postgres_local_migrate.py therefore logs nothing.
+--
+-- GET /api/productos/bc3/v1/changes pages through the log in
+-- (txid, change_id) order and only returns rows of transactions older than
+-- the oldest one still running, so a slow transaction that commits after a
+-- faster one can never be skipped by a client's watermark.
+--
+-- TRUNCATE is not logged: after truncating productos, clients must re-run a
+-- full export.
+--
+-- Rollback:
+--   DROP TRIGGER producto_changes_log ON "productos";
+--   DROP TRIGGER producto_changes_log_update ON "productos";
+--   DROP FUNCTION log_producto_change();
+--   DROP TABLE producto_changes;
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS producto_changes (
+    change_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    -- Writing transaction; xid8 as bigint for plain comparisons
+    txid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::TEXT::BIGINT),
+    codigo TEXT NOT NULL,
+    operation TEXT NOT NULL CHECK (operation IN ('upsert', 'delete')),
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Keyset paging of the changes endpoint
+CREATE INDEX IF NOT EXISTS ix_producto_changes_txid_change_id
+    ON producto_changes (txid, change_id);
+
+CREATE OR REPLACE FUNCTION log_producto_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE'
+        OR (TG_OP = 'UPDATE' AND OLD."CÓDIGO" IS DISTINCT FROM NEW."CÓDIGO") THEN
+        INSERT INTO producto_changes (codigo, operation) VALUES (OLD."CÓDIGO", 'delete');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO producto_changes (codigo, operation) VALUES (NEW."CÓDIGO", 'upsert');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS producto_changes_log ON "productos";
+CREATE TRIGGER producto_changes_log
+    AFTER INSERT OR DELETE ON "productos"
+    FOR EACH ROW EXECUTE FUNCTION log_producto_change();
+
+DROP TRIGGER IF EXISTS producto_changes_log_update ON "productos";
+CREATE TRIGGER producto_changes_log_update
+    AFTER UPDATE ON "productos"
+    FOR EACH ROW
+    WHEN (OLD.* IS DISTINCT FROM NEW.*)
+    EXECUTE FUNCTION log_producto_change();
+
+COMMIT;
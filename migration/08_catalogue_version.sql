@@ -0,0 +1,38 @@
+-- Catalogue version counter for HTTP conditional GET (ETag / Last-Modified).
+-- Run after 04_postgres_schema.sql, then set HTTP_ETAGS_ENABLED=true.
+-- Safe to re-run.
+--
+-- catalogue_version holds a single row. A statement-level trigger increments
+-- it, inside the writing transaction, on every INSERT, UPDATE, DELETE or
+-- TRUNCATE of productos, whoever the writer is (API, postgres_local_migrate.py,
+-- psql). refresh_catalogue_views() increments it as well, since refreshing
+-- productos_clean or familia_stats changes what the endpoints return.
+--
+-- Rollback: set HTTP_ETAGS_ENABLED=false, then
+--   DROP TRIGGER catalogue_version_bump ON "productos";
+--   DROP FUNCTION bump_catalogue_version();
+--   DROP TABLE catalogue_version;
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS catalogue_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+INSERT INTO catalogue_version (id, version) VALUES (TRUE, 1) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_catalogue_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE catalogue_version SET version = version + 1, updated_at = clock_timestamp();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS catalogue_version_bump ON "productos";
+CREATE TRIGGER catalogue_version_bump
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "productos"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version();
+
+COMMIT;
@@ -62,6 +62,12 @@ PRODUCT_COLUMNS = [
     "bc3_descripcion_completa",
 ]
 SCHEMA_PATH = Path(__file__).with_name("04_postgres_schema.sql")
+# Materialized by the optional migrations 05 (productos_clean) and 06 (familia_stats)
+CATALOGUE_VIEWS = ("productos_clean", "familia_stats")
+MATERIALIZED_VIEWS_SQL = (
+    "SELECT matviewname FROM pg_matviews "
+    "WHERE schemaname = current_schema() AND matviewname = ANY(%s)"
+)
 LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
 
 
@@ -435,6 +441,12 @@ def import_products(
             )
             if not result.is_valid or source_count != imported:
                 raise RuntimeError("source/target row verification failed")
+
+            cursor.execute(MATERIALIZED_VIEWS_SQL, (list(CATALOGUE_VIEWS),))
+            present = {row[0] for row in cursor.fetchall()}
+            for view in CATALOGUE_VIEWS:
+                if view in present:
+                    cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
         return imported
     except Exception:
         if not getattr(pg_connection, "closed", False):
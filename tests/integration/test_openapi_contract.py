@@ -92,6 +92,7 @@ def test_openapi_lists_public_and_private_read_contracts_with_pagination() -> No
         "pagination",
         "filters_applied",
         "sorting_applied",
+        "facets",
     }
     assert set(public_item["properties"]) & {
         "codigo",
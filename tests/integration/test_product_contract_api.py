@@ -59,7 +59,7 @@ class PublicProductService:
         self.pagination_request = None
         self.filters = None
 
-    def buscar_productos_paginado(self, request, filters):
+    def buscar_productos_paginado(self, request, filters, facets=None):
         self.pagination_request = request
         self.filters = filters
         return PaginatedResponseDTO(
@@ -0,0 +1,115 @@
+"""Per-request overhead of the security middleware stack.
+
+Compares the previous chain of ``BaseHTTPMiddleware`` layers with the
+pure-ASGI ``SecurityPipelineMiddleware``, calling the ASGI apps directly so
+the numbers exclude any HTTP client cost.
+
+Run with ``pytest tests/performance/test_security_pipeline_benchmark.py -s``
+to print the timings.
+"""
+
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from app import middleware as module
+from app.middleware import (
+    APIKeyMiddleware,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+    SecurityPipelineMiddleware,
+    UserAgentMiddleware,
+)
+
+NUM_REQUESTS = 2000
+
+
+def _base_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return PlainTextResponse("ok")
+
+    return app
+
+
+def _legacy_chain() -> FastAPI:
+    app = _base_app()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(APIKeyMiddleware)
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(UserAgentMiddleware)
+    return app
+
+
+def _pipeline() -> FastAPI:
+    app = _base_app()
+    app.add_middleware(SecurityPipelineMiddleware, enforce_access=True)
+    return app
+
+
+async def _drive(app, num_requests: int) -> float:
+    """Return the mean time per request in microseconds."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/items",
+        "raw_path": b"/api/items",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"user-agent", b"Mozilla/5.0 Chrome/120.0"),
+            (b"x-api-key", b"bench-key"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        return None
+
+    started = time.perf_counter()
+    for _ in range(num_requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / num_requests * 1_000_000
+
+
+def test_pure_asgi_pipeline_overhead_is_lower(monkeypatch):
+    """The single pure-ASGI layer costs less per request than the chained stack."""
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("API_KEYS", "bench-key")
+    monkeypatch.setattr(module, "get_rate_limit", lambda: 10**9)
+
+    async def run():
+        results = {}
+        for name, app in (
+            ("bare", _base_app()),
+            ("legacy", _legacy_chain()),
+            ("pipeline", _pipeline()),
+        ):
+            await _drive(app, 200)  # warm up (middleware stack build, caches)
+            module.rate_limit_store.clear()
+            results[name] = await _drive(app, NUM_REQUESTS)
+        return results
+
+    results = asyncio.run(run())
+    module.rate_limit_store.clear()
+
+    legacy_overhead = results["legacy"] - results["bare"]
+    pipeline_overhead = results["pipeline"] - results["bare"]
+    print(
+        f"\nbare {results['bare']:.1f}us | "
+        f"legacy chain +{legacy_overhead:.1f}us | "
+        f"pure ASGI pipeline +{pipeline_overhead:.1f}us per request"
+    )
+
+    assert results["pipeline"] < results["legacy"]
@@ -92,6 +92,11 @@ class TestFamiliaService:
             ),
         ]
 
+        # Default interface implementation: sort every family
+        mock_repo.get_bc3_coverage_leaderboard.side_effect = (
+            lambda limit: FamiliaRepositoryInterface.get_bc3_coverage_leaderboard(mock_repo, limit)
+        )
+
         service = FamiliaService(mock_repo)
         leaderboard = service.get_bc3_coverage_leaderboard(limit=2)
 
@@ -99,6 +104,7 @@ class TestFamiliaService:
         assert leaderboard[0].nombre == "Emergencia"  # Highest BC3 coverage
         assert leaderboard[1].nombre == "Interiores"
         mock_repo.get_all.assert_called_once()
+        mock_repo.get_bc3_coverage_leaderboard.assert_called_once_with(2)
 
     def test_bc3_coverage_calculation(self):
         """Test that BC3 coverage is calculated correctly."""
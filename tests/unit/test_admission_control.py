@@ -0,0 +1,165 @@
+"""Tests for AIMD admission control, stale-cache fallback and 503 mapping."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.domain.exceptions.overload import ServiceOverloadedException
+from app.infrastructure.cache.cache_manager import CacheManager
+from app.infrastructure.database import admission as admission_module
+from app.infrastructure.database.admission import AdmissionController, AIMDLimiter
+from app.interfaces.http.error_handlers import register_exception_handlers
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_limit_grows_additively_and_halves_on_slow_queries():
+    """Fast queries raise the limit by ~1 per round; a slow one halves it."""
+    clock = FakeClock()
+    limiter = AIMDLimiter("productos", initial_limit=4, max_limit=20, clock=clock)
+
+    for _ in range(5):
+        limiter.release(limiter.try_acquire())
+    assert limiter.limit == 5  # +1/limit per fast query: about +1 per round
+
+    started = limiter.try_acquire()
+    clock.now += 2.0
+    limiter.release(started)
+
+    assert limiter.limit == 2
+    assert limiter.decreases == 1
+
+
+def test_congestion_episode_decreases_only_once():
+    """Queries already in flight when the limit was cut do not cut it again."""
+    clock = FakeClock()
+    limiter = AIMDLimiter("productos", initial_limit=8, clock=clock)
+    in_flight = [limiter.try_acquire() for _ in range(4)]
+
+    clock.now += 1.0
+    for started in in_flight:
+        limiter.release(started)
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_controller_rejects_above_limit_without_waiting():
+    """Once the class limit is in flight, new requests fail fast."""
+    controller = AdmissionController(initial_limit=1, retry_after=3)
+
+    with controller.admit("productos"):
+        with pytest.raises(ServiceOverloadedException) as excinfo:
+            with controller.admit("productos"):
+                pass
+        # Other endpoint classes keep their own budget
+        with controller.admit("familias"):
+            pass
+
+    assert excinfo.value.retry_after == 3
+    state = controller.get_state()["classes"]["productos"]
+    assert state["rejected"] == 1
+    assert state["in_flight"] == 0
+
+
+def test_pool_timeout_is_reported_as_overload():
+    """A pool checkout timeout becomes a 503-able rejection and shrinks the limit."""
+    controller = AdmissionController(initial_limit=8)
+
+    with pytest.raises(ServiceOverloadedException):
+        with controller.admit("bc3"):
+            raise PoolTimeoutError("QueuePool limit reached")
+
+    assert controller.limiter("bc3").limit == 4
+
+
+def test_stale_entries_served_within_grace_window(monkeypatch):
+    """Expired entries stay readable through get_stale() for the grace period."""
+    now = [1000.0]
+    monkeypatch.setattr("app.infrastructure.cache.cache_manager.time.time", lambda: now[0])
+    cache = CacheManager(stale_grace=60)
+    cache.set("key", {"total": 1}, ttl=10)
+
+    now[0] += 30
+    assert cache.get("key") is None
+    assert cache.get_stale("key") == {"total": 1}
+
+    now[0] += 60
+    assert cache.get("key") is None
+    assert cache.get_stale("key") is None
+
+
+def test_repository_falls_back_to_stale_page(monkeypatch):
+    """When admission rejects a cache miss, the repository serves the stale page."""
+    from app.infrastructure.cache import pagination_cache
+    from app.infrastructure.repositories.familia import SQLAlchemyFamiliaRepository
+
+    now = [1000.0]
+    monkeypatch.setattr("app.infrastructure.cache.cache_manager.time.time", lambda: now[0])
+    wrapper = pagination_cache.PaginationCacheWrapper()
+    wrapper.cache_manager = CacheManager(stale_grace=300)
+    monkeypatch.setattr(pagination_cache, "_global_pagination_cache", wrapper)
+
+    controller = AdmissionController(initial_limit=1, max_limit=1)
+    monkeypatch.setattr(admission_module, "_global_admission_controller", controller)
+
+    row = {
+        "nombre": "DOWNLIGHT",
+        "total_productos": 3,
+        "con_bc3": 1,
+        "con_imagen": 0,
+        "descontinuados": 0,
+    }
+    wrapper.set("familias", 1, 10, None, {}, {"entities": [row], "total": 1}, ttl=10)
+    now[0] += 20  # fresh TTL expired, still inside the grace window
+
+    repository = SQLAlchemyFamiliaRepository(session=None)
+    dto = {"page": 1, "per_page": 10, "filters": {}}
+    with controller.admit("familias"):  # saturate the familias budget
+        entities, total = repository.buscar_familias_paginado(dto)
+
+    assert total == 1
+    assert entities[0].nombre == "DOWNLIGHT"
+
+    with controller.admit("familias"):
+        with pytest.raises(ServiceOverloadedException):
+            repository.buscar_familias_paginado({**dto, "page": 2})
+
+
+def test_overload_maps_to_503_with_retry_after():
+    """The exception handler answers 503 and tells the client when to retry."""
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.get("/busy")
+    async def busy():
+        raise ServiceOverloadedException("productos", retry_after=2)
+
+    response = TestClient(app).get("/busy")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert response.json()["details"]["endpoint_class"] == "productos"
+
+
+def test_pool_health_reports_admission_state(monkeypatch):
+    """monitor_pool_health exposes the per-class limiter state."""
+    from app.infrastructure.database import connection
+
+    controller = AdmissionController(initial_limit=1)
+    monkeypatch.setattr(admission_module, "_global_admission_controller", controller)
+
+    with controller.admit("productos"):
+        health = connection.monitor_pool_health()
+
+    assert health["admission"]["classes"]["productos"]["saturated"] is True
+    assert any("productos" in item for item in health["recommendations"])
@@ -0,0 +1,86 @@
+"""Tests for the incremental BC3 sync over the productos change log."""
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.domain.exceptions.not_found import ValidationException
+from app.domain.services.producto import (
+    ProductoService,
+    decode_change_token,
+    encode_change_token,
+)
+from app.infrastructure.models.producto import ProductoRawModel
+from app.infrastructure.models.producto_change import ProductoChangeModel
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+# (txid, codigo, operation), in log order; 003 was deleted again
+CHANGES = [
+    (10, "001", "upsert"),
+    (11, "002", "upsert"),
+    (11, "003", "upsert"),
+    (12, "001", "upsert"),
+    (13, "003", "delete"),
+    (14, "004", "delete"),
+]
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    ProductoRawModel.__table__.create(engine)
+    ProductoChangeModel.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(ProductoRawModel.__table__),
+            [
+                {"CÓDIGO": codigo, "MARCA": "A", "DESCRIPCION": f"p{codigo}"}
+                for codigo in ("001", "002")
+            ],
+        )
+        conn.execute(
+            insert(ProductoChangeModel.__table__),
+            [
+                {"txid": txid, "codigo": codigo, "operation": operation}
+                for txid, codigo, operation in CHANGES
+            ],
+        )
+    with Session(engine) as session:
+        yield ProductoService(SQLAlchemyProductoRepository(session))
+
+
+def test_without_token_returns_current_position(service):
+    result = service.listar_cambios_privado()
+
+    assert result["upserts"] == [] and result["deletes"] == []
+    assert decode_change_token(result["next_token"]) == (14, 6)
+
+
+def test_changes_collapse_to_latest_state(service):
+    """Each product appears once; an upsert whose row is gone is a delete."""
+    result = service.listar_cambios_privado(encode_change_token((0, 0)))
+
+    assert [item.codigo for item in result["upserts"]] == ["002", "001"]
+    assert result["deletes"] == ["003", "004"]
+    assert result["has_more"] is False
+    assert decode_change_token(result["next_token"]) == (14, 6)
+
+
+def test_keyset_pages_resume_after_token(service):
+    first = service.listar_cambios_privado(encode_change_token((0, 0)), limit=2)
+    second = service.listar_cambios_privado(first["next_token"], limit=2)
+    last = service.listar_cambios_privado(second["next_token"], limit=2)
+    caught_up = service.listar_cambios_privado(last["next_token"], limit=2)
+
+    assert first["has_more"] and second["has_more"] and not last["has_more"]
+    assert [item.codigo for item in first["upserts"]] == ["001", "002"]
+    assert [item.codigo for item in second["upserts"]] == ["001"]
+    assert second["deletes"] == ["003"]
+    assert last["deletes"] == ["003", "004"]
+    assert caught_up["next_token"] == last["next_token"]
+
+
+@pytest.mark.parametrize("token", ["???", encode_change_token((1, 2)) + "x", "LTEuMQ"])
+def test_invalid_token_is_rejected(service, token):
+    with pytest.raises(ValidationException):
+        service.listar_cambios_privado(token)
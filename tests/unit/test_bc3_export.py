@@ -0,0 +1,108 @@
+"""Tests for the streaming BC3 catalogue export."""
+
+import csv
+import gc
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.domain.exceptions.overload import ServiceOverloadedException
+from app.infrastructure.database.admission import StreamLimit
+from app.infrastructure.models.producto import ProductoRawModel
+from app.infrastructure.repositories import producto as producto_repository
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+from app.interfaces.http.export import CSV_COLUMNS, iter_csv, iter_ndjson
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    ProductoRawModel.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(ProductoRawModel.__table__),
+            [
+                {"CÓDIGO": f"{i:03d}", "MARCA": "A" if i % 2 else "B", "DESCRIPCION": f"p{i}"}
+                for i in range(7, 0, -1)
+            ],
+        )
+        conn.execute(
+            ProductoRawModel.__table__.update()
+            .where(ProductoRawModel.codigo == "001")
+            .values({"DTO.": "35", "U.CAJA": 4})
+        )
+    with Session(engine) as session:
+        yield session
+
+
+def test_stream_walks_catalogue_in_codigo_order(session):
+    """Small batches still yield every matching row, once, in order."""
+    repository = SQLAlchemyProductoRepository(session)
+
+    codes = [entity.codigo for entity in repository.stream_private_catalogue({}, batch_size=2)]
+    filtered = repository.stream_private_catalogue({"marca": "A"}, batch_size=2)
+
+    assert codes == ["001", "002", "003", "004", "005", "006", "007"]
+    assert [entity.codigo for entity in filtered] == ["001", "003", "005", "007"]
+
+
+def test_ndjson_rows_use_the_bc3_contract(session):
+    entities = SQLAlchemyProductoRepository(session).stream_private_catalogue({}, batch_size=3)
+
+    chunks = list(iter_ndjson(entities, chunk_rows=3))
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+    assert len(chunks) == 3
+    assert len(rows) == 7
+    assert rows[0] == {"codigo": "001", "descripcion": "p1", "marca": "A", "dto": "35", "u_caja": 4}
+
+
+def test_csv_has_header_and_empty_cells(session):
+    entities = SQLAlchemyProductoRepository(session).stream_private_catalogue({"marca": "A"})
+
+    rows = list(csv.DictReader(io.StringIO("".join(iter_csv(entities, chunk_rows=2)))))
+
+    assert [row["codigo"] for row in rows] == ["001", "003", "005", "007"]
+    assert rows[0]["dto"] == "35"
+    assert rows[1]["dto"] == ""
+
+
+def test_empty_csv_export_keeps_header():
+    assert list(iter_csv(iter(()))) == [",".join(CSV_COLUMNS) + "\r\n"]
+    assert list(iter_ndjson(iter(()))) == []
+
+
+@pytest.fixture
+def export_limit(monkeypatch):
+    limit = StreamLimit("bc3_export", limit=1, retry_after=30)
+    monkeypatch.setattr(producto_repository, "get_export_limit", lambda: limit)
+    return limit
+
+
+def test_concurrent_exports_are_capped(session, export_limit):
+    """A second export is shed while the first one still holds its connection."""
+    repository = SQLAlchemyProductoRepository(session)
+    first = repository.stream_private_catalogue({}, batch_size=2)
+
+    with pytest.raises(ServiceOverloadedException) as rejected:
+        repository.stream_private_catalogue({}, batch_size=2)
+    assert rejected.value.retry_after == 30
+
+    assert len(list(first)) == 7
+    assert export_limit.in_flight == 0
+    assert len(list(repository.stream_private_catalogue({}, batch_size=2))) == 7
+
+
+def test_abandoned_export_frees_its_slot(session, export_limit):
+    """A client that disconnects mid-stream does not keep the slot."""
+    stream = SQLAlchemyProductoRepository(session).stream_private_catalogue({}, batch_size=2)
+    next(stream)
+    assert export_limit.in_flight == 1
+
+    del stream
+    gc.collect()
+
+    assert export_limit.in_flight == 0
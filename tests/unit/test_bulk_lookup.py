@@ -0,0 +1,151 @@
+"""Tests for bulk product lookup by code list."""
+
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+
+from app.application.dto.producto import MAX_BULK_LOOKUP_CODES, ProductoBulkLookupRequest
+from app.domain.services.producto import ProductoService
+from app.infrastructure.cache import cache_manager as cache_manager_module
+from app.infrastructure.cache.cache_manager import CacheManager
+from app.infrastructure.database import catalogue_version as catalogue_version_module
+from app.infrastructure.database.catalogue_version import Version
+from app.infrastructure.models.producto import ProductoRawModel
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories import producto as repository_module
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+
+class StubVersion:
+    """Catalogue version reader returning a settable version (None: no migration 08)."""
+
+    def __init__(self):
+        self.version = None
+
+    def current(self):
+        return self.version
+
+
+@pytest.fixture
+def catalogue_version(monkeypatch):
+    stub = StubVersion()
+    monkeypatch.setattr(catalogue_version_module, "_global_catalogue_version", stub)
+    return stub
+
+
+@pytest.fixture
+def lookup(monkeypatch, catalogue_version):
+    """Service over 5 raw products, a fresh cache and a per-query statement log."""
+    monkeypatch.setattr(cache_manager_module, "_global_cache_manager", CacheManager())
+    monkeypatch.setattr(repository_module, "BULK_LOOKUP_CHUNK", 2)
+
+    engine = create_engine("sqlite://")
+    ProductoRawModel.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(ProductoRawModel.__table__),
+            [
+                {"CÓDIGO": f"00{n}", "MARCA": "A", "DESCRIPCION": f"producto {n}"}
+                for n in range(1, 6)
+            ],
+        )
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        yield ProductoService(SQLAlchemyProductoRepository(session)), statements
+
+
+def test_found_in_request_order_and_missing_codes(lookup):
+    service, _ = lookup
+
+    found, missing = service.obtener_productos_privado(["005", "999", "001", "005"])
+
+    assert [item.codigo for item in found] == ["005", "001"]
+    assert missing == ["999"]
+
+
+def test_one_in_query_per_chunk(lookup):
+    service, statements = lookup
+
+    service.obtener_productos_privado(["001", "002", "003", "004", "005"])
+
+    assert len(statements) == 3
+    assert all(" IN (" in statement for statement in statements)
+
+
+def test_cached_products_skip_the_database(lookup):
+    service, statements = lookup
+    service.obtener_productos_privado(["001", "002"])
+    statements.clear()
+
+    found, missing = service.obtener_productos_privado(["001", "002", "003"])
+
+    assert [item.codigo for item in found] == ["001", "002", "003"]
+    assert missing == []
+    assert len(statements) == 1
+
+
+def test_writes_forget_cached_products(lookup):
+    service, statements = lookup
+    service.obtener_productos_privado(["001"])
+    service.repository._forget_cached_products(["001"])
+    statements.clear()
+
+    service.obtener_productos_privado(["001"])
+
+    assert len(statements) == 1
+
+
+def test_cache_entries_follow_the_catalogue_version(lookup, catalogue_version):
+    """A version bump (a write through any worker) makes cached products unreachable."""
+    service, statements = lookup
+    catalogue_version.version = Version(1, datetime(2026, 1, 1, tzinfo=timezone.utc))
+    service.obtener_productos_privado(["001"])
+    service.obtener_productos_privado(["001"])
+    assert len(statements) == 1
+
+    catalogue_version.version = Version(2, catalogue_version.version.updated_at)
+    service.obtener_productos_privado(["001"])
+
+    assert len(statements) == 2
+
+
+def test_unversioned_public_entries_use_the_short_ttl(monkeypatch, catalogue_version):
+    """Without migration 08 public products are not cached for the full product TTL."""
+    cache = CacheManager()
+    monkeypatch.setattr(cache_manager_module, "_global_cache_manager", cache)
+    ttls = []
+    monkeypatch.setattr(cache, "set_many", lambda values, ttl: ttls.append(ttl))
+    engine = create_engine("sqlite://")
+    ProductoModelClean.__table__.create(engine)
+
+    with Session(engine) as session:
+        session.add(ProductoModelClean(codigo="001", descripcion="producto 1", marca="A"))
+        session.commit()
+        SQLAlchemyProductoRepository(session).get_by_codigos(["001"], cached=True)
+
+    assert ttls == [cache.get_ttl("product_bc3")]
+
+
+def test_request_normalizes_and_bounds_codes():
+    request = ProductoBulkLookupRequest(codigos=[" 001", "002", "001 "])
+
+    assert request.codigos == ["001", "002"]
+    with pytest.raises(ValidationError):
+        ProductoBulkLookupRequest(codigos=["001", " "])
+    with pytest.raises(ValidationError):
+        ProductoBulkLookupRequest(codigos=[])
+    with pytest.raises(ValidationError):
+        ProductoBulkLookupRequest(codigos=["x"] * (MAX_BULK_LOOKUP_CODES + 1))
+
+
+def test_cache_manager_get_many_and_set_many():
+    cache = CacheManager()
+    cache.set_many({"a": 1, "b": {"x": 2}}, ttl=60)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": {"x": 2}}
+    assert cache.get_statistics()["hits"] == 2
+    assert cache.get_statistics()["misses"] == 1
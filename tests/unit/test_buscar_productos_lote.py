@@ -0,0 +1,128 @@
+"""Tests for the batched /buscar-productos search."""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from app.application.dto.pagination import PaginationRequestDTO
+from app.domain.exceptions.overload import QueryTimeoutException
+from app.domain.services.producto import ProductoService
+from app.infrastructure.cache import cache_manager as cache_manager_module
+from app.infrastructure.cache import pagination_cache as pagination_cache_module
+from app.infrastructure.cache.cache_manager import CacheManager
+from app.infrastructure.database import deadlines
+from app.infrastructure.database.admission import AdmissionController
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories import producto as producto_repository
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+
+@pytest.fixture
+def search(monkeypatch):
+    """Service over a small catalogue, fresh caches and a connection/statement log."""
+    monkeypatch.setattr(cache_manager_module, "_global_cache_manager", CacheManager())
+    monkeypatch.setattr(pagination_cache_module, "_global_pagination_cache", None)
+
+    engine = create_engine("sqlite://")
+    ProductoModelClean.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                ProductoModelClean(codigo="1", descripcion="Toledo LED", marca="A", familia="F1"),
+                ProductoModelClean(codigo="2", descripcion="Toledo Pro", marca="B", familia="F1"),
+                ProductoModelClean(codigo="3", descripcion="Astro", marca="A", familia="F2"),
+            ]
+        )
+        session.commit()
+
+    log = {"connections": 0, "statements": 0}
+
+    def count(name):
+        def listener(*args):
+            log[name] += 1
+
+        return listener
+
+    event.listen(engine, "checkout", count("connections"))
+    event.listen(engine, "before_cursor_execute", count("statements"))
+    with Session(engine) as session:
+        yield ProductoService(SQLAlchemyProductoRepository(session)), log
+
+
+def page(per_page=20):
+    return PaginationRequestDTO(page=1, per_page=per_page)
+
+
+def test_results_in_request_order(search):
+    service, _ = search
+
+    results = service.buscar_productos_paginado_lote(
+        [(page(), {"buscar": "toledo"}), (page(), {"marca": "A"}), (page(), {"buscar": "nada"})]
+    )
+
+    assert [sorted(item.codigo for item in result.items) for result in results] == [
+        ["1", "2"],
+        ["1", "3"],
+        [],
+    ]
+    assert [result.pagination.total_items for result in results] == [2, 2, 0]
+
+
+def test_identical_queries_run_once_on_one_connection(search):
+    service, log = search
+
+    results = service.buscar_productos_paginado_lote(
+        [(page(), {"buscar": "toledo"}), (page(), {"marca": "A"}), (page(), {"buscar": "toledo"})]
+    )
+
+    # One COUNT and one page query per distinct search
+    assert log == {"connections": 1, "statements": 4}
+    assert results[0].items == results[2].items
+
+
+def test_cached_searches_are_not_executed_again(search):
+    service, log = search
+    service.buscar_productos_paginado(page(), {"buscar": "toledo"})
+    log["statements"] = 0
+
+    results = service.buscar_productos_paginado_lote(
+        [(page(), {"buscar": "toledo"}), (page(), {"familia": "F2"})]
+    )
+
+    assert log["statements"] == 2
+    assert [len(result.items) for result in results] == [2, 1]
+
+
+def test_each_query_is_admitted_on_its_own(monkeypatch, search):
+    service, _ = search
+    admitted = []
+    controller = AdmissionController()
+    original = controller.admit
+
+    def admit(endpoint_class):
+        admitted.append(endpoint_class)
+        return original(endpoint_class)
+
+    monkeypatch.setattr(controller, "admit", admit)
+    monkeypatch.setattr(producto_repository, "get_admission_controller", lambda: controller)
+
+    service.buscar_productos_paginado_lote(
+        [(page(), {"buscar": "toledo"}), (page(), {"marca": "A"}), (page(), {"marca": "B"})]
+    )
+
+    assert admitted == ["productos"] * 3
+
+
+def test_spent_budget_stops_the_batch(search):
+    service, log = search
+    session = service.repository.session
+    deadlines.set_deadline(session, 60.0)
+    session.execute(text("SELECT 1"))
+    session.info["connection"] = session.connection()
+    session.info["deadline"] = 0.0
+    log["statements"] = 0
+
+    with pytest.raises(QueryTimeoutException):
+        service.buscar_productos_paginado_lote([(page(), {"marca": "A"})])
+
+    assert log["statements"] == 0
@@ -0,0 +1,224 @@
+"""Tests for the columnar in-memory catalogue snapshot."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.application.dto.producto import MAX_SEARCH_TERM_LENGTH
+from app.config import get_settings
+from app.infrastructure.cache import cache_manager as cache_manager_module
+from app.infrastructure.cache import catalogue_snapshot as snapshot_module
+from app.infrastructure.cache import pagination_cache as pagination_cache_module
+from app.infrastructure.cache.cache_manager import CacheManager
+from app.infrastructure.database.catalogue_version import Version, VersionedSnapshot
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+from app.interfaces.http.productos import BuscarProductosRequest
+
+pytest.importorskip("numpy")
+
+PRODUCTS = [
+    dict(codigo="1", descripcion="Toledo LED", marca="A", familia="F1", pvp=10.0),
+    dict(
+        codigo="2",
+        descripcion="Toledo Pro",
+        marca="B",
+        familia="F1",
+        pvp=25.5,
+        bc3_product_type="luminaria",
+        bc3_descripcion_corta="Toledo corto",
+    ),
+    dict(codigo="3", descripcion="Astro 50%", marca="A", familia="F2", pvp=7.25),
+    dict(codigo="4", descripcion="Hydro", marca="C", familia="F2", pvp=None),
+    dict(codigo="5", descripcion="Mini toledo", marca="A", familia=None, pvp=99.0),
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    ProductoModelClean.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(ProductoModelClean(**product) for product in PRODUCTS)
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def snapshot(engine):
+    with Session(engine) as session:
+        return snapshot_module.load_catalogue(session)
+
+
+def dto(filters=None, sort=None, page=1, per_page=2):
+    return {
+        "page": page,
+        "per_page": per_page,
+        "offset": (page - 1) * per_page,
+        "sort": sort,
+        "filters": filters or {},
+    }
+
+
+def codes(entities):
+    return [entity.codigo for entity in entities]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"marca": "A"},
+        {"marca": "Z"},
+        {"familia": "F2", "marca": "A"},
+        {"pvp_min": 8},
+        {"pvp_min": 8, "pvp_max": 30},
+        {"bc3_product_type": "luminaria"},
+        {"bc3_has_descripcion_corta": True},
+        {"bc3_has_descripcion_corta": False},
+        {"buscar": "TOLEDO"},
+        {"buscar": "toledo", "marca": "A"},
+        {"buscar": "50%"},
+        {"buscar": "t_ledo"},
+        {"buscar": "t%o%d"},
+        {"buscar": "%%led%%"},
+        {"buscar": "%"},
+        {"buscar": "tol_d%o c"},
+        {"buscar": "toledo%corto"},
+        {"buscar": "led%toledo"},
+    ],
+)
+def test_filters_match_the_sql_search(engine, snapshot, filters):
+    with Session(engine) as session:
+        expected = SQLAlchemyProductoRepository(session)._execute_pagination_query(
+            dto(filters, per_page=100)
+        )
+
+    entities, total = snapshot.search(dto(filters, per_page=100))
+
+    assert sorted(codes(entities)) == sorted(codes(expected[0]))
+    assert total == expected[1]
+
+
+@pytest.mark.parametrize(
+    ("buscar", "expected"),
+    [
+        ("50\\%", ["3"]),
+        ("t\\_ledo", []),
+        ("\\t\\o\\l\\e\\d\\o", ["1", "2", "5"]),
+        ("astro 50\\", ["3"]),
+        ("astro\\", []),
+        ("\\", ["3"]),
+    ],
+)
+def test_backslash_escapes_like_postgresql(snapshot, buscar, expected):
+    r"""``\`` escapes the next character, as PostgreSQL's ILIKE default.
+
+    SQLite's LIKE has no default escape, so the expected codes are spelled out.
+    """
+    entities, total = snapshot.search(dto({"buscar": buscar}, per_page=100))
+
+    assert sorted(codes(entities)) == expected
+    assert total == len(expected)
+
+
+def test_wildcards_on_an_empty_catalogue():
+    catalogue = snapshot_module.ColumnarCatalogue([])
+
+    assert catalogue.search(dto({"buscar": "%"})) == ([], 0)
+    assert catalogue.search(dto({"buscar": "toledo"})) == ([], 0)
+
+
+def test_many_wildcards_stay_linear(engine):
+    """A term like ``a%a%...%z`` must not backtrack across the corpus."""
+    with Session(engine) as session:
+        session.add_all(
+            ProductoModelClean(codigo=f"x{n}", descripcion="a" * 200, marca="A") for n in range(200)
+        )
+        session.commit()
+        catalogue = snapshot_module.load_catalogue(session)
+
+    started = time.perf_counter()
+    entities, total = catalogue.search(dto({"buscar": "a%" * 40 + "z"}))
+
+    assert time.perf_counter() - started < 1.0
+    assert total == 0
+
+
+def test_search_terms_are_capped():
+    BuscarProductosRequest(termino="a" * MAX_SEARCH_TERM_LENGTH)
+    with pytest.raises(ValidationError):
+        BuscarProductosRequest(termino="a%" * MAX_SEARCH_TERM_LENGTH)
+
+
+@pytest.mark.parametrize("sort", ["pvp:asc", "pvp:desc", "codigo:desc", "descripcion"])
+def test_sorting_and_pagination(snapshot, sort):
+    field, _, order = sort.partition(":")
+    known = [product for product in PRODUCTS if product[field] is not None]
+    ordered = sorted(known, key=lambda product: product[field], reverse=order == "desc")
+    nulls = [product["codigo"] for product in PRODUCTS if product[field] is None]
+    expected = [product["codigo"] for product in ordered]
+    # PostgreSQL: NULLs last ascending, first descending
+    expected = nulls + expected if order == "desc" else expected + nulls
+
+    pages = [snapshot.search(dto(sort=sort, page=page))[0] for page in (1, 2, 3)]
+
+    assert [codigo for page in pages for codigo in codes(page)] == expected
+
+
+def test_facets_count_the_filtered_rows(snapshot):
+    entities, total, facets = snapshot.search_with_facets(dto({"buscar": "toledo"}))
+
+    assert total == 3
+    assert codes(entities) == ["1", "2"]
+    assert facets == {
+        "marca": [{"value": "A", "count": 2}, {"value": "B", "count": 1}],
+        "familia": [{"value": "F1", "count": 2}],
+        "bc3_product_type": [{"value": "luminaria", "count": 1}],
+    }
+
+
+def test_snapshot_is_only_served_at_the_current_version(engine, snapshot):
+    version = {"current": Version(1, datetime(2026, 1, 1, tzinfo=timezone.utc))}
+    holder = VersionedSnapshot(
+        "catalogue snapshot",
+        lambda session: snapshot,
+        sessionmaker(engine),
+        lambda: version["current"],
+    )
+    holder.refresh()
+    assert holder.get_current() is snapshot
+
+    version["current"] = Version(2, version["current"].updated_at)
+    holder._rebuilding = True  # keep the rebuild out of this test
+
+    assert holder.get_current() is None
+    assert holder.get() is snapshot
+
+
+def test_repository_searches_skip_the_database(monkeypatch, engine, snapshot):
+    monkeypatch.setattr(cache_manager_module, "_global_cache_manager", CacheManager())
+    monkeypatch.setattr(pagination_cache_module, "_global_pagination_cache", None)
+    monkeypatch.setattr(get_settings(), "catalogue_snapshot_enabled", True)
+    holder = VersionedSnapshot(
+        "catalogue snapshot", lambda session: snapshot, sessionmaker(engine), lambda: None
+    )
+    holder.refresh()
+    monkeypatch.setattr(snapshot_module, "_global_catalogue_snapshot", holder)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with Session(engine) as session:
+        repository = SQLAlchemyProductoRepository(session)
+        entities, total = repository.buscar_productos_paginado(dto({"marca": "A"}))
+        _, _, facets = repository.buscar_productos_facetado(dto({"marca": "A"}))
+        pages = repository.buscar_productos_paginado_lote([dto(), dto({"marca": "C"})])
+
+    assert statements == []
+    assert (codes(entities), total) == (["1", "3"], 3)
+    assert facets["familia"] == [{"value": "F1", "count": 1}, {"value": "F2", "count": 1}]
+    assert [page_total for _, page_total in pages] == [5, 1]
@@ -0,0 +1,155 @@
+"""Tests for Brotli/gzip negotiation and the precompressed body cache."""
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.infrastructure.cache.compressed_bodies import CompressedBodyCache
+from app.interfaces.http import compression
+from app.interfaces.http.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = json.dumps({"items": [{"bc3_descripcion_larga": "Luminaria LED " * 20}] * 20})
+
+
+@pytest.mark.parametrize(
+    ("header", "available", "expected"),
+    [
+        ("gzip, deflate, br", ("br", "gzip"), "br"),
+        ("gzip, deflate, br", ("gzip",), "gzip"),
+        ("br;q=0.5, gzip", ("br", "gzip"), "gzip"),
+        ("gzip;q=0", ("gzip",), None),
+        ("*", ("br", "gzip"), "br"),
+        ("identity", ("br", "gzip"), None),
+        ("", ("gzip",), None),
+    ],
+)
+def test_negotiate_encoding(header, available, expected):
+    assert negotiate_encoding(header, available) == expected
+
+
+@pytest.fixture
+def app_client():
+    cache = CompressedBodyCache(max_bytes=1024 * 1024)
+    app = FastAPI()
+
+    @app.get("/catalogue")
+    def catalogue():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"7-abc"'})
+
+    @app.get("/private")
+    def private():
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/export")
+    def export():
+        lines = (json.dumps({"n": n}) + "\n" for n in range(500))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=100, cache=cache)
+    return TestClient(app), cache
+
+
+def gzip_get(client, path):
+    return client.get(path, headers={"Accept-Encoding": "gzip"})
+
+
+def test_etag_responses_are_compressed_once(app_client, monkeypatch):
+    client, cache = app_client
+    calls = []
+    original = compression.compress
+
+    def counting(body, encoding, cached=False):
+        calls.append(cached)
+        return original(body, encoding, cached)
+
+    monkeypatch.setattr(compression, "compress", counting)
+
+    first = gzip_get(client, "/catalogue")
+    second = gzip_get(client, "/catalogue")
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == 'W/"7-abc"'
+    assert "accept-encoding" in first.headers["vary"].lower()
+    assert first.text == second.text == BODY
+    assert int(second.headers["content-length"]) < len(BODY)
+    assert calls == [True]
+    assert cache.get_statistics()["hits"] == 1
+
+
+def test_cached_variant_requires_the_same_raw_body():
+    cache = CompressedBodyCache(max_bytes=1024)
+    cache.put('"1-a"', b"old", "gzip", b"gz-old")
+
+    assert cache.get('"1-a"', b"old", "gzip") == b"gz-old"
+    assert cache.get('"1-a"', b"new", "gzip") is None
+    assert cache.get('"1-a"', b"old", "br") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CompressedBodyCache(max_bytes=20)
+    cache.put("a", b"12345", "gzip", b"123")
+    cache.put("b", b"12345", "gzip", b"123")
+    cache.get("a", b"12345", "gzip")
+    cache.put("c", b"12345", "gzip", b"123")
+
+    assert cache.get("b", b"12345", "gzip") is None
+    assert cache.get("a", b"12345", "gzip") == b"123"
+    assert cache.get_statistics()["bytes"] <= 20
+
+
+def test_responses_without_etag_are_compressed_per_request(app_client):
+    client, cache = app_client
+
+    response = gzip_get(client, "/private")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+    assert cache.get_statistics()["entries"] == 0
+
+
+def test_identity_small_and_binary_responses_are_untouched(app_client):
+    client, _ = app_client
+
+    identity = client.get("/private", headers={"Accept-Encoding": "identity"})
+    small = gzip_get(client, "/small")
+    image = gzip_get(client, "/image")
+
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in image.headers
+    assert "vary" not in image.headers
+
+
+def test_streaming_responses_are_compressed_incrementally(app_client):
+    client, _ = app_client
+
+    with client.stream("GET", "/export", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert [json.loads(line)["n"] for line in lines] == list(range(500))
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_brotli_is_preferred_when_installed(app_client):
+    client, _ = app_client
+
+    response = client.get("/catalogue", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert compression.brotli.decompress(response.content) == BODY.encode()
@@ -0,0 +1,155 @@
+"""Tests for ETag / Last-Modified conditional GET on catalogue endpoints."""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.infrastructure.database import catalogue_version as catalogue_version_module
+from app.infrastructure.database.catalogue_version import (
+    CatalogueVersion,
+    Version,
+    invalidate_after_commit,
+)
+from app.interfaces.http.conditional import catalogue_etag, etag_matches
+from app.interfaces.http.error_handlers import register_exception_handlers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def version_table():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE catalogue_version (version INTEGER, updated_at TIMESTAMP)"))
+        conn.execute(text("INSERT INTO catalogue_version VALUES (1, '2026-01-02 03:04:05')"))
+    return engine
+
+
+def test_version_is_cached_until_ttl_or_invalidation(version_table):
+    clock = FakeClock()
+    reader = CatalogueVersion(sessionmaker(version_table), ttl=5.0, clock=clock)
+
+    assert reader.current() == Version(1, datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+    with version_table.begin() as conn:
+        conn.execute(text("UPDATE catalogue_version SET version = 2"))
+    assert reader.current().number == 1
+
+    clock.now = 5.0
+    assert reader.current().number == 2
+
+    with version_table.begin() as conn:
+        conn.execute(text("UPDATE catalogue_version SET version = 3"))
+    reader.invalidate()
+    assert reader.current().number == 3
+
+
+def test_missing_version_table_disables_validators():
+    reader = CatalogueVersion(sessionmaker(create_engine("sqlite://")))
+
+    assert reader.current() is None
+
+
+def test_repository_writes_invalidate_after_commit(monkeypatch, version_table):
+    clock = FakeClock()
+    reader = CatalogueVersion(sessionmaker(version_table), ttl=5.0, clock=clock)
+    monkeypatch.setattr(catalogue_version_module, "_global_catalogue_version", reader)
+    assert reader.current().number == 1
+    session = sessionmaker(version_table)()
+
+    session.execute(text("UPDATE catalogue_version SET version = 2"))
+    invalidate_after_commit(session)
+    assert reader.current().number == 1
+    session.commit()
+    assert reader.current().number == 2
+
+    session.execute(text("UPDATE catalogue_version SET version = 3"))
+    invalidate_after_commit(session)
+    session.rollback()
+    session.commit()
+    assert reader.current().number == 2
+    session.close()
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [('"1-a"', True), ('W/"1-a"', True), ('"0-a", "1-a"', True), ("*", True), ('"2-a"', False)],
+)
+def test_if_none_match_comparison(header, expected):
+    assert etag_matches(header, '"1-a"') is expected
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """App with one ETag-guarded endpoint that counts its executions."""
+    version = {"current": Version(7, datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc))}
+
+    class StubVersion:
+        def current(self):
+            return version["current"]
+
+    monkeypatch.setattr(catalogue_version_module, "_global_catalogue_version", StubVersion())
+    monkeypatch.setenv("HTTP_ETAGS_ENABLED", "true")
+    get_settings.cache_clear()
+
+    app = FastAPI()
+    register_exception_handlers(app)
+    calls = []
+
+    @app.get("/items", dependencies=[Depends(catalogue_etag)])
+    def items(page: int = 1):
+        calls.append(page)
+        return {"page": page}
+
+    yield TestClient(app), calls, version
+    get_settings.cache_clear()
+
+
+def test_matching_etag_answers_304_without_running_the_endpoint(client):
+    http, calls, _ = client
+    first = http.get("/items", params={"page": 2})
+    etag = first.headers["etag"]
+
+    cached = http.get("/items", params={"page": 2}, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert calls == [2]
+
+
+def test_etag_changes_with_query_and_version(client):
+    http, calls, version = client
+    etag = http.get("/items", params={"page": 1}).headers["etag"]
+
+    other_page = http.get("/items", params={"page": 2}, headers={"If-None-Match": etag})
+    version["current"] = Version(8, version["current"].updated_at)
+    new_version = http.get("/items", params={"page": 1}, headers={"If-None-Match": etag})
+
+    assert other_page.status_code == 200
+    assert new_version.status_code == 200
+    assert new_version.headers["etag"] != etag
+    assert calls == [1, 2, 1]
+
+
+def test_if_modified_since(client):
+    http, calls, _ = client
+
+    fresh = http.get("/items", headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:05 GMT"})
+    stale = http.get("/items", headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:04 GMT"})
+
+    assert fresh.status_code == 304
+    assert stale.status_code == 200
+    assert calls == [1]
@@ -0,0 +1,133 @@
+"""Tests for facet counts on paginated product searches."""
+
+import re
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.application.dto.pagination import PaginationRequestDTO
+from app.domain.services.producto import ProductoService
+from app.infrastructure.cache import cache_manager as cache_manager_module
+from app.infrastructure.cache import pagination_cache as pagination_cache_module
+from app.infrastructure.cache.cache_manager import CacheManager
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories.producto import FACET_COLUMNS, SQLAlchemyProductoRepository
+from app.interfaces.http.productos import FACETS_PATTERN, _facet_fields
+
+
+@pytest.fixture
+def search(monkeypatch):
+    """Service over a small catalogue, fresh caches and a statement log."""
+    monkeypatch.setattr(cache_manager_module, "_global_cache_manager", CacheManager())
+    monkeypatch.setattr(pagination_cache_module, "_global_pagination_cache", None)
+
+    engine = create_engine("sqlite://")
+    ProductoModelClean.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                ProductoModelClean(codigo="1", descripcion="Toledo LED", marca="A", familia="F1"),
+                ProductoModelClean(
+                    codigo="2",
+                    descripcion="Toledo Pro",
+                    marca="B",
+                    familia="F1",
+                    bc3_product_type="luminaria",
+                ),
+                ProductoModelClean(codigo="3", descripcion="Toledo Mini", marca="A", familia="F2"),
+                ProductoModelClean(codigo="4", descripcion="Astro", marca="A", familia="F2"),
+            ]
+        )
+        session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        yield ProductoService(SQLAlchemyProductoRepository(session)), statements
+
+
+def page(per_page=2):
+    return PaginationRequestDTO(page=1, per_page=per_page)
+
+
+def test_counts_within_the_current_filters(search):
+    service, _ = search
+
+    response = service.buscar_productos_paginado(
+        page(), {"buscar": "toledo"}, ["marca", "familia", "bc3_product_type"]
+    )
+
+    assert response.pagination.total_items == 3
+    assert len(response.items) == 2
+    assert response.facets == {
+        "marca": [{"value": "A", "count": 2}, {"value": "B", "count": 1}],
+        "familia": [{"value": "F1", "count": 2}, {"value": "F2", "count": 1}],
+        "bc3_product_type": [{"value": "luminaria", "count": 1}],
+    }
+
+
+def test_only_requested_facets_are_returned(search):
+    service, _ = search
+
+    response = service.buscar_productos_paginado(page(), {"marca": "A"}, ["familia"])
+
+    assert response.facets == {
+        "familia": [{"value": "F2", "count": 2}, {"value": "F1", "count": 1}]
+    }
+    assert service.buscar_productos_paginado(page(), {"marca": "A"}).facets is None
+
+
+def test_facets_replace_the_count_query_and_are_cached(search):
+    service, statements = search
+
+    service.buscar_productos_paginado(page(), {"buscar": "toledo"}, ["marca"])
+    assert len(statements) == 2
+    statements.clear()
+
+    response = service.buscar_productos_paginado(page(), {"buscar": "toledo"}, ["familia"])
+
+    assert statements == []
+    assert response.pagination.total_items == 3
+
+
+def test_cached_page_only_runs_the_facet_query(search):
+    service, statements = search
+    service.buscar_productos_paginado(page(), {"buscar": "toledo"})
+    statements.clear()
+
+    response = service.buscar_productos_paginado(page(), {"buscar": "toledo"}, ["marca"])
+
+    assert len(statements) == 1
+    assert len(response.items) == 2
+    assert response.facets == {"marca": [{"value": "A", "count": 2}, {"value": "B", "count": 1}]}
+
+
+def test_postgresql_counts_with_grouping_sets(search):
+    service, _ = search
+    repository = service.repository
+    postgres = create_engine("postgresql+psycopg://u:p@localhost/db")
+    captured = {}
+
+    class Capture:
+        def execute(self, stmt):
+            captured["sql"] = str(stmt.compile(dialect=postgresql.dialect()))
+            return []
+
+        def get_bind(self):
+            return postgres
+
+    repository.session = Capture()
+    repository._count_facets({"marca": "A"})
+
+    columns = ", ".join(f"(productos_clean.{field})" for field in FACET_COLUMNS)
+    assert f"GROUP BY GROUPING SETS({columns}, ())" in captured["sql"]
+
+
+def test_facets_parameter():
+    assert re.match(FACETS_PATTERN, "marca,familia,bc3_product_type")
+    assert not re.match(FACETS_PATTERN, "marca,pvp")
+    assert not re.match(FACETS_PATTERN, "marca,")
+    assert _facet_fields("familia,marca,familia") == ["familia", "marca"]
+    assert _facet_fields(None) == []
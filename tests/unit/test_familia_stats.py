@@ -0,0 +1,105 @@
+"""Tests for family reads served from the familia_stats projection."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.infrastructure.cache import pagination_cache
+from app.infrastructure.models.familia_stats import FamiliaStatsModel
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories.familia import SQLAlchemyFamiliaRepository
+
+ROWS = [
+    ("001", "DOWN", "bc3", "img"),
+    ("002", "DOWN", None, "img"),
+    ("003", "PANEL", "bc3", None),
+    ("004", "Aplique", "bc3", "img"),
+    ("005", None, "bc3", None),
+]
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """SQLite productos_clean plus a familia_stats table built like migration 06."""
+
+    class NoCache:
+        def get(self, *args):
+            return None
+
+        def set(self, *args, **kwargs):
+            return True
+
+    monkeypatch.setattr(pagination_cache, "_global_pagination_cache", NoCache())
+    engine = create_engine("sqlite://")
+    ProductoModelClean.__table__.create(engine)
+    FamiliaStatsModel.__table__.create(engine)
+    with engine.begin() as conn:
+        for codigo, familia, bc3, imagen in ROWS:
+            conn.execute(
+                text(
+                    "INSERT INTO productos_clean "
+                    "(codigo, familia, bc3_descripcion_corta, descripcion_corta) "
+                    "VALUES (:c, :f, :b, :i)"
+                ),
+                {"c": codigo, "f": familia, "b": bc3, "i": imagen},
+            )
+        conn.execute(
+            text(
+                "INSERT INTO familia_stats "
+                "SELECT familia, COUNT(*), COUNT(bc3_descripcion_corta), "
+                "COUNT(descripcion_corta), "
+                "CAST(COUNT(bc3_descripcion_corta) AS REAL) / COUNT(*) "
+                "FROM productos_clean GROUP BY familia"
+            )
+        )
+    with Session(engine) as session:
+        yield session
+
+
+def _read_all(repository):
+    dto = {
+        "offset": 0,
+        "per_page": 10,
+        "sort": "total_productos:desc",
+        "filters": {"buscar": "n"},
+    }
+    return (
+        repository.get_all(),
+        repository.get_by_nombre("DOWN"),
+        repository.get_statistics(),
+        repository.get_bc3_coverage_leaderboard(limit=2),
+        repository._execute_pagination_query(dto),
+    )
+
+
+def test_projection_answers_match_group_by(session, monkeypatch):
+    """Every family read returns the same result from either source."""
+    repository = SQLAlchemyFamiliaRepository(session)
+    grouped = _read_all(repository)
+
+    monkeypatch.setenv("FAMILIA_STATS_ENABLED", "true")
+    get_settings.cache_clear()
+    try:
+        precomputed = _read_all(repository)
+    finally:
+        monkeypatch.delenv("FAMILIA_STATS_ENABLED")
+        get_settings.cache_clear()
+
+    assert precomputed == grouped
+    familias, _, statistics, leaderboard, _ = precomputed
+    assert [familia.nombre for familia in familias] == ["Aplique", "DOWN", "PANEL"]
+    assert statistics == {"total_familias": 3, "total_productos": 5, "bc3_coverage": 80.0}
+    assert [familia.nombre for familia in leaderboard] == ["Aplique", "PANEL"]
+
+
+def test_projection_lookup_of_unknown_family_raises(session, monkeypatch):
+    """A missing row in familia_stats is a missing family."""
+    monkeypatch.setenv("FAMILIA_STATS_ENABLED", "true")
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="no encontrada"):
+            SQLAlchemyFamiliaRepository(session).get_by_nombre("NADA")
+    finally:
+        monkeypatch.delenv("FAMILIA_STATS_ENABLED")
+        get_settings.cache_clear()
@@ -0,0 +1,141 @@
+"""Tests for workload recording and the index advisor's candidate rules."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database import index_advisor
+from app.infrastructure.database.index_advisor import (
+    RAW_COLUMNS,
+    IndexCandidate,
+    Recommendation,
+    candidate_for,
+    format_report,
+    propose_candidates,
+)
+from app.infrastructure.database.workload import QueryShape, WorkloadRecorder, load_workload
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories import producto as producto_repository
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+
+def _dto(sort=None, **filters):
+    return {"offset": 0, "per_page": 20, "sort": sort, "filters": filters}
+
+
+def test_shape_keeps_filter_presence_and_normalized_sort():
+    """Values are dropped except the partial-index flag; sort order is normalized."""
+    shape = QueryShape.from_dto(
+        _dto("pvp", marca="A", pvp_min=0, buscar="", bc3_has_descripcion_corta=False)
+    )
+
+    assert shape == QueryShape(
+        filters=("bc3_has_descripcion_corta=false", "marca", "pvp_min"), sort="pvp:asc"
+    )
+
+
+def test_recorder_flushes_periodically_and_files_merge(tmp_path):
+    """Shape counts from several worker files are summed."""
+    first = WorkloadRecorder(enabled=True, path=tmp_path / "pagination-1.json", flush_every=2)
+    second = WorkloadRecorder(enabled=True, path=tmp_path / "pagination-2.json", flush_every=0)
+    first.record(_dto(marca="A"))
+    first.record(_dto(marca="B"))
+    second.record(_dto(marca="C"))
+    second.record(_dto("pvp:desc", familia="DOWN"))
+    second.flush()
+
+    workload = load_workload([first.path, second.path])
+
+    assert [(shape.filters, count) for shape, count, _ in workload] == [
+        (("marca",), 3),
+        (("familia",), 1),
+    ]
+    assert workload[0][2]["filters"] == {"marca": "C"}
+
+
+def test_disabled_recorder_writes_nothing(tmp_path):
+    recorder = WorkloadRecorder(enabled=False, path=tmp_path / "pagination.json", flush_every=1)
+    recorder.record(_dto(marca="A"))
+
+    assert recorder.snapshot() == {"shapes": []}
+    assert not recorder.path.exists()
+
+
+def test_pagination_query_records_its_shape(tmp_path, monkeypatch):
+    """The repository hands every executed search to the recorder."""
+    recorder = WorkloadRecorder(enabled=True, path=tmp_path / "pagination.json", flush_every=0)
+    monkeypatch.setattr(producto_repository, "get_workload_recorder", lambda: recorder)
+    engine = create_engine("sqlite://")
+    ProductoModelClean.__table__.create(engine)
+
+    with Session(engine) as session:
+        SQLAlchemyProductoRepository(session)._execute_pagination_query(
+            _dto("pvp:desc", marca="A", pvp_max=10)
+        )
+
+    assert recorder.snapshot()["shapes"][0]["filters"] == ["marca", "pvp_max"]
+
+
+@pytest.mark.parametrize(
+    ("shape", "expected"),
+    [
+        # Equality, then sort; the pvp range is covered by INCLUDE
+        (
+            QueryShape(("familia", "marca", "pvp_min"), "pvp:desc"),
+            IndexCandidate(("marca", "familia", "pvp")),
+        ),
+        (
+            QueryShape(("familia", "marca", "pvp_max"), "descripcion:asc"),
+            IndexCandidate(("marca", "familia", "descripcion"), include=("pvp",)),
+        ),
+        (
+            QueryShape(("bc3_has_descripcion_corta=true", "bc3_product_type")),
+            IndexCandidate(("bc3_product_type",), where="bc3_descripcion_corta IS NOT NULL"),
+        ),
+        (QueryShape(("buscar",)), None),
+        (QueryShape(("marca",), "unknown:asc"), IndexCandidate(("marca",))),
+    ],
+)
+def test_candidate_follows_equality_sort_range(shape, expected):
+    assert candidate_for(shape) == expected
+
+
+def test_candidates_are_deduplicated():
+    shapes = [QueryShape(("marca", "pvp_min")), QueryShape(("marca", "pvp_max"))]
+
+    assert propose_candidates(shapes) == [IndexCandidate(("marca", "pvp"))]
+
+
+def test_ddl_targets_raw_columns_for_the_plain_view():
+    candidate = IndexCandidate(
+        ("marca", "descripcion"), include=("pvp",), where="bc3_descripcion_corta IS NULL"
+    )
+
+    ddl = candidate.ddl('"productos"', RAW_COLUMNS, concurrently=True)
+
+    assert ddl == (
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {candidate.name} ON "productos" '
+        '("MARCA", "DESCRIPCION") INCLUDE ("PVP_26_01_26") '
+        'WHERE "bc3_descripcion_corta" IS NULL'
+    )
+    assert len(candidate.name) <= 63
+
+
+def test_report_lists_only_beneficial_indexes():
+    useful = Recommendation(IndexCandidate(("marca", "pvp")), "CREATE ...", 120.0, 3, 8192, 1.5)
+    useless = Recommendation(IndexCandidate(("pvp",)), "CREATE useless", -1.0, 0, 8192, 1.0)
+
+    report = format_report([useful, useless])
+
+    assert "CREATE ...;" in report
+    assert "benefit 120.0 ms" in report
+    assert "useless" not in report
+    assert format_report([useless]).startswith("No index candidate")
+
+
+def test_advisor_refuses_non_local_databases(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        index_advisor.main(
+            [str(tmp_path / "pagination.json"), "--database-url", "postgresql://db.example/prod"]
+        )
+    assert "local PostgreSQL copy" in capsys.readouterr().err
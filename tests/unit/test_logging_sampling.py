@@ -0,0 +1,80 @@
+"""Tests for sampled, rate-capped security and access logging."""
+
+import json
+
+from app.security import logging_config
+from app.security.logging_config import EventLogSampler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sampler_keeps_one_in_n_access_events():
+    """1-in-N sampling reports how many events were skipped."""
+    sampler = EventLogSampler(sample_every={"access": 3})
+
+    results = [sampler.admit("access") for _ in range(6)]
+
+    assert results == [None, None, 2, None, None, 2]
+    assert sampler.get_stats()["access"] == {"seen": 6, "suppressed": 4}
+
+
+def test_sampler_caps_events_per_second_per_type():
+    """The cap applies per event type and resets every second."""
+    clock = FakeClock()
+    sampler = EventLogSampler(max_per_second=2, clock=clock)
+
+    burst = [sampler.admit("rate_limit") for _ in range(5)]
+    other = sampler.admit("auth_failed")
+    clock.now = 1.5
+    after_window = sampler.admit("rate_limit")
+
+    assert burst == [0, 0, None, None, None]
+    assert other == 0
+    assert after_window == 3
+
+
+def test_log_security_event_skips_suppressed_events(monkeypatch):
+    """Events dropped by the sampler never reach the logger."""
+    calls = []
+
+    class RecordingLogger:
+        def bind(self, **fields):
+            calls.append(fields)
+            return self
+
+        def warning(self, message):
+            calls.append(message)
+
+    monkeypatch.setattr(logging_config, "logger", RecordingLogger())
+    monkeypatch.setattr(
+        logging_config, "event_sampler", EventLogSampler(max_per_second=1, clock=FakeClock())
+    )
+
+    logging_config.log_security_event("rate_limit", "burst", client_ip="10.0.0.1")
+    logging_config.log_security_event("rate_limit", "burst", client_ip="10.0.0.1")
+
+    assert len(calls) == 2
+    assert calls[0]["event_type"] == "rate_limit"
+    assert calls[0]["client_ip"] == "10.0.0.1"
+
+
+def test_setup_logging_writes_json_lines(monkeypatch):
+    """File sinks serialize records as JSON when LOG_JSON is enabled."""
+    monkeypatch.setattr(logging_config.settings, "log_json", True)
+    logging_config.setup_logging()
+
+    logging_config.logger.bind(context="test").warning("json sink check")
+    logging_config.logger.complete()
+
+    last_line = logging_config.Path(logging_config.settings.log_file).read_text().splitlines()[-1]
+    record = json.loads(last_line)
+    assert record["record"]["message"] == "json sink check"
+    assert record["record"]["extra"]["context"] == "test"
@@ -0,0 +1,74 @@
+"""Tests for the event-loop lag monitor."""
+
+import asyncio
+import time
+
+from app.monitoring.loop_monitor import BLOCKED_METRIC, LAG_METRIC, EventLoopMonitor
+from app.monitoring.metrics import MetricsCollector
+
+
+def _block_event_loop(duration: float) -> None:
+    time.sleep(duration)
+
+
+def test_monitor_records_lag_samples():
+    """The probe task records one lag sample per interval."""
+    collector = MetricsCollector()
+
+    async def scenario():
+        monitor = EventLoopMonitor(interval=0.01, block_threshold=1.0, collector=collector)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+
+    assert not monitor.running
+    assert len(collector.get_metrics(LAG_METRIC)) >= 3
+    assert not monitor.blocking_events
+
+
+def test_monitor_captures_stack_of_blocking_call():
+    """A stall longer than the threshold is reported with the blocking stack."""
+    collector = MetricsCollector()
+
+    async def scenario():
+        monitor = EventLoopMonitor(interval=0.01, block_threshold=0.05, collector=collector)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        _block_event_loop(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+
+    assert len(monitor.blocking_events) == 1
+    event = monitor.blocking_events[0]
+    assert event.duration >= 0.15
+    assert any("_block_event_loop" in line for line in event.stack)
+    assert collector.get_metrics(BLOCKED_METRIC)
+
+    summary = monitor.get_summary()
+    assert summary["lag"]["p99"] >= 0.1
+    assert summary["blocking_events"][0]["stack"]
+
+
+def test_metrics_collector_max_samples_bounds_memory():
+    """A bounded collector keeps only the most recent entries per metric."""
+    collector = MetricsCollector(max_samples=3)
+
+    for value in range(5):
+        collector.record(LAG_METRIC, float(value))
+
+    assert [m["value"] for m in collector.get_metrics(LAG_METRIC)] == [2.0, 3.0, 4.0]
+
+
+def test_dashboard_exposes_event_loop_percentiles():
+    """The dashboard includes the event loop section with lag percentiles."""
+    from app.monitoring.dashboard import generate_dashboard
+
+    dashboard = generate_dashboard()
+
+    assert {"p50", "p95", "p99"} <= set(dashboard["event_loop"]["lag"])
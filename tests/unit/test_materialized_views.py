@@ -0,0 +1,146 @@
+"""Tests for the refresh of the materialized catalogue views."""
+
+import threading
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.domain.exceptions.overload import QueryTimeoutException
+from app.infrastructure.database import materialized
+from app.infrastructure.database.materialized import (
+    CatalogueViewRefresher,
+    refresh_catalogue_views,
+)
+from app.infrastructure.repositories import producto as producto_repository
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+
+def _postgres_session(materialized: list[str], catalogue_version: bool = False) -> MagicMock:
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    session.scalars.return_value = materialized
+    session.scalar.return_value = "catalogue_version" if catalogue_version else None
+    return session
+
+
+def test_refresh_runs_concurrently_only_for_materialized_views():
+    """Plain views are left alone; materialized ones are refreshed concurrently."""
+    session = _postgres_session([])
+    assert refresh_catalogue_views(session) == []
+    session.execute.assert_not_called()
+
+    session = _postgres_session(["familia_stats", "productos_clean"])
+    assert refresh_catalogue_views(session) == ["productos_clean", "familia_stats"]
+    statements = [str(call.args[0]) for call in session.execute.call_args_list]
+    assert statements == [
+        "REFRESH MATERIALIZED VIEW CONCURRENTLY productos_clean",
+        "REFRESH MATERIALIZED VIEW CONCURRENTLY familia_stats",
+    ]
+
+
+def test_refresh_bumps_the_catalogue_version_when_present():
+    """Refreshed views change endpoint bodies, so cached ETags must change too."""
+    session = _postgres_session(["productos_clean"], catalogue_version=True)
+    refresh_catalogue_views(session)
+
+    statements = [str(call.args[0]) for call in session.execute.call_args_list]
+    assert statements[-1].startswith("UPDATE catalogue_version SET version = version + 1")
+
+
+def test_refresh_is_noop_outside_postgresql():
+    """SQLite has no materialized views."""
+    with Session(create_engine("sqlite://")) as session:
+        assert refresh_catalogue_views(session) == []
+
+
+class RecordingRefresher:
+    def __init__(self):
+        self.callbacks = []
+
+    def schedule(self, on_refreshed=None):
+        self.callbacks.append(on_refreshed)
+
+
+def test_enrichment_schedules_a_refresh_only_when_products_changed(monkeypatch):
+    """The refresh is scheduled after a committed enrichment that updated products."""
+    repository = SQLAlchemyProductoRepository(MagicMock())
+    repository.session.in_transaction.return_value = False
+    refresher = RecordingRefresher()
+    monkeypatch.setattr(producto_repository, "get_catalogue_view_refresher", lambda: refresher)
+    invalidated = []
+    monkeypatch.setattr(
+        producto_repository,
+        "get_catalogue_version",
+        lambda: MagicMock(invalidate=lambda: invalidated.append(True)),
+    )
+
+    monkeypatch.setattr(
+        repository, "_apply_bc3_enrichment", lambda items, key: {"updated_codes": []}
+    )
+    repository.apply_bc3_enrichment([], "key-1")
+    assert refresher.callbacks == []
+    assert invalidated == []
+
+    monkeypatch.setattr(
+        repository, "_apply_bc3_enrichment", lambda items, key: {"updated_codes": ["001"]}
+    )
+    assert repository.apply_bc3_enrichment([], "key-2") == {"updated_codes": ["001"]}
+    # Caches are dropped before the refresh runs, and again once it lands
+    assert invalidated == [True]
+    refresher.callbacks[0]()
+    assert invalidated == [True, True]
+
+
+def _refresher(monkeypatch, refresh):
+    monkeypatch.setattr(materialized, "refresh_catalogue_views", refresh)
+    sessions = []
+
+    def session_factory():
+        session = MagicMock()
+        sessions.append(session)
+        return session
+
+    return CatalogueViewRefresher(session_factory), sessions
+
+
+def test_refresher_runs_in_the_background_on_its_own_session(monkeypatch):
+    """The refresh gets a fresh session and callbacks run once views changed."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_refresh(session):
+        started.set()
+        release.wait(5)
+        return ["productos_clean"]
+
+    refresher, sessions = _refresher(monkeypatch, slow_refresh)
+    called = []
+    refresher.schedule(lambda: called.append("first"))
+    assert started.wait(5)
+    # Requests made meanwhile are coalesced into one more refresh
+    refresher.schedule(lambda: called.append("second"))
+    refresher.schedule(lambda: called.append("third"))
+    release.set()
+
+    assert refresher.wait(5)
+    assert called == ["first", "second", "third"]
+    assert len(sessions) == 2
+
+
+def test_refresher_survives_a_failed_refresh(monkeypatch):
+    """A timed-out refresh is logged; callbacks are skipped and later refreshes run."""
+    outcomes = [QueryTimeoutException("admin"), ["productos_clean"]]
+
+    def refresh(session):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    refresher, _ = _refresher(monkeypatch, refresh)
+    called = []
+    refresher.schedule(lambda: called.append("failed"))
+    assert refresher.wait(5)
+    refresher.schedule(lambda: called.append("refreshed"))
+    assert refresher.wait(5)
+    assert called == ["refreshed"]
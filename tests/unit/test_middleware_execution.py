@@ -253,33 +253,33 @@ async def test_rate_limit_dispatch_handles_missing_client():
 class TestMiddlewareRateLimitStore:
     """Tests de rate_limit_store en app/middleware.py (TDD + AAA)."""
 
-    def test_rate_limit_store_is_dict_of_lists(self) -> None:
+    def test_rate_limit_store_is_sliding_window_limiter(self) -> None:
         """
-        GREEN: rate_limit_store es un dict de listas.
+        GREEN: rate_limit_store es un SlidingWindowRateLimiter acotado.
         """
         # Arrange & Act
         from app.middleware import rate_limit_store
+        from app.security.sliding_window import SlidingWindowRateLimiter
 
         # Assert
-        assert isinstance(rate_limit_store, dict)
-        assert all(isinstance(v, list) for v in rate_limit_store.values())
+        assert isinstance(rate_limit_store, SlidingWindowRateLimiter)
+        assert rate_limit_store.max_keys > 0
 
-    def test_rate_limit_store_allows_adding_timestamps(self) -> None:
+    def test_rate_limit_store_records_requests(self) -> None:
         """
-        GREEN: rate_limit_store permite agregar timestamps.
+        GREEN: rate_limit_store registra peticiones por cliente.
         ."""
         # Arrange
-        import time
-
         from app.middleware import rate_limit_store
 
-        # Act - Agregar timestamp para IP
+        # Act - Registrar una petición para la IP
         ip = "192.168.1.100"
-        rate_limit_store[ip].append(time.time())
+        decision = rate_limit_store.hit(ip, limit=5)
 
         # Assert
-        assert len(rate_limit_store[ip]) > 0
-        assert rate_limit_store[ip][-1] > 0
+        assert ip in rate_limit_store
+        assert decision.allowed is True
+        assert decision.remaining <= 4
 
 
 class TestMiddlewareApiKeyScopes:
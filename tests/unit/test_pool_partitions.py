@@ -0,0 +1,100 @@
+"""Tests for per-traffic-class database pool partitions (bulkheads)."""
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.database import connection
+from app.interfaces.http import productos as productos_http
+from app.interfaces.http import traffic
+
+
+def test_each_traffic_class_has_its_own_pool_and_limits():
+    """Public, BC3 and admin traffic never share a connection pool."""
+    pools = {
+        traffic_class: connection.engines[traffic_class].pool
+        for traffic_class in connection.TRAFFIC_CLASSES
+    }
+
+    assert len({id(pool) for pool in pools.values()}) == 3
+    assert pools["public"].size() == 6
+    assert pools["bc3"].size() == 3
+    assert pools["admin"].size() == 1
+    assert connection.engine is connection.engines["public"]
+
+
+def test_partition_metrics_follow_pool_events():
+    """Checkout/checkin events feed the partition counters."""
+    metrics = connection.PartitionMetrics()
+    engine = create_engine("sqlite://")
+    connection._attach_partition_metrics(engine, metrics)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert metrics.to_dict() == {"checkouts": 1, "in_use": 1, "peak_in_use": 1}
+
+    assert metrics.to_dict()["in_use"] == 0
+
+
+def test_pool_health_reports_every_partition():
+    """monitor_pool_health exposes stats and limits per traffic class."""
+    health = connection.monitor_pool_health()
+
+    assert set(health["partitions"]) == {"public", "bc3", "admin"}
+    assert health["partitions"]["bc3"]["limits"]["pool_timeout"] == 15.0
+    assert "checkouts" in health["partitions"]["public"]
+
+
+def _recording_client(monkeypatch):
+    """App with the productos router whose sessions record their partition."""
+    selected = []
+
+    class RecordingSession:
+        def __init__(self):
+            self.info = {}
+
+        def close(self):
+            return None
+
+    def factory_for(traffic_class):
+        selected.append(traffic_class)
+        return RecordingSession
+
+    monkeypatch.setattr(traffic, "get_session_factory", factory_for)
+
+    class StubService:
+        def obtener_producto(self, codigo):
+            raise productos_http.ProductoNotFoundException(codigo)
+
+        obtener_producto_privado = obtener_producto
+
+        def apply_bc3_enrichment(self, request, idempotency_key):
+            raise ValueError("idempotency key has already been used with a different request")
+
+    def stub_service(session=Depends(productos_http.get_db_session)):
+        return StubService()
+
+    app = FastAPI()
+    app.include_router(productos_http.router, prefix="/api")
+    app.dependency_overrides[productos_http.get_producto_service] = stub_service
+    return TestClient(app), selected
+
+
+def test_partition_selected_from_route_and_key_type(monkeypatch):
+    """Public, BC3-key, admin-key and enrichment-apply requests use their own pools."""
+    monkeypatch.setenv("BC3_API_KEYS", "bc3-key")
+    monkeypatch.setenv("ADMIN_API_KEYS", "admin-key")
+    productos_http.get_settings.cache_clear()
+    client, selected = _recording_client(monkeypatch)
+
+    client.get("/api/productos/v1/123")
+    client.get("/api/productos/bc3/v1/123", headers={"X-API-Key": "bc3-key"})
+    client.get("/api/productos/v1/123", headers={"X-Admin-API-Key": "admin-key"})
+    client.post(
+        "/api/productos/bc3/v1/enrichment/apply",
+        headers={"X-API-Key": "bc3-key", "Idempotency-Key": "job-1"},
+        json={"items": [{"codigo": "123", "bc3_descripcion_corta": "Downlight"}]},
+    )
+    productos_http.get_settings.cache_clear()
+
+    assert selected == ["public", "bc3", "admin", "admin"]
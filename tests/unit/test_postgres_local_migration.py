@@ -31,6 +31,8 @@ from migration.postgres_local_migrate import (  # pyright: ignore[reportMissingI
 
 ROOT = Path(__file__).parents[2]
 SCHEMA_PATH = ROOT / "migration" / "04_postgres_schema.sql"
+MATERIALIZE_PATH = ROOT / "migration" / "05_materialize_productos_clean.sql"
+FAMILIA_STATS_PATH = ROOT / "migration" / "06_familia_stats.sql"
 
 
 def test_schema_declares_products_jobs_and_safe_view() -> None:
@@ -49,6 +51,27 @@ def test_schema_declares_products_jobs_and_safe_view() -> None:
     assert "DROP TABLE" not in sql.upper()
 
 
+def test_materialized_productos_clean_is_indexed_for_concurrent_refresh() -> None:
+    schema = SCHEMA_PATH.read_text(encoding="utf-8")
+    sql = MATERIALIZE_PATH.read_text(encoding="utf-8")
+
+    assert "matviewname = 'productos_clean'" in schema
+    assert "CREATE MATERIALIZED VIEW IF NOT EXISTS productos_clean" in sql
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS idx_productos_clean_codigo" in sql
+    for column in ("marca", "familia", "pvp", "bc3_product_type"):
+        assert f"ON productos_clean ({column})" in sql
+    assert "DROP TABLE" not in sql.upper()
+
+
+def test_familia_stats_is_indexed_on_name_and_coverage() -> None:
+    sql = FAMILIA_STATS_PATH.read_text(encoding="utf-8")
+
+    assert "CREATE MATERIALIZED VIEW IF NOT EXISTS familia_stats" in sql
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS idx_familia_stats_familia" in sql
+    assert "ON familia_stats (bc3_coverage DESC, familia)" in sql
+    assert "DROP TABLE" not in sql.upper()
+
+
 def test_schema_contains_id_generator_compatibility_block() -> None:
     sql = SCHEMA_PATH.read_text(encoding="utf-8")
 
@@ -0,0 +1,120 @@
+"""Tests for the admin-only request profiler."""
+
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.monitoring import profiler as profiler_module
+from app.monitoring.profiler import ProfilingMiddleware, StackSampler, write_collapsed_profile
+
+
+def _busy(duration: float) -> int:
+    deadline = time.perf_counter() + duration
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def _build_app(tmp_path, sample_rate: int = 0) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        _busy(0.05)
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(
+        ProfilingMiddleware, sample_rate=sample_rate, interval=0.001, output_dir=tmp_path
+    )
+    return app
+
+
+def test_stack_sampler_collects_collapsed_stacks():
+    """The sampler records root-first stacks that include the busy function."""
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    _busy(0.05)
+    sampler.stop()
+
+    output = sampler.render_collapsed()
+    assert "_busy" in output
+    first_line = output.splitlines()[0]
+    stack, count = first_line.rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) >= 1
+
+
+def test_write_collapsed_profile_skips_empty_samples(tmp_path):
+    """Nothing is written when the sampler captured no stacks."""
+    assert write_collapsed_profile(StackSampler(), "GET", "/x", tmp_path) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_admin_header_returns_profile_instead_of_body(tmp_path, monkeypatch):
+    """An admin request with the profile header receives the report."""
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("ADMIN_API_KEYS", "admin-key")
+    monkeypatch.setattr(profiler_module, "_PyinstrumentProfiler", None)
+    client = TestClient(_build_app(tmp_path))
+
+    response = client.get("/work", headers={"X-Profile": "text", "X-Admin-API-Key": "admin-key"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["X-Profile-Status"] == "200"
+    assert "_busy" in response.text
+
+
+def test_profiler_is_stopped_when_the_request_fails(tmp_path, monkeypatch):
+    """A failing profiled request still stops the profiler."""
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("ADMIN_API_KEYS", "admin-key")
+    stopped = []
+
+    class _Profiler:
+        def __init__(self, **kwargs):
+            pass
+
+        def start(self):
+            pass
+
+        def stop(self):
+            stopped.append(True)
+
+    monkeypatch.setattr(profiler_module, "_PyinstrumentProfiler", _Profiler)
+    client = TestClient(_build_app(tmp_path), raise_server_exceptions=False)
+
+    response = client.get("/boom", headers={"X-Profile": "text", "X-Admin-API-Key": "admin-key"})
+
+    assert response.status_code == 500
+    assert stopped == [True]
+
+
+def test_profile_header_is_ignored_without_admin_key(tmp_path, monkeypatch):
+    """Non-admin callers cannot trigger profiling."""
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("ADMIN_API_KEYS", "admin-key")
+    client = TestClient(_build_app(tmp_path))
+
+    response = client.get("/work", headers={"X-Profile": "text"})
+
+    assert response.json() == {"ok": True}
+    assert "X-Profile-Status" not in response.headers
+
+
+def test_sampling_mode_writes_collapsed_files(tmp_path):
+    """One in N requests is profiled and persisted to the output directory."""
+    client = TestClient(_build_app(tmp_path, sample_rate=2))
+
+    for _ in range(4):
+        assert client.get("/work").json() == {"ok": True}
+
+    profiles = sorted(tmp_path.glob("*.collapsed"))
+    assert len(profiles) == 2
+    assert profiles[0].name.endswith("-GET-work.collapsed")
@@ -0,0 +1,127 @@
+"""Tests for per-request query deadlines, cancellation and 504 mapping."""
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.exceptions.overload import QueryTimeoutException, ServiceOverloadedException
+from app.infrastructure.database import deadlines
+from app.interfaces.http.deadlines import run_cancellable, search_query_budget
+from app.interfaces.http.error_handlers import register_exception_handlers
+
+
+def _session_factory():
+    """SQLite session factory with the deadline hooks installed."""
+    engine = create_engine("sqlite://")
+    factory = sessionmaker(bind=engine)
+    deadlines.install_deadline_hooks(factory, engine, "public")
+    return factory
+
+
+def test_remaining_budget_counts_down_from_deadline():
+    """The deadline is stored on the session and the budget shrinks with time."""
+    session = _session_factory()()
+    assert deadlines.remaining_budget(session) is None
+
+    deadlines.set_deadline(session, 2.0)
+
+    assert 0 < deadlines.remaining_budget(session) <= 2.0
+    assert session.info["budget"] == 2.0
+
+
+def test_exhausted_budget_rejects_new_transactions():
+    """A session past its deadline does not start another query."""
+    session = _session_factory()()
+    deadlines.set_deadline(session, 1.0, now=0.0)  # expired long ago
+
+    with pytest.raises(QueryTimeoutException) as excinfo:
+        session.execute(text("SELECT 1"))
+
+    assert excinfo.value.budget == 1.0
+    assert isinstance(excinfo.value, ServiceOverloadedException)
+
+
+def test_open_transaction_exposes_connection_for_cancel():
+    """The DBAPI connection is remembered only while the transaction is open."""
+    session = _session_factory()()
+    deadlines.set_deadline(session, 5.0)
+
+    session.execute(text("SELECT 1"))
+    assert session.info["dbapi_connection"] is not None
+
+    session.commit()
+    assert "dbapi_connection" not in session.info
+
+
+def test_cancel_running_query_prefers_cancel_safe():
+    """cancel_running_query uses psycopg's cancel_safe when available."""
+    calls = []
+
+    class FakeConnection:
+        def cancel_safe(self):
+            calls.append("cancel_safe")
+
+        def cancel(self):
+            calls.append("cancel")
+
+    class FakeSession:
+        info = {"dbapi_connection": FakeConnection(), "traffic_class": "bc3"}
+
+    assert deadlines.cancel_running_query(FakeSession()) is True
+    assert calls == ["cancel_safe"]
+
+    FakeSession.info = {}
+    assert deadlines.cancel_running_query(FakeSession()) is False
+
+
+def test_postgres_query_canceled_is_translated():
+    """SQLSTATE 57014 raised by the driver becomes QueryTimeoutException."""
+    engine = create_engine("sqlite://")
+    deadlines.install_deadline_hooks(sessionmaker(bind=engine), engine, "public")
+
+    class QueryCanceled(Exception):
+        sqlstate = deadlines.QUERY_CANCELED_SQLSTATE
+
+    def fail(cursor, statement, parameters, context):
+        raise QueryCanceled("canceling statement due to statement timeout")
+
+    event.listen(engine, "do_execute", fail)
+    with pytest.raises(QueryTimeoutException):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+
+def test_search_routes_get_budget_and_run_off_the_event_loop():
+    """search_query_budget lowers the budget; run_cancellable returns the result."""
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.get("/search", dependencies=[Depends(search_query_budget)])
+    async def search(request: Request):
+        return {"budget": await run_cancellable(request, lambda: request.state.query_budget)}
+
+    @app.get("/slow")
+    async def slow():
+        raise QueryTimeoutException("public", budget=2.0)
+
+    client = TestClient(app)
+    assert client.get("/search").json() == {"budget": 2.0}
+
+    response = client.get("/slow")
+    assert response.status_code == 504
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["details"]["budget"] == 2.0
+
+
+def test_deadline_is_rechecked_inside_one_transaction():
+    """Statements after the budget ran out in an open transaction are refused."""
+    session = _session_factory()()
+    deadlines.set_deadline(session, 5.0)
+    session.execute(text("SELECT 1"))
+    deadlines.enforce_deadline(session)
+
+    session.info["deadline"] = 0.0  # spent while the transaction was open
+    with pytest.raises(QueryTimeoutException):
+        deadlines.enforce_deadline(session)
@@ -0,0 +1,102 @@
+"""Tests for read-replica routing with two local SQLite databases as stand-ins."""
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.database import replicas as replicas_module
+from app.infrastructure.database.replicas import ReplicaSet, RoutingSession, WriteTracker
+from app.infrastructure.models.producto_clean import ProductoModelClean
+from app.infrastructure.repositories.producto import SQLAlchemyProductoRepository
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _database(tmp_path, name: str):
+    """SQLite file database whose single product is described as ``name``."""
+    engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+    ProductoModelClean.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO productos_clean (codigo, descripcion, marca) VALUES ('1', :d, 'X')"),
+            {"d": name},
+        )
+    return engine
+
+
+def _factory(primary, replica_engines, clock=None):
+    """Routing session factory over ``primary`` and ``replica_engines``."""
+    replica_set = ReplicaSet(replica_engines, clock=clock or FakeClock())
+    return sessionmaker(bind=primary, class_=RoutingSession, replicas=replica_set), replica_set
+
+
+def test_read_only_calls_round_robin_over_replicas(tmp_path, monkeypatch):
+    """Decorated repository reads alternate between replicas; others use the primary."""
+    monkeypatch.setattr(replicas_module, "_global_write_tracker", WriteTracker())
+    factory, _ = _factory(
+        _database(tmp_path, "primary"),
+        [_database(tmp_path, "replica-a"), _database(tmp_path, "replica-b")],
+    )
+
+    served_by = []
+    for _ in range(3):
+        with factory() as session:
+            served_by.append(SQLAlchemyProductoRepository(session).get_by_codigo("1").descripcion)
+
+    assert served_by == ["replica-a", "replica-b", "replica-a"]
+
+    with factory() as session:
+        # Undecorated (write-path) queries stay on the primary
+        descripcion = session.execute(
+            text("SELECT descripcion FROM productos_clean WHERE codigo = '1'")
+        ).scalar()
+    assert descripcion == "primary"
+
+
+def test_writer_reads_its_own_writes_from_primary(tmp_path, monkeypatch):
+    """After a flush, the session and its client stay on the primary for the window."""
+    clock = FakeClock()
+    monkeypatch.setattr(replicas_module, "_global_write_tracker", WriteTracker(5.0, clock=clock))
+    factory, _ = _factory(_database(tmp_path, "primary"), [_database(tmp_path, "replica")])
+
+    with factory() as session:
+        session.info["sticky_key"] = "key:bc3"
+        session.add(ProductoModelClean(codigo="2", descripcion="nuevo", marca="X"))
+        session.flush()
+        assert SQLAlchemyProductoRepository(session).get_by_codigo("2").descripcion == "nuevo"
+        session.commit()
+
+    def read_as(sticky_key):
+        with factory() as session:
+            session.info["sticky_key"] = sticky_key
+            return SQLAlchemyProductoRepository(session).get_by_codigo("1").descripcion
+
+    assert read_as("key:bc3") == "primary"
+    assert read_as("ip:10.0.0.1") == "replica"
+
+    clock.now += 6
+    assert read_as("key:bc3") == "replica"
+
+
+def test_unhealthy_replica_leaves_rotation(tmp_path, monkeypatch):
+    """A replica that fails its health check is skipped; none left means primary."""
+    monkeypatch.setattr(replicas_module, "_global_write_tracker", WriteTracker())
+    clock = FakeClock()
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    factory, replica_set = _factory(_database(tmp_path, "primary"), [broken], clock=clock)
+
+    clock.now += replica_set.health_interval + 1
+    with factory() as session:
+        descripcion = SQLAlchemyProductoRepository(session).get_by_codigo("1").descripcion
+
+    assert descripcion == "primary"
+    state = replica_set.get_state()[0]
+    assert state["healthy"] is False
+    assert state["last_error"] == "OperationalError"
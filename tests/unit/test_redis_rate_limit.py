@@ -0,0 +1,126 @@
+"""Tests for the Redis-backed rate limiter (fakeredis stand-in) and its circuit breaker."""
+
+import asyncio
+
+import pytest
+
+from app.middleware_redis import CircuitBreaker, RedisRateLimitMiddleware
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+class FailingScript:
+    """Script stand-in whose calls always fail like an unreachable server."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, keys, args):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+
+class FailingRedis:
+    """Redis client stand-in that registers scripts which always fail."""
+
+    def __init__(self):
+        self.script = FailingScript()
+
+    def register_script(self, _source):
+        return self.script
+
+
+def _middleware(redis_client, per_client=3, global_limit=1000):
+    middleware = RedisRateLimitMiddleware(app=None, redis_client=redis_client)
+    middleware.rate_limit_per_client = per_client
+    middleware.rate_limit_global = global_limit
+    return middleware
+
+
+def test_workers_share_the_client_quota():
+    """Two middleware instances (two workers) share one per-client window."""
+    server = fakeredis.FakeServer()
+    worker_a = _middleware(fakeredis.FakeAsyncRedis(server=server))
+    worker_b = _middleware(fakeredis.FakeAsyncRedis(server=server))
+
+    async def scenario():
+        return [
+            await worker._check_rate_limits_shared(client_id)
+            for worker, client_id in (
+                (worker_a, "key-1"),
+                (worker_b, "key-1"),
+                (worker_a, "key-1"),
+                (worker_b, "key-1"),
+                (worker_b, "key-2"),
+            )
+        ]
+
+    results = asyncio.run(scenario())
+
+    assert [r["exceeded"] for r in results] == [False, False, False, True, False]
+    assert {r["backend"] for r in results} == {"redis"}
+    assert results[3]["retry_after"] > 0
+
+
+def test_global_limit_is_atomic_across_clients():
+    """The global window rejects once the total across clients is reached."""
+    server = fakeredis.FakeServer()
+    middleware = _middleware(fakeredis.FakeAsyncRedis(server=server), global_limit=2)
+
+    async def scenario():
+        return [await middleware._check_rate_limits_shared(f"client-{i}") for i in range(3)]
+
+    results = asyncio.run(scenario())
+
+    assert [r["exceeded"] for r in results] == [False, False, True]
+    assert "Global rate limit" in results[2]["message"]
+
+
+def test_redis_keys_expire_after_two_windows():
+    """Client counters carry a TTL so idle clients leave Redis."""
+    client = fakeredis.FakeAsyncRedis()
+    middleware = _middleware(client)
+
+    async def scenario():
+        await middleware._check_rate_limits_shared("key-1")
+        return await client.pttl(middleware._get_redis_key("key-1"))
+
+    ttl_ms = asyncio.run(scenario())
+
+    assert 0 < ttl_ms <= 120_000
+
+
+def test_circuit_breaker_falls_back_to_local_limits():
+    """Repeated Redis failures open the circuit and stop contacting Redis."""
+    failing = FailingRedis()
+    middleware = _middleware(failing)
+
+    async def scenario():
+        return [await middleware._check_rate_limits_shared("key-1") for _ in range(5)]
+
+    results = asyncio.run(scenario())
+
+    assert {r["backend"] for r in results} == {"local"}
+    assert [r["exceeded"] for r in results] == [False, False, False, True, True]
+    assert failing.script.calls == middleware.circuit_breaker.failure_threshold
+    assert middleware.circuit_breaker.state == "open"
+
+
+def test_circuit_breaker_half_open_trial():
+    """After the reset timeout one trial call decides whether to close again."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.record_failure() is True
+    assert breaker.allow_request() is False
+
+    now[0] = 11.0
+    assert breaker.state == "half_open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 22.0
+    breaker.record_success()
+    assert breaker.state == "closed"
@@ -0,0 +1,170 @@
+"""Tests for the incremental, bounded-memory scraping detector."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.security.scraping_detector import (
+    HISTORY_TTL_SECONDS,
+    BanStore,
+    InMemoryBanStore,
+    RedisBanStore,
+    ScrapingDetector,
+)
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _request(path: str, ip: str = "10.0.0.1", headers: dict | None = None):
+    return SimpleNamespace(
+        url=SimpleNamespace(path=path),
+        headers=headers or {},
+        client=SimpleNamespace(host=ip),
+    )
+
+
+def _detector(clock=None, ban_store=None):
+    clock = clock or FakeClock()
+    return ScrapingDetector(ban_store=ban_store or InMemoryBanStore(clock), clock=clock)
+
+
+def test_sequential_product_scan_is_detected():
+    """Walking product codes one by one scores as sequential access."""
+    clock = FakeClock()
+    detector = _detector(clock)
+
+    for code in range(11253300, 11253325):
+        clock.now += 1.5
+        analysis = detector.analyze_request(_request(f"/api/productos/v1/{code}"))
+
+    assert analysis["patterns"]["sequential_access"] == 40
+    assert "perfect_timing" not in analysis["patterns"]
+
+
+def test_perfect_timing_and_frequency_flag_bots():
+    """Fast, evenly spaced requests trigger timing and frequency heuristics."""
+    clock = FakeClock()
+    detector = _detector(clock)
+
+    for _ in range(60):
+        clock.now += 0.1
+        analysis = detector.analyze_request(_request("/api/productos/"))
+
+    assert analysis["patterns"]["perfect_timing"] == 30
+    assert analysis["patterns"]["high_frequency"] == 20
+    assert analysis["score"] == 60
+
+
+def test_irregular_human_traffic_is_not_suspicious():
+    """Slow, irregular browsing with a referer scores zero."""
+    clock = FakeClock()
+    detector = _detector(clock)
+
+    for index, code in enumerate((500, 12, 9000, 431, 77, 3000, 150, 8, 6400, 20) * 3):
+        clock.now += 2 + index % 7
+        analysis = detector.analyze_request(
+            _request(f"/api/productos/v1/{code}", headers={"referer": "https://disano.es"})
+        )
+
+    assert analysis["score"] == 0
+
+
+def test_per_client_memory_is_bounded():
+    """Long request streams keep fixed-size buffers per client."""
+    clock = FakeClock()
+    detector = _detector(clock)
+
+    for code in range(5000):
+        clock.now += 0.5
+        detector.analyze_request(_request(f"/api/products/{code}"))
+
+    stats = detector.clients["ip:10.0.0.1"]
+    assert stats.requests == 5000
+    assert len(stats.intervals) == 19
+    assert len(stats.code_steps) == 49
+    assert len(stats.recent) == 51
+
+
+def test_idle_clients_expire_after_one_hour():
+    """Clients silent for an hour are dropped via the time wheel."""
+    clock = FakeClock()
+    detector = _detector(clock)
+    detector.analyze_request(_request("/api/productos/", ip="10.0.0.1"))
+
+    clock.now += HISTORY_TTL_SECONDS / 2
+    detector.analyze_request(_request("/api/productos/", ip="10.0.0.2"))
+    clock.now += HISTORY_TTL_SECONDS / 2 + 120
+    detector.analyze_request(_request("/api/productos/", ip="10.0.0.3"))
+
+    assert set(detector.clients) == {"ip:10.0.0.2", "ip:10.0.0.3"}
+
+
+def test_honeypot_bans_are_permanent_and_removable():
+    """Two honeypot hits ban the IP until an operator unbans it."""
+    detector = _detector()
+
+    async def scenario():
+        await detector.is_honeypot_access(_request("/api/sitemap.xml", ip="6.6.6.6"))
+        assert await detector.get_banned_ips() == []
+        await detector.is_honeypot_access(_request("/sitemap.xml", ip="6.6.6.6"))
+
+        assert await detector.get_banned_ips() == ["6.6.6.6"]
+        assert await detector.unban_ip("6.6.6.6") is True
+        assert await detector.get_banned_ips() == []
+
+    asyncio.run(scenario())
+
+
+def test_temporary_bans_expire():
+    """Expired bans disappear from the store."""
+    clock = FakeClock()
+    store = InMemoryBanStore(clock)
+
+    async def scenario():
+        await store.ban("1.2.3.4", clock.now + 60)
+
+        assert await store.get_ban("1.2.3.4") is not None
+        clock.now += 61
+        assert await store.get_ban("1.2.3.4") is None
+        assert await store.active_bans() == []
+
+    asyncio.run(scenario())
+
+
+def test_ban_store_requires_every_operation():
+    """BanStore is abstract: partial implementations cannot be instantiated."""
+
+    class PartialBanStore(BanStore):
+        async def get_ban(self, ip):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialBanStore()
+
+
+def test_redis_ban_store_is_shared_between_workers():
+    """Bans written by one worker are visible to another through Redis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    worker_a = _detector(ban_store=RedisBanStore(fakeredis.FakeAsyncRedis(server=server)))
+    worker_b = _detector(ban_store=RedisBanStore(fakeredis.FakeAsyncRedis(server=server)))
+
+    async def scenario():
+        await worker_a.is_honeypot_access(_request("/api/all-products", ip="6.6.6.6"))
+        await worker_b.is_honeypot_access(_request("/api/all-products", ip="6.6.6.6"))
+
+        assert await worker_a.get_banned_ips() == ["6.6.6.6"]
+        assert await worker_b.ban_store.get_ban("6.6.6.6") == float("inf")
+        assert await worker_a.unban_ip("6.6.6.6") is True
+        assert await worker_b.get_banned_ips() == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,115 @@
+"""Behavioral tests for the pure-ASGI security pipeline."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import middleware as module
+from app.middleware import SecurityPipelineMiddleware
+
+BROWSER_UA = "Mozilla/5.0 (X11; Linux x86_64) Chrome/120.0"
+
+
+@pytest.fixture
+def production_env(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("API_KEYS", "general-key")
+    monkeypatch.setenv("ADMIN_API_KEYS", "admin-key")
+    module.rate_limit_store.clear()
+    yield
+    module.rate_limit_store.clear()
+
+
+def _client(enforce_access: bool = True) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return PlainTextResponse("ok", headers={"Server": "uvicorn"})
+
+    @app.get("/api/items")
+    async def items():
+        return {"items": []}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for part in (b"a", b"b", b"c"):
+                yield part
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(SecurityPipelineMiddleware, enforce_access=enforce_access)
+    return TestClient(app)
+
+
+def test_headers_added_and_server_banner_stripped(production_env):
+    """Security headers (and HSTS in production) are set on every response."""
+    response = _client().get("/health", headers={"User-Agent": BROWSER_UA})
+
+    assert response.status_code == 200
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["Content-Security-Policy"] == "default-src 'self'"
+    assert "max-age=31536000" in response.headers["Strict-Transport-Security"]
+    assert "server" not in response.headers
+
+
+def test_blocked_user_agent_is_rejected(production_env):
+    """Scraper User-Agents receive 403 before any other check."""
+    response = _client().get("/api/items", headers={"User-Agent": "python-requests/2.31"})
+
+    assert response.status_code == 403
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+
+def test_api_key_required_and_validated(production_env):
+    """Protected routes need a valid regular or admin key."""
+    client = _client()
+
+    missing = client.get("/api/items", headers={"User-Agent": BROWSER_UA})
+    invalid = client.get("/api/items", headers={"User-Agent": BROWSER_UA, "X-API-Key": "nope"})
+    admin = client.get(
+        "/api/items", headers={"User-Agent": BROWSER_UA, "X-Admin-API-Key": "admin-key"}
+    )
+
+    assert missing.status_code == 401
+    assert invalid.json() == {"detail": "Invalid API Key"}
+    assert admin.status_code == 200
+
+
+def test_rate_limit_headers_and_rejection(production_env, monkeypatch):
+    """Rate-limit headers are added and the quota is enforced per key."""
+    monkeypatch.setattr(module, "get_rate_limit", lambda: 2)
+    client = _client()
+    headers = {"User-Agent": BROWSER_UA, "X-API-Key": "general-key"}
+
+    first = client.get("/api/items", headers=headers)
+    client.get("/api/items", headers=headers)
+    third = client.get("/api/items", headers=headers)
+
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert third.status_code == 429
+    assert 1 <= int(third.headers["Retry-After"]) <= 60
+
+
+def test_streaming_responses_pass_through(production_env):
+    """Streaming bodies are forwarded chunk by chunk with headers applied."""
+    response = _client().get(
+        "/api/stream", headers={"User-Agent": BROWSER_UA, "X-API-Key": "general-key"}
+    )
+
+    assert response.text == "abc"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+def test_access_checks_disabled_outside_production(monkeypatch):
+    """Without enforcement only the security headers are applied."""
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    response = _client(enforce_access=False).get("/api/items", headers={"User-Agent": "curl/8.0"})
+
+    assert response.status_code == 200
+    assert response.headers["X-XSS-Protection"] == "1; mode=block"
+    assert "Strict-Transport-Security" not in response.headers
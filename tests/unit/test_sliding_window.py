@@ -0,0 +1,74 @@
+"""Tests for the O(1) sliding-window rate limiter."""
+
+from app.middleware_redis import RedisRateLimitMiddleware
+from app.security.sliding_window import SlidingWindowRateLimiter
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now: float = 1_000_020.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_limit_enforced_within_window():
+    """Requests beyond the limit in the same window are rejected."""
+    limiter = SlidingWindowRateLimiter(limit=3, window=60, clock=FakeClock())
+
+    decisions = [limiter.hit("client") for _ in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    assert decisions[3].retry_after > 0
+
+
+def test_previous_window_is_weighted_by_overlap():
+    """Half-way through a window, half of the previous window still counts."""
+    clock = FakeClock(now=60 * 1000.0)
+    limiter = SlidingWindowRateLimiter(limit=4, window=60, clock=clock)
+    for _ in range(4):
+        assert limiter.hit("client").allowed
+
+    clock.now += 90  # halfway through the next window: estimate = 4 * 0.5
+    allowed = [limiter.hit("client").allowed for _ in range(3)]
+
+    assert allowed == [True, True, False]
+
+
+def test_idle_clients_are_evicted():
+    """Clients silent for two windows no longer hold memory."""
+    clock = FakeClock()
+    limiter = SlidingWindowRateLimiter(limit=10, window=60, clock=clock)
+    limiter.hit("old-client")
+
+    clock.now += 121
+    limiter.hit("new-client")
+
+    assert "old-client" not in limiter
+    assert len(limiter) == 1
+
+
+def test_memory_ceiling_drops_least_recent_client():
+    """The number of tracked clients never exceeds max_keys."""
+    limiter = SlidingWindowRateLimiter(limit=10, window=60, max_keys=100, clock=FakeClock())
+
+    for index in range(1000):
+        limiter.hit(f"ip-{index}")
+
+    assert len(limiter) == 100
+    assert "ip-0" not in limiter
+    assert "ip-999" in limiter
+
+
+def test_redis_middleware_enforces_global_limit_with_counter():
+    """The global limit is a single O(1) counter across clients."""
+    middleware = RedisRateLimitMiddleware(app=None)
+    middleware.rate_limit_global = 2
+
+    results = [middleware._check_rate_limits(f"client-{i}") for i in range(3)]
+
+    assert [r["exceeded"] for r in results] == [False, False, True]
+    assert results[2]["limit"] == 2
@@ -0,0 +1,106 @@
+"""Tests for the typeahead prefix index."""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.cache.suggest_index import PrefixIndex, Suggestion, SuggestIndex
+from app.infrastructure.database.catalogue_version import Version
+from app.infrastructure.models.producto_clean import ProductoModelClean
+
+PRODUCTS = [
+    Suggestion("11253300", "Luminária LED Toledo", "Disano", "TOL-33"),
+    Suggestion("11253301", "Toledo Pro 40W", "Disano", None),
+    Suggestion("20000001", "Proyector Astro", "Fosnova", "AST-1"),
+    Suggestion("30000001", "Luminaria estanca Hydro", "Disano", None),
+]
+
+
+def codes(results):
+    return [(product.codigo, match) for product, match in results]
+
+
+def test_code_prefix_matches_come_first():
+    index = PrefixIndex(PRODUCTS)
+
+    assert codes(index.suggest("112533")) == [("11253300", "codigo"), ("11253301", "codigo")]
+    assert codes(index.suggest("tol 3")) == [("11253300", "referencia")]
+
+
+def test_description_words_are_normalized():
+    index = PrefixIndex(PRODUCTS)
+
+    assert {codigo for codigo, _ in codes(index.suggest("LUMI"))} == {"11253300", "30000001"}
+    assert codes(index.suggest("luminaria tol")) == [("11253300", "descripcion")]
+    assert codes(index.suggest("pro")) == [("11253301", "descripcion"), ("20000001", "descripcion")]
+
+
+def test_limit_and_empty_queries():
+    index = PrefixIndex(PRODUCTS)
+
+    assert len(index.suggest("1", limit=1)) == 1
+    assert index.suggest("  ") == []
+    assert index.suggest("zzz") == []
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def catalogue():
+    # One shared connection: the rebuild runs in another thread
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    ProductoModelClean.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(ProductoModelClean(codigo="1", descripcion="Toledo", marca="A"))
+        session.commit()
+    return engine
+
+
+def add_product(engine, codigo, descripcion):
+    with Session(engine) as session:
+        session.add(ProductoModelClean(codigo=codigo, descripcion=descripcion, marca="A"))
+        session.commit()
+
+
+def test_rebuilds_when_catalogue_version_changes(catalogue):
+    version = {"current": Version(1, datetime(2026, 1, 1, tzinfo=timezone.utc))}
+    index = SuggestIndex(sessionmaker(catalogue), lambda: version["current"])
+
+    assert len(index.get()) == 1
+    add_product(catalogue, "2", "Astro")
+    assert len(index.get()) == 1
+
+    version["current"] = Version(2, version["current"].updated_at)
+    stale = index.get()
+    assert index.wait_for_rebuild(timeout=5)
+
+    assert len(stale) == 1
+    assert codes(index.get().suggest("astro")) == [("2", "descripcion")]
+
+
+def test_without_version_rebuilds_after_max_age(catalogue):
+    clock = FakeClock()
+    index = SuggestIndex(sessionmaker(catalogue), lambda: None, max_age=60, clock=clock)
+    index.get()
+    add_product(catalogue, "2", "Astro")
+
+    clock.now = 30
+    index.get()
+    assert index.wait_for_rebuild(timeout=5)
+    assert len(index.get()) == 1
+
+    clock.now = 61
+    index.get()
+    assert index.wait_for_rebuild(timeout=5)
+    assert len(index.get()) == 2
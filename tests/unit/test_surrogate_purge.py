@@ -0,0 +1,158 @@
+"""Tests for surrogate-key cache headers and reverse-proxy purges."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.infrastructure.cache import surrogate_purge
+from app.infrastructure.cache.surrogate_purge import (
+    HTTPCachePurger,
+    catalogue_write_keys,
+    get_purge_worker,
+    queue_purge,
+)
+from app.interfaces.http.surrogate import surrogate_keys
+
+
+@pytest.fixture
+def proxy():
+    """Local stand-in for the proxy purge endpoint; records every request."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_PURGE(self):
+            received.append((self.command, self.path, self.headers["Surrogate-Key"]))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/purge", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def purger(monkeypatch, proxy):
+    url, received = proxy
+    monkeypatch.setattr(surrogate_purge, "_global_cache_purger", HTTPCachePurger(url))
+    return received
+
+
+def test_purge_sends_keys_to_the_proxy(proxy):
+    url, received = proxy
+
+    assert HTTPCachePurger(url).purge(catalogue_write_keys(["A 1", "Ñ%"])) is True
+    assert received == [("PURGE", "/purge", "catalogue familias producto:A%201 producto:%C3%91%25")]
+
+
+def test_long_key_lists_are_split(proxy):
+    url, received = proxy
+    keys = [f"producto:{n:04d}" for n in range(10)]
+
+    assert HTTPCachePurger(url, max_header_bytes=50).purge(keys) is True
+    assert [key for _, _, value in received for key in value.split()] == keys
+    assert all(len(value) <= 50 for _, _, value in received)
+
+
+def test_unreachable_proxy_does_not_raise():
+    assert HTTPCachePurger("http://127.0.0.1:9/purge", timeout=0.5).purge(["catalogue"]) is False
+
+
+def test_purge_waits_for_commit_and_is_dropped_on_rollback(purger):
+    session = sessionmaker(create_engine("sqlite://"))()
+    session.execute(text("SELECT 1"))
+
+    queue_purge(session, ["producto:A"])
+    assert purger == []
+    session.commit()
+    get_purge_worker().wait()
+    assert [value for _, _, value in purger] == ["producto:A"]
+
+    session.execute(text("SELECT 1"))
+    queue_purge(session, ["producto:B"])
+    session.rollback()
+    session.commit()
+    get_purge_worker().wait()
+    assert [value for _, _, value in purger] == ["producto:A"]
+    session.close()
+
+
+def test_purge_outside_a_transaction_is_immediate(purger):
+    session = sessionmaker(create_engine("sqlite://"))()
+
+    queue_purge(session, ["catalogue"])
+    get_purge_worker().wait()
+
+    assert [value for _, _, value in purger] == ["catalogue"]
+    session.close()
+
+
+def test_commit_does_not_wait_for_the_proxy(monkeypatch):
+    """A slow proxy delays the purge, not the commit."""
+    release = threading.Event()
+    purged = []
+
+    class SlowPurger(HTTPCachePurger):
+        def purge(self, keys):
+            release.wait(5)
+            purged.append(keys)
+            return True
+
+    monkeypatch.setattr(surrogate_purge, "_global_cache_purger", SlowPurger("http://proxy"))
+    session = sessionmaker(create_engine("sqlite://"))()
+    session.execute(text("SELECT 1"))
+    queue_purge(session, ["producto:A"])
+
+    session.commit()
+    assert purged == []
+
+    release.set()
+    get_purge_worker().wait()
+    assert purged == [["producto:A"]]
+    session.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def make(shared_max_age):
+        monkeypatch.setenv("HTTP_SHARED_CACHE_MAX_AGE", str(shared_max_age))
+        get_settings.cache_clear()
+
+        app = FastAPI()
+
+        @app.get("/items/{codigo}", dependencies=[Depends(surrogate_keys("producto:{codigo}"))])
+        def item(codigo: str):
+            return {"codigo": codigo}
+
+        return TestClient(app)
+
+    yield make
+    get_settings.cache_clear()
+
+
+def test_responses_are_tagged_but_not_shared_by_default(client):
+    response = client(0).get("/items/A B")
+
+    assert response.headers["surrogate-key"] == "producto:A%20B"
+    assert "cache-control" not in response.headers
+
+
+def test_shared_cache_headers(client):
+    response = client(300).get("/items/A1")
+
+    assert response.headers["surrogate-key"] == "producto:A1"
+    assert response.headers["cache-control"] == "public, max-age=0, s-maxage=300"
+    assert response.headers["x-accel-expires"] == "300"
+    assert response.headers["vary"] == "X-API-Key"